@@ -7,6 +7,7 @@ import re
 from six import add_metaclass
 
 from django.conf import settings
+from django.core.cache import cache
 from django.utils.translation import ugettext_lazy, ugettext as _
 from django.core.urlresolvers import resolve
 
@@ -26,6 +27,11 @@ from xmodule.library_tools import normalize_key_for_search
 # how far back from the trigger point to look back in order to index
 REINDEX_AGE = timedelta(0, 60)  # 60 seconds
 
+# INDEX_BATCH_SIZE is the maximum number of items sent to the search engine
+# in a single index call, so that indexing a large structure doesn't build
+# one huge bulk request.
+INDEX_BATCH_SIZE = 100
+
 log = logging.getLogger('edx.modulestore')
 
 
@@ -113,6 +119,40 @@ class SearchIndexerBase(object):
         result_ids = [result["data"]["id"] for result in response["results"]]
         searcher.remove(cls.DOCUMENT_TYPE, result_ids)
 
+    @classmethod
+    def _get_structure_version(cls, modulestore, structure_key):
+        """
+        Returns the version of the published structure, or None if its
+        modulestore doesn't version it
+        """
+        return modulestore.get_course_version(structure_key)
+
+    @classmethod
+    def _get_indexed_version_cache_key(cls, structure_key):
+        """ Returns the cache key of the version of the structure last indexed """
+        return u"{}.indexed_version.{}".format(cls.INDEX_NAME, structure_key)
+
+    @classmethod
+    def _get_structure_changes(cls, modulestore, structure_key, structure_version):
+        """
+        Returns the changes to the structure since the version of it last indexed,
+        as returned by the modulestore's get_structure_changes, or None if they
+        aren't known, in which case the whole structure is walked through
+        """
+        if structure_version is None:
+            return None
+        indexed_version = cache.get(cls._get_indexed_version_cache_key(structure_key))
+        if indexed_version is None:
+            return None
+
+        changes = modulestore.get_structure_changes(structure_key, indexed_version, structure_version)
+        if changes is None:
+            return None
+        return {
+            change: set(usage_key.version_agnostic().replace(branch=None) for usage_key in usage_keys)
+            for change, usage_keys in changes.iteritems()
+        }
+
     @classmethod
     def index(cls, modulestore, structure_key, triggered_at=None, reindex_age=REINDEX_AGE):
         """
@@ -130,6 +170,12 @@ class SearchIndexerBase(object):
             which items may need to be removed from the index
             If None, then a full reindex takes place
 
+            If the structure is versioned and the version last indexed is known,
+            only the items changed since that version are walked through and have
+            their index updated, along with their ancestors, and their descendants
+            if more than their children changed. The items removed since that
+            version are removed from the index.
+
         Returns:
         Number of items that have been added to the index
         """
@@ -152,18 +198,46 @@ class SearchIndexerBase(object):
         # list - those are ready to be destroyed
         indexed_items = set()
 
-        # items_index is a list of all the items index dictionaries.
-        # it is used to collect all indexes and index them using bulk API,
+        # items_index is a list of the items index dictionaries not indexed yet.
+        # it is used to collect indexes and index them in batches using bulk API,
         # instead of per item index API call.
         items_index = []
 
+        # structure_changes holds the items changed and removed since the
+        # version of the structure last indexed, if known.
+        structure_changes = None
+
+        def index_items(batch_size=1):
+            """
+            Indexes the collected items index dictionaries, if there are at
+            least batch_size of them
+            """
+            if len(items_index) >= batch_size:
+                searcher.index(cls.DOCUMENT_TYPE, list(items_index))
+                del items_index[:]
+
         def get_item_location(item):
             """
             Gets the version agnostic item location
             """
             return item.location.version_agnostic().replace(branch=None)
 
-        def prepare_item_index(item, skip_index=False, groups_usage_info=None):
+        def is_changed(item, parent_changed):
+            """
+            Returns whether the index of the item and its descendants needs to
+            be updated since the version of the structure last indexed, and
+            whether the index of the item itself does, or None for both if the
+            changes aren't known
+            """
+            if structure_changes is None:
+                return None, None
+            item_location = get_item_location(item)
+            changed = parent_changed or item_location in structure_changes['changed']
+            return changed, changed or any(
+                item_location in structure_changes[change] for change in ('children_changed', 'ancestors')
+            )
+
+        def prepare_item_index(item, skip_index=False, groups_usage_info=None, changed=None):
             """
             Add this item to the items_index and indexed_items list
 
@@ -175,6 +249,11 @@ class SearchIndexerBase(object):
                 This should really only be passed from the recursive child calls when
                 this method has determined that it is safe to do so
 
+            changed - whether the index of the item and its descendants needs to be
+                updated since the version of the structure last indexed, or None if
+                the changes aren't known. Children whose index doesn't need to be
+                updated are not walked through.
+
             Returns:
             item_content_groups - content groups assigned to indexed item
             """
@@ -209,17 +288,26 @@ class SearchIndexerBase(object):
             item_id = unicode(cls._id_modifier(item.scope_ids.usage_id))
             indexed_items.add(item_id)
             if item.has_children:
-                # determine if it's okay to skip adding the children herein based upon how recently any may have changed
-                skip_child_index = skip_index or \
-                    (triggered_at is not None and (triggered_at - item.subtree_edited_on) > reindex_age)
+                # determine if it's okay to skip adding the children herein based upon how recently any may have
+                # changed, unless the changes since the version last indexed are known
+                skip_child_index = skip_index or (
+                    structure_changes is None and
+                    triggered_at is not None and
+                    (triggered_at - item.subtree_edited_on) > reindex_age
+                )
                 children_groups_usage = []
                 for child_item in item.get_children():
-                    if modulestore.has_published_version(child_item):
+                    child_changed, child_needs_index = is_changed(child_item, changed)
+                    if child_needs_index is False:
+                        # Unchanged, so already indexed, as when skipped.
+                        children_groups_usage.append(None)
+                    elif modulestore.has_published_version(child_item):
                         children_groups_usage.append(
                             prepare_item_index(
                                 child_item,
                                 skip_index=skip_child_index,
-                                groups_usage_info=groups_usage_info
+                                groups_usage_info=groups_usage_info,
+                                changed=child_changed,
                             )
                         )
                 if None in children_groups_usage:
@@ -240,25 +328,46 @@ class SearchIndexerBase(object):
                 item_index.update(cls.supplemental_fields(item))
                 items_index.append(item_index)
                 indexed_count["count"] += 1
+                index_items(INDEX_BATCH_SIZE)
                 return item_content_groups
             except Exception as err:  # pylint: disable=broad-except
                 # broad exception so that index operation does not fail on one item of many
                 log.warning('Could not index item: %s - %r', item.location, err)
                 error_list.append(_('Could not index item: {}').format(item.location))
 
+        structure_version = None
         try:
-            with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only):
+            # The bulk operation keeps the published structure loaded once for
+            # the whole walk, including the has_published_version checks.
+            with modulestore.branch_setting(ModuleStoreEnum.RevisionOption.published_only), \
+                    modulestore.bulk_operations(structure_key):
                 structure = cls._fetch_top_level(modulestore, structure_key)
                 groups_usage_info = cls.fetch_group_usage(modulestore, structure)
 
                 # First perform any additional indexing from the structure object
                 cls.supplemental_index_information(modulestore, structure)
 
+                structure_version = cls._get_structure_version(modulestore, structure_key)
+                if triggered_at is not None:
+                    structure_changes = cls._get_structure_changes(modulestore, structure_key, structure_version)
+                structure_changed, __ = is_changed(structure, False)
+
                 # Now index the content
                 for item in structure.get_children():
-                    prepare_item_index(item, groups_usage_info=groups_usage_info)
-                searcher.index(cls.DOCUMENT_TYPE, items_index)
-                cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                    item_changed, item_needs_index = is_changed(item, structure_changed)
+                    if item_needs_index is False:
+                        continue
+                    prepare_item_index(item, groups_usage_info=groups_usage_info, changed=item_changed)
+                index_items()
+                if structure_changes is None:
+                    cls.remove_deleted_items(searcher, structure_key, indexed_items)
+                else:
+                    removed_items = structure_changes['removed']
+                    if removed_items:
+                        searcher.remove(
+                            cls.DOCUMENT_TYPE,
+                            [unicode(cls._id_modifier(usage_key)) for usage_key in removed_items]
+                        )
         except Exception as err:  # pylint: disable=broad-except
             # broad exception so that index operation does not prevent the rest of the application from working
             log.exception(
@@ -271,6 +380,9 @@ class SearchIndexerBase(object):
         if error_list:
             raise SearchIndexingError('Error(s) present during indexing', error_list)
 
+        if structure_version is not None:
+            cache.set(cls._get_indexed_version_cache_key(structure_key), structure_version, None)
+
         return indexed_count["count"]
 
     @classmethod
@@ -460,6 +572,14 @@ class LibrarySearchIndexer(SearchIndexerBase):
         """ Modifies usage_id to submit to index """
         return usage_id.replace(library_key=(usage_id.library_key.replace(version_guid=None, branch=None)))
 
+    @classmethod
+    def _get_structure_version(cls, modulestore, structure_key):
+        """
+        Libraries are walked through entirely on each update, since they don't
+        have a published branch whose versions may be compared
+        """
+        return None
+
     @classmethod
     def do_library_reindex(cls, modulestore, library_key):
         """
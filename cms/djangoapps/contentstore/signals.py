@@ -10,6 +10,7 @@ from contentstore.courseware_index import CoursewareSearchIndexer, LibrarySearch
 from contentstore.proctoring import register_special_exams
 from openedx.core.djangoapps.credit.signals import on_course_publish
 from openedx.core.lib.gating import api as gating_api
+from static_replace import invalidate_asset_urls
 from util.module_utils import yield_dynamic_descriptor_descendants
 
 
@@ -29,6 +30,9 @@ def listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable=
     # to perform any 'on_publish' workflow
     on_course_publish(course_key)
 
+    # Publishing follows course imports, which may change the course's assets
+    invalidate_asset_urls(course_key)
+
     # Finally call into the course search subsystem
     # to kick off an indexing action
 
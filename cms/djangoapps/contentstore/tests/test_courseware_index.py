@@ -443,8 +443,13 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         # index based on time, will include an index of the origin sequential
         # because it is in a common subtree but not of the original vertical
         # because the original sequential's subtree is too old
+        # split courses are indexed based on the changes to their structure since
+        # their last index instead, which don't include the origin sequential
         new_indexed_count = self.index_recent_changes(store, before_time)
-        self.assertEqual(new_indexed_count, 5)
+        if store.get_modulestore_type(self.course.id) == ModuleStoreEnum.Type.split:
+            self.assertEqual(new_indexed_count, 4)
+        else:
+            self.assertEqual(new_indexed_count, 5)
 
         # full index again
         indexed_count = self.reindex_course(store)
@@ -545,6 +550,30 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         self.assertEqual(result["course_name"], "Search Index Test Course")
         self.assertEqual(result["location"], ["Week 1", CoursewareSearchIndexer.UNNAMED_MODULE_NAME, "Subsection 2"])
 
+    def _test_index_recent_changes_deleting_item(self, store):
+        """ test deleting an item, then indexing recent changes """
+        self.publish_item(store, self.vertical.location)
+        self.reindex_course(store)
+        response = self.search()
+        self.assertEqual(response["total"], 4)
+
+        self.delete_item(store, self.html_unit.location)
+        self.publish_item(store, self.vertical.location)
+        self.index_recent_changes(store, datetime.now(UTC))
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
+    @patch('contentstore.courseware_index.INDEX_BATCH_SIZE', 3)
+    def _test_indexing_in_batches(self, store):
+        """ items are sent to the search engine in batches of bounded size """
+        self.publish_item(store, self.vertical.location)
+        with patch(settings.SEARCH_ENGINE + '.index') as mock_index:
+            self.reindex_course(store)
+        self.assertEqual(
+            [len(args[1]) for args, __ in mock_index.call_args_list if args[0] == self.DOCUMENT_TYPE],
+            [3, 1]
+        )
+
     @patch('django.conf.settings.SEARCH_ENGINE', 'search.tests.utils.ErroringIndexEngine')
     def _test_exception(self, store):
         """ Test that exception within indexing yields a SearchIndexingError """
@@ -552,6 +581,25 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
         with self.assertRaises(SearchIndexingError):
             self.reindex_course(store)
 
+    def _test_item_exception(self, store):
+        """ Test that an exception indexing one item is reported, and the other items still indexed """
+        self.publish_item(store, self.vertical.location)
+        original_supplemental_fields = CoursewareSearchIndexer.supplemental_fields.__func__
+
+        def supplemental_fields(cls, item):
+            """ Fail for the html unit only """
+            if item.location.block_id == self.html_unit.location.block_id:
+                raise ValueError('bad item')
+            return original_supplemental_fields(cls, item)
+
+        with patch.object(CoursewareSearchIndexer, 'supplemental_fields', classmethod(supplemental_fields)):
+            with self.assertRaises(SearchIndexingError) as context:
+                self.reindex_course(store)
+        self.assertEqual(len(context.exception.error_list), 1)
+        self.assertIn('Could not index item: ', context.exception.error_list[0])
+        response = self.search()
+        self.assertEqual(response["total"], 3)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_indexing_course(self, store_type):
         self._perform_test_using_store(store_type, self._test_indexing_course)
@@ -580,10 +628,22 @@ class TestCoursewareSearchIndexer(MixedWithOptionsTestCase):
     def test_time_based_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_time_based_index)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_index_recent_changes_deleting_item(self, store_type):
+        self._perform_test_using_store(store_type, self._test_index_recent_changes_deleting_item)
+
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_indexing_in_batches(self, store_type):
+        self._perform_test_using_store(store_type, self._test_indexing_in_batches)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_exception(self, store_type):
         self._perform_test_using_store(store_type, self._test_exception)
 
+    @ddt.data(*WORKS_WITH_STORES)
+    def test_item_exception(self, store_type):
+        self._perform_test_using_store(store_type, self._test_item_exception)
+
     @ddt.data(*WORKS_WITH_STORES)
     def test_course_about_property_index(self, store_type):
         self._perform_test_using_store(store_type, self._test_course_about_property_index)
@@ -11,6 +11,7 @@ from django.conf import settings
 
 from edxmako.shortcuts import render_to_response
 from cache_toolbox.core import del_cached_content
+from static_replace import invalidate_asset_urls
 
 from contentstore.utils import reverse_course_url
 from xmodule.contentstore.django import contentstore
@@ -280,6 +281,7 @@ def _upload_asset(request, course_key):
     # then commit the content
     contentstore().save(content)
     del_cached_content(content.location)
+    invalidate_asset_urls(course_key)
 
     # readback the saved content - we need the database timestamp
     readback = contentstore().find(content.location)
@@ -328,6 +330,7 @@ def _update_asset(request, course_key, asset_key):
             contentstore().set_attr(asset_key, 'locked', modified_asset['locked'])
             # Delete the asset from the cache so we check the lock status the next time it is requested.
             del_cached_content(asset_key)
+            invalidate_asset_urls(course_key)
             return JsonResponse(modified_asset, status=201)
 
 
@@ -363,6 +366,7 @@ def delete_asset(course_key, asset_key):
     contentstore().delete(content.get_id())
     # remove from cache
     del_cached_content(content.location)
+    invalidate_asset_urls(course_key)
 
 
 def _get_asset_json(display_name, content_type, date, location, thumbnail_location, locked):
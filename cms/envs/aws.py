@@ -282,6 +282,11 @@ for database_name in DATABASES:
 
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
 CONTENTSTORE = AUTH_TOKENS['CONTENTSTORE']
+ASSET_DISK_CACHE.update(ENV_TOKENS.get('ASSET_DISK_CACHE', {}))
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE', COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE
+)
+COURSE_STRUCTURE_CACHE_CODEC.update(ENV_TOKENS.get('COURSE_STRUCTURE_CACHE_CODEC', {}))
 DOC_STORE_CONFIG = AUTH_TOKENS['DOC_STORE_CONFIG']
 # Datadog for events!
 DATADOG = AUTH_TOKENS.get("DATADOG", {})
@@ -412,6 +412,25 @@ MODULESTORE = {
     }
 }
 
+# Local on-disk cache for course assets too large for the Django cache, used by the
+# contentserver. Disabled unless DIRECTORY is set; MAX_SIZE is the budget in bytes.
+ASSET_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 ** 3,
+}
+
+# Memory budget in bytes of the per-process LRU of serialized split modulestore course structures
+# kept in front of the 'course_structure_cache'. Set to 0 to disable it.
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = 128 * 1024 ** 2
+
+# Serialization of course structures in the 'course_structure_cache'. CODEC is 'split_structure'
+# (columnar, fastest to load) or 'pickle'; COMPRESSOR is 'zlib', 'lz4' (needs the lz4 package)
+# or 'none'.
+COURSE_STRUCTURE_CACHE_CODEC = {
+    'CODEC': 'split_structure',
+    'COMPRESSOR': 'zlib',
+}
+
 ############################ DJANGO_BUILTINS ################################
 # Change DEBUG in your environment settings files, not here
 DEBUG = False
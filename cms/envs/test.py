@@ -173,6 +173,9 @@ CACHES = {
     },
 }
 
+# Course structures are not cached between tests (see 'course_structure_cache' above).
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = 0
+
 # hide ratelimit warnings while running tests
 filterwarnings('ignore', message='No request passed to the backend, unable to rate-limit')
 
@@ -117,6 +117,25 @@ def get_cached_content(location):
     return cache.get(unicode(location).encode("utf-8"))
 
 
+def content_metadata_key(location):
+    """
+    Returns the cache key for the metadata of the content at the given location.
+    """
+    return u'{}:metadata'.format(location).encode("utf-8")
+
+
+def set_cached_content_metadata(content):
+    """
+    Caches the metadata of `content` (everything but its data) on its own, so that
+    it can be looked up without loading the content itself.
+    """
+    cache.set(content_metadata_key(content.location), content.copy_metadata())
+
+
+def get_cached_content_metadata(location):
+    return cache.get(content_metadata_key(location))
+
+
 def del_cached_content(location):
     """
     delete content for the given location, as well as for content with run=None.
@@ -126,11 +145,13 @@ def del_cached_content(location):
     def location_str(loc):
         return unicode(loc).encode("utf-8")
 
-    locations = [location_str(location)]
+    locations = [location]
     try:
-        locations.append(location_str(location.replace(run=None)))
+        locations.append(location.replace(run=None))
     except InvalidKeyError:
         # although deprecated keys allowed run=None, new keys don't if there is no version.
         pass
 
-    cache.delete_many(locations)
+    cache.delete_many(
+        [location_str(loc) for loc in locations] + [content_metadata_key(loc) for loc in locations]
+    )
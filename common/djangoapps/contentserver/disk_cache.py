@@ -0,0 +1,303 @@
+"""
+Local on-disk cache for course assets served by the StaticContentServer.
+
+Assets too large for the Django cache would otherwise be streamed from GridFS
+on every request. This cache keeps a copy of their bytes on the local disk,
+bounded by a size budget and evicted least-recently-used first. Cached files
+are served through memory maps, so the OS page cache does the buffering.
+
+Entries are keyed by the asset location together with its last modification
+time and content digest, so a re-uploaded asset never matches a stale file and
+no explicit invalidation is needed. Files are written under a temporary name and
+renamed into place, so several worker processes can safely share one directory.
+
+A miss never delays the response: the asset is served from its GridFS stream
+while a background thread copies it to disk from a stream of its own.
+"""
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from contextlib import closing
+
+from django.conf import settings
+
+import dogstats_wrapper as dog_stats_api
+from xmodule.contentstore.content import StaticContent
+
+log = logging.getLogger(__name__)
+
+# Size of the pieces a memory mapped asset is handed to the response in.
+MAPPED_CHUNK_SIZE = 256 * 1024
+
+# Prefix of files still being written; they are never served or evicted.
+TEMP_FILE_PREFIX = '.tmp-'
+
+
+class MappedStaticContent(StaticContent):
+    """
+    StaticContent whose data lives in a file of the disk cache.
+
+    The file is opened right away, so the content stays readable even if the
+    file gets evicted meanwhile. It is memory mapped only while streaming.
+    """
+    def __init__(self, content, cached_file):
+        super(MappedStaticContent, self).__init__(
+            content.location, content.name, content.content_type, None,
+            last_modified_at=content.last_modified_at, thumbnail_location=content.thumbnail_location,
+            import_path=content.import_path, length=content.length, locked=content.locked,
+            content_digest=content.content_digest,
+        )
+        self._file = cached_file
+
+    @property
+    def data(self):
+        return ''.join(self.stream_data())
+
+    def stream_data(self):
+        return self.stream_data_in_range(0, self.length - 1)
+
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        if last_byte < first_byte:
+            return
+        with closing(mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)) as mapped:
+            for position in xrange(first_byte, last_byte + 1, MAPPED_CHUNK_SIZE):
+                yield mapped[position:min(position + MAPPED_CHUNK_SIZE, last_byte + 1)]
+
+    def close(self):
+        self._file.close()
+
+
+class AssetDiskCache(object):
+    """
+    A size-bounded LRU of asset bodies stored as files in `directory`.
+
+    Recency is tracked with the files' modification times, which are refreshed
+    on every hit, so the order is shared by all processes using the directory.
+    """
+    def __init__(self, directory, max_size):
+        self.directory = directory
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # Estimated size of the directory; None until the first scan.
+        self._size = None
+        # Keys of the files being written by background threads of this process.
+        self._filling = set()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(content):
+        """
+        Returns the file name for `content`, or None if it can't be versioned.
+        """
+        if content.last_modified_at is None and content.content_digest is None:
+            return None
+        return hashlib.sha1(u'{location}|{modified}|{digest}'.format(
+            location=unicode(content.location),
+            modified=content.last_modified_at.isoformat() if content.last_modified_at else '',
+            digest=content.content_digest or '',
+        ).encode('utf-8')).hexdigest()
+
+    def _path(self, key):
+        """
+        Returns the path of the file for `key`, fanned out over subdirectories.
+        """
+        return os.path.join(self.directory, key[:2], key)
+
+    def stats(self):
+        """
+        Returns the hit, miss and eviction counters of this process.
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions}
+
+    def _record(self, event, count=1):
+        """
+        Increments a counter and reports it to datadog.
+        """
+        with self._lock:
+            setattr(self, event, getattr(self, event) + count)
+        dog_stats_api.increment('contentserver.disk_cache.{}'.format(event), value=count)
+
+    def get(self, content):
+        """
+        Returns a MappedStaticContent for `content` if its bytes are cached, else None.
+        """
+        key = self.cache_key(content)
+        if key is None:
+            return None
+        path = self._path(key)
+        try:
+            cached_file = open(path, 'rb')
+        except (IOError, OSError):
+            self._record('misses')
+            return None
+        try:
+            os.utime(path, None)
+        except OSError:
+            # Evicted by another process in the meantime.
+            cached_file.close()
+            self._record('misses')
+            return None
+        self._record('hits')
+        return MappedStaticContent(content, cached_file)
+
+    def add(self, content):
+        """
+        Copies the bytes of the `content` stream to disk.
+
+        Returns a MappedStaticContent reading the new file, or None if the asset
+        can't be cached (too large, unversioned or the write failed).
+        """
+        key = self.cache_key(content)
+        if key is None or content.length is None or content.length > self.max_size:
+            return None
+
+        path = self._path(key)
+        try:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+            handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), prefix=TEMP_FILE_PREFIX)
+            try:
+                with os.fdopen(handle, 'wb') as temp_file:
+                    for chunk in content.stream_data():
+                        temp_file.write(chunk)
+                cached_file = open(temp_path, 'rb')
+                try:
+                    os.rename(temp_path, path)
+                except OSError:
+                    cached_file.close()
+                    raise
+            except Exception:
+                os.remove(temp_path)
+                raise
+        except (IOError, OSError):
+            log.exception(u"Could not write asset %s to the disk cache", unicode(content.location))
+            return None
+
+        self._grow(content.length)
+        return MappedStaticContent(content, cached_file)
+
+    def add_in_background(self, content, load_content):
+        """
+        Caches the asset of `content` from a background thread.
+
+        `load_content` is called in that thread to get a stream of the asset of
+        its own, as the stream of `content` is being served meanwhile. Returns
+        the started thread, or None if the asset can't be cached or is already
+        being cached by this process.
+        """
+        key = self.cache_key(content)
+        if key is None or content.length is None or content.length > self.max_size:
+            return None
+        with self._lock:
+            if key in self._filling:
+                return None
+            self._filling.add(key)
+
+        def fill():
+            """
+            Copies the asset to disk, closing the streams once done.
+            """
+            try:
+                source = load_content()
+                try:
+                    cached = self.add(source)
+                finally:
+                    source.close()
+                if cached is not None:
+                    cached.close()
+            except Exception:  # pylint: disable=broad-except
+                log.exception(u"Could not load asset %s for the disk cache", unicode(content.location))
+            finally:
+                with self._lock:
+                    self._filling.discard(key)
+
+        thread = threading.Thread(target=fill, name='asset-disk-cache-fill')
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def get_or_add(self, content, load_content):
+        """
+        Returns the cached version of the `content` stream if there is one.
+
+        On a miss, `content` itself is returned to be served from its stream,
+        and the asset is cached in the background, see add_in_background.
+        """
+        cached = self.get(content)
+        if cached is None:
+            self.add_in_background(content, load_content)
+            return content
+        return cached
+
+    def _entries(self):
+        """
+        Returns (mtime, size, path) for every cached file.
+        """
+        entries = []
+        for dirpath, __, filenames in os.walk(self.directory):
+            for filename in filenames:
+                if filename.startswith(TEMP_FILE_PREFIX):
+                    continue
+                path = os.path.join(dirpath, filename)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _grow(self, added_size):
+        """
+        Accounts for a new file and evicts the least recently used files if over budget.
+        """
+        with self._lock:
+            if self._size is not None:
+                self._size += added_size
+            if self._size is not None and self._size <= self.max_size:
+                return
+            entries = self._entries()
+            self._size = sum(size for __, size, __ in entries)
+            if self._size <= self.max_size:
+                return
+
+            evicted = 0
+            for __, size, path in sorted(entries):
+                if self._size <= self.max_size:
+                    break
+                try:
+                    os.remove(path)
+                except OSError:
+                    # Already evicted by another process.
+                    pass
+                self._size -= size
+                evicted += 1
+        if evicted:
+            self._record('evictions', evicted)
+
+
+_DISK_CACHE = None
+
+
+def get_asset_disk_cache():
+    """
+    Returns the process wide AssetDiskCache, or None if it isn't configured.
+
+    Configured through settings.ASSET_DISK_CACHE: a 'DIRECTORY' to store the
+    files in and a 'MAX_SIZE' budget in bytes.
+    """
+    global _DISK_CACHE  # pylint: disable=global-statement
+    config = getattr(settings, 'ASSET_DISK_CACHE', None) or {}
+    directory = config.get('DIRECTORY')
+    if not directory:
+        return None
+    if _DISK_CACHE is None or _DISK_CACHE.directory != directory:
+        _DISK_CACHE = AssetDiskCache(directory, config.get('MAX_SIZE', 0))
+    return _DISK_CACHE
@@ -2,13 +2,17 @@
 Middleware to serve assets.
 """
 
+import calendar
 import logging
+from uuid import uuid4
 
 import datetime
 from django.http import (
     HttpResponse, HttpResponseNotModified, HttpResponseForbidden,
-    HttpResponseBadRequest, HttpResponseNotFound)
+    HttpResponseBadRequest, HttpResponseNotFound, StreamingHttpResponse)
+from django.utils.http import parse_etags, parse_http_date_safe, quote_etag
 from student.models import CourseEnrollment
+from contentserver.disk_cache import get_asset_disk_cache
 from contentserver.models import CourseAssetCacheTtlConfig
 
 from clean_headers import remove_headers_from_response
@@ -17,7 +21,9 @@ from xmodule.contentstore.content import StaticContent, XASSET_LOCATION_TAG
 from xmodule.modulestore import InvalidLocationError
 from opaque_keys import InvalidKeyError
 from opaque_keys.edx.locator import AssetLocator
-from cache_toolbox.core import get_cached_content, set_cached_content
+from cache_toolbox.core import (
+    get_cached_content, set_cached_content, get_cached_content_metadata, set_cached_content_metadata
+)
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.exceptions import NotFoundError
 
@@ -27,6 +33,10 @@ from xmodule.exceptions import NotFoundError
 log = logging.getLogger(__name__)
 HTTP_DATE_FORMAT = "%a, %d %b %Y %H:%M:%S GMT"
 
+# Requests asking for more ranges than this get the full content instead, so that
+# a single request can't make us stream (overlapping) parts of a file many times over.
+MAX_BYTE_RANGES = 50
+
 
 class StaticContentServer(object):
     def is_asset_request(self, request):
@@ -48,24 +58,33 @@ class StaticContentServer(object):
             except (InvalidLocationError, InvalidKeyError):
                 return HttpResponseBadRequest()
 
-            # Try and load the asset.
+            # Try and load the asset's metadata, which is all we need to answer conditional
+            # requests. Only load the asset itself if it isn't cached.
             content = None
-            try:
-                content = self.load_asset_from_location(loc)
-            except (ItemNotFoundError, NotFoundError):
-                return HttpResponseNotFound()
+            metadata = get_cached_content_metadata(loc)
+            if metadata is None:
+                try:
+                    content = metadata = self.load_asset_from_location(loc)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
+                set_cached_content_metadata(content)
 
             # Check that user has access to the content.
-            if not self.is_user_authorized(request, content, loc):
+            if not self.is_user_authorized(request, metadata, loc):
                 return HttpResponseForbidden('Unauthorized')
 
             # Figure out if the client sent us a conditional request, and let them know
             # if this asset has changed since then.
-            last_modified_at_str = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
-            if 'HTTP_IF_MODIFIED_SINCE' in request.META:
-                if_modified_since = request.META['HTTP_IF_MODIFIED_SINCE']
-                if if_modified_since == last_modified_at_str:
-                    return HttpResponseNotModified()
+            if is_not_modified(request, metadata):
+                response = HttpResponseNotModified()
+                self.set_caching_headers(metadata, response)
+                return response
+
+            if content is None:
+                try:
+                    content = self.load_asset_from_location(loc)
+                except (ItemNotFoundError, NotFoundError):
+                    return HttpResponseNotFound()
 
             # *** File streaming within a byte range ***
             # If a Range is provided, parse Range attribute of the request
@@ -75,10 +94,6 @@ class StaticContentServer(object):
             # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.35
             response = None
             if request.META.get('HTTP_RANGE'):
-                # If we have a StaticContent, get a StaticContentStream.  Can't manipulate the bytes otherwise.
-                if type(content) == StaticContent:
-                    content = AssetManager.find(loc, as_stream=True)
-
                 header_value = request.META['HTTP_RANGE']
                 try:
                     unit, ranges = parse_range_header(header_value, content.length)
@@ -91,38 +106,44 @@ class StaticContentServer(object):
                     if unit != 'bytes':
                         # Only accept ranges in bytes
                         log.warning(u"Unknown unit in Range header: %s for content: %s", header_value, unicode(loc))
-                    elif len(ranges) > 1:
-                        # According to Http/1.1 spec content for multiple ranges should be sent as a multipart message.
-                        # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
-                        # But we send back the full content.
+                    elif len(ranges) > MAX_BYTE_RANGES:
                         log.warning(
-                            u"More than 1 ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            u"Too many ranges in Range header: %s for content: %s", header_value, unicode(loc)
                         )
                     else:
-                        first, last = ranges[0]
+                        # Unsatisfiable ranges are dropped; the request fails only if none are left.
+                        ranges = [
+                            (first, last) for first, last in ranges
+                            if 0 <= first <= last < content.length
+                        ]
+                        if not ranges:
+                            log.warning(
+                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
+                            )
+                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
 
-                        if 0 <= first <= last < content.length:
-                            # If the byte range is satisfiable
-                            response = HttpResponse(content.stream_data_in_range(first, last))
+                        if len(ranges) == 1:
+                            first, last = ranges[0]
+                            response = StreamingHttpResponse(
+                                content.stream_data_in_range(first, last), content_type=content.content_type
+                            )
                             response['Content-Range'] = 'bytes {first}-{last}/{length}'.format(
                                 first=first, last=last, length=content.length
                             )
                             response['Content-Length'] = str(last - first + 1)
-                            response.status_code = 206  # Partial Content
                         else:
-                            log.warning(
-                                u"Cannot satisfy ranges in Range header: %s for content: %s", header_value, unicode(loc)
-                            )
-                            return HttpResponse(status=416)  # Requested Range Not Satisfiable
+                            # Content for multiple ranges is sent as a multipart message.
+                            # http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.16
+                            response = multipart_byteranges_response(content, ranges)
+                        response.status_code = 206  # Partial Content
 
             # If Range header is absent or syntactically invalid return a full content response.
             if response is None:
-                response = HttpResponse(content.stream_data())
+                response = StreamingHttpResponse(content.stream_data(), content_type=content.content_type)
                 response['Content-Length'] = content.length
 
             # "Accept-Ranges: bytes" tells the user that only "bytes" ranges are allowed
             response['Accept-Ranges'] = 'bytes'
-            response['Content-Type'] = content.content_type
 
             # Set any caching headers, and do any response cleanup needed.  Based on how much
             # middleware we have in place, there's no easy way to use the built-in Django
@@ -152,6 +173,9 @@ class StaticContentServer(object):
             response['Cache-Control'] = "private, no-cache, no-store"
 
         response['Last-Modified'] = content.last_modified_at.strftime(HTTP_DATE_FORMAT)
+        etag = get_etag(content)
+        if etag is not None:
+            response['ETag'] = etag
 
         remove_headers_from_response(response, "Vary")
 
@@ -203,10 +227,94 @@ class StaticContentServer(object):
             if content.length is not None and content.length < 1048576:
                 content = content.copy_to_in_mem()
                 set_cached_content(content)
+            else:
+                # Larger assets can be kept on the local disk, if so configured. Only the
+                # metadata has been loaded from GridFS at this point, not the asset bytes.
+                disk_cache = get_asset_disk_cache()
+                if disk_cache is not None:
+                    content = disk_cache.get_or_add(
+                        content, lambda: AssetManager.find(location, as_stream=True)
+                    )
 
         return content
 
 
+def get_etag(content):
+    """
+    Returns the strong entity tag of `content`, derived from its content hash, or None if unknown.
+    """
+    # Content cached before digests were recorded doesn't have the attribute.
+    content_digest = getattr(content, 'content_digest', None)
+    if content_digest is None:
+        return None
+    return quote_etag(content_digest)
+
+
+def is_not_modified(request, content):
+    """
+    Returns whether the conditional headers of the request show the client already has `content`.
+
+    If-None-Match takes precedence over If-Modified-Since, as the spec requires.
+    See: http://www.w3.org/Protocols/rfc2616/rfc2616-sec14.html#sec14.26
+    """
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if if_none_match is not None:
+        content_digest = getattr(content, 'content_digest', None)
+        etags = parse_etags(if_none_match)
+        return '*' in etags or (content_digest is not None and content_digest in etags)
+
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE', ''))
+    if if_modified_since is not None and content.last_modified_at is not None:
+        # HTTP dates have a resolution of one second.
+        last_modified_at = calendar.timegm(content.last_modified_at.utctimetuple())
+        return last_modified_at <= if_modified_since
+    return False
+
+
+def multipart_byteranges_response(content, ranges):
+    """
+    Returns a streaming multipart/byteranges response with one part per (first, last) range.
+
+    Each part is read from `content` only while the response is being sent, so
+    the body is never held in memory as a whole.
+
+    See spec for details: http://www.w3.org/Protocols/rfc2616/rfc2616-sec19.html#sec19.2
+    """
+    boundary = uuid4().hex
+    part_headers = [
+        (
+            '--{boundary}\r\n'
+            'Content-Type: {content_type}\r\n'
+            'Content-Range: bytes {first}-{last}/{length}\r\n'
+            '\r\n'
+        ).format(
+            boundary=boundary, content_type=content.content_type, first=first, last=last, length=content.length
+        )
+        for first, last in ranges
+    ]
+    closing = '--{boundary}--\r\n'.format(boundary=boundary)
+
+    def stream_parts():
+        """
+        Yields the part headers, each range's data and the closing boundary.
+        """
+        for header, (first, last) in zip(part_headers, ranges):
+            yield header
+            for chunk in content.stream_data_in_range(first, last):
+                yield chunk
+            yield '\r\n'
+        yield closing
+
+    response = StreamingHttpResponse(
+        stream_parts(), content_type='multipart/byteranges; boundary={}'.format(boundary)
+    )
+    response['Content-Length'] = str(
+        sum(len(header) + (last - first + 1) + len('\r\n') for header, (first, last) in zip(part_headers, ranges)) +
+        len(closing)
+    )
+    return response
+
+
 def parse_range_header(header_value, content_length):
     """
     Returns the unit and a list of (start, end) tuples of ranges.
@@ -148,15 +148,51 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
 
     def test_range_request_multiple_ranges(self):
         """
-        Test that multiple ranges in request outputs the full content.
+        Test that multiple ranges in request outputs a multipart/byteranges response.
         """
         first_byte = self.length_unlocked / 4
         last_byte = self.length_unlocked / 2
         resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes={first}-{last}, -100'.format(
             first=first_byte, last=last_byte))
 
-        self.assertEqual(resp.status_code, 200)
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
         self.assertNotIn('Content-Range', resp)
+        self.assertTrue(resp['Content-Type'].startswith('multipart/byteranges; boundary='))
+        boundary = resp['Content-Type'].split('boundary=')[1]
+
+        body = ''.join(resp.streaming_content)
+        self.assertEqual(resp['Content-Length'], str(len(body)))
+
+        full_content = ''.join(self.client.get(self.url_unlocked).streaming_content)
+        parts = body.split('--{}'.format(boundary))
+        self.assertEqual(parts[0], '')
+        self.assertEqual(parts[-1], '--\r\n')
+        expected_ranges = [(first_byte, last_byte), (self.length_unlocked - 100, self.length_unlocked - 1)]
+        for part, (first, last) in zip(parts[1:-1], expected_ranges):
+            headers, data = part.split('\r\n\r\n', 1)
+            self.assertIn('Content-Range: bytes {first}-{last}/{length}'.format(
+                first=first, last=last, length=self.length_unlocked), headers)
+            self.assertEqual(data, full_content[first:last + 1] + '\r\n')
+
+    def test_range_request_multiple_ranges_partly_satisfiable(self):
+        """
+        Test that unsatisfiable ranges are dropped when at least one range can be served.
+        """
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE='bytes=0-9, {first}-'.format(
+            first=self.length_unlocked))
+
+        self.assertEqual(resp.status_code, 206)  # HTTP_206_PARTIAL_CONTENT
+        self.assertEqual(resp['Content-Range'], 'bytes 0-9/{length}'.format(length=self.length_unlocked))
+        self.assertEqual(len(''.join(resp.streaming_content)), 10)
+
+    def test_range_request_too_many_ranges(self):
+        """
+        Test that requests with too many ranges get the full content.
+        """
+        header_value = 'bytes=' + ', '.join(['0-1'] * 51)
+        resp = self.client.get(self.url_unlocked, HTTP_RANGE=header_value)
+
+        self.assertEqual(resp.status_code, 200)
         self.assertEqual(resp['Content-Length'], str(self.length_unlocked))
 
     @ddt.data(
@@ -251,6 +287,81 @@ class ContentStoreToyCourseTest(ModuleStoreTestCase):
         self.assertNotIn('Expires', resp)
         self.assertEquals('private, no-cache, no-store', resp['Cache-Control'])
 
+    def test_etag(self):
+        """
+        Test that assets are served with a strong ETag derived from their content hash.
+        """
+        resp = self.client.get(self.url_unlocked)
+        self.assertEqual(resp.status_code, 200)
+        content_digest = self.contentstore.find(self.unlocked_asset).content_digest
+        self.assertEqual(resp['ETag'], '"{}"'.format(content_digest))
+
+    def test_if_none_match(self):
+        """
+        Test that a request with a matching If-None-Match gets a 304 Not Modified with
+        the same validators, and a non-matching one gets the content.
+        """
+        etag = self.client.get(self.url_unlocked)['ETag']
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertEqual(resp['ETag'], etag)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other", {}'.format(etag))
+        self.assertEqual(resp.status_code, 304)
+
+        resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH='"other"')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_if_none_match_takes_precedence(self):
+        """
+        Test that If-Modified-Since is ignored when If-None-Match is present.
+        """
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        resp = self.client.get(
+            self.url_unlocked, HTTP_IF_NONE_MATCH='"other"', HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(resp.status_code, 200)
+
+    @ddt.data(
+        (datetime.timedelta(seconds=0), 304),
+        (datetime.timedelta(days=1), 304),
+        (datetime.timedelta(days=-1), 200),
+    )
+    @ddt.unpack
+    def test_if_modified_since(self, offset, expected_status):
+        """
+        Test that If-Modified-Since is compared as a date.
+        """
+        last_modified = self.client.get(self.url_unlocked)['Last-Modified']
+        if_modified_since = datetime.datetime.strptime(last_modified, HTTP_DATE_FORMAT) + offset
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE=if_modified_since.strftime(HTTP_DATE_FORMAT))
+        self.assertEqual(resp.status_code, expected_status)
+
+    def test_if_modified_since_invalid(self):
+        resp = self.client.get(self.url_unlocked, HTTP_IF_MODIFIED_SINCE='yesterday')
+        self.assertEqual(resp.status_code, 200)
+
+    def test_not_modified_from_cached_metadata(self):
+        """
+        Test that revalidation requests are answered without loading the asset.
+        """
+        etag = self.client.get(self.url_unlocked)['ETag']
+        with patch.object(StaticContentServer, 'load_asset_from_location') as mock_load:
+            resp = self.client.get(self.url_unlocked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 304)
+        self.assertFalse(mock_load.called)
+
+    def test_locked_asset_not_modified_requires_access(self):
+        """
+        Test that the access check still applies to conditional requests.
+        """
+        self.client.login(username=self.staff_usr, password=self.staff_pwd)
+        etag = self.client.get(self.url_locked)['ETag']
+        self.client.logout()
+        resp = self.client.get(self.url_locked, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(resp.status_code, 403)
+
     def test_get_expiration_value(self):
         start_dt = datetime.datetime.strptime("Thu, 01 Dec 1983 20:00:00 GMT", HTTP_DATE_FORMAT)
         near_expire_dt = StaticContentServer.get_expiration_value(start_dt, 55)
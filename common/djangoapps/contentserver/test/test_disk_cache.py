@@ -0,0 +1,174 @@
+"""
+Tests for the contentserver's local disk cache.
+"""
+import datetime
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from StringIO import StringIO
+
+from django.test.utils import override_settings
+import mock
+from opaque_keys.edx.locations import SlashSeparatedCourseKey
+
+from xmodule.contentstore.content import StaticContentStream
+
+from contentserver import disk_cache
+from contentserver.disk_cache import AssetDiskCache, MappedStaticContent, get_asset_disk_cache
+
+
+class AssetDiskCacheTest(unittest.TestCase):
+    """
+    Tests for AssetDiskCache.
+    """
+    def setUp(self):
+        super(AssetDiskCacheTest, self).setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        self.course_key = SlashSeparatedCourseKey('edX', 'toy', '2012_Fall')
+        self.cache = AssetDiskCache(self.directory, max_size=2500)
+
+    def make_content(self, name, data, last_modified_at=None, content_digest='abc'):
+        """
+        Returns a StaticContentStream for an asset with the given data.
+        """
+        return StaticContentStream(
+            self.course_key.make_asset_key('asset', name), name, 'text/plain', StringIO(data),
+            last_modified_at=last_modified_at or datetime.datetime(2016, 1, 1),
+            length=len(data), content_digest=content_digest,
+        )
+
+    def wait_for_fills(self):
+        """
+        Waits for the background threads filling the cache to finish.
+        """
+        for thread in threading.enumerate():
+            if thread.name == 'asset-disk-cache-fill':
+                thread.join()
+
+    def test_miss_then_hit(self):
+        data = 'x' * 1000 + 'y' * 500
+        content = self.make_content('a.txt', data)
+        self.assertIsNone(self.cache.get(content))
+
+        # The miss is served from the stream, while the cache is filled from another one.
+        self.assertIs(self.cache.get_or_add(content, lambda: self.make_content('a.txt', data)), content)
+        self.wait_for_fills()
+        self.assertEqual(content.stream_data_in_range(0, 2).next(), 'xxx')
+
+        cached = self.cache.get_or_add(self.make_content('a.txt', data), None)
+        self.assertIsInstance(cached, MappedStaticContent)
+        self.assertEqual(''.join(cached.stream_data()), data)
+        self.assertEqual(''.join(cached.stream_data_in_range(990, 1009)), 'x' * 10 + 'y' * 10)
+        self.assertEqual(self.cache.stats(), {'hits': 1, 'misses': 2, 'evictions': 0})
+
+    def test_add_in_background_once(self):
+        data = 'f' * 1000
+        loading = threading.Event()
+        sources = []
+
+        def load_content():
+            """
+            Returns a new stream of the asset, once the test lets it.
+            """
+            loading.wait()
+            sources.append(self.make_content('a.txt', data))
+            return sources[-1]
+
+        thread = self.cache.add_in_background(self.make_content('a.txt', data), load_content)
+        self.assertIsNone(self.cache.add_in_background(self.make_content('a.txt', data), load_content))
+        loading.set()
+        thread.join()
+
+        self.assertEqual(len(sources), 1)
+        self.assertTrue(sources[0]._stream.closed)  # pylint: disable=protected-access
+        self.assertIsNotNone(self.cache.get(self.make_content('a.txt', data)))
+
+    def test_add_in_background_failure(self):
+        def load_content():
+            """
+            Fails to load the asset.
+            """
+            raise IOError('GridFS is unavailable')
+
+        with mock.patch.object(disk_cache.log, 'exception') as log_exception:
+            self.cache.add_in_background(self.make_content('a.txt', 'data'), load_content).join()
+            self.assertEqual(log_exception.call_count, 1)
+            self.assertIsNone(self.cache.get(self.make_content('a.txt', 'data')))
+            # The asset can be tried again.
+            self.cache.add_in_background(self.make_content('a.txt', 'data'), load_content).join()
+            self.assertEqual(log_exception.call_count, 2)
+
+    def test_evicted_while_getting(self):
+        content = self.make_content('a.txt', 'data')
+        self.cache.add(content)
+        opened = []
+
+        def open_file(*args):
+            """
+            Opens the file, keeping track of it.
+            """
+            opened.append(open(*args))
+            return opened[-1]
+
+        with mock.patch('contentserver.disk_cache.open', side_effect=open_file, create=True):
+            with mock.patch('os.utime', side_effect=OSError):
+                self.assertIsNone(self.cache.get(content))
+        self.assertEqual(len(opened), 1)
+        self.assertTrue(opened[0].closed)
+
+    def test_new_version_misses(self):
+        self.cache.add(self.make_content('a.txt', 'old'))
+        self.assertIsNone(self.cache.get(self.make_content('a.txt', 'new', content_digest='def')))
+        self.assertIsNone(self.cache.get(
+            self.make_content('a.txt', 'new', last_modified_at=datetime.datetime(2016, 2, 1))
+        ))
+
+    def test_least_recently_used_evicted(self):
+        first = self.make_content('first.txt', 'a' * 1000)
+        second = self.make_content('second.txt', 'b' * 1000)
+        self.cache.add(first)
+        self.cache.add(second)
+        # Make `first` the most recently used entry.
+        os.utime(self.cache._path(self.cache.cache_key(second)), (1, 1))  # pylint: disable=protected-access
+        self.cache.get(first)
+
+        self.cache.add(self.make_content('third.txt', 'c' * 1000))
+        self.assertIsNone(self.cache.get(second))
+        self.assertIsNotNone(self.cache.get(first))
+        self.assertEqual(self.cache.stats()['evictions'], 1)
+
+    def test_too_large_not_cached(self):
+        content = self.make_content('big.txt', 'z' * 3000)
+        self.assertIs(self.cache.get_or_add(content, lambda: self.make_content('big.txt', 'z' * 3000)), content)
+        self.wait_for_fills()
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_evicted_while_open(self):
+        data = 'q' * 1200
+        self.cache.add(self.make_content('a.txt', data))
+        cached = self.cache.get(self.make_content('a.txt', data))
+        shutil.rmtree(self.directory)
+        self.assertEqual(''.join(cached.stream_data()), data)
+
+
+class GetAssetDiskCacheTest(unittest.TestCase):
+    """
+    Tests for get_asset_disk_cache.
+    """
+    def setUp(self):
+        super(GetAssetDiskCacheTest, self).setUp()
+        self.addCleanup(setattr, disk_cache, '_DISK_CACHE', None)
+
+    @override_settings(ASSET_DISK_CACHE={'DIRECTORY': None})
+    def test_disabled(self):
+        self.assertIsNone(get_asset_disk_cache())
+
+    @override_settings(ASSET_DISK_CACHE={'DIRECTORY': '/tmp/assets', 'MAX_SIZE': 100})
+    def test_enabled(self):
+        cache = get_asset_disk_cache()
+        self.assertEqual(cache.directory, '/tmp/assets')
+        self.assertEqual(cache.max_size, 100)
+        self.assertIs(cache, get_asset_disk_cache())
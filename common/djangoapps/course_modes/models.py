@@ -10,6 +10,7 @@ from django.core.exceptions import ValidationError
 from django.db import models
 from django.db.models import Q
 from django.utils.translation import ugettext_lazy as _
+from openedx.core.lib.cache_utils import invalidate_memoized_on, memoized
 from xmodule_django.models import CourseKeyField
 
 Mode = namedtuple('Mode',
@@ -25,6 +26,10 @@ Mode = namedtuple('Mode',
                   ])
 
 
+# The namespace of the results of CourseMode.modes_for_course memoized in the request cache.
+MODES_FOR_COURSE_NAMESPACE = 'course_modes.modes_for_course'
+
+
 class CourseMode(models.Model):
     """
     We would like to offer a course in a variety of modes.
@@ -247,6 +252,7 @@ class CourseMode(models.Model):
         return [mode.to_tuple() for mode in found_course_modes]
 
     @classmethod
+    @memoized(MODES_FOR_COURSE_NAMESPACE)
     def modes_for_course(cls, course_id, include_expired=False, only_selectable=True):
         """
         Returns a list of the non-expired modes for a given course id
@@ -632,6 +638,9 @@ class CourseMode(models.Model):
         )
 
 
+invalidate_memoized_on(MODES_FOR_COURSE_NAMESPACE, CourseMode)
+
+
 class CourseModesArchive(models.Model):
     """
     Store the past values of course_mode that a course had in the past. We decided on having
@@ -29,10 +29,18 @@ from xmodule_django.models import CourseKeyField, NoneToEmptyManager
 
 from embargo.exceptions import InvalidAccessPoint
 from embargo.messages import ENROLL_MESSAGES, COURSEWARE_MESSAGES
+from embargo.prefix_tree import IPPrefixTree
+from openedx.core.lib.cache_utils import memoized
 
 
 log = logging.getLogger(__name__)
 
+# Compiled IP filter lists are memoized by their content, so they never go
+# stale; the cache only drops lists that are no longer configured.
+IP_FILTER_LIST_NAMESPACE = 'embargo.ip_filter_list'
+IP_FILTER_LIST_CACHE_TIMEOUT = 24 * 60 * 60
+IP_FILTER_LIST_CACHE_MAX_ENTRIES = 4
+
 
 class EmbargoedCourse(models.Model):
     """
@@ -679,6 +687,7 @@ class IPFilter(ConfigurationModel):
 
         def __init__(self, ips):
             self.networks = [ipaddr.IPNetwork(ip) for ip in ips]
+            self._prefix_tree = IPPrefixTree(self.networks)
 
         def __iter__(self):
             for network in self.networks:
@@ -690,11 +699,7 @@ class IPFilter(ConfigurationModel):
             except ValueError:
                 return False
 
-            for network in self.networks:
-                if network.Contains(ip):
-                    return True
-
-            return False
+            return ip in self._prefix_tree
 
     @property
     def whitelist_ips(self):
@@ -703,7 +708,7 @@ class IPFilter(ConfigurationModel):
         """
         if self.whitelist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.whitelist.split(',')])
+        return _get_ip_filter_list(self.whitelist)
 
     @property
     def blacklist_ips(self):
@@ -712,4 +717,18 @@ class IPFilter(ConfigurationModel):
         """
         if self.blacklist == '':
             return []
-        return self.IPFilterList([addr.strip() for addr in self.blacklist.split(',')])
+        return _get_ip_filter_list(self.blacklist)
+
+
+@memoized(
+    IP_FILTER_LIST_NAMESPACE,
+    request=False,
+    process_timeout=IP_FILTER_LIST_CACHE_TIMEOUT,
+    process_max_entries=IP_FILTER_LIST_CACHE_MAX_ENTRIES,
+)
+def _get_ip_filter_list(ips):
+    """
+    Returns the IPFilterList of a comma-separated list of IP addresses and
+    networks. Each process builds it once for each configured list.
+    """
+    return IPFilter.IPFilterList([addr.strip() for addr in ips.split(',')])
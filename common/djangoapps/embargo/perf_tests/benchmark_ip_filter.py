@@ -0,0 +1,97 @@
+"""
+Benchmark of matching IP addresses against large embargo IP filter lists.
+
+Generates the requested number of random IPv4 and IPv6 networks, and times
+matching random addresses against them with IPPrefixTree, against scanning
+the networks as IPFilterList did before, as well as building the tree.
+
+Run with:
+  python -m embargo.perf_tests.benchmark_ip_filter [--networks N [N ...]] [--lookups N]
+"""
+import argparse
+import random
+import timeit
+
+import ipaddr
+
+from embargo.prefix_tree import IPPrefixTree
+
+# Share of the networks that are IPv6.
+IPV6_SHARE = 0.2
+
+
+def generate_networks(network_count, rand):
+    """
+    Returns `network_count` random networks, with a mix of prefix lengths.
+    """
+    networks = []
+    for __ in range(network_count):
+        if rand.random() < IPV6_SHARE:
+            address = ipaddr.IPv6Address(rand.getrandbits(128))
+            prefixlen = rand.choice((32, 48, 64, 128))
+        else:
+            address = ipaddr.IPv4Address(rand.getrandbits(32))
+            prefixlen = rand.choice((16, 20, 24, 28, 32))
+        networks.append(ipaddr.IPNetwork('{}/{}'.format(address, prefixlen)))
+    return networks
+
+
+def generate_addresses(networks, address_count, rand):
+    """
+    Returns `address_count` random addresses, half of them in the networks.
+    """
+    addresses = []
+    for index in range(address_count):
+        if index % 2:
+            network = rand.choice(networks)
+            addresses.append(network.network + rand.randint(0, min(network.numhosts, 2 ** 16) - 1))
+        else:
+            addresses.append(ipaddr.IPv4Address(rand.getrandbits(32)))
+    return addresses
+
+
+def scan_networks(networks, address):
+    """
+    Returns whether the address is in any of the networks, scanning them.
+    """
+    for network in networks:
+        if network.Contains(address):
+            return True
+    return False
+
+
+def main():
+    """
+    Time building and matching for each number of networks and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--networks', type=int, nargs='+', default=[100, 1000, 10000], help='numbers of networks')
+    parser.add_argument('--lookups', type=int, default=1000, help='number of addresses matched in each run')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs')
+    args = parser.parse_args()
+
+    rand = random.Random(0)
+
+    def best_time(func):
+        """
+        Returns the best time of running func, in milliseconds.
+        """
+        return min(timeit.repeat(func, repeat=args.repeat, number=1)) * 1000
+
+    print "{} lookups per run".format(args.lookups)
+    print "{:>10} {:>12} {:>12} {:>12}".format('networks', 'build (ms)', 'scan (ms)', 'tree (ms)')
+    for network_count in args.networks:
+        networks = generate_networks(network_count, rand)
+        addresses = generate_addresses(networks, args.lookups, rand)
+        prefix_tree = IPPrefixTree(networks)
+        assert all((address in prefix_tree) == scan_networks(networks, address) for address in addresses)
+        print "{:>10} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            network_count,
+            best_time(lambda: IPPrefixTree(networks)),
+            best_time(lambda: [scan_networks(networks, address) for address in addresses]),
+            best_time(lambda: [address in prefix_tree for address in addresses]),
+        )
+
+
+if __name__ == '__main__':
+    main()
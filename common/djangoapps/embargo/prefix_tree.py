@@ -0,0 +1,62 @@
+"""
+Matching of IP addresses against many IP networks at once.
+"""
+
+# Number of bits in the addresses of each IP version.
+ADDRESS_BITS = {4: 32, 6: 128}
+
+# Index, in a node of the tree, of whether a network ends at the node. Its
+# children for the next bit being 0 and 1 are at the indexes 0 and 1.
+_MATCH = 2
+
+
+def _new_node():
+    """
+    Returns a node of the tree, without children or network.
+    """
+    return [None, None, False]
+
+
+class IPPrefixTree(object):
+    """
+    A binary prefix tree of IPv4 and IPv6 networks, which finds whether an
+    address is in any of them in at most as many steps as the address has
+    bits, however many networks there are.
+
+    Networks and addresses are `ipaddr` objects.
+    """
+    def __init__(self, networks=()):
+        self._roots = {version: _new_node() for version in ADDRESS_BITS}
+        for network in networks:
+            self.add(network)
+
+    def add(self, network):
+        """
+        Adds the network to the tree.
+        """
+        bits = ADDRESS_BITS[network.version]
+        network_address = int(network.network)
+        node = self._roots[network.version]
+        for index in range(network.prefixlen):
+            if node[_MATCH]:
+                # A shorter network already contains this one.
+                return
+            bit = (network_address >> (bits - 1 - index)) & 1
+            if node[bit] is None:
+                node[bit] = _new_node()
+            node = node[bit]
+        # Longer networks under this one no longer need matching.
+        node[:] = [None, None, True]
+
+    def __contains__(self, address):
+        value = int(address)
+        node = self._roots[address.version]
+        index = ADDRESS_BITS[address.version] - 1
+        while node is not None:
+            if node[_MATCH]:
+                return True
+            if index < 0:
+                return False
+            node = node[(value >> index) & 1]
+            index -= 1
+        return False
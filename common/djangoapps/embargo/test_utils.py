@@ -7,6 +7,8 @@ import pygeoip
 from django.core.urlresolvers import reverse
 from django.core.cache import cache
 from embargo.models import Country, CountryAccessRule, RestrictedCourse
+from geoinfo.api import COUNTRY_CODE_NAMESPACE
+from openedx.core.lib.cache_utils import invalidate_memoized
 
 
 @contextlib.contextmanager
@@ -43,6 +45,7 @@ def restrict_course(course_key, access_point="enrollment", disable_access_check=
     # Clear the cache to ensure that previous tests don't interfere
     # with this test.
     cache.clear()
+    invalidate_memoized(COUNTRY_CODE_NAMESPACE)
 
     with mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr') as mock_ip:
 
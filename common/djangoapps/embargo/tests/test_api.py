@@ -31,6 +31,8 @@ from embargo.models import (
 from util.testing import UrlResetMixin
 from embargo import api as embargo_api
 from embargo.exceptions import InvalidAccessPoint
+from geoinfo.api import COUNTRY_CODE_NAMESPACE
+from openedx.core.lib.cache_utils import invalidate_memoized
 from mock import patch
 
 
@@ -227,6 +229,7 @@ class EmbargoCheckAccessApiTests(ModuleStoreTestCase):
 
     @contextmanager
     def _mock_geoip(self, country_code):
+        invalidate_memoized(COUNTRY_CODE_NAMESPACE)
         with mock.patch.object(pygeoip.GeoIP, 'country_code_by_addr') as mock_ip:
             mock_ip.return_value = country_code
             yield
@@ -0,0 +1,59 @@
+"""
+Tests for prefix_tree.py
+"""
+import random
+from unittest import TestCase
+
+import ddt
+import ipaddr
+
+from embargo.prefix_tree import IPPrefixTree
+
+
+@ddt.ddt
+class IPPrefixTreeTest(TestCase):
+    """
+    Tests for IPPrefixTree
+    """
+    @ddt.data(
+        ('1.0.0.0/24', '1.0.0.0', True),
+        ('1.0.0.0/24', '1.0.0.255', True),
+        ('1.0.0.0/24', '1.0.1.0', False),
+        ('1.0.0.5/24', '1.0.0.100', True),
+        ('18.244.51.3', '18.244.51.3', True),
+        ('18.244.51.3', '18.244.51.4', False),
+        ('0.0.0.0/0', '18.244.51.3', True),
+        ('0.0.0.0/0', '2002:c0a8:101::42', False),
+        ('2002:c0a8:101::/48', '2002:c0a8:101::42', True),
+        ('2002:c0a8:101::/48', '2002:c0a8:102::42', False),
+        ('2002:c0a8:101::42', '2002:c0a8:101::42', True),
+    )
+    @ddt.unpack
+    def test_contains(self, network, address, expected):
+        prefix_tree = IPPrefixTree([ipaddr.IPNetwork(network)])
+        self.assertEqual(ipaddr.IPAddress(address) in prefix_tree, expected)
+
+    def test_nested_networks(self):
+        for networks in (['1.1.0.0/16', '1.1.1.0/24'], ['1.1.1.0/24', '1.1.0.0/16']):
+            prefix_tree = IPPrefixTree([ipaddr.IPNetwork(network) for network in networks])
+            self.assertIn(ipaddr.IPAddress('1.1.1.1'), prefix_tree)
+            self.assertIn(ipaddr.IPAddress('1.1.2.1'), prefix_tree)
+            self.assertNotIn(ipaddr.IPAddress('1.2.0.0'), prefix_tree)
+
+    def test_matches_linear_scan(self):
+        rand = random.Random(0)
+        networks = [
+            ipaddr.IPNetwork('{}/{}'.format(ipaddr.IPv4Address(rand.getrandbits(32)), rand.randint(8, 32)))
+            for __ in range(200)
+        ] + [
+            ipaddr.IPNetwork('{}/{}'.format(ipaddr.IPv6Address(rand.getrandbits(128)), rand.randint(16, 128)))
+            for __ in range(50)
+        ]
+        prefix_tree = IPPrefixTree(networks)
+        addresses = [network.network + rand.randint(0, network.numhosts - 1) for network in networks] + [
+            ipaddr.IPv4Address(rand.getrandbits(32)) for __ in range(500)
+        ] + [
+            ipaddr.IPv6Address(rand.getrandbits(128)) for __ in range(100)
+        ]
+        for address in addresses:
+            self.assertEqual(address in prefix_tree, any(network.Contains(address) for network in networks))
@@ -0,0 +1,63 @@
+"""
+Lookup of the country of IP addresses in the GeoIP databases.
+
+Each process opens each database once, memory-mapped, and shares it between
+threads. Countries are memoized per IP address in a process LRU, whose hits
+and misses are reported by
+`openedx.core.lib.cache_utils.get_memoize_stats(COUNTRY_CODE_NAMESPACE)`.
+"""
+import threading
+
+import pygeoip
+from django.conf import settings
+
+from openedx.core.lib.cache_utils import memoized
+
+COUNTRY_CODE_NAMESPACE = 'geoinfo.country_code'
+
+# The GeoIP databases only change on deployment, so the countries of IP
+# addresses are memoized for an hour.
+COUNTRY_CODE_CACHE_TIMEOUT = 60 * 60
+COUNTRY_CODE_CACHE_MAX_ENTRIES = 10000
+
+_READERS = {}
+_READERS_LOCK = threading.Lock()
+
+
+def _get_reader(path):
+    """
+    Returns this process's reader of the GeoIP database at path, opening it
+    memory-mapped on first use.
+    """
+    path = unicode(path)
+    reader = _READERS.get(path)
+    if reader is None:
+        with _READERS_LOCK:
+            reader = _READERS.get(path)
+            if reader is None:
+                reader = _READERS[path] = pygeoip.GeoIP(path, pygeoip.MMAP_CACHE)
+    return reader
+
+
+@memoized(
+    COUNTRY_CODE_NAMESPACE,
+    request=False,
+    process_timeout=COUNTRY_CODE_CACHE_TIMEOUT,
+    process_max_entries=COUNTRY_CODE_CACHE_MAX_ENTRIES,
+)
+def country_code_from_ip(ip_addr):
+    """
+    Return the country code associated with an IP address.
+    Handles both IPv4 and IPv6 addresses.
+
+    Args:
+        ip_addr (str): The IP address to look up.
+
+    Returns:
+        str: A 2-letter country code.
+
+    """
+    if ip_addr.find(':') >= 0:
+        return _get_reader(settings.GEOIPV6_PATH).country_code_by_addr(ip_addr)
+    else:
+        return _get_reader(settings.GEOIP_PATH).country_code_by_addr(ip_addr)
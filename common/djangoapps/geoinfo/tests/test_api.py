@@ -0,0 +1,47 @@
+"""
+Tests for the GeoIP lookups of geoinfo.api.
+"""
+from mock import patch
+import pygeoip
+
+from django.test import TestCase
+
+from geoinfo import api as geoinfo_api
+from openedx.core.lib.cache_utils import get_memoize_stats, invalidate_memoized, reset_memoize_stats
+
+
+class CountryCodeFromIpTests(TestCase):
+    """
+    Tests of country_code_from_ip.
+    """
+    def setUp(self):
+        super(CountryCodeFromIpTests, self).setUp()
+        invalidate_memoized(geoinfo_api.COUNTRY_CODE_NAMESPACE)
+        reset_memoize_stats()
+        self.patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', autospec=True, return_value='CN')
+        self.mock_country_code_by_addr = self.patcher.start()
+        self.addCleanup(self.patcher.stop)
+
+    def test_reader_shared(self):
+        with patch('geoinfo.api._READERS', {}):
+            geoinfo_api.country_code_from_ip('117.79.83.1')
+            geoinfo_api.country_code_from_ip('117.79.83.100')
+            geoinfo_api.country_code_from_ip('2001:da8:20f:1502:edcf:550b:4a9c:207d')
+            self.assertEqual(len(geoinfo_api._READERS), 2)  # pylint: disable=protected-access
+
+        readers = set(call[0][0] for call in self.mock_country_code_by_addr.call_args_list)
+        self.assertEqual(len(readers), 2)
+
+    def test_memoized(self):
+        self.assertEqual(geoinfo_api.country_code_from_ip('117.79.83.1'), 'CN')
+        self.mock_country_code_by_addr.return_value = 'US'
+        self.assertEqual(geoinfo_api.country_code_from_ip('117.79.83.1'), 'CN')
+        self.assertEqual(geoinfo_api.country_code_from_ip('4.0.0.0'), 'US')
+        self.assertEqual(self.mock_country_code_by_addr.call_count, 2)
+        self.assertEqual(
+            get_memoize_stats(geoinfo_api.COUNTRY_CODE_NAMESPACE)['process'],
+            {'hits': 1, 'misses': 2},
+        )
+
+        invalidate_memoized(geoinfo_api.COUNTRY_CODE_NAMESPACE)
+        self.assertEqual(geoinfo_api.country_code_from_ip('117.79.83.1'), 'US')
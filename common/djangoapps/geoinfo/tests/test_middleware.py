@@ -7,7 +7,9 @@ import pygeoip
 from django.contrib.sessions.middleware import SessionMiddleware
 from django.test import TestCase
 from django.test.client import RequestFactory
+from geoinfo.api import COUNTRY_CODE_NAMESPACE
 from geoinfo.middleware import CountryMiddleware
+from openedx.core.lib.cache_utils import invalidate_memoized
 
 from student.tests.factories import UserFactory, AnonymousUserFactory
 
@@ -26,6 +28,7 @@ class CountryMiddlewareTests(TestCase):
         self.patcher = patch.object(pygeoip.GeoIP, 'country_code_by_addr', self.mock_country_code_by_addr)
         self.patcher.start()
         self.addCleanup(self.patcher.stop)
+        invalidate_memoized(COUNTRY_CODE_NAMESPACE)
 
     def mock_country_code_by_addr(self, ip_addr):
         """
@@ -4,6 +4,7 @@ import re
 from django.contrib.staticfiles.storage import staticfiles_storage
 from django.contrib.staticfiles import finders
 from django.conf import settings
+from django.core.cache import cache
 
 from static_replace.models import AssetBaseUrlConfig, AssetExcludedExtensionsConfig
 from xmodule.modulestore.django import modulestore
@@ -11,9 +12,23 @@ from xmodule.modulestore import ModuleStoreEnum
 from xmodule.contentstore.content import StaticContent
 
 from opaque_keys.edx.locator import AssetLocator
+from openedx.core.lib.cache_utils import memoized
 
 log = logging.getLogger(__name__)
 
+COURSE_URL_PREFIX = '/course/'
+JUMP_TO_ID_URL_PREFIX = '/jump_to_id/'
+
+# The urls of course assets are memoized in each process, per generation of
+# the course's assets, which invalidate_asset_urls moves on when they change.
+ASSET_URLS_NAMESPACE = 'static_replace.asset_urls'
+ASSET_URLS_GENERATION_KEY = u'static_replace.asset_urls.generation.{course_key}'
+ASSET_URL_CACHE_TIMEOUT = 60 * 60
+ASSET_URL_CACHE_MAX_ENTRIES = 10000
+
+# The compiled regex of each url prefix.
+_URL_REPLACE_REGEXES = {}
+
 
 def _url_replace_regex(prefix):
     """
@@ -31,6 +46,28 @@ def _url_replace_regex(prefix):
         """.format(prefix=prefix)
 
 
+def _compiled_url_replace_regex(prefix):
+    """
+    Returns the regex of _url_replace_regex for the prefix, compiled once per
+    process.
+    """
+    regex = _URL_REPLACE_REGEXES.get(prefix)
+    if regex is None:
+        regex = _URL_REPLACE_REGEXES[prefix] = re.compile(_url_replace_regex(prefix))
+    return regex
+
+
+def _static_url_prefix(data_dir=None):
+    """
+    Returns the prefix of the static urls to replace, excluding those already
+    in the data directory.
+    """
+    return u'(?:{static_url}|/static/)(?!{data_dir})'.format(
+        static_url=settings.STATIC_URL,
+        data_dir=data_dir
+    )
+
+
 def try_staticfiles_lookup(path):
     """
     Try to lookup a path in staticfiles_storage.  If it fails, return
@@ -72,7 +109,7 @@ def replace_jump_to_id_urls(text, course_id, jump_to_id_base_url):
         rest = match.group('rest')
         return "".join([quote, jump_to_id_base_url + rest, quote])
 
-    return re.sub(_url_replace_regex('/jump_to_id/'), replace_jump_to_id_url, text)
+    return _compiled_url_replace_regex(JUMP_TO_ID_URL_PREFIX).sub(replace_jump_to_id_url, text)
 
 
 def replace_course_urls(text, course_key):
@@ -92,7 +129,7 @@ def replace_course_urls(text, course_key):
         rest = match.group('rest')
         return "".join([quote, '/courses/' + course_id + '/', rest, quote])
 
-    return re.sub(_url_replace_regex('/course/'), replace_course_url, text)
+    return _compiled_url_replace_regex(COURSE_URL_PREFIX).sub(replace_course_url, text)
 
 
 def process_static_urls(text, replacement_function, data_dir=None):
@@ -111,14 +148,7 @@ def process_static_urls(text, replacement_function, data_dir=None):
         rest = match.group('rest')
         return replacement_function(original, prefix, quote, rest)
 
-    return re.sub(
-        _url_replace_regex(u'(?:{static_url}|/static/)(?!{data_dir})'.format(
-            static_url=settings.STATIC_URL,
-            data_dir=data_dir
-        )),
-        wrap_part_extraction,
-        text
-    )
+    return _compiled_url_replace_regex(_static_url_prefix(data_dir)).sub(wrap_part_extraction, text)
 
 
 def make_static_urls_absolute(request, html):
@@ -138,18 +168,86 @@ def make_static_urls_absolute(request, html):
     )
 
 
-def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path=''):
+def _get_asset_urls_generation(course_key):
     """
-    Replace /static/$stuff urls either with their correct url as generated by collectstatic,
-    (/static/$md5_hashed_stuff) or by the course-specific content static url
-    /static/$course_data_dir/$stuff, or, if course_namespace is not None, by the
-    correct url in the contentstore (/c4x/.. or /asset-loc:..)
+    Returns the current generation of the course's assets.
+    """
+    return cache.get(ASSET_URLS_GENERATION_KEY.format(course_key=course_key)) or 0
 
-    text: The source text to do the substitution in
-    data_directory: The directory in which course data is stored
-    course_id: The course identifier used to distinguish static content for this course in studio
-    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+
+def invalidate_asset_urls(course_key):
+    """
+    Forgets the urls of the course's assets memoized by all processes, for
+    when the assets change.
+    """
+    generation_key = ASSET_URLS_GENERATION_KEY.format(course_key=course_key)
+    try:
+        cache.incr(generation_key)
+    except ValueError:
+        # No url of the course's assets was memoized since the key was last set.
+        cache.add(generation_key, 1, None)
+
+
+@memoized(
+    ASSET_URLS_NAMESPACE,
+    request=False,
+    process_timeout=ASSET_URL_CACHE_TIMEOUT,
+    process_max_entries=ASSET_URL_CACHE_MAX_ENTRIES,
+)
+def _get_course_asset_url(course_id, path, generation, base_url, excluded_exts):  # pylint: disable=unused-argument
+    """
+    Returns the url of the static file or course asset at path, for a course
+    whose assets are in the contentstore. It is memoized per generation of
+    the course's assets and asset settings.
+    """
+    # first look in the static file pipeline and see if we are trying to reference
+    # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
+
+    exists_in_staticfiles_storage = False
+    try:
+        exists_in_staticfiles_storage = staticfiles_storage.exists(path)
+    except Exception as err:
+        log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
+            path, str(err)))
+
+    if exists_in_staticfiles_storage:
+        url = staticfiles_storage.url(path)
+    else:
+        # if not, then assume it's courseware specific content and then look in the
+        # Mongo-backed database
+        url = StaticContent.get_canonicalized_asset_path(course_id, path, base_url, excluded_exts)
+
+        if AssetLocator.CANONICAL_NAMESPACE in url:
+            url = url.replace('block@', 'block/', 1)
+    return url
+
+
+def _make_static_url_replacement(data_directory=None, course_id=None, static_asset_path=''):
+    """
+    Returns the function replacing a single matched static url for
+    replace_static_urls. It looks up the course's store and asset settings
+    once, on the first url that needs them.
     """
+    course_asset_settings = []
+
+    def get_course_asset_settings():
+        """
+        Returns the generation and settings of the course's assets, or None if
+        they aren't in the contentstore.
+        """
+        if not course_asset_settings:
+            # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
+            if (not static_asset_path) \
+                    and course_id \
+                    and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
+                course_asset_settings.append((
+                    _get_asset_urls_generation(course_id),
+                    AssetBaseUrlConfig.get_base_url(),
+                    AssetExcludedExtensionsConfig.get_excluded_extensions(),
+                ))
+            else:
+                course_asset_settings.append(None)
+        return course_asset_settings[0]
 
     def replace_static_url(original, prefix, quote, rest):
         """
@@ -162,31 +260,10 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
         # In debug mode, if we can find the url as is,
         if settings.DEBUG and finders.find(rest, True):
             return original
-        # if we're running with a MongoBacked store course_namespace is not None, then use studio style urls
-        elif (not static_asset_path) \
-                and course_id \
-                and modulestore().get_modulestore_type(course_id) != ModuleStoreEnum.Type.xml:
-            # first look in the static file pipeline and see if we are trying to reference
-            # a piece of static content which is in the edx-platform repo (e.g. JS associated with an xmodule)
-
-            exists_in_staticfiles_storage = False
-            try:
-                exists_in_staticfiles_storage = staticfiles_storage.exists(rest)
-            except Exception as err:
-                log.warning("staticfiles_storage couldn't find path {0}: {1}".format(
-                    rest, str(err)))
-
-            if exists_in_staticfiles_storage:
-                url = staticfiles_storage.url(rest)
-            else:
-                # if not, then assume it's courseware specific content and then look in the
-                # Mongo-backed database
-                base_url = AssetBaseUrlConfig.get_base_url()
-                excluded_exts = AssetExcludedExtensionsConfig.get_excluded_extensions()
-                url = StaticContent.get_canonicalized_asset_path(course_id, rest, base_url, excluded_exts)
 
-                if AssetLocator.CANONICAL_NAMESPACE in url:
-                    url = url.replace('block@', 'block/', 1)
+        asset_settings = get_course_asset_settings()
+        if asset_settings is not None:
+            url = _get_course_asset_url(course_id, rest, *asset_settings)
 
         # Otherwise, look the file up in staticfiles_storage, and append the data directory if needed
         else:
@@ -205,4 +282,57 @@ def replace_static_urls(text, data_directory=None, course_id=None, static_asset_
 
         return "".join([quote, url, quote])
 
-    return process_static_urls(text, replace_static_url, data_dir=static_asset_path or data_directory)
+    return replace_static_url
+
+
+def replace_static_urls(text, data_directory=None, course_id=None, static_asset_path=''):
+    """
+    Replace /static/$stuff urls either with their correct url as generated by collectstatic,
+    (/static/$md5_hashed_stuff) or by the course-specific content static url
+    /static/$course_data_dir/$stuff, or, if course_namespace is not None, by the
+    correct url in the contentstore (/c4x/.. or /asset-loc:..)
+
+    text: The source text to do the substitution in
+    data_directory: The directory in which course data is stored
+    course_id: The course identifier used to distinguish static content for this course in studio
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    """
+    return process_static_urls(
+        text,
+        _make_static_url_replacement(data_directory, course_id, static_asset_path),
+        data_dir=static_asset_path or data_directory
+    )
+
+
+def replace_urls(text, data_directory=None, course_id=None, static_asset_path='', jump_to_id_base_url=None):
+    """
+    Replace the /static/, /course/ and /jump_to_id/ urls of the text in a single pass,
+    as replace_static_urls, replace_course_urls and replace_jump_to_id_urls would in turn.
+
+    text: The source text to do the substitution in
+    data_directory: The directory in which course data is stored
+    course_id: The course identifier, also used to replace /course/ urls if given
+    static_asset_path: Path for static assets, which overrides data_directory and course_namespace, if nonempty
+    jump_to_id_base_url: The base of the jump_to_id handler, used to replace /jump_to_id/ urls if given
+    """
+    prefixes = [_static_url_prefix(static_asset_path or data_directory)]
+    if course_id:
+        prefixes.append(COURSE_URL_PREFIX)
+    if jump_to_id_base_url:
+        prefixes.append(JUMP_TO_ID_URL_PREFIX)
+    replace_static_url = _make_static_url_replacement(data_directory, course_id, static_asset_path)
+
+    def replace_url(match):
+        """
+        Replace a single matched url, according to its prefix.
+        """
+        prefix = match.group('prefix')
+        quote = match.group('quote')
+        rest = match.group('rest')
+        if prefix == COURSE_URL_PREFIX:
+            return "".join([quote, '/courses/' + course_id.to_deprecated_string() + '/', rest, quote])
+        elif prefix == JUMP_TO_ID_URL_PREFIX:
+            return "".join([quote, jump_to_id_base_url + rest, quote])
+        return replace_static_url(match.group(0), prefix, quote, rest)
+
+    return _compiled_url_replace_regex(u'|'.join(prefixes)).sub(replace_url, text)
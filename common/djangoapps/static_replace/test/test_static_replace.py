@@ -9,8 +9,12 @@ from cStringIO import StringIO
 
 from nose.tools import assert_equals, assert_true, assert_false  # pylint: disable=no-name-in-module
 from static_replace import (
+    ASSET_URLS_NAMESPACE,
+    invalidate_asset_urls,
     replace_static_urls,
     replace_course_urls,
+    replace_jump_to_id_urls,
+    replace_urls,
     _url_replace_regex,
     process_static_urls,
     make_static_urls_absolute
@@ -18,6 +22,7 @@ from static_replace import (
 from mock import patch, Mock
 
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
+from openedx.core.lib.cache_utils import invalidate_memoized
 from xmodule.contentstore.content import StaticContent
 from xmodule.contentstore.django import contentstore
 from xmodule.modulestore import ModuleStoreEnum
@@ -132,6 +137,53 @@ def test_data_dir_fallback(mock_storage, mock_modulestore, mock_settings):
     assert_equals('"/static/data_dir/file.png"', replace_static_urls(STATIC_SOURCE, DATA_DIRECTORY))
 
 
+@patch('static_replace.StaticContent', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+@patch('static_replace.AssetBaseUrlConfig.get_base_url', Mock(return_value=u''))
+@patch('static_replace.AssetExcludedExtensionsConfig.get_excluded_extensions', Mock(return_value=['.html']))
+def test_course_asset_urls_memoized(mock_modulestore, mock_static_content):
+    invalidate_memoized(ASSET_URLS_NAMESPACE)
+    mock_modulestore.return_value = Mock(MongoModuleStore)
+    mock_static_content.get_canonicalized_asset_path.return_value = '/c4x/org/course/asset/memoized.png'
+    source = '"/static/memoized.png" "/static/memoized.png"'
+    expected = '"/c4x/org/course/asset/memoized.png" "/c4x/org/course/asset/memoized.png"'
+
+    assert_equals(expected, replace_static_urls(source, DATA_DIRECTORY, course_id=COURSE_KEY))
+    assert_equals(expected, replace_static_urls(source, DATA_DIRECTORY, course_id=COURSE_KEY))
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 1)
+
+    # Changes to the course's assets invalidate their urls.
+    invalidate_asset_urls(COURSE_KEY)
+    assert_equals(expected, replace_static_urls(source, DATA_DIRECTORY, course_id=COURSE_KEY))
+    assert_equals(mock_static_content.get_canonicalized_asset_path.call_count, 2)
+
+
+@patch('static_replace.staticfiles_storage', autospec=True)
+@patch('static_replace.modulestore', autospec=True)
+def test_replace_urls(mock_modulestore, mock_storage):
+    mock_modulestore.return_value.get_modulestore_type.return_value = ModuleStoreEnum.Type.xml
+    mock_storage.exists.return_value = True
+    mock_storage.url.side_effect = lambda path: '/static/hashed/' + path
+    jump_to_id_base_url = '/courses/org/course/run/jump_to_id/'
+    text = (
+        '<img src="/static/file.png"/><a href="/course/info"></a>'
+        '<a href=\'/jump_to_id/unit\'></a><img src="/static/{}/file.png?raw"/>'.format(DATA_DIRECTORY)
+    )
+
+    assert_equals(
+        replace_jump_to_id_urls(
+            replace_course_urls(replace_static_urls(text, DATA_DIRECTORY, COURSE_KEY), COURSE_KEY),
+            COURSE_KEY,
+            jump_to_id_base_url,
+        ),
+        replace_urls(text, DATA_DIRECTORY, COURSE_KEY, jump_to_id_base_url=jump_to_id_base_url),
+    )
+    assert_equals(
+        replace_static_urls(text, DATA_DIRECTORY),
+        replace_urls(text, DATA_DIRECTORY),
+    )
+
+
 def test_raw_static_check():
     """
     Make sure replace_static_urls leaves alone things that end in '.raw'
@@ -189,6 +241,7 @@ class CanonicalContentTest(SharedModuleStoreTestCase):
 
     def setUp(self):
         super(CanonicalContentTest, self).setUp()
+        invalidate_memoized(ASSET_URLS_NAMESPACE)
 
     @classmethod
     def setUpClass(cls):
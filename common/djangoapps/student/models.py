@@ -52,6 +52,7 @@ from microsite_configuration import microsite
 import lms.lib.comment_client as cc
 from openedx.core.djangoapps.commerce.utils import ecommerce_api_client, ECOMMERCE_DATE_FORMAT
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.lib.cache_utils import invalidate_memoized_on, memoized
 from util.model_utils import emit_field_changed_events, get_changed_fields_dict
 from util.query import use_read_replica_if_available
 from util.milestones_helpers import is_entrance_exams_enabled
@@ -905,6 +906,11 @@ class CourseEnrollmentManager(models.Manager):
         )
 
 
+# The namespaces of the results of CourseEnrollment methods memoized in the request cache.
+IS_ENROLLED_NAMESPACE = 'student.is_enrolled'
+ENROLLMENT_MODE_FOR_USER_NAMESPACE = 'student.enrollment_mode_for_user'
+
+
 class CourseEnrollment(models.Model):
     """
     Represents a Student's Enrollment record for a single Course. You should
@@ -1286,6 +1292,7 @@ class CourseEnrollment(models.Model):
             )
 
     @classmethod
+    @memoized(IS_ENROLLED_NAMESPACE)
     def is_enrolled(cls, user, course_key):
         """
         Returns True if the user is enrolled in the course (the entry must exist
@@ -1335,6 +1342,7 @@ class CourseEnrollment(models.Model):
             return False
 
     @classmethod
+    @memoized(ENROLLMENT_MODE_FOR_USER_NAMESPACE)
     def enrollment_mode_for_user(cls, user, course_id):
         """
         Returns the enrollment mode for the given user for the given course
@@ -1495,6 +1503,10 @@ class CourseEnrollment(models.Model):
         return cls.COURSE_ENROLLMENT_CACHE_KEY.format(user_id, unicode(course_key))
 
 
+invalidate_memoized_on(IS_ENROLLED_NAMESPACE, CourseEnrollment)
+invalidate_memoized_on(ENROLLMENT_MODE_FOR_USER_NAMESPACE, CourseEnrollment)
+
+
 @receiver(models.signals.post_save, sender=CourseEnrollment)
 @receiver(models.signals.post_delete, sender=CourseEnrollment)
 def invalidate_enrollment_mode_cache(sender, instance, **kwargs):  # pylint: disable=unused-argument, invalid-name
@@ -10,12 +10,17 @@ from opaque_keys import InvalidKeyError
 from opaque_keys.edx.keys import CourseKey
 
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
+from openedx.core.lib.cache_utils import invalidate_memoized
 from xmodule.modulestore.django import modulestore
 
 NAMESPACE_CHOICES = {
     'ENTRANCE_EXAM': 'entrance_exams'
 }
 
+# The namespace of memoized results that depend on whether users have fulfilled
+# the milestones of courses, invalidated by the functions changing them below.
+MILESTONES_FULFILLMENT_NAMESPACE = 'milestones.fulfillment'
+
 
 def get_namespace_choices():
     """
@@ -64,6 +69,7 @@ def add_prerequisite_course(course_key, prerequisite_course_key):
 
     # add fulfillment course milestone
     milestones_api.add_course_milestone(prerequisite_course_key, 'fulfills', milestone)
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 
 
 def remove_prerequisite_course(course_key, milestone):
@@ -78,6 +84,7 @@ def remove_prerequisite_course(course_key, milestone):
         course_key,
         milestone,
     )
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 
 
 def set_prerequisite_courses(course_key, prerequisite_course_keys):
@@ -195,6 +202,7 @@ def fulfill_course_milestone(course_key, user):
         course_milestones = milestones_api.get_course_milestones(course_key=course_key, relationship="fulfills")
     for milestone in course_milestones:
         milestones_api.add_user_milestone({'id': user.id}, milestone)
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 
 
 def remove_course_milestones(course_key, user, relationship):
@@ -207,6 +215,7 @@ def remove_course_milestones(course_key, user, relationship):
     course_milestones = milestones_api.get_course_milestones(course_key=course_key, relationship=relationship)
     for milestone in course_milestones:
         milestones_api.remove_user_milestone({'id': user.id}, milestone)
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 
 
 def get_required_content(course, user):
@@ -322,6 +331,7 @@ def add_course_milestone(course_id, relationship, milestone):
     if not settings.FEATURES.get('MILESTONES_APP', False):
         return None
     from milestones import api as milestones_api
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
     return milestones_api.add_course_milestone(course_id, relationship, milestone)
 
 
@@ -366,6 +376,7 @@ def remove_course_content_user_milestones(course_key, content_key, user, relatio
     course_content_milestones = milestones_api.get_course_content_milestones(course_key, content_key, relationship)
     for milestone in course_content_milestones:
         milestones_api.remove_user_milestone({'id': user.id}, milestone)
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 
 
 def remove_content_references(content_id):
@@ -375,6 +386,7 @@ def remove_content_references(content_id):
     if not settings.FEATURES.get('MILESTONES_APP', False):
         return None
     from milestones import api as milestones_api
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
     return milestones_api.remove_content_references(content_id)
 
 
@@ -407,4 +419,5 @@ def add_user_milestone(user, milestone):
     if not settings.FEATURES.get('MILESTONES_APP', False):
         return None
     from milestones import api as milestones_api
+    invalidate_memoized(MILESTONES_FULFILLMENT_NAMESPACE)
     return milestones_api.add_user_milestone(user, milestone)
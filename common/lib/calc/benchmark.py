@@ -0,0 +1,90 @@
+"""
+Micro-benchmark for calc.evaluator on typical formularesponse inputs.
+
+Compares evaluation with the per-process expression cache against parsing the
+expression from scratch on every call (the behavior before plans were cached).
+
+Run from this directory:
+  python benchmark.py [--samples N] [--repeat N]
+"""
+import argparse
+import random
+import timeit
+
+import numpy
+
+import calc
+
+# numpy warns on out-of-domain inputs; keep the output readable.
+numpy.seterr(all='ignore')
+
+# (expression, variable names) pairs resembling formularesponse answers.
+EXPRESSIONS = [
+    ('x^2+2*x+1', ['x']),
+    ('m*g*h + 1/2*m*v^2', ['m', 'g', 'h', 'v']),
+    ('sqrt(R1^2+(omega*L-1/(omega*C))^2)', ['R1', 'omega', 'L', 'C']),
+    ('A*exp(-t/tau)*cos(omega*t+phi)', ['A', 't', 'tau', 'omega', 'phi']),
+    ('(R1||R2)+R3', ['R1', 'R2', 'R3']),
+    ('k*T/q*ln(I/I_0+1)', ['I', 'I_0']),
+]
+
+
+def uncached_evaluator(variables, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate `math_expr` the way `evaluator` did before plans were cached.
+    """
+    plan = calc.CompiledExpression(math_expr, case_sensitive)
+    all_variables, all_functions = calc.add_defaults(variables, functions, case_sensitive)
+    plan.check_variables(all_variables, all_functions)
+    return plan.evaluate(all_variables, all_functions)
+
+
+def sample_points(names, samples):
+    """
+    Return `samples` random variable bindings for the given names.
+    """
+    return [
+        {name: random.uniform(1, 10) for name in names}
+        for __ in range(samples)
+    ]
+
+
+def grade_all(evaluate, points_by_expr):
+    """
+    Evaluate every expression at all of its sample points.
+    """
+    for expr, points in points_by_expr:
+        for point in points:
+            evaluate(point, {}, expr)
+
+
+def main():
+    """
+    Time both evaluation strategies and print the speedup.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--samples', type=int, default=20, help='sample points per expression')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+
+    points_by_expr = [(expr, sample_points(names, args.samples)) for expr, names in EXPRESSIONS]
+    evaluations = len(EXPRESSIONS) * args.samples
+
+    results = []
+    for label, evaluate in (('uncached', uncached_evaluator), ('cached', calc.evaluator)):
+        calc.EXPRESSION_CACHE.clear()
+        best = min(timeit.repeat(
+            lambda: grade_all(evaluate, points_by_expr),  # pylint: disable=cell-var-from-loop
+            repeat=args.repeat,
+            number=1
+        ))
+        results.append(best)
+        print "{:>9}: {:8.3f} ms total, {:7.1f} us per evaluation".format(
+            label, best * 1000, best * 1e6 / evaluations
+        )
+
+    print "  speedup: {:.1f}x".format(results[0] / results[1])
+
+
+if __name__ == '__main__':
+    main()
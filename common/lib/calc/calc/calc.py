@@ -7,6 +7,9 @@ Uses pyparsing to parse. Main function as of now is evaluator().
 import math
 import operator
 import numbers
+import threading
+from collections import OrderedDict
+
 import numpy
 import scipy.constants
 import functions
@@ -228,34 +231,442 @@ def evaluator(variables, functions, math_expr, case_sensitive=False):
     if math_expr.strip() == "":
         return float('nan')
 
-    # Parse the tree.
-    math_interpreter = ParseAugmenter(math_expr, case_sensitive)
-    math_interpreter.parse_algebra()
+    # Parse the tree (or reuse the plan from an earlier call).
+    plan = compile_expression(math_expr, case_sensitive)
 
     # Get our variables together.
     all_variables, all_functions = add_defaults(variables, functions, case_sensitive)
 
     # ...and check them
-    math_interpreter.check_variables(all_variables, all_functions)
+    plan.check_variables(all_variables, all_functions)
+
+    return plan.evaluate(all_variables, all_functions)
+
+
+def evaluator_batch(variables, functions, math_expr, case_sensitive=False):
+    """
+    Evaluate an expression at many sample points; return a numpy array.
+
+    -Variables are passed as a dictionary from string to a sequence of values,
+     one per sample point. All sequences must have the same length. Plain
+     numbers are also accepted and used for every sample.
+    -Unary functions are passed as a dictionary from string to function.
+
+    The result is the same as calling `evaluator` once per sample point (and
+    any exception is the one `evaluator` would raise), but when possible the
+    expression is evaluated just once over whole arrays.
+    """
+    arrays = dict((name, numpy.asarray(values)) for name, values in variables.iteritems())
+    columns = dict((name, array.tolist()) for name, array in arrays.iteritems())
+    sizes = set(array.shape[0] for array in arrays.itervalues() if array.ndim)
+    if len(sizes) > 1:
+        raise ValueError("All sample arrays must have the same length")
+    size = sizes.pop() if sizes else 1
+
+    # No need to go further.
+    if math_expr.strip() == "":
+        return numpy.resize(float('nan'), size)
+
+    plan = compile_expression(math_expr, case_sensitive)
+    all_variables, all_functions = add_defaults(arrays, functions, case_sensitive)
+    plan.check_variables(all_variables, all_functions)
+
+    if plan.is_vectorizable(all_functions):
+        try:
+            result = numpy.resize(plan.evaluate_batch(all_variables, all_functions), size)
+        except Exception:  # pylint: disable=broad-except
+            result = None
+        if result is not None and numpy.all(numpy.isfinite(result)):
+            return result
+
+    # Some sample raised an error or produced a non-finite value, or the
+    # expression calls scalar-only functions: evaluate point by point so the
+    # values and errors match `evaluator` exactly.
+    results = []
+    for index in range(size):
+        point = dict(
+            (name, column[index] if isinstance(column, list) else column)
+            for name, column in columns.iteritems()
+        )
+        point_variables, point_functions = add_defaults(point, functions, case_sensitive)
+        results.append(plan.evaluate(point_variables, point_functions))
+    return numpy.array(results)
+
+
+# The following few functions turn the nodes of a parse tree into closures.
+# Each of them takes the list of (already compiled) child nodes and returns a
+# function `f(all_variables, all_functions)` computing the value of the node.
+# Operator tokens ('+', '*', '^', ...) are passed through as strings.
+
+def compile_number(parse_result):
+    """
+    Evaluate the number once; the closure just returns the constant.
+    """
+    value = eval_number(parse_result)
+    return lambda all_variables, all_functions: value
+
+
+def compile_atom(parse_result):
+    """
+    Return the closure wrapped by the atom, ignoring any parentheses.
+    """
+    return next(k for k in parse_result if callable(k))
+
+
+def compile_power(parse_result):
+    """
+    Exponentiate the child values right to left, as `eval_power` does.
+    """
+    operands = [k for k in parse_result if callable(k)]
+    if len(operands) == 1:
+        return operands[0]
+
+    operands.reverse()
+
+    def power(all_variables, all_functions):
+        """Raise `b` to the power of `a`, going from the right."""
+        values = [k(all_variables, all_functions) for k in operands]
+        return reduce(lambda a, b: b ** a, values)
+    return power
+
+
+def compile_parallel(parse_result):
+    """
+    Combine the child values with the parallel resistors operator.
+    """
+    operands = [k for k in parse_result if callable(k)]
+    if len(operands) == 1:
+        return operands[0]
+
+    def parallel(all_variables, all_functions):
+        """Evaluate the operands and hand them to `eval_parallel`."""
+        return eval_parallel([k(all_variables, all_functions) for k in operands])
+    return parallel
+
+
+def _compile_chain(parse_result, operators, initial_value):
+    """
+    Pair each operand with the operator preceding it, e.g. for sums/products.
+
+    `operators` maps the operator token to its function; the first entry is
+    used when no operator precedes an operand. Return a closure folding the
+    operands onto `initial_value` from left to right.
+    """
+    steps = []
+    current_op = operators[None]
+    for token in parse_result:
+        if callable(token):
+            steps.append((current_op, token))
+        else:
+            current_op = operators[token]
+
+    def chain(all_variables, all_functions):
+        """Fold the operands from left to right."""
+        total = initial_value
+        for op, operand in steps:
+            total = op(total, operand(all_variables, all_functions))
+        return total
+    return chain
+
+
+def compile_sum(parse_result):
+    """
+    Add the inputs, keeping in mind their sign. See `eval_sum`.
+    """
+    return _compile_chain(
+        parse_result,
+        {None: operator.add, '+': operator.add, '-': operator.sub},
+        0.0
+    )
+
+
+def compile_product(parse_result):
+    """
+    Multiply and divide the inputs. See `eval_product`.
+    """
+    return _compile_chain(
+        parse_result,
+        {None: operator.mul, '*': operator.mul, '/': operator.truediv},
+        1.0
+    )
+
+
+def compile_parallel_batch(parse_result):
+    """
+    Like `compile_parallel`, but for arrays of sample values.
+
+    Samples where any of the inputs is zero evaluate to NaN.
+    """
+    operands = [k for k in parse_result if callable(k)]
+    if len(operands) == 1:
+        return operands[0]
+
+    def parallel(all_variables, all_functions):
+        """Combine the operand arrays elementwise."""
+        values = [k(all_variables, all_functions) for k in operands]
+        has_zero = reduce(numpy.logical_or, [value == 0 for value in values])
+        return numpy.where(has_zero, float('nan'), 1. / sum(1. / value for value in values))
+    return parallel
+
+
+# Functions known to operate elementwise on numpy arrays. `fact` and `arccot`
+# only accept scalars; user-supplied functions are never assumed to be safe.
+VECTORIZED_FUNCTIONS = frozenset(
+    func for name, func in DEFAULT_FUNCTIONS.iteritems()
+    if name not in ('fact', 'factorial', 'arccot')
+)
+
+
+class CompiledExpression(object):
+    """
+    A parsed math expression, ready to be evaluated many times.
+
+    The parse tree is reduced once into a tree of closures, so evaluating the
+    same expression with different variable bindings skips parsing entirely.
+    Instances may be shared between threads.
+    """
+    def __init__(self, math_expr, case_sensitive=False):
+        parser = ParseAugmenter(math_expr, case_sensitive)
+        parser.parse_algebra()
+
+        self.math_expr = math_expr
+        self.case_sensitive = case_sensitive
+        self.variables_used = frozenset(parser.variables_used)
+        self.functions_used = frozenset(parser.functions_used)
+
+        self._parser = parser
+        self._plan = self._compile(compile_parallel)
+        # Compiled on first use by `evaluate_batch`.
+        self._batch_plan = None
+
+    def _casify(self, name):
+        """
+        Normalize `name` the way `add_defaults` normalizes the bindings.
+        """
+        return name if self.case_sensitive else name.lower()
+
+    def _compile(self, parallel_action):
+        """
+        Reduce the parse tree into a closure `f(all_variables, all_functions)`.
+        """
+        casify = self._casify
+
+        def compile_variable(parse_result):
+            """Look the variable up by its (casified) name."""
+            name = casify(parse_result[0])
+            return lambda all_variables, all_functions: all_variables[name]
+
+        def compile_function(parse_result):
+            """Apply the (casified) function to its compiled argument."""
+            name = casify(parse_result[0])
+            argument = parse_result[1]
+            return lambda all_variables, all_functions: all_functions[name](
+                argument(all_variables, all_functions)
+            )
+
+        compile_actions = {
+            'number': compile_number,
+            'variable': compile_variable,
+            'function': compile_function,
+            'atom': compile_atom,
+            'power': compile_power,
+            'parallel': parallel_action,
+            'product': compile_product,
+            'sum': compile_sum
+        }
+        return self._parser.reduce_tree(compile_actions)
+
+    def check_variables(self, valid_variables, valid_functions):
+        """
+        Confirm that all the variables used in the expression are defined.
+
+        Otherwise, raise an UndefinedVariable containing all bad variables.
+        """
+        _check_variables(
+            self.variables_used, self.functions_used, self.case_sensitive,
+            valid_variables, valid_functions
+        )
+
+    def evaluate(self, all_variables, all_functions):
+        """
+        Evaluate the expression with the given (already defaulted) bindings.
+
+        The dictionaries are those returned by `add_defaults`; call
+        `check_variables` first to get a friendly error for missing names.
+        """
+        return self._plan(all_variables, all_functions)
+
+    def is_vectorizable(self, all_functions):
+        """
+        Return whether every function used accepts numpy arrays.
+        """
+        return all(
+            all_functions[self._casify(name)] in VECTORIZED_FUNCTIONS
+            for name in self.functions_used
+        )
+
+    def evaluate_batch(self, all_variables, all_functions):
+        """
+        Evaluate the expression once over arrays of sample values.
+
+        Only meaningful when `is_vectorizable` is true. numpy reports domain
+        errors and division by zero as NaN/inf instead of raising, so callers
+        needing the exact scalar semantics must check the result themselves.
+        """
+        if self._batch_plan is None:
+            self._batch_plan = self._compile(compile_parallel_batch)
+        with numpy.errstate(all='ignore'):
+            return self._batch_plan(all_variables, all_functions)
+
+
+class ExpressionCache(object):
+    """
+    A bounded, thread-safe LRU mapping (math_expr, case_sensitive) to plans.
+    """
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._plans = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._plans)
 
-    # Create a recursion to evaluate the tree.
+    def get(self, math_expr, case_sensitive):
+        """
+        Return the `CompiledExpression` for `math_expr`, compiling on a miss.
+
+        Expressions which fail to parse are not cached; the ParseException is
+        raised to the caller every time.
+        """
+        key = (math_expr, case_sensitive)
+        with self._lock:
+            plan = self._plans.pop(key, None)
+            if plan is not None:
+                # Reinsert to mark as most recently used.
+                self._plans[key] = plan
+                return plan
+
+        # Compile outside the lock; a concurrent duplicate compile is harmless.
+        plan = CompiledExpression(math_expr, case_sensitive)
+        with self._lock:
+            self._plans[key] = plan
+            while len(self._plans) > self.maxsize:
+                self._plans.popitem(last=False)
+        return plan
+
+    def clear(self):
+        """
+        Drop every cached plan.
+        """
+        with self._lock:
+            self._plans.clear()
+
+
+# Formula response grading evaluates the same few expressions at many sample
+# points, so even a modest cache absorbs nearly all the parsing work.
+EXPRESSION_CACHE_SIZE = 1024
+EXPRESSION_CACHE = ExpressionCache(EXPRESSION_CACHE_SIZE)
+
+
+def compile_expression(math_expr, case_sensitive=False):
+    """
+    Return a (possibly cached) `CompiledExpression` for `math_expr`.
+    """
+    return EXPRESSION_CACHE.get(math_expr, case_sensitive)
+
+
+def _check_variables(variables_used, functions_used, case_sensitive,
+                     valid_variables, valid_functions):
+    """
+    Raise an UndefinedVariable listing the names which are not defined.
+    """
     if case_sensitive:
         casify = lambda x: x
     else:
         casify = lambda x: x.lower()  # Lowercase for case insens.
 
-    evaluate_actions = {
-        'number': eval_number,
-        'variable': lambda x: all_variables[casify(x[0])],
-        'function': lambda x: all_functions[casify(x[0])](x[1]),
-        'atom': eval_atom,
-        'power': eval_power,
-        'parallel': eval_parallel,
-        'product': eval_product,
-        'sum': eval_sum
-    }
+    # Test if casify(X) is valid, but return the actual bad input (i.e. X)
+    bad_vars = set(var for var in variables_used
+                   if casify(var) not in valid_variables)
+    bad_vars.update(func for func in functions_used
+                    if casify(func) not in valid_functions)
+
+    if bad_vars:
+        raise UndefinedVariable(' '.join(sorted(bad_vars)))
+
+
+_GRAMMAR = None
+_GRAMMAR_LOCK = threading.Lock()
+
 
-    return math_interpreter.reduce_tree(evaluate_actions)
+def _build_grammar():
+    """
+    Build the pyparsing grammar for algebraic expressions.
+
+    The grammar carries no per-parse state, so one instance is shared by every
+    `ParseAugmenter` in the process. See `get_grammar`.
+    """
+    # 0.33 or 7 or .34 or 16.
+    number_part = Word(nums)
+    inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
+    # pyparsing allows spaces between tokens--`Combine` prevents that.
+    inner_number = Combine(inner_number)
+
+    # SI suffixes and percent.
+    number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
+
+    # 0.33k or 17
+    plus_minus = Literal('+') | Literal('-')
+    number = Group(
+        Optional(plus_minus) +
+        inner_number +
+        Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
+        Optional(number_suffix)
+    )
+    number = number("number")
+
+    # Predefine recursive variables.
+    expr = Forward()
+
+    # Handle variables passed in. They must start with letters/underscores
+    # and may contain numbers afterward.
+    inner_varname = Word(alphas + "_", alphanums + "_")
+    varname = Group(inner_varname)("variable")
+
+    # Same thing for functions.
+    function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
+
+    atom = number | function | varname | "(" + expr + ")"
+    atom = Group(atom)("atom")
+
+    # Do the following in the correct order to preserve order of operation.
+    pow_term = atom + ZeroOrMore("^" + atom)
+    pow_term = Group(pow_term)("power")
+
+    par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
+    par_term = Group(par_term)("parallel")
+
+    prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
+    prod_term = Group(prod_term)("product")
+
+    sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
+    sum_term = Group(sum_term)("sum")
+
+    # Finish the recursion.
+    expr << sum_term  # pylint: disable=pointless-statement
+    return expr + stringEnd
+
+
+def get_grammar():
+    """
+    Return the process-wide grammar, building it on first use.
+    """
+    global _GRAMMAR  # pylint: disable=global-statement
+    if _GRAMMAR is None:
+        with _GRAMMAR_LOCK:
+            if _GRAMMAR is None:
+                _GRAMMAR = _build_grammar()
+    return _GRAMMAR
 
 
 class ParseAugmenter(object):
@@ -278,23 +689,6 @@ class ParseAugmenter(object):
         self.variables_used = set()
         self.functions_used = set()
 
-        def vpa(tokens):
-            """
-            When a variable is recognized, store it in `variables_used`.
-            """
-            varname = tokens[0][0]
-            self.variables_used.add(varname)
-
-        def fpa(tokens):
-            """
-            When a function is recognized, store it in `functions_used`.
-            """
-            varname = tokens[0][0]
-            self.functions_used.add(varname)
-
-        self.variable_parse_action = vpa
-        self.function_parse_action = fpa
-
     def parse_algebra(self):
         """
         Parse an algebraic expression into a tree.
@@ -307,57 +701,22 @@ class ParseAugmenter(object):
         really gross. For debugging, use something like
           print OBJ.tree.asXML()
         """
-        # 0.33 or 7 or .34 or 16.
-        number_part = Word(nums)
-        inner_number = (number_part + Optional("." + Optional(number_part))) | ("." + number_part)
-        # pyparsing allows spaces between tokens--`Combine` prevents that.
-        inner_number = Combine(inner_number)
-
-        # SI suffixes and percent.
-        number_suffix = MatchFirst(Literal(k) for k in SUFFIXES.keys())
-
-        # 0.33k or 17
-        plus_minus = Literal('+') | Literal('-')
-        number = Group(
-            Optional(plus_minus) +
-            inner_number +
-            Optional(CaselessLiteral("E") + Optional(plus_minus) + number_part) +
-            Optional(number_suffix)
-        )
-        number = number("number")
-
-        # Predefine recursive variables.
-        expr = Forward()
-
-        # Handle variables passed in. They must start with letters/underscores
-        # and may contain numbers afterward.
-        inner_varname = Word(alphas + "_", alphanums + "_")
-        varname = Group(inner_varname)("variable")
-        varname.setParseAction(self.variable_parse_action)
-
-        # Same thing for functions.
-        function = Group(inner_varname + Suppress("(") + expr + Suppress(")"))("function")
-        function.setParseAction(self.function_parse_action)
-
-        atom = number | function | varname | "(" + expr + ")"
-        atom = Group(atom)("atom")
-
-        # Do the following in the correct order to preserve order of operation.
-        pow_term = atom + ZeroOrMore("^" + atom)
-        pow_term = Group(pow_term)("power")
+        self.tree = get_grammar().parseString(self.math_expr)[0]
+        self._collect_names(self.tree)
 
-        par_term = pow_term + ZeroOrMore('||' + pow_term)  # 5k || 4k
-        par_term = Group(par_term)("parallel")
-
-        prod_term = par_term + ZeroOrMore((Literal('*') | Literal('/')) + par_term)  # 7 * 5 / 4
-        prod_term = Group(prod_term)("product")
-
-        sum_term = Optional(plus_minus) + prod_term + ZeroOrMore(plus_minus + prod_term)  # -5 + 4 - 3
-        sum_term = Group(sum_term)("sum")
-
-        # Finish the recursion.
-        expr << sum_term  # pylint: disable=pointless-statement
-        self.tree = (expr + stringEnd).parseString(self.math_expr)[0]
+    def _collect_names(self, node):
+        """
+        Record the variables and functions used in `node` and its children.
+        """
+        if not isinstance(node, ParseResults):
+            return
+        node_name = node.getName()
+        if node_name == 'variable':
+            self.variables_used.add(node[0])
+        elif node_name == 'function':
+            self.functions_used.add(node[0])
+        for child in node:
+            self._collect_names(child)
 
     def reduce_tree(self, handle_actions, terminal_converter=None):
         """
@@ -403,16 +762,7 @@ class ParseAugmenter(object):
 
         Otherwise, raise an UndefinedVariable containing all bad variables.
         """
-        if self.case_sensitive:
-            casify = lambda x: x
-        else:
-            casify = lambda x: x.lower()  # Lowercase for case insens.
-
-        # Test if casify(X) is valid, but return the actual bad input (i.e. X)
-        bad_vars = set(var for var in self.variables_used
-                       if casify(var) not in valid_variables)
-        bad_vars.update(func for func in self.functions_used
-                        if casify(func) not in valid_functions)
-
-        if bad_vars:
-            raise UndefinedVariable(' '.join(sorted(bad_vars)))
+        _check_variables(
+            self.variables_used, self.functions_used, self.case_sensitive,
+            valid_variables, valid_functions
+        )
@@ -559,3 +559,122 @@ class EvaluatorTest(unittest.TestCase):
             calc.evaluator({'r1': 5}, {}, "r1+r2")
         with self.assertRaisesRegexp(calc.UndefinedVariable, 'r1 r3'):
             calc.evaluator(variables, {}, "r1*r3", case_sensitive=True)
+
+
+class CompiledExpressionTest(unittest.TestCase):
+    """
+    Test the compiled expression plans and their cache.
+    """
+
+    def setUp(self):
+        super(CompiledExpressionTest, self).setUp()
+        calc.EXPRESSION_CACHE.clear()
+        self.addCleanup(calc.EXPRESSION_CACHE.clear)
+
+    def test_plan_reused(self):
+        """
+        The same expression should only be compiled once per case sensitivity.
+        """
+        plan = calc.compile_expression('x^2+y')
+        self.assertIs(plan, calc.compile_expression('x^2+y'))
+        self.assertIsNot(plan, calc.compile_expression('x^2+y', case_sensitive=True))
+        self.assertEqual(plan.variables_used, frozenset(['x', 'y']))
+
+    def test_rebinding_variables(self):
+        """
+        Evaluating a cached plan should honor the new variable values.
+        """
+        for x_value in (1.0, 2.5, -3.0):
+            self.assertEqual(
+                calc.evaluator({'x': x_value}, {}, 'x^2+2*x'),
+                x_value ** 2 + 2 * x_value
+            )
+        self.assertEqual(len(calc.EXPRESSION_CACHE), 1)
+
+    def test_functions_rebound(self):
+        """
+        Functions are looked up at evaluation time, not at compile time.
+        """
+        self.assertEqual(calc.evaluator({}, {'f': lambda x: x + 1}, 'f(1)'), 2)
+        self.assertEqual(calc.evaluator({}, {'f': lambda x: x * 10}, 'f(1)'), 10)
+
+    def test_undefined_vars_with_cached_plan(self):
+        """
+        A cached plan should still complain about undefined variables.
+        """
+        calc.evaluator({'x': 1, 'y': 2}, {}, 'x+y')
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluator({'x': 1}, {}, 'x+y')
+
+    def test_parse_errors_not_cached(self):
+        """
+        Expressions which fail to parse should raise every time.
+        """
+        for __ in range(2):
+            with self.assertRaises(ParseException):
+                calc.evaluator({}, {}, '1+.')
+        self.assertEqual(len(calc.EXPRESSION_CACHE), 0)
+
+    def test_cache_bounded(self):
+        """
+        The least recently used plans should be evicted first.
+        """
+        cache = calc.ExpressionCache(maxsize=2)
+        first = cache.get('1+1', False)
+        cache.get('2+2', False)
+        cache.get('1+1', False)
+        cache.get('3+3', False)
+        self.assertEqual(len(cache), 2)
+        self.assertIs(first, cache.get('1+1', False))
+
+
+class EvaluatorBatchTest(unittest.TestCase):
+    """
+    Test calc.evaluator_batch against point-by-point calc.evaluator calls.
+    """
+
+    def assert_matches_evaluator(self, variables, expr, functions=None):
+        """
+        Check that batch evaluation equals evaluating each point separately.
+        """
+        functions = functions or {}
+        result = calc.evaluator_batch(variables, functions, expr)
+        size = len(variables.values()[0])
+        self.assertEqual(len(result), size)
+        for index in range(size):
+            point = {name: values[index] for name, values in variables.items()}
+            expected = calc.evaluator(point, functions, expr)
+            self.assertAlmostEqual(result[index], expected)
+
+    def test_vectorized_expressions(self):
+        variables = {'x': [0.5, 1.5, 2.5], 'R_1': [1.0, 2.0, 4.0]}
+        for expr in ('x^2+2*x+1', 'sin(x)*exp(-x)/sqrt(x)', 'x||R_1', '-x^x^2',
+                     'sec(x) + arcsinh(x)', 'x*j + 5k', '7'):
+            self.assert_matches_evaluator(variables, expr)
+
+    def test_scalar_only_functions(self):
+        """
+        `fact` and user functions are evaluated point by point.
+        """
+        self.assert_matches_evaluator({'x': [1.0, 2.0, 3.0]}, 'fact(x)')
+        self.assert_matches_evaluator({'x': [-1.0, 2.0]}, 'arccot(x)')
+        self.assert_matches_evaluator({'x': [1.0, 2.0]}, 'f(x)', {'f': lambda x: x + 1})
+
+    def test_errors_match_evaluator(self):
+        """
+        Errors raised for a single sample should still be raised.
+        """
+        with self.assertRaises(ZeroDivisionError):
+            calc.evaluator_batch({'x': [1.0, 0.0]}, {}, '1/x')
+        with self.assertRaises(ValueError):
+            calc.evaluator_batch({'x': [1.0, 2.5]}, {}, 'fact(x)')
+        with self.assertRaisesRegexp(calc.UndefinedVariable, 'y'):
+            calc.evaluator_batch({'x': [1.0]}, {}, 'x+y')
+
+    def test_nan_samples(self):
+        self.assertTrue(numpy.isnan(calc.evaluator_batch({'x': [0.0, 1.0]}, {}, 'x||1')[0]))
+        self.assertTrue(numpy.all(numpy.isnan(calc.evaluator_batch({'x': [1.0]}, {}, ''))))
+
+    def test_mismatched_lengths(self):
+        with self.assertRaises(ValueError):
+            calc.evaluator_batch({'x': [1.0, 2.0], 'y': [1.0]}, {}, 'x+y')
@@ -591,6 +591,34 @@ class FormulaResponseTest(ResponseTest):
         self.assertTrue(problem.responders.values()[0].validate_answer('14*x'))
         self.assertFalse(problem.responders.values()[0].validate_answer('3*y+2*x'))
 
+    def test_samples_evaluated_in_one_batch(self):
+        """
+        Each formula should be evaluated once over all the sample points.
+        """
+        sample_dict = {'x': (1, 2), 'y': (3, 4)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=30,
+                                     tolerance="1%",
+                                     answer="x^2+y")
+        with mock.patch('capa.responsetypes.evaluator_batch', wraps=calc.evaluator_batch) as mock_batch:
+            self.assert_grade(problem, "x*x+y", "correct")
+        self.assertEqual(mock_batch.call_count, 2)
+        var_arrays = mock_batch.call_args[0][0]
+        self.assertEqual(sorted(var_arrays), ['x', 'y'])
+        self.assertEqual(len(var_arrays['x']), 30)
+
+    def test_factorial_outside_domain(self):
+        """
+        A factorial evaluated at non-integer samples should be reported.
+        """
+        sample_dict = {'x': (1.5, 2.5)}
+        problem = self.build_problem(sample_dict=sample_dict,
+                                     num_samples=10,
+                                     tolerance="1%",
+                                     answer="x")
+        with self.assertRaisesRegexp(StudentInputError, "factorial function not permitted"):
+            problem.grade_answers({'1_2_1': 'fact(x)'})
+
 
 class StringResponseTest(ResponseTest):  # pylint: disable=missing-docstring
     xml_factory_class = StringResponseXMLFactory
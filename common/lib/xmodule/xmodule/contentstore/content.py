@@ -26,7 +26,7 @@ from PIL import Image
 
 class StaticContent(object):
     def __init__(self, loc, name, content_type, data, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         self.location = loc
         self.name = name  # a display string which can be edited, and thus not part of the location which needs to be fixed
         self.content_type = content_type
@@ -38,6 +38,8 @@ class StaticContent(object):
         # cycles
         self.import_path = import_path
         self.locked = locked
+        # hex digest (md5) of the content as computed by the store, if known
+        self.content_digest = content_digest
 
     @property
     def is_thumbnail(self):
@@ -86,6 +88,17 @@ class StaticContent(object):
     def data(self):
         return self._data
 
+    def copy_metadata(self):
+        """
+        Returns a StaticContent with the same metadata as this content, but without its data.
+        """
+        return StaticContent(
+            self.location, self.name, self.content_type, None, last_modified_at=self.last_modified_at,
+            thumbnail_location=self.thumbnail_location, import_path=self.import_path, length=self.length,
+            # Content pickled before digests were recorded doesn't have the attribute.
+            locked=self.locked, content_digest=getattr(self, 'content_digest', None)
+        )
+
     ASSET_URL_RE = re.compile(r"""
         /?c4x/
         (?P<org>[^/]+)/
@@ -224,6 +237,12 @@ class StaticContent(object):
     def stream_data(self):
         yield self._data
 
+    def stream_data_in_range(self, first_byte, last_byte):
+        """
+        Stream the data between first_byte and last_byte (included)
+        """
+        yield self._data[first_byte:last_byte + 1]
+
     @staticmethod
     def serialize_asset_key_with_slash(asset_key):
         """
@@ -238,15 +257,27 @@ class StaticContent(object):
 
 class StaticContentStream(StaticContent):
     def __init__(self, loc, name, content_type, stream, last_modified_at=None, thumbnail_location=None, import_path=None,
-                 length=None, locked=False):
+                 length=None, locked=False, content_digest=None):
         super(StaticContentStream, self).__init__(loc, name, content_type, None, last_modified_at=last_modified_at,
                                                   thumbnail_location=thumbnail_location, import_path=import_path,
-                                                  length=length, locked=locked)
+                                                  length=length, locked=locked, content_digest=content_digest)
         self._stream = stream
 
+    @property
+    def chunk_size(self):
+        """
+        The read size matching the storage chunks of the underlying stream.
+
+        GridFS files are stored in fixed size chunks; reading whole, aligned
+        chunks avoids re-fetching or splitting a chunk across reads.
+        """
+        return getattr(self._stream, 'chunk_size', None) or STREAM_DATA_CHUNK_SIZE
+
     def stream_data(self):
+        chunk_size = self.chunk_size
+        self._stream.seek(0)
         while True:
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
+            chunk = self._stream.read(chunk_size)
             if len(chunk) == 0:
                 break
             yield chunk
@@ -254,16 +285,19 @@ class StaticContentStream(StaticContent):
     def stream_data_in_range(self, first_byte, last_byte):
         """
         Stream the data between first_byte and last_byte (included)
+
+        After the first (possibly partial) chunk, every read starts on a
+        chunk boundary of the underlying stream.
         """
+        chunk_size = self.chunk_size
         self._stream.seek(first_byte)
         position = first_byte
-        while True:
-            if last_byte < position + STREAM_DATA_CHUNK_SIZE - 1:
-                chunk = self._stream.read(last_byte - position + 1)
-                yield chunk
+        while position <= last_byte:
+            block_end = min(last_byte + 1, (position // chunk_size + 1) * chunk_size)
+            chunk = self._stream.read(block_end - position)
+            if len(chunk) == 0:
                 break
-            chunk = self._stream.read(STREAM_DATA_CHUNK_SIZE)
-            position += STREAM_DATA_CHUNK_SIZE
+            position += len(chunk)
             yield chunk
 
     def close(self):
@@ -273,7 +307,8 @@ class StaticContentStream(StaticContent):
         self._stream.seek(0)
         content = StaticContent(self.location, self.name, self.content_type, self._stream.read(),
                                 last_modified_at=self.last_modified_at, thumbnail_location=self.thumbnail_location,
-                                import_path=self.import_path, length=self.length, locked=self.locked)
+                                import_path=self.import_path, length=self.length, locked=self.locked,
+                                content_digest=self.content_digest)
         return content
 
 
@@ -568,6 +568,41 @@ class MixedModuleStore(ModuleStoreDraftAndPublished, ModuleStoreWriteBase):
         except NotImplementedError:
             return None, None
 
+    def get_course_version(self, course_key):
+        """
+        Returns the version of the current data of the given course, or None
+        if its modulestore doesn't version courses.
+        """
+        try:
+            store = self._verify_modulestore_support(course_key, 'get_course_version')
+            return store.get_course_version(course_key)
+        except NotImplementedError:
+            return None
+
+    def get_changed_blocks(self, course_key, from_version, to_version):
+        """
+        Returns the usage keys of the blocks of the given course which were added
+        or changed between the given versions of the course, or None if its
+        modulestore can't tell.
+        """
+        try:
+            store = self._verify_modulestore_support(course_key, 'get_changed_blocks')
+            return store.get_changed_blocks(course_key, from_version, to_version)
+        except NotImplementedError:
+            return None
+
+    def get_structure_changes(self, course_key, from_version, to_version):
+        """
+        Returns the changes to the blocks of the given course between the given
+        versions of the course, as detailed by its modulestore, or None if its
+        modulestore can't tell.
+        """
+        try:
+            store = self._verify_modulestore_support(course_key, 'get_structure_changes')
+            return store.get_structure_changes(course_key, from_version, to_version)
+        except NotImplementedError:
+            return None
+
     def get_modulestore_type(self, course_id):
         """
         Returns a type which identifies which modulestore is servicing the given course_id.
@@ -0,0 +1,100 @@
+"""
+Benchmark of importing the static files of a course into the content store.
+
+Generates a course directory with the requested number and size of static
+files, and times importing them with import_static_content at each requested
+concurrency, into a content store that waits the requested latency on each
+save, as saving to a remote GridFS does.
+
+Run with:
+  python -m xmodule.modulestore.perf_tests.benchmark_static_import [--files N] [--size KB] [--latency MS]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import threading
+import time
+import timeit
+
+from opaque_keys.edx.locator import CourseLocator
+from path import Path as path
+
+from xmodule.modulestore.xml_importer import import_static_content
+
+
+class _ContentStore(object):
+    """
+    Stands in for a content store, waiting `latency` seconds on each save and
+    recording the most files held in memory at once.
+    """
+    def __init__(self, latency):
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.saving = 0
+        self.max_saving = 0
+
+    def generate_thumbnail(self, content):  # pylint: disable=unused-argument
+        """
+        Returns no thumbnail.
+        """
+        return None, None
+
+    def save(self, content):  # pylint: disable=unused-argument
+        """
+        Waits as saving the content would.
+        """
+        with self.lock:
+            self.saving += 1
+            self.max_saving = max(self.max_saving, self.saving)
+        time.sleep(self.latency)
+        with self.lock:
+            self.saving -= 1
+
+
+def generate_course_dir(file_count, file_size):
+    """
+    Returns the path of a new course directory with `file_count` static files
+    of `file_size` bytes, spread over a few subdirectories.
+    """
+    course_dir = path(tempfile.mkdtemp())
+    for index in range(file_count):
+        static_dir = course_dir / 'static' / 'dir{}'.format(index % 10)
+        if not static_dir.exists():
+            static_dir.makedirs()
+        with open(static_dir / 'file{}.png'.format(index), 'wb') as static_file:
+            static_file.write(os.urandom(file_size))
+    return course_dir
+
+
+def main():
+    """
+    Time importing the static files at each concurrency and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--files', type=int, default=1000, help='number of static files')
+    parser.add_argument('--size', type=int, default=64, help='size of each static file, in KB')
+    parser.add_argument('--latency', type=float, default=5, help='time to save each file, in milliseconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[1, 4, 8, 16], help='concurrencies to time')
+    parser.add_argument('--repeat', type=int, default=3, help='number of timed runs')
+    args = parser.parse_args()
+
+    course_dir = generate_course_dir(args.files, args.size * 1024)
+    course_key = CourseLocator('edX', 'Benchmark', '2016')
+    try:
+        print "{} static files of {} KB, saved in {} ms each".format(args.files, args.size, args.latency)
+        print "{:>12} {:>12} {:>18}".format('concurrency', 'time (s)', 'max files held')
+        for concurrency in args.concurrency:
+            content_store = _ContentStore(args.latency / 1000.0)
+            best_time = min(timeit.repeat(
+                lambda: import_static_content(course_dir, content_store, course_key, concurrency=concurrency),
+                repeat=args.repeat,
+                number=1,
+            ))
+            print "{:>12} {:>12.2f} {:>18}".format(concurrency, best_time, content_store.max_saving)
+    finally:
+        shutil.rmtree(course_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,127 @@
+"""
+Benchmark of the codecs for caching split modulestore course structures.
+
+Generates a course structure of the requested size, shaped like a real course
+(chapters, sequentials, verticals and leaf components), and times serializing
+and deserializing it with each registered codec and compressor pair. Garbage
+collection stays enabled, as it is when serving requests.
+
+Run with:
+  python -m xmodule.modulestore.perf_tests.benchmark_structure_codecs [--blocks N] [--repeat N]
+"""
+import argparse
+import datetime
+import itertools
+import random
+import timeit
+
+from bson.objectid import ObjectId
+from pytz import UTC
+
+from openedx.core.lib.cache_utils import CODECS, COMPRESSORS
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_codec import StructureCodec  # pylint: disable=unused-import
+
+# Number of children of each block, from the course down to the verticals.
+FAN_OUT = (20, 8, 5)
+
+LEAF_TYPES = ('html', 'problem', 'video', 'discussion')
+
+
+def generate_structure(block_count):
+    """
+    Returns a course structure with about `block_count` blocks.
+    """
+    versions = [ObjectId() for __ in range(20)]
+    editors = range(1, 6)
+    dates = [datetime.datetime(2016, 1, day, tzinfo=UTC) for day in range(1, 29)]
+    counter = itertools.count()
+    blocks = {}
+
+    def add_block(block_type, children, **fields):
+        """
+        Adds a block with random edit info and returns its key.
+        """
+        block_key = BlockKey(block_type, '{}{}'.format(block_type, next(counter)))
+        if children:
+            fields['children'] = children
+        fields['display_name'] = u'{} {}'.format(block_type.title(), block_key.id)
+        blocks[block_key] = BlockData(
+            block_type=block_type,
+            definition=ObjectId(),
+            fields=fields,
+            edit_info={
+                'previous_version': random.choice(versions),
+                'update_version': random.choice(versions),
+                'source_version': None,
+                'edited_on': random.choice(dates),
+                'edited_by': random.choice(editors),
+            },
+        )
+        return block_key
+
+    per_vertical = max(1, block_count / (FAN_OUT[0] * FAN_OUT[1] * FAN_OUT[2]))
+    chapters = []
+    for __ in range(FAN_OUT[0]):
+        sequentials = []
+        for __ in range(FAN_OUT[1]):
+            verticals = [
+                add_block('vertical', [
+                    add_block(random.choice(LEAF_TYPES), None, weight=1.0, max_attempts=3)
+                    for __ in range(per_vertical)
+                ])
+                for __ in range(FAN_OUT[2])
+            ]
+            sequentials.append(add_block('sequential', verticals, graded=True, format=u'Homework'))
+        chapters.append(add_block('chapter', sequentials))
+    root = add_block('course', chapters, start=dates[0], tabs=[{'type': 'courseware'}])
+
+    return {
+        '_id': versions[0],
+        'root': root,
+        'previous_version': versions[1],
+        'original_version': versions[2],
+        'edited_by': editors[0],
+        'edited_on': dates[-1],
+        'schema_version': 1,
+        'blocks': blocks,
+    }
+
+
+def main():
+    """
+    Time every codec and compressor pair and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--blocks', type=int, default=10000, help='approximate number of blocks in the course')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+
+    structure = generate_structure(args.blocks)
+    print "Course structure with {} blocks".format(len(structure['blocks']))
+    print "{:>16} {:>6} {:>12} {:>12} {:>12}".format('codec', 'compr.', 'size (KB)', 'dumps (ms)', 'loads (ms)')
+
+    for codec_name, compressor_name in itertools.product(sorted(CODECS), sorted(COMPRESSORS)):
+        codec, compressor = CODECS[codec_name], COMPRESSORS[compressor_name]
+        data = compressor.compress(codec.dumps(structure))
+        assert codec.loads(compressor.decompress(data)) == structure
+        dumps_time = min(timeit.repeat(
+            lambda: compressor.compress(codec.dumps(structure)),  # pylint: disable=cell-var-from-loop
+            setup='gc.enable()',
+            repeat=args.repeat,
+            number=1,
+        ))
+        loads_time = min(timeit.repeat(
+            lambda: codec.loads(compressor.decompress(data)),  # pylint: disable=cell-var-from-loop
+            setup='gc.enable()',
+            repeat=args.repeat,
+            number=1,
+        ))
+        print "{:>16} {:>6} {:>12.1f} {:>12.1f} {:>12.1f}".format(
+            codec_name, compressor_name, len(data) / 1024.0, dumps_time * 1000, loads_time * 1000
+        )
+
+
+if __name__ == '__main__':
+    main()
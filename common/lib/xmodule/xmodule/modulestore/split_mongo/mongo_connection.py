@@ -2,12 +2,12 @@
 Segregation of pymongo functions from the data modeling mechanisms for split modulestore.
 """
 import datetime
-import cPickle as pickle
 import math
-import zlib
 import pymongo
 import pytz
 import re
+import threading
+from collections import OrderedDict
 from contextlib import contextmanager
 from time import time
 
@@ -15,6 +15,7 @@ from time import time
 from pymongo.errors import DuplicateKeyError  # pylint: disable=unused-import
 
 try:
+    from django.conf import settings
     from django.core.cache import caches, InvalidCacheBackendError
     DJANGO_AVAILABLE = True
 except ImportError:
@@ -24,9 +25,11 @@ import dogstats_wrapper as dog_stats_api
 
 from contracts import check, new_contract
 from mongodb_proxy import autoretry_read
+from openedx.core.lib.cache_utils import CODECS, COMPRESSORS
 from xmodule.exceptions import HeartbeatFailure
 from xmodule.modulestore import BlockData
 from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_codec import StructureCodec
 from xmodule.mongo_utils import connect_to_mongodb, create_collection_index
 
 
@@ -223,58 +226,203 @@ def structure_to_mongo(structure, course_context=None):
         return new_structure
 
 
+class StructureLRU(object):
+    """
+    A process-local LRU of serialized course structures, bounded by memory.
+
+    Structures are immutable once written, so entries never need invalidating.
+    Entries are kept serialized, rather than as the structure dicts themselves,
+    because split modulestore mutates the structures it loads (lazily loaded
+    definition fields, edit info), and each caller must get its own copy.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self.resident_size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    @property
+    def hit_ratio(self):
+        """
+        Return the fraction of lookups answered by this cache.
+        """
+        lookups = self.hits + self.misses
+        return float(self.hits) / lookups if lookups else 0.0
+
+    def get(self, key):
+        """
+        Return the serialized structure for `key`, or None if it isn't cached.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                self.misses += 1
+                return None
+            # Re-insert to mark it as the most recently used.
+            self._entries[key] = entry
+            self.hits += 1
+            return entry
+
+    def set(self, key, serialized_data):
+        """
+        Cache `serialized_data`, evicting the least recently used entries to stay within `max_size`.
+        """
+        size = len(serialized_data)
+        if size > self.max_size:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.resident_size -= len(previous)
+            self._entries[key] = serialized_data
+            self.resident_size += size
+            while self.resident_size > self.max_size:
+                __, evicted = self._entries.popitem(last=False)
+                self.resident_size -= len(evicted)
+
+    def clear(self):
+        """
+        Remove all entries and reset the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self.resident_size = 0
+            self.hits = 0
+            self.misses = 0
+
+
+_LOCAL_STRUCTURE_CACHE = None
+
+
+def get_local_structure_cache():
+    """
+    Return the process-wide StructureLRU, or None if it is disabled.
+
+    Its size in bytes is set by settings.COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE;
+    it is disabled when the setting is 0 or missing.
+    """
+    global _LOCAL_STRUCTURE_CACHE  # pylint: disable=global-statement
+    if not DJANGO_AVAILABLE:
+        return None
+    max_size = getattr(settings, 'COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE', 0)
+    if not max_size:
+        return None
+    if _LOCAL_STRUCTURE_CACHE is None or _LOCAL_STRUCTURE_CACHE.max_size != max_size:
+        _LOCAL_STRUCTURE_CACHE = StructureLRU(max_size)
+    return _LOCAL_STRUCTURE_CACHE
+
+
+def get_structure_cache_codec():
+    """
+    Return the names of the codec and compressor used to cache course structures.
+
+    They are set by settings.COURSE_STRUCTURE_CACHE_CODEC, a dict with a 'CODEC'
+    and a 'COMPRESSOR' registered in openedx.core.lib.cache_utils.
+    """
+    config = {'CODEC': StructureCodec.name, 'COMPRESSOR': 'zlib'}
+    if DJANGO_AVAILABLE:
+        config.update(getattr(settings, 'COURSE_STRUCTURE_CACHE_CODEC', None) or {})
+    return config['CODEC'], config['COMPRESSOR']
+
+
 class CourseStructureCache(object):
     """
     Wrapper around django cache object to cache course structure objects.
-    The course structures are pickled and compressed when cached.
+    The course structures are serialized and compressed when cached, with the
+    codec and compressor from :func:`get_structure_cache_codec`.
+
+    Structures are also kept serialized, but uncompressed, in a process-local
+    LRU in front of the django cache (see :func:`get_local_structure_cache`),
+    which saves the round trip and decompression for structures used
+    repeatedly. They are deserialized on every get, so that callers never
+    share, and mutate, the same structure.
 
     If the 'course_structure_cache' doesn't exist, then don't do anything for
     for set and get.
     """
     def __init__(self):
         self.cache = None
+        self.local_cache = get_local_structure_cache()
+        codec_name, compressor_name = get_structure_cache_codec()
+        self.codec = CODECS[codec_name]
+        self.compressor = COMPRESSORS[compressor_name]
         if DJANGO_AVAILABLE:
             try:
                 self.cache = get_cache('course_structure_cache')
             except InvalidCacheBackendError:
                 pass
 
+    def _cache_key(self, key):
+        """
+        Return the key of the structure `key` in the django cache.
+
+        Each format is stored under its own key, so that processes configured
+        with different codecs never read each other's data.
+        """
+        if (self.codec.name, self.compressor.name) == ('pickle', 'zlib'):
+            return key
+        return '{}.{}.{}'.format(key, self.codec.name, self.compressor.name)
+
+    def _measure_local_cache(self, tagger):
+        """Record the hit ratio and resident size of the local cache."""
+        tagger.measure('local_hit_percent', int(self.local_cache.hit_ratio * 100))
+        tagger.measure('local_resident_size', self.local_cache.resident_size)
+
     def get(self, key, course_context=None):
-        """Pull the compressed, pickled struct data from cache and deserialize."""
+        """Pull the compressed, serialized struct data from cache and deserialize."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.get", course_context) as tagger:
-            compressed_pickled_data = self.cache.get(key)
-            tagger.tag(from_cache=str(compressed_pickled_data is not None).lower())
+            if self.local_cache is not None:
+                serialized_data = self.local_cache.get(key)
+                tagger.tag(from_local_cache=str(serialized_data is not None).lower())
+                self._measure_local_cache(tagger)
+                if serialized_data is not None:
+                    return self.codec.loads(serialized_data)
 
-            if compressed_pickled_data is None:
+            compressed_data = self.cache.get(self._cache_key(key))
+            tagger.tag(from_cache=str(compressed_data is not None).lower())
+
+            if compressed_data is None:
                 # Always log cache misses, because they are unexpected
                 tagger.sample_rate = 1
                 return None
 
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            tagger.tag(codec=self.codec.name, compressor=self.compressor.name)
+            tagger.measure('compressed_size', len(compressed_data))
 
-            pickled_data = zlib.decompress(compressed_pickled_data)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            serialized_data = self.compressor.decompress(compressed_data)
+            tagger.measure('uncompressed_size', len(serialized_data))
 
-            return pickle.loads(pickled_data)
+            if self.local_cache is not None:
+                self.local_cache.set(key, serialized_data)
+            return self.codec.loads(serialized_data)
 
     def set(self, key, structure, course_context=None):
-        """Given a structure, will pickle, compress, and write to cache."""
+        """Given a structure, will serialize, compress, and write to cache."""
         if self.cache is None:
             return None
 
         with TIMER.timer("CourseStructureCache.set", course_context) as tagger:
-            pickled_data = pickle.dumps(structure, pickle.HIGHEST_PROTOCOL)
-            tagger.measure('uncompressed_size', len(pickled_data))
+            tagger.tag(codec=self.codec.name, compressor=self.compressor.name)
+            serialized_data = self.codec.dumps(structure)
+            tagger.measure('uncompressed_size', len(serialized_data))
 
-            # 1 = Fastest (slightly larger results)
-            compressed_pickled_data = zlib.compress(pickled_data, 1)
-            tagger.measure('compressed_size', len(compressed_pickled_data))
+            compressed_data = self.compressor.compress(serialized_data)
+            tagger.measure('compressed_size', len(compressed_data))
 
             # Stuctures are immutable, so we set a timeout of "never"
-            self.cache.set(key, compressed_pickled_data, None)
+            self.cache.set(self._cache_key(key), compressed_data, None)
+
+            if self.local_cache is not None:
+                self.local_cache.set(key, serialized_data)
+                self._measure_local_cache(tagger)
 
 
 class MongoConnection(object):
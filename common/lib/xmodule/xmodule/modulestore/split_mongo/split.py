@@ -1386,6 +1386,80 @@ class SplitMongoModuleStore(SplitBulkWriteMixin, ModuleStoreWriteBase):
             'edited_on': course['edited_on']
         }
 
+    def get_course_version(self, course_key):
+        """
+        Returns the version guid of the current structure of the given course.
+        """
+        return self._lookup_course(course_key).structure['_id']
+
+    def get_changed_blocks(self, course_key, from_version, to_version):
+        """
+        Returns the usage keys of the blocks of the given course which were added or
+        changed in its structure of version to_version, compared to its structure of
+        version from_version. Blocks which were removed are not returned, but their
+        parents are, since their children changed.
+
+        Returns None if either structure can't be found.
+        """
+        changes = self.get_structure_changes(course_key, from_version, to_version)
+        if changes is None:
+            return None
+        return changes['changed'] | changes['children_changed']
+
+    def get_structure_changes(self, course_key, from_version, to_version):
+        """
+        Returns the changes to the blocks of the given course in its structure of
+        version to_version, compared to its structure of version from_version, as a
+        dict of sets of usage keys:
+            'changed': the blocks added, or whose definition or fields other than
+                their children changed
+            'children_changed': the other blocks changed, such as the parents of
+                blocks added or removed
+            'ancestors': the other blocks with any changed block as descendant in
+                the structure of version to_version
+            'removed': the blocks removed
+
+        Returns None if either structure can't be found.
+        """
+        from_structure = self.get_structure(course_key, from_version)
+        to_structure = self.get_structure(course_key, to_version)
+        if from_structure is None or to_structure is None:
+            return None
+
+        def own_data(block_data):
+            """
+            Returns the data of the block, other than its children and edit info.
+            """
+            fields = {name: value for name, value in block_data.fields.iteritems() if name != 'children'}
+            return fields, block_data.block_type, block_data.definition, block_data.defaults
+
+        from_blocks = from_structure['blocks']
+        to_blocks = to_structure['blocks']
+        changes = {'changed': set(), 'children_changed': set(), 'ancestors': set()}
+        for block_key, block_data in to_blocks.iteritems():
+            from_block_data = from_blocks.get(block_key)
+            if from_block_data is None or not own_data(from_block_data) == own_data(block_data):
+                changes['changed'].add(block_key)
+            elif not from_block_data == block_data:
+                changes['children_changed'].add(block_key)
+
+        parents = defaultdict(list)
+        for block_key, block_data in to_blocks.iteritems():
+            for child_key in block_data.fields.get('children', []):
+                parents[child_key].append(block_key)
+        stack = list(changes['changed'] | changes['children_changed'])
+        while stack:
+            for parent_key in parents[stack.pop()]:
+                if not any(parent_key in block_keys for block_keys in changes.itervalues()):
+                    changes['ancestors'].add(parent_key)
+                    stack.append(parent_key)
+
+        changes['removed'] = set(block_key for block_key in from_blocks if block_key not in to_blocks)
+        return {
+            change: {course_key.make_usage_key(block_key.type, block_key.id) for block_key in block_keys}
+            for change, block_keys in changes.iteritems()
+        }
+
     def get_definition_history_info(self, definition_locator, course_context=None):
         """
         Because xblocks doesn't give a means to separate the definition's meta information from
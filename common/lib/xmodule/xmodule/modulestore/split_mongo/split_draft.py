@@ -315,6 +315,14 @@ class DraftVersioningModuleStore(SplitMongoModuleStore, ModuleStoreDraftAndPubli
         usage_key = self._map_revision_to_branch(usage_key)
         return super(DraftVersioningModuleStore, self).get_block_original_usage(usage_key)
 
+    def get_course_version(self, course_key):
+        """
+        Returns the version guid of the current structure of the given course,
+        in the branch of the current branch setting.
+        """
+        course_key = self._map_revision_to_branch(course_key)
+        return super(DraftVersioningModuleStore, self).get_course_version(course_key)
+
     def get_orphans(self, course_key, **kwargs):
         course_key = self._map_revision_to_branch(course_key)
         return super(DraftVersioningModuleStore, self).get_orphans(course_key, **kwargs)
@@ -0,0 +1,198 @@
+"""
+A compact serialization of split modulestore course structures for caching.
+
+Pickling a structure as-is writes one object graph per block: a BlockKey, a
+BlockData and an EditInfo, each with its own copies of version guids and dates
+that are shared by many blocks. Unpickling it again calls the BlockKey
+constructor (and its contract) for every block and child reference.
+
+This codec stores the blocks as columns instead. Values repeated across blocks
+(block types, definitions, versions, editors and dates) are interned into a table
+per column, with an array of indexes into it, and children are stored as indexes
+of the blocks they refer to. The columns are then pickled as a handful of flat
+lists and strings, which is both smaller and much faster to load.
+"""
+import cPickle as pickle
+import gc
+from array import array
+from itertools import izip
+
+from openedx.core.lib.cache_utils import register_codec
+from xmodule.modulestore import BlockData, EditInfo
+from xmodule.modulestore.split_mongo import BlockKey
+
+# Version of the column layout, bumped whenever it changes.
+FORMAT_VERSION = 1
+
+# Attributes of EditInfo, each stored as a column.
+EDIT_INFO_ATTRS = (
+    'previous_version',
+    'update_version',
+    'source_version',
+    'edited_on',
+    'edited_by',
+    'original_usage',
+    'original_usage_version',
+    '_subtree_edited_on',
+    '_subtree_edited_by',
+)
+
+
+def _make_block_key(block_type, block_id):
+    """
+    Returns a BlockKey without going through its contract-checked constructor.
+    """
+    return tuple.__new__(BlockKey, (block_type, block_id))
+
+
+def _encode_column(values):
+    """
+    Returns values as a (table, indexes) pair of its distinct values and the
+    packed index of each value in that table. Unhashable values are kept as a
+    plain list, with None in place of the indexes.
+    """
+    values = list(values)
+    table = []
+    positions = {}
+    indexes = array('I')
+    try:
+        for value in values:
+            position = positions.get(value)
+            if position is None:
+                position = positions[value] = len(table)
+                table.append(value)
+            indexes.append(position)
+    except TypeError:
+        return values, None
+    return table, indexes.tostring()
+
+
+def _decode_column(column):
+    """
+    Returns the list of values encoded by _encode_column.
+    """
+    table, packed_indexes = column
+    if packed_indexes is None:
+        return table
+    indexes = array('I')
+    indexes.fromstring(packed_indexes)
+    return [table[index] for index in indexes]
+
+
+class StructureCodec(object):
+    """
+    Serializes split modulestore structures, as returned by structure_from_mongo.
+    """
+    name = 'split_structure'
+
+    def dumps(self, structure):
+        """
+        Returns the serialization of structure as a string.
+        """
+        block_keys = list(structure['blocks'])
+        key_indexes = {block_key: index for index, block_key in enumerate(block_keys)}
+        blocks = [structure['blocks'][block_key] for block_key in block_keys]
+
+        fields = []
+        for block in blocks:
+            block_fields = block.fields
+            if 'children' in block_fields:
+                block_fields = dict(block_fields)
+                # Children missing from the structure are kept as (type, id) pairs.
+                block_fields['children'] = [
+                    key_indexes.get(child, tuple(child)) for child in block_fields['children']
+                ]
+            fields.append(block_fields)
+
+        edit_infos = [block.edit_info.__dict__ for block in blocks]
+        header = {key: value for key, value in structure.iteritems() if key not in ('blocks', 'root')}
+        columns = (
+            FORMAT_VERSION,
+            header,
+            tuple(structure['root']),
+            _encode_column(block_key.type for block_key in block_keys),
+            [block_key.id for block_key in block_keys],
+            # The block type almost always matches the key's type, so store only the exceptions.
+            {
+                index: block.block_type
+                for index, (block_key, block) in enumerate(izip(block_keys, blocks))
+                if block.block_type != block_key.type
+            },
+            _encode_column(block.definition for block in blocks),
+            [index for index, block in enumerate(blocks) if block.definition_loaded],
+            fields,
+            [block.defaults for block in blocks],
+            [
+                _encode_column(edit_info.get(attr) for edit_info in edit_infos)
+                for attr in EDIT_INFO_ATTRS
+            ],
+        )
+        return pickle.dumps(columns, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, serialized):
+        """
+        Returns the structure serialized by dumps.
+        """
+        # Creating this many objects would otherwise trigger several full garbage
+        # collections, while none of them can be garbage yet.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return self._loads(serialized)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _loads(self, serialized):
+        """
+        Returns the structure serialized by dumps, with garbage collection disabled.
+        """
+        (
+            version, header, root, block_types, block_ids, other_block_types, definitions,
+            loaded_definitions, fields, defaults, edit_info_columns,
+        ) = pickle.loads(serialized)
+        if version != FORMAT_VERSION:
+            raise ValueError("Unsupported structure format version {}".format(version))
+
+        block_keys = [
+            _make_block_key(block_type, block_id)
+            for block_type, block_id in izip(_decode_column(block_types), block_ids)
+        ]
+
+        blocks = {}
+        new_object = object.__new__
+        for block_key, definition, block_fields, block_defaults, edit_info_values in izip(
+                block_keys, _decode_column(definitions), fields, defaults,
+                izip(*[_decode_column(column) for column in edit_info_columns]),
+        ):
+            if 'children' in block_fields:
+                block_fields['children'] = [
+                    block_keys[child] if isinstance(child, int) else _make_block_key(*child)
+                    for child in block_fields['children']
+                ]
+            # Set the attributes directly, as the constructors would only copy them.
+            edit_info = new_object(EditInfo)
+            edit_info.__dict__ = dict(izip(EDIT_INFO_ATTRS, edit_info_values))
+            block = new_object(BlockData)
+            block.__dict__ = {
+                'definition_loaded': False,
+                'fields': block_fields,
+                'block_type': block_key.type,
+                'definition': definition,
+                'defaults': block_defaults,
+                'edit_info': edit_info,
+            }
+            blocks[block_key] = block
+
+        for index, block_type in other_block_types.iteritems():
+            blocks[block_keys[index]].block_type = block_type
+        for index in loaded_definitions:
+            blocks[block_keys[index]].definition_loaded = True
+
+        structure = dict(header)
+        structure['root'] = _make_block_key(*root)
+        structure['blocks'] = blocks
+        return structure
+
+
+register_codec(StructureCodec())
@@ -1348,6 +1348,52 @@ class TestItemCrud(SplitModuleTest):
         self.assertIn(new_module.location.version_agnostic(), version_agnostic(parent.children))
         self.assertEqual(new_module.definition_locator.definition_id, original.definition_locator.definition_id)
 
+    def test_get_changed_blocks(self):
+        """
+        Test get_changed_blocks returns the blocks added or changed between two versions
+        """
+        chapter_locator = BlockUsageLocator(
+            CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT),
+            'chapter', block_id='chapter2'
+        )
+        course_key = chapter_locator.course_key
+        premod_version = modulestore().get_course_version(course_key)
+        new_module = modulestore().create_child(
+            'user123', chapter_locator, 'sequential', fields={'display_name': 'new sequential'}
+        )
+        current_version = modulestore().get_course_version(course_key)
+        self.assertEqual(current_version, new_module.location.version_guid)
+
+        self.assertEqual(
+            modulestore().get_changed_blocks(course_key, premod_version, current_version),
+            {chapter_locator, new_module.location.version_agnostic()}
+        )
+        self.assertEqual(modulestore().get_changed_blocks(course_key, current_version, current_version), set())
+
+    def test_get_structure_changes(self):
+        """
+        Test get_structure_changes details the blocks changed or removed between two versions
+        """
+        course_locator = CourseLocator(org='testx', course='GreekHero', run="run", branch=BRANCH_NAME_DRAFT)
+        chapter_locator = BlockUsageLocator(course_locator, 'chapter', block_id='chapter3')
+        problem_locator = BlockUsageLocator(course_locator, 'problem', block_id='problem1')
+        premod_version = modulestore().get_course_version(course_locator)
+        new_module = modulestore().create_child(
+            'user123', chapter_locator, 'sequential', fields={'display_name': 'new sequential'}
+        )
+        modulestore().delete_item(problem_locator, 'user123')
+        current_version = modulestore().get_course_version(course_locator)
+
+        self.assertEqual(
+            modulestore().get_structure_changes(course_locator, premod_version, current_version),
+            {
+                'changed': {new_module.location.version_agnostic()},
+                'children_changed': {chapter_locator},
+                'ancestors': {BlockUsageLocator(course_locator, 'course', 'head12345')},
+                'removed': {problem_locator},
+            }
+        )
+
     def test_unique_naming(self):
         """
         Check that 2 modules of same type get unique block_ids. Also check that if creation provides
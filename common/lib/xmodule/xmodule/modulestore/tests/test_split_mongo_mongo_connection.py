@@ -1,7 +1,15 @@
 """ Test the behavior of split_mongo/MongoConnection """
+import cPickle as pickle
 import unittest
+import zlib
+
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase
+from django.test.utils import override_settings
 from mock import patch
-from xmodule.modulestore.split_mongo.mongo_connection import MongoConnection
+
+from xmodule.modulestore.split_mongo import BlockKey, mongo_connection
+from xmodule.modulestore.split_mongo.mongo_connection import CourseStructureCache, MongoConnection, StructureLRU
 from xmodule.exceptions import HeartbeatFailure
 
 
@@ -17,3 +25,98 @@ class TestHeartbeatFailureException(unittest.TestCase):
 
             with self.assertRaises(HeartbeatFailure):
                 useless_conn.heartbeat()
+
+
+class TestStructureLRU(unittest.TestCase):
+    """ Test the process-local LRU of course structures """
+    def test_hit_and_miss(self):
+        cache = StructureLRU(max_size=100)
+        self.assertIsNone(cache.get('a'))
+        cache.set('a', 'x' * 10)
+        self.assertEqual(cache.get('a'), 'x' * 10)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_ratio, 0.5)
+        self.assertEqual(cache.resident_size, 10)
+
+    def test_least_recently_used_evicted(self):
+        cache = StructureLRU(max_size=100)
+        cache.set('a', 'a' * 40)
+        cache.set('b', 'b' * 40)
+        cache.get('a')
+        cache.set('c', 'c' * 40)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 'a' * 40)
+        self.assertEqual(cache.get('c'), 'c' * 40)
+        self.assertEqual(cache.resident_size, 80)
+
+    def test_too_large_not_cached(self):
+        cache = StructureLRU(max_size=100)
+        cache.set('a', 'a' * 101)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.resident_size, 0)
+
+    def test_replace_entry(self):
+        cache = StructureLRU(max_size=100)
+        cache.set('a', 'a' * 30)
+        cache.set('a', 'b' * 50)
+        self.assertEqual(cache.get('a'), 'b' * 50)
+        self.assertEqual(cache.resident_size, 50)
+
+
+@override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE=1024 ** 2)
+class TestCourseStructureCacheLocalTier(SimpleTestCase):
+    """ Test the local tier of CourseStructureCache """
+    def setUp(self):
+        super(TestCourseStructureCacheLocalTier, self).setUp()
+        self.remote_cache = LocMemCache('test_course_structure_cache', {})
+        patcher = patch(
+            'xmodule.modulestore.split_mongo.mongo_connection.get_cache', return_value=self.remote_cache
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(setattr, mongo_connection, '_LOCAL_STRUCTURE_CACHE', None)
+
+    def make_structure(self):
+        """ Return an empty structure """
+        return {'_id': 'abc', 'root': BlockKey('course', 'course'), 'blocks': {}}
+
+    def test_set_populates_local_cache(self):
+        structure = self.make_structure()
+        CourseStructureCache().set('abc', structure)
+        self.remote_cache.clear()
+        self.assertEqual(CourseStructureCache().get('abc'), structure)
+
+    def test_remote_hit_populates_local_cache(self):
+        CourseStructureCache().set('abc', self.make_structure())
+        mongo_connection._LOCAL_STRUCTURE_CACHE.clear()  # pylint: disable=protected-access
+
+        with patch.object(self.remote_cache, 'get', wraps=self.remote_cache.get) as remote_get:
+            first = CourseStructureCache().get('abc')
+            second = CourseStructureCache().get('abc')
+        self.assertEqual(first, self.make_structure())
+        self.assertEqual(first, second)
+        self.assertEqual(remote_get.call_count, 1)
+
+    def test_callers_get_own_copy(self):
+        CourseStructureCache().set('abc', self.make_structure())
+        first = CourseStructureCache().get('abc')
+        first['blocks']['mutated'] = True
+        second = CourseStructureCache().get('abc')
+        self.assertIsNot(first, second)
+        self.assertEqual(second, self.make_structure())
+
+    @override_settings(COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE=0)
+    def test_disabled(self):
+        CourseStructureCache().set('abc', self.make_structure())
+        self.remote_cache.clear()
+        self.assertIsNone(CourseStructureCache().get('abc'))
+
+    @override_settings(COURSE_STRUCTURE_CACHE_CODEC={'CODEC': 'pickle', 'COMPRESSOR': 'zlib'})
+    def test_pickle_codec_uses_original_format(self):
+        CourseStructureCache().set('abc', self.make_structure())
+        self.assertEqual(pickle.loads(zlib.decompress(self.remote_cache.get('abc'))), self.make_structure())
+
+    def test_codec_in_cache_key(self):
+        CourseStructureCache().set('abc', self.make_structure())
+        self.assertIsNone(self.remote_cache.get('abc'))
+        self.assertIsNotNone(self.remote_cache.get('abc.split_structure.zlib'))
@@ -0,0 +1,95 @@
+""" Test the serialization of split modulestore structures for caching """
+import datetime
+import unittest
+
+from bson.objectid import ObjectId
+from pytz import UTC
+
+from openedx.core.lib.cache_utils import zpickle, zunpickle
+from xmodule.modulestore import BlockData
+from xmodule.modulestore.split_mongo import BlockKey
+from xmodule.modulestore.split_mongo.structure_codec import StructureCodec
+
+
+class TestStructureCodec(unittest.TestCase):
+    """ Test that StructureCodec round-trips structures """
+    def setUp(self):
+        super(TestStructureCodec, self).setUp()
+        self.codec = StructureCodec()
+        version = ObjectId()
+        edited_on = datetime.datetime(2016, 3, 1, tzinfo=UTC)
+
+        def edit_info(**kwargs):
+            """ Return edit info shared by most blocks, updated with kwargs """
+            info = {'update_version': version, 'edited_on': edited_on, 'edited_by': 42}
+            info.update(kwargs)
+            return info
+
+        self.course = BlockKey('course', 'course')
+        self.chapter = BlockKey('chapter', 'week1')
+        self.problem = BlockKey('problem', 'quiz')
+        self.structure = {
+            '_id': version,
+            'root': self.course,
+            'previous_version': None,
+            'original_version': version,
+            'edited_by': 42,
+            'edited_on': edited_on,
+            'schema_version': 1,
+            'blocks': {
+                self.course: BlockData(
+                    block_type='course', definition=ObjectId(), edit_info=edit_info(),
+                    fields={'children': [self.chapter], 'display_name': u'Course'},
+                ),
+                self.chapter: BlockData(
+                    block_type='chapter', definition=ObjectId(), edit_info=edit_info(previous_version=ObjectId()),
+                    fields={'children': [self.problem, BlockKey('html', 'missing')]},
+                ),
+                self.problem: BlockData(
+                    block_type='problem', definition='not an ObjectId',
+                    edit_info=edit_info(original_usage=u'block-v1:a+b+c+type@problem+block@orig'),
+                    fields={'weight': 2.0, 'grading': {'unhashable': ['list']}}, defaults={'max_attempts': 3},
+                ),
+            },
+        }
+
+    def round_trip(self, structure):
+        """ Return the structure after serializing and deserializing it """
+        return self.codec.loads(self.codec.dumps(structure))
+
+    def test_round_trip(self):
+        decoded = self.round_trip(self.structure)
+        self.assertEqual(decoded, self.structure)
+        self.assertIsInstance(decoded['root'], BlockKey)
+        for block_key, block in decoded['blocks'].iteritems():
+            self.assertIsInstance(block_key, BlockKey)
+            self.assertIsInstance(block, BlockData)
+            self.assertFalse(block.definition_loaded)
+
+    def test_children_are_block_keys(self):
+        children = self.round_trip(self.structure)['blocks'][self.chapter].fields['children']
+        self.assertEqual(children, [self.problem, BlockKey('html', 'missing')])
+        self.assertTrue(all(isinstance(child, BlockKey) for child in children))
+
+    def test_original_not_modified(self):
+        self.codec.dumps(self.structure)
+        self.assertEqual(self.structure['blocks'][self.course].fields['children'], [self.chapter])
+
+    def test_block_type_differs_from_key(self):
+        self.structure['blocks'][self.problem].block_type = 'other'
+        self.structure['blocks'][self.problem].definition_loaded = True
+        decoded = self.round_trip(self.structure)['blocks'][self.problem]
+        self.assertEqual(decoded.block_type, 'other')
+        self.assertTrue(decoded.definition_loaded)
+
+    def test_subtree_edit_info(self):
+        self.structure['blocks'][self.course].edit_info._subtree_edited_by = 7  # pylint: disable=protected-access
+        decoded = self.round_trip(self.structure)['blocks'][self.course]
+        self.assertEqual(decoded.edit_info._subtree_edited_by, 7)  # pylint: disable=protected-access
+
+    def test_empty_structure(self):
+        self.structure['blocks'] = {}
+        self.assertEqual(self.round_trip(self.structure), self.structure)
+
+    def test_zpickle(self):
+        self.assertEqual(zunpickle(zpickle(self.structure, StructureCodec.name, 'zlib')), self.structure)
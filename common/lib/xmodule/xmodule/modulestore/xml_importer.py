@@ -22,6 +22,8 @@ Modulestore virtual   |          XML physical (draft, published)
 """
 import logging
 from abc import abstractmethod
+from contextlib import contextmanager
+from multiprocessing.pool import ThreadPool
 from opaque_keys.edx.locator import LibraryLocator
 import os
 import mimetypes
@@ -53,11 +55,21 @@ from xmodule.util.misc import escape_invalid_characters
 
 log = logging.getLogger(__name__)
 
+# Number of static files uploaded at the same time by import_static_content.
+# Each upload reads its file only once it starts, so no more than this many
+# files are held in memory at once.
+STATIC_CONTENT_UPLOAD_CONCURRENCY = 8
+
 
 def import_static_content(
         course_data_path, static_content_store,
-        target_id, subpath='static', verbose=False):
-
+        target_id, subpath='static', verbose=False,
+        concurrency=STATIC_CONTENT_UPLOAD_CONCURRENCY):
+    """
+    Uploads the files in the subpath of course_data_path to the
+    static_content_store, `concurrency` files at a time, and returns the
+    map of their paths to their asset keys.
+    """
     remap_dict = {}
 
     # now import all static assets
@@ -76,70 +88,98 @@ def import_static_content(
     mimetypes.add_type('application/octet-stream', '.srt')
     mimetypes_list = mimetypes.types_map.values()
 
-    for dirname, _, filenames in os.walk(static_dir):
-        for filename in filenames:
+    def static_files():
+        """
+        Yields the path of each static file to upload.
+        """
+        for dirname, _, filenames in os.walk(static_dir):
+            for filename in filenames:
 
-            content_path = os.path.join(dirname, filename)
+                content_path = os.path.join(dirname, filename)
 
-            if re.match(ASSET_IGNORE_REGEX, filename):
-                if verbose:
-                    log.debug('skipping static content %s...', content_path)
-                continue
+                if re.match(ASSET_IGNORE_REGEX, filename):
+                    if verbose:
+                        log.debug('skipping static content %s...', content_path)
+                    continue
 
-            if verbose:
-                log.debug('importing static content %s...', content_path)
+                yield content_path
 
-            try:
-                with open(content_path, 'rb') as f:
-                    data = f.read()
-            except IOError:
-                if filename.startswith('._'):
-                    # OS X "companion files". See
-                    # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
-                    continue
-                # Not a 'hidden file', then re-raise exception
-                raise
+    def import_static_file(content_path):
+        """
+        Uploads the static file at content_path, and returns its path
+        relative to the static directory and its asset key; returns None if
+        the file is skipped.
+        """
+        filename = os.path.basename(content_path)
+
+        if verbose:
+            log.debug('importing static content %s...', content_path)
 
-            # strip away leading path from the name
-            fullname_with_subpath = content_path.replace(static_dir, '')
-            if fullname_with_subpath.startswith('/'):
-                fullname_with_subpath = fullname_with_subpath[1:]
-            asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+        try:
+            with open(content_path, 'rb') as f:
+                data = f.read()
+        except IOError:
+            if filename.startswith('._'):
+                # OS X "companion files". See
+                # http://www.diigo.com/annotated/0c936fda5da4aa1159c189cea227e174
+                return None
+            # Not a 'hidden file', then re-raise exception
+            raise
+
+        # strip away leading path from the name
+        fullname_with_subpath = content_path.replace(static_dir, '')
+        if fullname_with_subpath.startswith('/'):
+            fullname_with_subpath = fullname_with_subpath[1:]
+        asset_key = StaticContent.compute_location(target_id, fullname_with_subpath)
+
+        policy_ele = policy.get(asset_key.path, {})
+
+        # During export display name is used to create files, strip away slashes from name
+        displayname = escape_invalid_characters(
+            name=policy_ele.get('displayname', filename),
+            invalid_char_list=['/', '\\']
+        )
+        locked = policy_ele.get('locked', False)
+        mime_type = policy_ele.get('contentType')
+
+        # Check extracted contentType in list of all valid mimetypes
+        if not mime_type or mime_type not in mimetypes_list:
+            mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
+        content = StaticContent(
+            asset_key, displayname, mime_type, data,
+            import_path=fullname_with_subpath, locked=locked
+        )
 
-            policy_ele = policy.get(asset_key.path, {})
+        # first let's save a thumbnail so we can get back a thumbnail location
+        thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
 
-            # During export display name is used to create files, strip away slashes from name
-            displayname = escape_invalid_characters(
-                name=policy_ele.get('displayname', filename),
-                invalid_char_list=['/', '\\']
-            )
-            locked = policy_ele.get('locked', False)
-            mime_type = policy_ele.get('contentType')
-
-            # Check extracted contentType in list of all valid mimetypes
-            if not mime_type or mime_type not in mimetypes_list:
-                mime_type = mimetypes.guess_type(filename)[0]   # Assign guessed mimetype
-            content = StaticContent(
-                asset_key, displayname, mime_type, data,
-                import_path=fullname_with_subpath, locked=locked
-            )
+        if thumbnail_content is not None:
+            content.thumbnail_location = thumbnail_location
 
-            # first let's save a thumbnail so we can get back a thumbnail location
-            thumbnail_content, thumbnail_location = static_content_store.generate_thumbnail(content)
+        # then commit the content
+        try:
+            static_content_store.save(content)
+        except Exception as err:
+            log.exception(u'Error importing {0}, error={1}'.format(
+                fullname_with_subpath, err
+            ))
 
-            if thumbnail_content is not None:
-                content.thumbnail_location = thumbnail_location
+        return fullname_with_subpath, asset_key
 
-            # then commit the content
-            try:
-                static_content_store.save(content)
-            except Exception as err:
-                log.exception(u'Error importing {0}, error={1}'.format(
-                    fullname_with_subpath, err
-                ))
+    if concurrency > 1:
+        pool = ThreadPool(concurrency)
+        try:
+            imported_files = list(pool.imap_unordered(import_static_file, static_files()))
+        finally:
+            pool.terminate()
+    else:
+        imported_files = [import_static_file(content_path) for content_path in static_files()]
 
+    for imported_file in imported_files:
+        if imported_file is not None:
             # store the remapping information which will be needed
             # to subsitute in the module data
+            fullname_with_subpath, asset_key = imported_file
             remap_dict[fullname_with_subpath] = asset_key
 
     return remap_dict
@@ -176,6 +216,9 @@ class ImportManager(object):
         create_if_not_present: If True, then a new courselike is created if it doesn't already exist.
             Otherwise, it throws an InvalidLocationError if the courselike does not exist.
 
+        static_content_concurrency: the number of static files uploaded at the same time. The
+            static files are uploaded while the blocks are imported, unless this is 1.
+
         default_class, load_error_modules: are arguments for constructing the XMLModuleStore (see its doc)
     """
     store_class = XMLModuleStore
@@ -186,7 +229,8 @@ class ImportManager(object):
             load_error_modules=True, static_content_store=None,
             target_id=None, verbose=False,
             do_import_static=True, create_if_not_present=False,
-            raise_on_failure=False
+            raise_on_failure=False,
+            static_content_concurrency=STATIC_CONTENT_UPLOAD_CONCURRENCY
     ):
         self.store = store
         self.user_id = user_id
@@ -199,6 +243,7 @@ class ImportManager(object):
         self.do_import_static = do_import_static
         self.create_if_not_present = create_if_not_present
         self.raise_on_failure = raise_on_failure
+        self.static_content_concurrency = static_content_concurrency
         self.xml_module_store = self.store_class(
             data_dir,
             default_class=default_class,
@@ -227,7 +272,8 @@ class ImportManager(object):
             # first pass to find everything in /static/
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath='static', verbose=self.verbose
+                dest_id, subpath='static', verbose=self.verbose,
+                concurrency=self.static_content_concurrency
             )
 
         elif self.verbose and not self.do_import_static:
@@ -250,9 +296,33 @@ class ImportManager(object):
         if os.path.exists(data_path / simport):
             import_static_content(
                 data_path, self.static_content_store,
-                dest_id, subpath=simport, verbose=self.verbose
+                dest_id, subpath=simport, verbose=self.verbose,
+                concurrency=self.static_content_concurrency
             )
 
+    @contextmanager
+    def importing_static(self, data_path, dest_id):
+        """
+        Imports all static items into the content store while the body of
+        the with statement runs, unless static files are uploaded one at a
+        time; they only go to the content store, so the blocks may be
+        imported meanwhile.
+        """
+        if self.static_content_concurrency < 2:
+            self.import_static(data_path, dest_id)
+            yield
+            return
+
+        pool = ThreadPool(1)
+        try:
+            static_import = pool.apply_async(self.import_static, (data_path, dest_id))
+            yield
+            # Raise any error importing the static items.
+            static_import.get()
+        finally:
+            pool.close()
+            pool.join()
+
     def import_asset_metadata(self, data_dir, course_id):
         """
         Read in assets XML file, parse it, and add all asset metadata to the modulestore.
@@ -438,14 +508,13 @@ class ImportManager(object):
                 # Retrieve the course itself.
                 source_courselike, courselike, data_path = self.get_courselike(courselike_key, runtime, dest_id)
 
-                # Import all static pieces.
-                self.import_static(data_path, dest_id)
-
-                # Import asset metadata stored in XML.
-                self.import_asset_metadata(data_path, dest_id)
+                # Import all static pieces, while the blocks are imported.
+                with self.importing_static(data_path, dest_id):
+                    # Import asset metadata stored in XML.
+                    self.import_asset_metadata(data_path, dest_id)
 
-                # Import all children
-                self.import_children(source_courselike, courselike, courselike_key, dest_id)
+                    # Import all children
+                    self.import_children(source_courselike, courselike, courselike_key, dest_id)
 
             # This bulk operation wraps all the operations to populate the draft branch with any items
             # from the /drafts subdirectory.
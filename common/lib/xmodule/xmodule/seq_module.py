@@ -174,8 +174,47 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
                 self.position = 1
             return json.dumps({'success': True})
 
+        if dispatch == 'render_unit' and getattr(self.system, 'lazy_sequence_units', False):
+            # Renders a unit that student_view left to be loaded on demand.
+            context = {
+                'username': self.runtime.service(self, "user").get_current_user().opt_attrs[
+                    'edx-platform.username'
+                ],
+            }
+            # Units of timed and proctored exams are only served when
+            # student_view would show them, not its alternate rendering.
+            if self.is_time_limited and self._time_limited_student_view(context):
+                raise NotFoundError('Unit not available')
+
+            position = data.get('position', u'')
+            display_items = self.get_display_items()
+            if not position.isdigit() or not 0 < int(position) <= len(display_items):
+                raise NotFoundError('Unexpected position')
+            child = display_items[int(position) - 1]
+            context['bookmarked'] = unicode(child.scope_ids.usage_id) in self._get_bookmarked_usage_ids()
+            rendered_child = child.render(STUDENT_VIEW, context)
+            return json.dumps({
+                'html': rendered_child.content,
+                'resources': [
+                    {
+                        'placement': resource.placement,
+                        'url': resource.data if resource.kind == 'url' else None,
+                        'html': Fragment.resource_to_html(resource),
+                    }
+                    for resource in rendered_child.resources
+                ],
+            })
+
         raise NotFoundError('Unexpected dispatch type')
 
+    def _get_bookmarked_usage_ids(self):
+        """
+        Returns the set of usage ids bookmarked by the user in this course,
+        which the bookmarks service fetches in a single query.
+        """
+        bookmarks_service = self.runtime.service(self, "bookmarks")
+        return set(bookmark['usage_id'] for bookmark in bookmarks_service.bookmarks(self.location.course_key))
+
     def student_view(self, context):
         # If we're rendering this sequence, but no position is set yet,
         # default the position to the first element
@@ -188,7 +227,6 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
         fragment = Fragment()
         context = context or {}
 
-        bookmarks_service = self.runtime.service(self, "bookmarks")
         context["username"] = self.runtime.service(self, "user").get_current_user().opt_attrs['edx-platform.username']
 
         parent_module = self.get_parent()
@@ -212,19 +250,32 @@ class SequenceModule(SequenceFields, ProctoringFields, XModule):
                 return fragment
 
         display_items = self.get_display_items()
-        for child in display_items:
-            is_bookmarked = bookmarks_service.is_bookmarked(usage_key=child.scope_ids.usage_id)
+        bookmarked_usage_ids = self._get_bookmarked_usage_ids()
+
+        # With lazy units, only the unit at the current position is rendered
+        # here; the client renders the others on demand with `render_unit`.
+        lazy_units = context.get('lazy_units', False)
+        current_index = min(max(self.position, 1), len(display_items)) - 1
+
+        for index, child in enumerate(display_items):
+            is_bookmarked = unicode(child.scope_ids.usage_id) in bookmarked_usage_ids
             context["bookmarked"] = is_bookmarked
 
             progress = child.get_progress()
-            rendered_child = child.render(STUDENT_VIEW, context)
-            fragment.add_frag_resources(rendered_child)
+            is_lazy = lazy_units and index != current_index
+            if is_lazy:
+                content = u''
+            else:
+                rendered_child = child.render(STUDENT_VIEW, context)
+                fragment.add_frag_resources(rendered_child)
+                content = rendered_child.content
 
             # `titles` is a list of titles to inject into the sequential tooltip display.
             # We omit any blank titles to avoid blank lines in the tooltip display.
             titles = [title.strip() for title in child.get_content_titles() if title.strip()]
             childinfo = {
-                'content': rendered_child.content,
+                'content': content,
+                'lazy': is_lazy,
                 'title': "\n".join(titles),
                 'page_title': titles[0] if titles else '',
                 'progress_status': Progress.to_js_status_str(progress),
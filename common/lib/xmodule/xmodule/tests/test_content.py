@@ -160,6 +160,30 @@ class ContentTest(unittest.TestCase):
 
         self.assertEqual(total_length, last_byte - first_byte + 1)
 
+    def test_static_content_stream_aligned_reads(self):
+        """
+        Test that StaticContentStream reads whole chunks of the underlying stream
+        after the first, possibly partial, chunk of a range.
+        """
+        item = FakeGridFsItem(SAMPLE_STRING)
+        item.chunk_size = 256
+        static_content_stream = StaticContentStream('loc', 'name', 'type', item, length=item.length)
+
+        chunks = list(static_content_stream.stream_data_in_range(100, 1500))
+        self.assertEqual(''.join(chunks), SAMPLE_STRING[100:1501])
+        self.assertEqual([len(chunk) for chunk in chunks], [156, 256, 256, 256, 256, 221])
+
+        chunks = list(static_content_stream.stream_data())
+        self.assertEqual(''.join(chunks), SAMPLE_STRING)
+        self.assertTrue(all(len(chunk) == 256 for chunk in chunks[:-1]))
+
+    def test_static_content_stream_data_in_range(self):
+        """
+        Test that in-memory StaticContent can serve byte ranges.
+        """
+        content = StaticContent('loc', 'name', 'type', SAMPLE_STRING, length=len(SAMPLE_STRING))
+        self.assertEqual(''.join(content.stream_data_in_range(100, 1500)), SAMPLE_STRING[100:1501])
+
     def test_static_content_write_js(self):
         """
         Test that only one filename starts with 000.
@@ -2,12 +2,14 @@
 Tests that check that we ignore the appropriate files when importing courses.
 """
 import unittest
+import ddt
 from mock import Mock
 from xmodule.modulestore.xml_importer import import_static_content
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
 from xmodule.tests import DATA_DIR
 
 
+@ddt.ddt
 class IgnoredFilesTestCase(unittest.TestCase):
     "Tests for ignored files"
     def test_ignore_tilde_static_files(self):
@@ -39,3 +41,20 @@ class IgnoredFilesTestCase(unittest.TestCase):
         self.assertNotIn(".DS_Store", name_val)
         self.assertIn("GREEN", name_val["example.txt"])
         self.assertIn("BLUE", name_val[".example.txt"])
+
+    @ddt.data(1, 4)
+    def test_import_concurrently(self, concurrency):
+        """
+        Test that the same static files are imported whether uploaded one at a time or concurrently
+        """
+        course_dir = DATA_DIR / "dot-underscore"
+        course_id = SlashSeparatedCourseKey("edX", "dot-underscore", "2014_Fall")
+        content_store = Mock()
+        content_store.generate_thumbnail.return_value = ("content", "location")
+        remap_dict = import_static_content(course_dir, content_store, course_id, concurrency=concurrency)
+        saved_static_content = [call[0][0] for call in content_store.save.call_args_list]
+        self.assertEqual(
+            sorted(remap_dict.values()),
+            sorted(static_content.location for static_content in saved_static_content),
+        )
+        self.assertEqual(sorted(remap_dict), [".example.txt", "example.txt"])
@@ -9,7 +9,7 @@ from django.db import transaction, IntegrityError
 
 import request_cache
 
-from courseware.field_overrides import FieldOverrideProvider
+from courseware.field_overrides import FieldOverrideProvider, clear_override_indexes
 from opaque_keys.edx.keys import CourseKey, UsageKey
 from ccx_keys.locator import CCXLocator, CCXBlockUsageLocator
 
@@ -159,6 +159,7 @@ def override_field_for_ccx(ccx, block, name, value):
 
     _get_overrides_for_ccx(ccx).setdefault(block.location, {})[name] = value_json
     _get_overrides_for_ccx(ccx).setdefault(block.location, {})[name + "_instance"] = override
+    clear_override_indexes()
 
 
 def clear_override_for_ccx(ccx, block, name):
@@ -191,6 +192,7 @@ def clear_ccx_field_info_from_ccx_map(ccx, block, name):  # pylint: disable=inva
         ccx_override_map.pop(name + "_instance")
     except KeyError:
         pass
+    clear_override_indexes()
 
 
 def bulk_delete_ccx_override_fields(ccx, ids):
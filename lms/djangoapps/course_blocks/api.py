@@ -2,6 +2,7 @@
 API entry point to the course_blocks app with top-level
 get_course_blocks and clear_course_from_cache functions.
 """
+from django.conf import settings
 from django.core.cache import cache
 from openedx.core.lib.block_structure.manager import BlockStructureManager
 from openedx.core.lib.block_structure.transformers import BlockStructureTransformers
@@ -88,6 +89,16 @@ def update_course_in_cache(course_key):
     return _get_block_structure_manager(course_key).update_collected()
 
 
+def invalidate_course_in_cache(course_key):
+    """
+    A higher order function implemented on top of the
+    block_structure.invalidate function that marks the block structure
+    in the cache for the given course_key as stale, so that it is no
+    longer returned, but can be reused to update it.
+    """
+    _get_block_structure_manager(course_key).invalidate()
+
+
 def clear_course_from_cache(course_key):
     """
     A higher order function implemented on top of the
@@ -108,7 +119,13 @@ def _get_block_structure_manager(course_key):
     """
     store = modulestore()
     course_usage_key = store.make_course_usage_key(course_key)
-    return BlockStructureManager(course_usage_key, store, _get_cache())
+    codec = getattr(settings, 'BLOCK_STRUCTURE_CACHE_CODEC', None) or {}
+    block_structures_settings = getattr(settings, 'BLOCK_STRUCTURES_SETTINGS', None) or {}
+    return BlockStructureManager(
+        course_usage_key, store, _get_cache(), codec.get('CODEC'), codec.get('COMPRESSOR'),
+        collect_lease_timeout=block_structures_settings.get('COLLECT_LEASE_TIMEOUT', 60),
+        collect_wait_timeout=block_structures_settings.get('COLLECT_WAIT_TIMEOUT', 5),
+    )
 
 
 def _get_cache():
@@ -1,11 +1,12 @@
 """
 Signal handlers for invalidating cached data.
 """
+from django.conf import settings
 from django.dispatch.dispatcher import receiver
 
 from xmodule.modulestore.django import SignalHandler
 
-from .api import clear_course_from_cache
+from .api import clear_course_from_cache, invalidate_course_in_cache
 from .tasks import update_course_in_cache
 
 
@@ -14,8 +15,15 @@ def _listen_for_course_publish(sender, course_key, **kwargs):  # pylint: disable
     """
     Catches the signal that a course has been published in the module
     store and creates/updates the corresponding cache entry.
+
+    Unless BLOCK_STRUCTURES_SETTINGS['SERVE_STALE_WHILE_RECOLLECTING'] is
+    set, the cache entry is invalidated right away, so the next request
+    collects it again if the task hasn't yet. Either way, the previous
+    entry is kept so that only the blocks changed by the publish are
+    collected again.
     """
-    clear_course_from_cache(course_key)
+    if not settings.BLOCK_STRUCTURES_SETTINGS.get('SERVE_STALE_WHILE_RECOLLECTING'):
+        invalidate_course_in_cache(course_key)
 
     # The countdown=0 kwarg ensures the call occurs after the signal emitter
     # has finished all operations.
@@ -3,6 +3,7 @@ Asynchronous tasks related to the Course Blocks sub-application.
 """
 import logging
 from celery.task import task
+from django.conf import settings
 from opaque_keys.edx.keys import CourseKey
 
 from . import api
@@ -11,10 +12,21 @@ from . import api
 log = logging.getLogger('edx.celery.task')
 
 
-@task()
-def update_course_in_cache(course_key):
+@task(
+    bind=True,
+    default_retry_delay=settings.BLOCK_STRUCTURES_SETTINGS['TASK_DEFAULT_RETRY_DELAY'],
+    max_retries=settings.BLOCK_STRUCTURES_SETTINGS['TASK_MAX_RETRIES'],
+)
+def update_course_in_cache(self, course_key):
     """
     Updates the course blocks (in the database) for the specified course.
+
+    Retried on failure, since the cache may otherwise keep serving the
+    blocks of the course from before it was published.
     """
     course_key = CourseKey.from_string(course_key)
-    api.update_course_in_cache(course_key)
+    try:
+        api.update_course_in_cache(course_key)
+    except Exception as exc:  # pylint: disable=broad-except
+        log.exception('update_course_in_cache failed for course %s; retrying.', course_key)
+        raise self.retry(exc=exc)
@@ -1,6 +1,8 @@
 """
 Unit tests for the Course Blocks signals
 """
+from django.test.utils import override_settings
+from mock import patch
 
 from xmodule.modulestore.exceptions import ItemNotFoundError
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
@@ -49,3 +51,15 @@ class CourseBlocksSignalTest(EnableTransformerRegistryMixin, ModuleStoreTestCase
             bs_manager.get_collected()
 
         self.assertFalse(is_course_in_block_structure_cache(self.course.id, self.store))
+
+    @override_settings(BLOCK_STRUCTURES_SETTINGS={'SERVE_STALE_WHILE_RECOLLECTING': True})
+    @patch('lms.djangoapps.course_blocks.signals.update_course_in_cache')
+    def test_course_publish_serve_stale(self, mock_update):
+        get_course_blocks(self.user, self.course_usage_key)
+
+        self.course.visible_to_staff_only = True
+        self.store.update_item(self.course, self.user.id)
+
+        # The previously collected block structure is kept until the task updates it.
+        self.assertTrue(is_course_in_block_structure_cache(self.course.id, self.store))
+        self.assertTrue(mock_update.apply_async.called)
@@ -20,6 +20,7 @@ class SplitTestTransformer(BlockStructureTransformer):
     'group_access' fields.
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
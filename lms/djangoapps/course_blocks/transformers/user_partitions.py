@@ -17,6 +17,7 @@ class UserPartitionTransformer(BlockStructureTransformer):
     Staff users are *not* exempted from user partition pathways.
     """
     VERSION = 1
+    SUPPORTS_INCREMENTAL_COLLECT = True
 
     @classmethod
     def name(cls):
@@ -48,10 +48,12 @@ from student.roles import (
     OrgStaffRole,
 )
 from util.milestones_helpers import (
+    MILESTONES_FULFILLMENT_NAMESPACE,
     get_pre_requisite_courses_not_completed,
     any_unfulfilled_milestones,
     is_prerequisite_courses_enabled,
 )
+from openedx.core.lib.cache_utils import memoized
 from ccx_keys.locator import CCXLocator
 
 import dogstats_wrapper as dog_stats_api
@@ -760,6 +762,7 @@ def _has_detached_class_tag(descriptor):
     return ACCESS_GRANTED if 'detached' in descriptor._class_tags else ACCESS_DENIED  # pylint: disable=protected-access
 
 
+@memoized(MILESTONES_FULFILLMENT_NAMESPACE)
 def _has_fulfilled_all_milestones(user, course_id):
     """
     Returns whether the given user has fulfilled all milestones for the
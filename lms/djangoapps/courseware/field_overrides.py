@@ -19,12 +19,17 @@ import threading
 from abc import ABCMeta, abstractmethod
 from contextlib import contextmanager
 from django.conf import settings
+import request_cache
 from request_cache.middleware import RequestCache
 from xblock.field_data import FieldData
 from xmodule.modulestore.inheritance import InheritanceMixin
 
 NOTSET = object()
 ENABLED_OVERRIDE_PROVIDERS_KEY = "courseware.field_overrides.enabled_providers.{course_id}"
+OVERRIDE_INDEXES_CACHE = "courseware.field_overrides.indexes"
+
+# The names of the fields that blocks inherit from their ancestors.
+INHERITABLE_FIELDS = frozenset(InheritanceMixin.fields.keys())
 
 
 def resolve_dotted(name):
@@ -112,7 +117,23 @@ class OverrideFieldData(FieldData):
 
     def __init__(self, user, fallback, providers):
         self.fallback = fallback
-        self.providers = tuple(provider(user) for provider in providers)
+        self.user = user
+        self.providers = providers
+        self._index = None
+
+    @property
+    def index(self):
+        """
+        The `OverrideIndex` to look the overrides up in: the one shared by the
+        blocks of the user in the current request, or outside of requests one
+        of this field data's own.
+        """
+        index = _get_override_index(self.user, self.providers)
+        if index is None:
+            if self._index is None:
+                self._index = OverrideIndex(self.user, self.providers)
+            index = self._index
+        return index
 
     def get_override(self, block, name):
         """
@@ -120,10 +141,17 @@ class OverrideFieldData(FieldData):
         Returns the overridden value or `NOTSET` if no override is found.
         """
         if not overrides_disabled():
-            for provider in self.providers:
-                value = provider.get(block, name, NOTSET)
-                if value is not NOTSET:
-                    return value
+            return self.index.get_override(block, name)
+        return NOTSET
+
+    def get_inherited_override(self, block, name):
+        """
+        Checks for an override for the field identified by `name` in the
+        ancestors of `block`, if it is inheritable. Returns the override of
+        the nearest ancestor or `NOTSET` if no override is found.
+        """
+        if name in INHERITABLE_FIELDS and not overrides_disabled():
+            return self.index.get_inherited_override(block, name)
         return NOTSET
 
     def get(self, block, name):
@@ -147,11 +175,8 @@ class OverrideFieldData(FieldData):
             # If this is an inheritable field and an override is set above,
             # then we want to return False here, so the field_data uses the
             # override and not the original value for this block.
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    if self.get_override(ancestor, name) is not NOTSET:
-                        return False
+            if self.get_inherited_override(block, name) is not NOTSET:
+                return False
 
         return has is not NOTSET or self.fallback.has(block, name)
 
@@ -161,16 +186,98 @@ class OverrideFieldData(FieldData):
     def default(self, block, name):
         # The `default` method is overloaded by the field storage system to
         # also handle inheritance.
-        if self.providers and not overrides_disabled():
-            inheritable = InheritanceMixin.fields.keys()
-            if name in inheritable:
-                for ancestor in _lineage(block):
-                    value = self.get_override(ancestor, name)
-                    if value is not NOTSET:
-                        return value
+        if self.providers:
+            value = self.get_inherited_override(block, name)
+            if value is not NOTSET:
+                return value
         return self.fallback.default(block, name)
 
 
+class OverrideIndex(object):
+    """
+    The field overrides of a user, shared by the `OverrideFieldData` of all
+    the blocks the user loads in a request. Each override of a block, and the
+    override each block inherits from its nearest ancestor, is looked up once
+    from the providers and then indexed by block and field name, so that
+    reading fields doesn't ask every provider for every ancestor again.
+    """
+    def __init__(self, user, providers):
+        self.providers = tuple(provider(user) for provider in providers)
+        self._overrides = {}
+        self._inherited_overrides = {}
+
+    def get_override(self, block, name):
+        """
+        Returns the value of the first provider overriding the field named
+        `name` in `block`, or `NOTSET`.
+        """
+        key = (_block_key(block), name)
+        value = self._overrides.get(key, _UNINDEXED)
+        if value is _UNINDEXED:
+            value = NOTSET
+            for provider in self.providers:
+                value = provider.get(block, name, NOTSET)
+                if value is not NOTSET:
+                    break
+            self._overrides[key] = value
+        return value
+
+    def get_inherited_override(self, block, name):
+        """
+        Returns the override of the field named `name` in the nearest
+        ancestor of `block` that has one, or `NOTSET`.
+        """
+        key = (_block_key(block), name)
+        value = self._inherited_overrides.get(key, _UNINDEXED)
+        if value is _UNINDEXED:
+            parent = block.get_parent()
+            if parent is None:
+                value = NOTSET
+            else:
+                value = self.get_override(parent, name)
+                if value is NOTSET:
+                    value = self.get_inherited_override(parent, name)
+            self._inherited_overrides[key] = value
+        return value
+
+
+_UNINDEXED = object()
+
+
+def _block_key(block):
+    """
+    Returns the key identifying block in an `OverrideIndex`.
+    """
+    return getattr(block, 'location', block)
+
+
+def _get_override_index(user, providers):
+    """
+    Returns the `OverrideIndex` of the user with the given providers in the
+    current request. Blocks of different courses have different keys, so
+    courses enabling the same providers share it.
+
+    Returns None outside of requests: only RequestCacheMiddleware clears the
+    request cache, so in celery tasks and management commands the index would
+    keep the overrides of every user for the life of the process.
+    """
+    if request_cache.get_request() is None:
+        return None
+    indexes = request_cache.get_cache(OVERRIDE_INDEXES_CACHE)
+    cache_key = (getattr(user, 'id', user), providers)
+    if cache_key not in indexes:
+        indexes[cache_key] = OverrideIndex(user, providers)
+    return indexes[cache_key]
+
+
+def clear_override_indexes():
+    """
+    Forgets the overrides indexed in the current request. Providers' APIs
+    that set or clear overrides call this, so that the changes are read back.
+    """
+    request_cache.get_cache(OVERRIDE_INDEXES_CACHE).clear()
+
+
 class _OverridesDisabled(threading.local):
     """
     A thread local used to manage state of overrides being disabled or not.
@@ -240,14 +347,3 @@ class FieldOverrideProvider(object):
           bool
         """
         return False
-
-
-def _lineage(block):
-    """
-    Returns an iterator over all ancestors of the given block, starting with
-    its immediate parent and ending at the root of the block tree.
-    """
-    parent = block.get_parent()
-    while parent:
-        yield parent
-        parent = parent.get_parent()
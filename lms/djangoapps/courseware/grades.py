@@ -3,22 +3,27 @@ from __future__ import division
 
 import json
 import logging
+import multiprocessing
 import random
-from collections import defaultdict
+from collections import defaultdict, deque, namedtuple
 from functools import partial
 
 import dogstats_wrapper as dog_stats_api
 from django.conf import settings
+from django.contrib.auth.models import User
 from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
 from django.test.client import RequestFactory
+from django.utils import timezone
 from opaque_keys import InvalidKeyError
-from opaque_keys.edx.keys import CourseKey
+from opaque_keys.edx.keys import CourseKey, UsageKey
 from opaque_keys.edx.locator import BlockUsageLocator
 
 from openedx.core.lib.gating import api as gating_api
 from courseware import courses
 from courseware.access import has_access
 from courseware.model_data import FieldDataCache, ScoresClient
+from courseware.user_state_client import DjangoXBlockUserStateClient
 from openedx.core.djangoapps.signals.signals import GRADES_UPDATED
 from student.models import anonymous_id_for_user
 from util.db import outer_atomic
@@ -27,7 +32,8 @@ from xmodule import graders
 from xmodule.graders import Score
 from xmodule.modulestore.django import modulestore
 from xmodule.modulestore.exceptions import ItemNotFoundError
-from .models import StudentModule
+from util.query import use_read_replica_if_available
+from .models import PersistentSubsectionGrade, StudentModule, iter_chunks
 from .module_render import get_module_for_descriptor
 
 log = logging.getLogger("edx.courseware")
@@ -127,6 +133,161 @@ class MaxScoresCache(object):
         return max_score
 
 
+# The score of a block of a subsection for a user, as persisted by SubsectionGradeStore.
+BlockScore = namedtuple('BlockScore', 'location parent earned possible graded display_name')
+
+
+class SubsectionGradeStore(object):
+    """
+    The grades of a user in the subsections of a course, persisted as
+    PersistentSubsectionGrade rows.
+
+    Grades are only used for the version of the course they were computed for:
+    like `MaxScoresCache`, this relies on the last time something was published
+    to the course. Grades of a subsection are invalidated when one of its scores
+    changes, and all the grades of a user when their cohort or course tags
+    change (see the receivers in courseware.models), so they are computed again
+    the next time the user is graded.
+
+    A store has to be created before the scores it saves grades for are
+    loaded: it only saves the grades of a subsection if they weren't
+    invalidated since the store read them. Stores created with `read_only`
+    never save grades.
+
+    Persisting is disabled unless FEATURES['ENABLE_PERSISTENT_SUBSECTION_GRADES']
+    is set, and for courses without a publish date (old XML courses).
+    """
+    def __init__(self, student, course, grades=None, read_only=False):
+        """
+        grades are the PersistentSubsectionGrade rows of student in course,
+        when they have already been fetched.
+        """
+        self.student = student
+        self.course = course
+        self.enabled = self.is_enabled(student, course)
+        self.read_only = read_only
+        self.course_version = course.subtree_edited_on.isoformat() if course.subtree_edited_on else u''
+        self._grades = {}
+        self._versions = {}
+        # The (field_data_cache, scores_client) of the student state loaded by
+        # the first grader using this store that needed it, for the next ones.
+        self.student_state = None
+        if self.enabled:
+            if grades is None:
+                grades = PersistentSubsectionGrade.objects.filter(user=student, course_id=course.id)
+            for grade in grades:
+                usage_key = grade.usage_key.map_into_course(course.id)
+                self._versions[usage_key] = grade.version
+                if grade.course_version == self.course_version:
+                    self._grades[usage_key] = grade
+
+    @staticmethod
+    def is_enabled(student, course):
+        """
+        Returns whether grades of student in course are persisted.
+        """
+        return (
+            PersistentSubsectionGrade.is_enabled() and
+            course.subtree_edited_on is not None and
+            student.is_authenticated()
+        )
+
+    @classmethod
+    def for_students(cls, students, course):
+        """
+        Returns a dict mapping the ids of students to their SubsectionGradeStore
+        in course, fetching all their grades in one query.
+        """
+        grades = defaultdict(list)
+        if any(cls.is_enabled(student, course) for student in students):
+            for grade in PersistentSubsectionGrade.objects.filter(
+                    user_id__in=[student.id for student in students], course_id=course.id
+            ):
+                grades[grade.user_id].append(grade)
+        return {student.id: cls(student, course, grades[student.id]) for student in students}
+
+    def has_grade(self, usage_key):
+        """
+        Returns whether grades are persisted for the subsection usage_key.
+        """
+        return usage_key in self._grades
+
+    def get(self, usage_key):
+        """
+        Returns the (block_scores, attempted) persisted for the subsection
+        usage_key, or None if there are none for this version of the course.
+        """
+        grade = self._grades.get(usage_key)
+        if grade is None:
+            return None
+
+        def to_key(location):
+            """ Returns the usage key for a persisted location string """
+            if location is None:
+                return None
+            return UsageKey.from_string(location).map_into_course(self.course.id)
+
+        block_scores = [
+            BlockScore(to_key(location), to_key(parent), earned, possible, graded, display_name)
+            for location, parent, earned, possible, graded, display_name in json.loads(grade.scores)
+        ]
+        return block_scores, grade.attempted
+
+    def save(self, usage_key, block_scores, attempted):
+        """
+        Persists the block_scores of the subsection usage_key, as returned by
+        `score_subsection`, and whether the user attempted any of its problems.
+
+        The grades are not saved if they were invalidated, or saved by another
+        grader, since this store read them: they may have been computed from
+        scores older than the invalidation.
+        """
+        if not self.enabled or self.read_only:
+            return
+        scores = json.dumps([
+            [
+                unicode(block_score.location),
+                unicode(block_score.parent) if block_score.parent else None,
+                block_score.earned,
+                block_score.possible,
+                block_score.graded,
+                block_score.display_name,
+            ]
+            for block_score in block_scores
+        ])
+        version = self._versions.get(usage_key)
+        grade = PersistentSubsectionGrade(
+            user=self.student,
+            course_id=self.course.id,
+            usage_key=usage_key,
+            course_version=self.course_version,
+            attempted=attempted,
+            scores=scores,
+            version=(version or 0) + 1,
+        )
+        if version is None:
+            try:
+                with transaction.atomic():
+                    grade.save(force_insert=True)
+            except IntegrityError:
+                # The row was created since it was read.
+                return
+        else:
+            saved = PersistentSubsectionGrade.objects.filter(
+                user=self.student, course_id=self.course.id, usage_key=usage_key, version=version
+            ).update(
+                course_version=grade.course_version,
+                attempted=grade.attempted,
+                scores=grade.scores,
+                version=grade.version,
+                modified=timezone.now(),
+            )
+            if not saved:
+                return
+        self._versions[usage_key] = grade.version
+        self._grades[usage_key] = grade
+
+
 class ProgressSummary(object):
     """
     Wrapper class for the computation of a user's scores across a course.
@@ -202,6 +363,140 @@ def field_data_cache_for_grading(course, user):
     )
 
 
+def _load_scores(student, course, field_data_cache, scores_client=None):
+    """
+    Returns the (scores_client, submissions_scores, max_scores_cache) needed to
+    score the problems of student in course with get_score, for the problems
+    whose state was loaded in field_data_cache.
+    """
+    if scores_client is None:
+        scores_client = ScoresClient.from_field_data_cache(field_data_cache)
+
+    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
+    # scores that were registered with the submissions API, which for the moment
+    # means only openassessment (edx-ora2)
+    # We need to import this here to avoid a circular dependency of the form:
+    # XBlock --> submissions --> Django Rest Framework error strings -->
+    # Django translation --> ... --> courseware --> submissions
+    from submissions import api as sub_api  # installed from the edx-submissions repository
+    submissions_scores = sub_api.get_scores(
+        course.id.to_deprecated_string(),
+        anonymous_id_for_user(student, course.id)
+    )
+
+    max_scores_cache = MaxScoresCache.create_for_course(course)
+    # For the moment, we have to get scorable_locations from field_data_cache
+    # and not from scores_client, because scores_client is ignorant of things
+    # in the submissions API. As a further refactoring step, submissions should
+    # be hidden behind the ScoresClient.
+    max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
+
+    return scores_client, submissions_scores, max_scores_cache
+
+
+def _grade_store(student, course, field_data_cache, scores_client):
+    """
+    Returns a new SubsectionGradeStore of student in course. It is read only if
+    the caller already loaded some scores, since they may be older than the
+    grades it reads.
+    """
+    return SubsectionGradeStore(
+        student, course, read_only=field_data_cache is not None or scores_client is not None
+    )
+
+
+def _student_state(student, course, store, field_data_cache=None, scores_client=None):
+    """
+    Returns the (field_data_cache, scores_client) with the state of student
+    needed to grade course: the given ones, or else the ones already loaded
+    for store, loading them if needed.
+    """
+    if field_data_cache is not None:
+        return field_data_cache, scores_client
+    if store.student_state is None:
+        field_data_cache = field_data_cache_for_grading(course, student)
+        store.student_state = (field_data_cache, ScoresClient.from_field_data_cache(field_data_cache))
+    return store.student_state
+
+
+def score_subsection(student, section, module_creator, scores_client, submissions_scores, max_scores_cache):
+    """
+    Scores every block of a subsection for student.
+
+    Returns a tuple (block_scores, attempted, persistable): a list with the
+    BlockScore of every block, in the order of yield_dynamic_descriptor_descendants,
+    whether student has a score for any of them, and whether these scores may be
+    persisted. Whether student has access to the blocks is left to
+    `_scores_for_grading`, since it changes over time. Blocks that are scored
+    outside of the LMS (always_recalculate_grades) always have to be scored
+    again, so their subsection is never persisted.
+    """
+    block_scores = []
+    attempted = False
+    persistable = True
+    for module_descriptor in yield_dynamic_descriptor_descendants(section, student.id, module_creator):
+        if module_descriptor.always_recalculate_grades:
+            attempted = True
+            persistable = False
+        elif (
+                module_descriptor.location in scores_client or
+                module_descriptor.location.to_deprecated_string() in submissions_scores
+        ):
+            attempted = True
+
+        (correct, total) = get_score(
+            student,
+            module_descriptor,
+            module_creator,
+            scores_client,
+            submissions_scores,
+            max_scores_cache,
+        )
+        block_scores.append(BlockScore(
+            module_descriptor.location,
+            module_descriptor.parent,
+            correct,
+            total,
+            module_descriptor.graded,
+            module_descriptor.display_name_with_default_escaped,
+        ))
+    return block_scores, attempted, persistable
+
+
+def _scores_for_grading(student, block_scores, descriptors):
+    """
+    Returns the Scores of the blocks of a subsection that count for the grade:
+    the blocks the student has access to, which have a score.
+
+    descriptors maps the locations of the scorable blocks of the subsection to
+    their descriptors. Access is checked each time, rather than persisted with
+    the scores, since it changes with release dates and group membership.
+    """
+    scores = []
+    for block_score in block_scores:
+        correct, total = block_score.earned, block_score.possible
+        if correct is None and total is None:
+            continue
+
+        descriptor = descriptors.get(block_score.location)
+        if descriptor is None or not has_access(student, 'load', descriptor, descriptor.location.course_key):
+            continue
+
+        if settings.GENERATE_PROFILE_SCORES:    # for debugging!
+            if total > 1:
+                correct = random.randrange(max(total - 2, 1), total + 1)
+            else:
+                correct = total
+
+        graded = block_score.graded
+        if not total > 0:
+            # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
+            graded = False
+
+        scores.append(Score(correct, total, graded, block_score.display_name, block_score.location))
+    return scores
+
+
 def answer_distributions(course_key):
     """
     Given a course_key, return answer distributions in the form of a dictionary
@@ -295,13 +590,14 @@ def answer_distributions(course_key):
     return answer_counts
 
 
-def grade(student, request, course, keep_raw_scores=False, field_data_cache=None, scores_client=None):
+def grade(student, request, course, keep_raw_scores=False, field_data_cache=None, scores_client=None,
+          grade_store=None):
     """
     Returns the grade of the student.
 
     Also sends a signal to update the minimum grade requirement status.
     """
-    grade_summary = _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client)
+    grade_summary = _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client, grade_store)
     responses = GRADES_UPDATED.send_robust(
         sender=None,
         username=student.username,
@@ -316,7 +612,7 @@ def grade(student, request, course, keep_raw_scores=False, field_data_cache=None
     return grade_summary
 
 
-def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client):
+def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_client, grade_store=None):
     """
     Unwrapped version of "grade"
 
@@ -335,36 +631,30 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
     - keep_raw_scores : if True, then value for key 'raw_scores' contains scores
       for every graded module
 
+    - grade_store : the SubsectionGradeStore of student in course, if it was
+      created before field_data_cache or scores_client were loaded
+
     More information on the format is in the docstring for CourseGrader.
     """
-    with outer_atomic():
-        if field_data_cache is None:
-            field_data_cache = field_data_cache_for_grading(course, student)
-        if scores_client is None:
-            scores_client = ScoresClient.from_field_data_cache(field_data_cache)
-
-    # Dict of item_ids -> (earned, possible) point tuples. This *only* grabs
-    # scores that were registered with the submissions API, which for the moment
-    # means only openassessment (edx-ora2)
-    # We need to import this here to avoid a circular dependency of the form:
-    # XBlock --> submissions --> Django Rest Framework error strings -->
-    # Django translation --> ... --> courseware --> submissions
-    from submissions import api as sub_api  # installed from the edx-submissions repository
-
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(),
-            anonymous_id_for_user(student, course.id)
-        )
-        max_scores_cache = MaxScoresCache.create_for_course(course)
-
-        # For the moment, we have to get scorable_locations from field_data_cache
-        # and not from scores_client, because scores_client is ignorant of things
-        # in the submissions API. As a further refactoring step, submissions should
-        # be hidden behind the ScoresClient.
-        max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
-
+    store = grade_store or _grade_store(student, course, field_data_cache, scores_client)
     grading_context = course.grading_context
+    persisted_grades = {
+        section['section_descriptor'].location: store.get(section['section_descriptor'].location)
+        for sections in grading_context['graded_sections'].itervalues()
+        for section in sections
+    }
+
+    # Student state only has to be loaded if some subsection has no persisted grades.
+    submissions_scores = max_scores_cache = None
+    if not all(persisted_grades.itervalues()):
+        with outer_atomic():
+            field_data_cache, scores_client = _student_state(
+                student, course, store, field_data_cache, scores_client
+            )
+            scores_client, submissions_scores, max_scores_cache = _load_scores(
+                student, course, field_data_cache, scores_client
+            )
+
     raw_scores = []
 
     totaled_scores = {}
@@ -377,83 +667,64 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
             section_name = section_descriptor.display_name_with_default_escaped
 
             with outer_atomic():
-                # some problems have state that is updated independently of interaction
-                # with the LMS, so they need to always be scored. (E.g. combinedopenended ORA1)
-                # TODO This block is causing extra savepoints to be fired that are empty because no queries are executed
-                # during the loop. When refactoring this code please keep this outer_atomic call in mind and ensure we
-                # are not making unnecessary database queries.
-                should_grade_section = any(
-                    descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
-                )
+                persisted_grade = persisted_grades[section_descriptor.location]
+                if persisted_grade is not None:
+                    block_scores, should_grade_section = persisted_grade
+                else:
+                    block_scores = None
 
-                # If there are no problems that always have to be regraded, check to
-                # see if any of our locations are in the scores from the submissions
-                # API. If scores exist, we have to calculate grades for this section.
-                if not should_grade_section:
+                    # some problems have state that is updated independently of interaction
+                    # with the LMS, so they need to always be scored. (E.g. combinedopenended ORA1)
+                    # TODO This block is causing extra savepoints to be fired that are empty because no queries are
+                    # executed during the loop. When refactoring this code please keep this outer_atomic call in mind
+                    # and ensure we are not making unnecessary database queries.
                     should_grade_section = any(
-                        descriptor.location.to_deprecated_string() in submissions_scores
-                        for descriptor in section['xmoduledescriptors']
+                        descriptor.always_recalculate_grades for descriptor in section['xmoduledescriptors']
                     )
 
-                if not should_grade_section:
-                    should_grade_section = any(
-                        descriptor.location in scores_client
-                        for descriptor in section['xmoduledescriptors']
-                    )
+                    # If there are no problems that always have to be regraded, check to
+                    # see if any of our locations are in the scores from the submissions
+                    # API. If scores exist, we have to calculate grades for this section.
+                    if not should_grade_section:
+                        should_grade_section = any(
+                            descriptor.location.to_deprecated_string() in submissions_scores
+                            for descriptor in section['xmoduledescriptors']
+                        )
+
+                    if not should_grade_section:
+                        should_grade_section = any(
+                            descriptor.location in scores_client
+                            for descriptor in section['xmoduledescriptors']
+                        )
 
                 # If we haven't seen a single problem in the section, we don't have
                 # to grade it at all! We can assume 0%
                 if should_grade_section:
-                    scores = []
-
-                    def create_module(descriptor):
-                        '''creates an XModule instance given a descriptor'''
-                        # TODO: We need the request to pass into here. If we could forego that, our arguments
-                        # would be simpler
-                        return get_module_for_descriptor(
-                            student, request, descriptor, field_data_cache, course.id, course=course
-                        )
-
-                    descendants = yield_dynamic_descriptor_descendants(section_descriptor, student.id, create_module)
-                    for module_descriptor in descendants:
-                        user_access = has_access(
-                            student, 'load', module_descriptor, module_descriptor.location.course_key
-                        )
-                        if not user_access:
-                            continue
+                    if block_scores is None:
+                        def create_module(descriptor):
+                            '''creates an XModule instance given a descriptor'''
+                            # TODO: We need the request to pass into here. If we could forego that, our arguments
+                            # would be simpler
+                            return get_module_for_descriptor(
+                                student, request, descriptor, field_data_cache, course.id, course=course
+                            )
 
-                        (correct, total) = get_score(
+                        block_scores, __, persistable = score_subsection(
                             student,
-                            module_descriptor,
+                            section_descriptor,
                             create_module,
                             scores_client,
                             submissions_scores,
                             max_scores_cache,
                         )
-                        if correct is None and total is None:
-                            continue
-
-                        if settings.GENERATE_PROFILE_SCORES:    # for debugging!
-                            if total > 1:
-                                correct = random.randrange(max(total - 2, 1), total + 1)
-                            else:
-                                correct = total
-
-                        graded = module_descriptor.graded
-                        if not total > 0:
-                            # We simply cannot grade a problem that is 12/0, because we might need it as a percentage
-                            graded = False
-
-                        scores.append(
-                            Score(
-                                correct,
-                                total,
-                                graded,
-                                module_descriptor.display_name_with_default_escaped,
-                                module_descriptor.location
-                            )
-                        )
+                        if persistable:
+                            store.save(section_descriptor.location, block_scores, True)
 
+                    scores = _scores_for_grading(
+                        student,
+                        block_scores,
+                        {descriptor.location: descriptor for descriptor in section['xmoduledescriptors']},
+                    )
                     __, graded_total = graders.aggregate_scores(scores, section_name)
                     if keep_raw_scores:
                         raw_scores += scores
@@ -488,7 +759,8 @@ def _grade(student, request, course, keep_raw_scores, field_data_cache, scores_c
             # so grader can be double-checked
             grade_summary['raw_scores'] = raw_scores
 
-        max_scores_cache.push_to_remote()
+        if max_scores_cache is not None:
+            max_scores_cache.push_to_remote()
 
     return grade_summary
 
@@ -515,11 +787,11 @@ def grade_for_percentage(grade_cutoffs, percentage):
     return letter_grade
 
 
-def progress_summary(student, request, course, field_data_cache=None, scores_client=None):
+def progress_summary(student, request, course, field_data_cache=None, scores_client=None, grade_store=None):
     """
     Returns progress summary for all chapters in the course.
     """
-    progress = _progress_summary(student, request, course, field_data_cache, scores_client)
+    progress = _progress_summary(student, request, course, field_data_cache, scores_client, grade_store)
     if progress:
         return progress.chapters
     else:
@@ -538,7 +810,7 @@ def get_weighted_scores(student, course, field_data_cache=None, scores_client=No
 # TODO: This method is not very good. It was written in the old course style and
 # then converted over and performance is not good. Once the progress page is redesigned
 # to not have the progress summary this method should be deleted (so it won't be copied).
-def _progress_summary(student, request, course, field_data_cache=None, scores_client=None):
+def _progress_summary(student, request, course, field_data_cache=None, scores_client=None, grade_store=None):
     """
     Unwrapped version of "progress_summary".
 
@@ -554,16 +826,30 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
     Arguments:
         student: A User object for the student to grade
         course: A Descriptor containing the course to grade
+        grade_store: The SubsectionGradeStore of student in course, if it was
+            created before field_data_cache or scores_client were loaded
 
     If the student does not have access to load the course module, this function
     will return None.
 
     """
+    store = grade_store or _grade_store(student, course, field_data_cache, scores_client)
     with outer_atomic():
-        if field_data_cache is None:
-            field_data_cache = field_data_cache_for_grading(course, student)
-        if scores_client is None:
-            scores_client = ScoresClient.from_field_data_cache(field_data_cache)
+        # If every subsection has persisted grades, only the state of the course,
+        # its chapters and its subsections has to be loaded to list them.
+        scores_loaded = field_data_cache is not None or store.student_state is not None or not all(
+            store.has_grade(section.location)
+            for chapter in course.get_children()
+            for section in chapter.get_children()
+        )
+        if scores_loaded:
+            field_data_cache, scores_client = _student_state(
+                student, course, store, field_data_cache, scores_client
+            )
+        else:
+            field_data_cache = FieldDataCache.cache_for_descriptor_descendents(
+                course.id, student, course, depth=2
+            )
 
         course_module = get_module_for_descriptor(
             student, request, course, field_data_cache, course.id, course=course
@@ -573,21 +859,12 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
 
         course_module = getattr(course_module, '_x_module', course_module)
 
-    # We need to import this here to avoid a circular dependency of the form:
-    # XBlock --> submissions --> Django Rest Framework error strings -->
-    # Django translation --> ... --> courseware --> submissions
-    from submissions import api as sub_api  # installed from the edx-submissions repository
-    with outer_atomic():
-        submissions_scores = sub_api.get_scores(
-            course.id.to_deprecated_string(), anonymous_id_for_user(student, course.id)
-        )
-
-        max_scores_cache = MaxScoresCache.create_for_course(course)
-        # For the moment, we have to get scorable_locations from field_data_cache
-        # and not from scores_client, because scores_client is ignorant of things
-        # in the submissions API. As a further refactoring step, submissions should
-        # be hidden behind the ScoresClient.
-        max_scores_cache.fetch_from_remote(field_data_cache.scorable_locations)
+    submissions_scores = max_scores_cache = None
+    if scores_loaded:
+        with outer_atomic():
+            scores_client, submissions_scores, max_scores_cache = _load_scores(
+                student, course, field_data_cache, scores_client
+            )
 
     # Check for gated content
     gated_content = gating_api.get_gated_content(course, student)
@@ -611,33 +888,47 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
                 graded = section_module.graded
                 scores = []
 
-                module_creator = section_module.xmodule_runtime.get_module
+                persisted_grade = store.get(section_module.location)
+                if persisted_grade is not None:
+                    block_scores, __ = persisted_grade
+                else:
+                    if not scores_loaded:
+                        field_data_cache.add_descriptor_descendents(
+                            course,
+                            descriptor_filter=partial(descriptor_affects_grading, course.block_types_affecting_grading)
+                        )
+                        store.student_state = (field_data_cache, ScoresClient.from_field_data_cache(field_data_cache))
+                        scores_client, submissions_scores, max_scores_cache = _load_scores(
+                            student, course, *store.student_state
+                        )
+                        scores_loaded = True
 
-                for module_descriptor in yield_dynamic_descriptor_descendants(
-                        section_module, student.id, module_creator
-                ):
-                    locations_to_children[module_descriptor.parent].append(module_descriptor.location)
-                    (correct, total) = get_score(
+                    block_scores, attempted, persistable = score_subsection(
                         student,
-                        module_descriptor,
-                        module_creator,
+                        section_module,
+                        section_module.xmodule_runtime.get_module,
                         scores_client,
                         submissions_scores,
                         max_scores_cache,
                     )
-                    if correct is None and total is None:
+                    if persistable:
+                        store.save(section_module.location, block_scores, attempted)
+
+                for block_score in block_scores:
+                    locations_to_children[block_score.parent].append(block_score.location)
+                    if block_score.earned is None and block_score.possible is None:
                         continue
 
                     weighted_location_score = Score(
-                        correct,
-                        total,
+                        block_score.earned,
+                        block_score.possible,
                         graded,
-                        module_descriptor.display_name_with_default_escaped,
-                        module_descriptor.location
+                        block_score.display_name,
+                        block_score.location
                     )
 
                     scores.append(weighted_location_score)
-                    locations_to_weighted_scores[module_descriptor.location] = weighted_location_score
+                    locations_to_weighted_scores[block_score.location] = weighted_location_score
 
                 scores.reverse()
                 section_total, _ = graders.aggregate_scores(
@@ -661,7 +952,8 @@ def _progress_summary(student, request, course, field_data_cache=None, scores_cl
             'sections': sections
         })
 
-    max_scores_cache.push_to_remote()
+    if max_scores_cache is not None:
+        max_scores_cache.push_to_remote()
 
     return ProgressSummary(chapters, locations_to_weighted_scores, locations_to_children)
 
@@ -802,6 +1094,161 @@ def iterate_grades_for(course_or_id, students, keep_raw_scores=False):
                 yield student, {}, exc.message
 
 
+# Number of students whose StudentModules are fetched together by iterate_grades_in_batches.
+GRADING_BATCH_SIZE = 100
+
+
+class BatchGrader(object):
+    """
+    Grades students of a course a batch at a time.
+
+    The descriptors that affect grading are collected once for the course, and
+    the user state and scores of a whole batch of students are fetched together.
+    Each student is then graded by `grade`, with a FieldDataCache and a
+    ScoresClient built from the prefetched data, so the resulting gradesets are
+    the same as those of `iterate_grades_for`.
+    """
+    def __init__(self, course, keep_raw_scores=False):
+        self.course = course
+        self.keep_raw_scores = keep_raw_scores
+        self.descriptors = FieldDataCache.descriptor_descendents(
+            course,
+            descriptor_filter=partial(descriptor_affects_grading, course.block_types_affecting_grading),
+        )
+        self.scorable_locations = set(
+            descriptor.location for descriptor in self.descriptors if descriptor.has_score
+        )
+
+    def fetch_student_state(self, student_ids):
+        """
+        Returns two dicts mapping each of student_ids to its user state and its
+        ScoresClient.
+
+        The user state of a student maps usage keys to their stored field values.
+        The state and the scores of all the students are each fetched at once.
+        """
+        batch_size = len(student_ids)
+        user_states = DjangoXBlockUserStateClient().get_many_for_users(
+            student_ids, [descriptor.location for descriptor in self.descriptors], batch_size=batch_size,
+        )
+        states = {
+            student_id: {usage_key: block_state.state for usage_key, block_state in block_states.iteritems()}
+            for student_id, block_states in user_states
+        }
+        scores_clients = dict(
+            ScoresClient.iter_for_users(self.course.id, student_ids, self.scorable_locations, batch_size=batch_size)
+        )
+        return states, scores_clients
+
+    def grade_batch(self, students):
+        """
+        Yields (student, gradeset, err_msg) for each of students, like
+        `iterate_grades_for`.
+        """
+        with outer_atomic():
+            # The grade stores are created before the scores are loaded, so
+            # that they can save the grades computed from them.
+            grade_stores = SubsectionGradeStore.for_students(students, self.course)
+            states, scores_clients = self.fetch_student_state([student.id for student in students])
+
+        for student in students:
+            with dog_stats_api.timer('lms.grades.iterate_grades_for', tags=[u'action:{}'.format(self.course.id)]):
+                try:
+                    request = _get_mock_request(student)
+                    # See iterate_grades_for for why the session is needed.
+                    request.session = {}
+                    field_data_cache = FieldDataCache(
+                        self.descriptors, self.course.id, student, user_state=states[student.id]
+                    )
+                    gradeset = grade(
+                        student, request, self.course, self.keep_raw_scores, field_data_cache,
+                        scores_clients[student.id], grade_stores[student.id],
+                    )
+                    yield student, gradeset, ""
+                except Exception as exc:  # pylint: disable=broad-except
+                    log.exception(
+                        'Cannot grade student %s (%s) in course %s because of exception: %s',
+                        student.username,
+                        student.id,
+                        self.course.id,
+                        exc.message
+                    )
+                    yield student, {}, exc.message
+
+
+def iterate_grades_in_batches(course_or_id, students, keep_raw_scores=False, batch_size=GRADING_BATCH_SIZE,
+                              processes=None):
+    """
+    Yields the same (student, gradeset, err_msg) tuples as `iterate_grades_for`,
+    grading `batch_size` students at a time with a BatchGrader.
+
+    If `processes` is more than 1, the batches are graded in parallel by a pool
+    of that many worker processes. The pool can't be used from daemonic
+    processes, such as celery workers.
+    """
+    if isinstance(course_or_id, (basestring, CourseKey)):
+        course = courses.get_course_by_id(course_or_id)
+    else:
+        course = course_or_id
+
+    batches = iter_chunks(students, batch_size)
+    if processes and processes > 1:
+        # Batches sent to the pool and not yet yielded; pool.imap returns results in order.
+        pending = deque()
+
+        def worker_args():
+            """Yields the arguments of _grade_batch_in_worker for each batch."""
+            for batch in batches:
+                pending.append(batch)
+                yield course.id, [student.id for student in batch], keep_raw_scores
+
+        pool = multiprocessing.Pool(processes, initializer=_init_grading_worker)
+        try:
+            for results in pool.imap(_grade_batch_in_worker, worker_args()):
+                for student in pending.popleft():
+                    gradeset, err_msg = results[student.id]
+                    yield student, gradeset, err_msg
+        finally:
+            pool.terminate()
+    else:
+        grader = BatchGrader(course, keep_raw_scores)
+        for batch in batches:
+            for result in grader.grade_batch(batch):
+                yield result
+
+
+def _init_grading_worker():
+    """
+    Makes a pool process open its own database and cache connections, rather
+    than sharing the ones inherited from the parent process.
+    """
+    connections.close_all()
+    cache.close()
+
+
+# The BatchGrader of each worker process, reused for all of its batches of the course.
+_WORKER_GRADER = None
+
+
+def _grade_batch_in_worker(args):
+    """
+    Grades a batch of students in a pool process.
+
+    Arguments are passed as one (course_key, student_ids, keep_raw_scores)
+    tuple; returns a dict mapping the student ids to (gradeset, err_msg).
+    """
+    global _WORKER_GRADER  # pylint: disable=global-statement
+    course_key, student_ids, keep_raw_scores = args
+    if _WORKER_GRADER is None or _WORKER_GRADER.course.id != course_key:
+        _WORKER_GRADER = BatchGrader(courses.get_course_by_id(course_key), keep_raw_scores)
+    _WORKER_GRADER.keep_raw_scores = keep_raw_scores
+    students = use_read_replica_if_available(User.objects.filter(id__in=student_ids))
+    return {
+        student.id: (gradeset, err_msg)
+        for student, gradeset, err_msg in _WORKER_GRADER.grade_batch(list(students))
+    }
+
+
 def _get_mock_request(student):
     """
     Make a fake request because grading code expects to be able to look at
@@ -28,7 +28,9 @@ from .models import (
     StudentModule,
     XModuleUserStateSummaryField,
     XModuleStudentPrefsField,
-    XModuleStudentInfoField
+    XModuleStudentInfoField,
+    chunks,
+    iter_chunks,
 )
 import logging
 from opaque_keys.edx.keys import CourseKey, UsageKey
@@ -372,6 +374,17 @@ class UserStateCache(object):
         for user_state in block_field_state:
             self._cache[user_state.block_key] = user_state.state
 
+    def cache_prefetched(self, block_field_state):
+        """
+        Load field state that was already fetched for this user into this cache.
+
+        Arguments:
+            block_field_state (dict): A dict mapping usage keys to the dict of
+                field values stored for that block, without the blocks that
+                have no stored state.
+        """
+        self._cache.update(block_field_state)
+
     @contract(kvs_key=DjangoKeyValueStore.Key)
     def set(self, kvs_key, value):
         """
@@ -686,7 +699,7 @@ class FieldDataCache(object):
     A cache of django model objects needed to supply the data
     for a module and its descendants
     """
-    def __init__(self, descriptors, course_id, user, select_for_update=False, asides=None):
+    def __init__(self, descriptors, course_id, user, select_for_update=False, asides=None, user_state=None):
         """
         Find any courseware.models objects that are needed by any descriptor
         in descriptors. Attempts to minimize the number of queries to the database.
@@ -699,6 +712,8 @@ class FieldDataCache(object):
         user: The user for which to cache data
         select_for_update: Ignored
         asides: The list of aside types to load, or None to prefetch no asides.
+        user_state: The Scope.user_state data of descriptors, if it was already
+            fetched (see add_descriptors_to_cache).
         """
         if asides is None:
             self.asides = []
@@ -725,11 +740,15 @@ class FieldDataCache(object):
             ),
         }
         self.scorable_locations = set()
-        self.add_descriptors_to_cache(descriptors)
+        self.add_descriptors_to_cache(descriptors, user_state)
 
-    def add_descriptors_to_cache(self, descriptors):
+    def add_descriptors_to_cache(self, descriptors, user_state=None):
         """
         Add all `descriptors` to this FieldDataCache.
+
+        If `user_state` is given, it is used as the Scope.user_state data of
+        `descriptors` instead of loading it from the database: a dict mapping
+        usage keys to the field values stored for the user.
         """
         if self.user.is_authenticated():
             self.scorable_locations.update(desc.location for desc in descriptors if desc.has_score)
@@ -737,7 +756,10 @@ class FieldDataCache(object):
                 if scope not in self.cache:
                     continue
 
-                self.cache[scope].cache_fields(fields, descriptors, self.asides)
+                if scope == Scope.user_state and user_state is not None:
+                    self.cache[scope].cache_prefetched(user_state)
+                else:
+                    self.cache[scope].cache_fields(fields, descriptors, self.asides)
 
     def add_descriptor_descendents(self, descriptor, depth=None, descriptor_filter=lambda descriptor: True):
         """
@@ -750,6 +772,14 @@ class FieldDataCache(object):
             descriptor_filter is a function that accepts a descriptor and return whether the field data
                 should be cached
         """
+        self.add_descriptors_to_cache(self.descriptor_descendents(descriptor, depth, descriptor_filter))
+
+    @staticmethod
+    def descriptor_descendents(descriptor, depth=None, descriptor_filter=lambda descriptor: True):
+        """
+        Return the list of descriptors that add_descriptor_descendents would add
+        for these arguments, including `descriptor` itself.
+        """
 
         def get_child_descriptors(descriptor, depth, descriptor_filter):
             """
@@ -775,9 +805,7 @@ class FieldDataCache(object):
             return descriptors
 
         with modulestore().bulk_operations(descriptor.location.course_key):
-            descriptors = get_child_descriptors(descriptor, depth, descriptor_filter)
-
-        self.add_descriptors_to_cache(descriptors)
+            return get_child_descriptors(descriptor, depth, descriptor_filter)
 
     @classmethod
     def cache_for_descriptor_descendents(cls, course_id, user, descriptor, depth=None,
@@ -930,6 +958,10 @@ class FieldDataCache(object):
         return sum(len(cache) for cache in self.cache.values())
 
 
+# Number of users whose scores are fetched together by ScoresClient.iter_for_users.
+SCORES_BATCH_SIZE = 100
+
+
 class ScoresClient(object):
     """
     Basic client interface for retrieving Score information.
@@ -967,6 +999,17 @@ class ScoresClient(object):
         })
         self._has_fetched = True
 
+    def add_scores(self, locations_to_scores):
+        """
+        Use scores that were already fetched, instead of calling fetch_scores().
+
+        Arguments:
+            locations_to_scores (dict): A dict mapping locations (with full course
+                run information) to Score tuples.
+        """
+        self._locations_to_scores.update(locations_to_scores)
+        self._has_fetched = True
+
     def get(self, location):
         """
         Get the score for a given location, if it exists.
@@ -989,6 +1032,36 @@ class ScoresClient(object):
         client.fetch_scores(fd_cache.scorable_locations)
         return client
 
+    @classmethod
+    def iter_for_users(cls, course_key, user_ids, locations, batch_size=SCORES_BATCH_SIZE):
+        """
+        Yields (user_id, ScoresClient) for each of user_ids, in order, with the
+        scores of the given locations already fetched.
+
+        The scores of `batch_size` users are fetched together, so only one batch
+        of scores is held in memory while user_ids is iterated.
+        """
+        locations = set(locations)
+        for user_ids_batch in iter_chunks(user_ids, batch_size):
+            locations_to_scores = defaultdict(dict)
+            for locations_chunk in chunks(locations, 500):
+                scores_qset = StudentModule.objects.filter(
+                    student_id__in=user_ids_batch,
+                    course_id=course_key,
+                    module_state_key__in=locations_chunk,
+                )
+                # See fetch_scores for why the course key is mapped back in.
+                for user_id, location, correct, total in scores_qset.values_list(
+                        'student_id', 'module_state_key', 'grade', 'max_grade'
+                ):
+                    location = UsageKey.from_string(location).map_into_course(course_key)
+                    locations_to_scores[user_id][location] = cls.Score(correct, total)
+
+            for user_id in user_ids_batch:
+                client = cls(course_key, user_id)
+                client.add_scores(locations_to_scores[user_id])
+                yield user_id, client
+
 
 # @contract(user_id=int, usage_key=UsageKey, score="number|None", max_score="number|None")
 def set_score(user_id, usage_key, score, max_score):
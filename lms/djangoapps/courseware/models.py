@@ -17,13 +17,20 @@ import itertools
 
 from django.contrib.auth.models import User
 from django.conf import settings
-from django.db import models
-from django.db.models.signals import post_save
+from django.db import IntegrityError, models, transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver, Signal
 
 from model_utils.models import TimeStampedModel
+from opaque_keys import InvalidKeyError
+from opaque_keys.edx.keys import CourseKey, UsageKey
+from openedx.core.djangoapps.course_groups.models import CohortMembership
+from openedx.core.djangoapps.user_api.models import UserCourseTag
 from student.models import user_by_anonymous_id
 from submissions.models import score_set, score_reset
+from xmodule.modulestore.django import modulestore
+from xmodule.modulestore.exceptions import ItemNotFoundError
 
 from xmodule_django.models import CourseKeyField, LocationKeyField, BlockTypeKeyField
 log = logging.getLogger(__name__)
@@ -39,6 +46,21 @@ def chunks(items, chunk_size):
     return (items[i:i + chunk_size] for i in xrange(0, len(items), chunk_size))
 
 
+def iter_chunks(items, chunk_size):
+    """
+    Yields lists of up to chunk_size consecutive values from items, only
+    consuming items as the chunks are needed.
+    """
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
 class ChunkingManager(models.Manager):
     """
     :class:`~Manager` that adds an additional method :meth:`chunked_filter` to provide
@@ -313,6 +335,111 @@ class StudentFieldOverride(TimeStampedModel):
     value = models.TextField(default='null')
 
 
+class PersistentSubsectionGrade(TimeStampedModel):
+    """
+    The scores of a user in one subsection of a course, as last computed by
+    the grading code in `courseware.grades`.
+
+    `scores` holds the score of every block in the subsection for the user, so
+    that grading can reuse it instead of loading student state and problems
+    again. A row only applies to the version of the course it was computed for,
+    and is invalidated as soon as a score of one of its blocks changes.
+
+    Invalidated rows are kept, with an empty course_version, and `version`
+    counts the writes and invalidations of a row, so that a grader only
+    overwrites the row it read before loading the scores (see
+    `courseware.grades.SubsectionGradeStore.save`).
+    """
+    user = models.ForeignKey(User, db_index=True)
+    course_id = CourseKeyField(max_length=255)
+    usage_key = LocationKeyField(max_length=255)
+
+    # When the course was last published, as of this computation.
+    course_version = models.CharField(max_length=255, blank=True)
+
+    # Whether the user has any score in the subsection yet.
+    attempted = models.BooleanField(default=False)
+
+    # JSON list of [location, parent, earned, possible, graded, display_name]
+    # for every block in the subsection.
+    scores = models.TextField()
+
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta(object):
+        app_label = "courseware"
+        unique_together = (('user', 'course_id', 'usage_key'),)
+
+    def __unicode__(self):
+        return u"[PersistentSubsectionGrade] {}: {} ({})".format(self.user_id, self.usage_key, self.course_version)
+
+    @staticmethod
+    def is_enabled():
+        """
+        Returns whether grades are persisted, and so have to be invalidated.
+        """
+        return settings.FEATURES.get('ENABLE_PERSISTENT_SUBSECTION_GRADES', False)
+
+    @classmethod
+    def invalidate(cls, user_id, course_key, usage_key=None):
+        """
+        Invalidates the grades of user_id for the subsection usage_key of
+        course_key, or for all of its subsections if usage_key is None.
+
+        A row is created for a subsection with no grades yet, so that a grader
+        already computing its grades from the previous scores can't save them.
+
+        Does nothing while persisting grades is disabled, so that score changes
+        cost no extra queries then.
+        """
+        if not cls.is_enabled():
+            return
+        grades = cls.objects.filter(user_id=user_id, course_id=course_key)
+        if usage_key is not None:
+            grades = grades.filter(usage_key=usage_key)
+        if grades.update(course_version=u'', version=F('version') + 1) or usage_key is None:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(
+                    user_id=user_id, course_id=course_key, usage_key=usage_key, scores=u'[]', version=1
+                )
+        except IntegrityError:
+            grades.update(course_version=u'', version=F('version') + 1)
+
+    @classmethod
+    def invalidate_for_block(cls, user_id, course_key, usage_key):
+        """
+        Invalidates the grades of user_id for the subsection of course_key
+        containing the block usage_key, or for all of its subsections if the
+        block isn't found in the course.
+        """
+        if not cls.is_enabled():
+            return
+        cls.invalidate(user_id, course_key, _subsection_location(course_key, usage_key))
+
+
+def _subsection_location(course_key, usage_key):
+    """
+    Returns the location of the subsection of course_key containing the block
+    usage_key, that is of its ancestor whose parent is a chapter, or None if
+    the block isn't in a subsection of the course.
+    """
+    store = modulestore()
+    location = usage_key
+    try:
+        with store.bulk_operations(course_key):
+            while True:
+                parent = store.get_parent_location(location)
+                if parent is None:
+                    return None
+                if parent.block_type == 'chapter':
+                    return location.map_into_course(course_key)
+                location = parent
+    except ItemNotFoundError:
+        return None
+
+
 # Signal that indicates that a user's score for a problem has been updated.
 # This signal is generated when a scoring event occurs either within the core
 # platform or in the Submissions module. Note that this signal will be triggered
@@ -409,3 +536,56 @@ def submissions_score_reset_handler(sender, **kwargs):  # pylint: disable=unused
             u"Failed to process score_reset signal from Submissions API. "
             "user: %s, course_id: %s, usage_id: %s", user, course_id, usage_id
         )
+
+
+@receiver(SCORE_CHANGED)
+def invalidate_subsection_grade_handler(sender, **kwargs):  # pylint: disable=unused-argument
+    """
+    Consume the SCORE_CHANGED signal, and invalidate the persisted grades of
+    the subsection containing the scored block, so that only this subsection gets
+    computed again the next time the user is graded.
+    """
+    try:
+        course_key = CourseKey.from_string(kwargs['course_id'])
+        usage_key = UsageKey.from_string(kwargs['usage_id']).map_into_course(course_key)
+    except (KeyError, InvalidKeyError):
+        log.exception(
+            u"Failed to invalidate subsection grades for SCORE_CHANGED signal. course_id: %s, usage_id: %s",
+            kwargs.get('course_id'), kwargs.get('usage_id')
+        )
+        return
+    PersistentSubsectionGrade.invalidate_for_block(kwargs['user_id'], course_key, usage_key)
+
+
+@receiver(post_delete, sender=StudentModule)
+def student_module_deleted_handler(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the persisted grades depending on a StudentModule that was deleted,
+    e.g. when an instructor deletes the state of a student for a problem.
+    """
+    PersistentSubsectionGrade.invalidate_for_block(
+        instance.student_id,
+        instance.course_id,
+        instance.module_state_key.map_into_course(instance.course_id),
+    )
+
+
+@receiver(post_save, sender=CohortMembership)
+@receiver(post_delete, sender=CohortMembership)
+def cohort_membership_changed_handler(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the persisted grades of a user whose cohort changed, since it
+    can change the blocks of the course the user sees.
+    """
+    PersistentSubsectionGrade.invalidate(instance.user_id, instance.course_id)
+
+
+@receiver(post_save, sender=UserCourseTag)
+@receiver(post_delete, sender=UserCourseTag)
+def user_course_tag_changed_handler(sender, instance, **kwargs):  # pylint: disable=unused-argument
+    """
+    Invalidate the persisted grades of a user whose course tags changed, since
+    they hold the groups of the user in the partitions of the course, such as
+    the ones of content experiments.
+    """
+    PersistentSubsectionGrade.invalidate(instance.user_id, instance.course_id)
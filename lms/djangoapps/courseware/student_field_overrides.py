@@ -4,9 +4,13 @@ by the individual due dates feature.
 """
 import json
 
-from .field_overrides import FieldOverrideProvider
+import request_cache
+
+from .field_overrides import NOTSET, FieldOverrideProvider, clear_override_indexes
 from .models import StudentFieldOverride
 
+STUDENT_OVERRIDES_CACHE = "courseware.student_field_overrides"
+
 
 class IndividualStudentOverrideProvider(FieldOverrideProvider):
     """
@@ -29,31 +33,82 @@ def get_override_for_user(user, block, name, default=None):
     specify the block and the name of the field.  If the field is not
     overridden for the given user, returns `default`.
     """
+    if request_cache.get_request() is None:
+        block_overrides = _get_block_overrides_for_user(user, block)
+    else:
+        block_overrides = _get_overrides_for_user(user, block.runtime.course_id).get(_location_in_course(block), {})
+    if name in block_overrides:
+        return block.fields[name].from_json(block_overrides[name])
+    return default
+
+
+def _get_overrides_for_user(user, course_id):
+    """
+    Gets all of the individual student overrides for given user in the
+    course, in one query per request. Returns a dictionary mapping block
+    locations to dictionaries of serialized field override values keyed by
+    field name.
+    """
+    overrides_cache = request_cache.get_cache(STUDENT_OVERRIDES_CACHE)
+    cache_key = (user.id, course_id)
+    if cache_key not in overrides_cache:
+        overrides = {}
+        query = StudentFieldOverride.objects.filter(
+            course_id=course_id,
+            student_id=user.id,
+        )
+        for override in query:
+            location = override.location.map_into_course(course_id)
+            overrides.setdefault(location, {})[override.field] = json.loads(override.value)
+        overrides_cache[cache_key] = overrides
+    return overrides_cache[cache_key]
+
+
+def _get_block_overrides_for_user(user, block):
+    """
+    Gets the individual student overrides for given user and block, cached on
+    the block, for use outside of requests: only RequestCacheMiddleware clears
+    the request cache, so in celery tasks and management commands it would
+    keep serving overrides changed since. Returns a dictionary of serialized
+    field override values keyed by field name.
+    """
     if not hasattr(block, '_student_overrides'):
         block._student_overrides = {}  # pylint: disable=protected-access
     overrides = block._student_overrides.get(user.id)  # pylint: disable=protected-access
     if overrides is None:
-        overrides = _get_overrides_for_user(user, block)
+        query = StudentFieldOverride.objects.filter(
+            course_id=block.runtime.course_id,
+            location=block.location,
+            student_id=user.id,
+        )
+        overrides = {override.field: json.loads(override.value) for override in query}
         block._student_overrides[user.id] = overrides  # pylint: disable=protected-access
-    return overrides.get(name, default)
+    return overrides
 
 
-def _get_overrides_for_user(user, block):
+def _location_in_course(block):
     """
-    Gets all of the individual student overrides for given user and block.
-    Returns a dictionary of field override values keyed by field name.
+    Returns the location of the block in its course, as in the locations of
+    the overrides returned by _get_overrides_for_user.
     """
-    query = StudentFieldOverride.objects.filter(
-        course_id=block.runtime.course_id,
-        location=block.location,
-        student_id=user.id,
-    )
-    overrides = {}
-    for override in query:
-        field = block.fields[override.field]
-        value = field.from_json(json.loads(override.value))
-        overrides[override.field] = value
-    return overrides
+    return block.location.map_into_course(block.runtime.course_id)
+
+
+def _update_cached_override(user, block, name, value_json=NOTSET):
+    """
+    Updates the overrides of the user cached in this request, if any, with
+    the override of the field `name` in `block`, cleared when `value_json` is
+    NOTSET. The overrides cached on the block are dropped.
+    """
+    getattr(block, '_student_overrides', {}).pop(user.id, None)
+    overrides = request_cache.get_cache(STUDENT_OVERRIDES_CACHE).get((user.id, block.runtime.course_id))
+    if overrides is not None:
+        block_overrides = overrides.setdefault(_location_in_course(block), {})
+        if value_json is NOTSET:
+            block_overrides.pop(name, None)
+        else:
+            block_overrides[name] = value_json
+    clear_override_indexes()
 
 
 def override_field_for_user(user, block, name, value):
@@ -68,8 +123,10 @@ def override_field_for_user(user, block, name, value):
         student_id=user.id,
         field=name)
     field = block.fields[name]
-    override.value = json.dumps(field.to_json(value))
+    value_json = field.to_json(value)
+    override.value = json.dumps(value_json)
     override.save()
+    _update_cached_override(user, block, name, value_json)
 
 
 def clear_override_for_user(user, block, name):
@@ -87,3 +144,4 @@ def clear_override_for_user(user, block, name):
             field=name).delete()
     except StudentFieldOverride.DoesNotExist:
         pass
+    _update_cached_override(user, block, name)
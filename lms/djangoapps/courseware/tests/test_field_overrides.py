@@ -4,12 +4,15 @@ Tests for `field_overrides` module.
 import unittest
 from nose.plugins.attrib import attr
 
+from django.test.client import RequestFactory
 from django.test.utils import override_settings
+from request_cache.middleware import RequestCache
 from xblock.field_data import DictFieldData
 from xmodule.modulestore.tests.factories import CourseFactory
 from xmodule.modulestore.tests.django_utils import ModuleStoreTestCase
 
 from ..field_overrides import (
+    clear_override_indexes,
     disable_overrides,
     FieldOverrideProvider,
     OverrideFieldData,
@@ -87,6 +90,41 @@ class OverrideFieldDataTests(ModuleStoreTestCase):
         with disable_overrides():
             self.assertEqual(data.get('block', 'foo'), 'baz')
 
+    @override_settings(FIELD_OVERRIDE_PROVIDERS=(
+        'courseware.tests.test_field_overrides.TestInheritedOverrideProvider',))
+    def test_inherited_overrides_indexed(self):
+        RequestCache().process_request(RequestFactory().get('/'))
+        self.addCleanup(RequestCache.clear_request_cache)
+        TestInheritedOverrideProvider.lookups = []
+        course = TestBlock('course')
+        chapter = TestBlock('chapter', parent=course)
+        sequentials = [TestBlock('sequential{}'.format(index), parent=chapter) for index in range(3)]
+        for sequential in sequentials:
+            data = self.make_one()
+            self.assertFalse(data.has(sequential, 'due'))
+            self.assertEqual(data.default(sequential, 'due'), 'tomorrow')
+        # Each block's overrides are looked up once for all the field data.
+        self.assertEqual(
+            TestInheritedOverrideProvider.lookups,
+            ['sequential0', 'chapter', 'sequential1', 'sequential2'],
+        )
+
+        clear_override_indexes()
+        self.make_one().default(sequentials[0], 'due')
+        self.assertEqual(TestInheritedOverrideProvider.lookups[4:], ['chapter'])
+
+    @override_settings(FIELD_OVERRIDE_PROVIDERS=(
+        'courseware.tests.test_field_overrides.TestInheritedOverrideProvider',))
+    def test_index_not_shared_outside_requests(self):
+        TestInheritedOverrideProvider.lookups = []
+        sequential = TestBlock('sequential', parent=TestBlock('chapter'))
+        for __ in range(2):
+            data = self.make_one()
+            self.assertEqual(data.default(sequential, 'due'), 'tomorrow')
+            self.assertEqual(data.default(sequential, 'due'), 'tomorrow')
+        # Each field data has its own index.
+        self.assertEqual(TestInheritedOverrideProvider.lookups, ['chapter', 'chapter'])
+
     @override_settings(FIELD_OVERRIDE_PROVIDERS=())
     def test_no_overrides_configured(self):
         data = self.make_one()
@@ -132,6 +170,39 @@ class TestOverrideProvider(FieldOverrideProvider):
         return True
 
 
+class TestInheritedOverrideProvider(FieldOverrideProvider):
+    """
+    A `FieldOverrideProvider` for testing, which overrides the due date of
+    chapters and records the blocks it looks up.
+    """
+    lookups = []
+
+    def get(self, block, name, default):
+        self.lookups.append(block.location)
+        if name == 'due' and block.location == 'chapter':
+            return 'tomorrow'
+        return default
+
+    @classmethod
+    def enabled_for(cls, course):
+        return True
+
+
+class TestBlock(object):
+    """
+    A block for testing, with just a location and a parent.
+    """
+    def __init__(self, location, parent=None):
+        self.location = location
+        self.parent = parent
+
+    def get_parent(self):
+        """
+        Returns the parent of the block.
+        """
+        return self.parent
+
+
 def inject_field_overrides(blocks, course, user):
     """
     Apparently the test harness doesn't use LmsFieldStorage, and I'm
@@ -5,6 +5,7 @@ from django.http import Http404
 from django.test import TestCase
 from django.test.client import RequestFactory
 
+from django.conf import settings
 from mock import patch, MagicMock
 from nose.plugins.attrib import attr
 from opaque_keys.edx.locations import SlashSeparatedCourseKey
@@ -14,12 +15,19 @@ from courseware.grades import (
     field_data_cache_for_grading,
     grade,
     iterate_grades_for,
+    iterate_grades_in_batches,
     MaxScoresCache,
     ProgressSummary,
-    get_module_score
+    get_module_score,
+    progress_summary,
+    score_subsection,
+    SubsectionGradeStore,
 )
 from courseware.module_render import get_module
-from courseware.model_data import FieldDataCache, set_score
+from courseware.model_data import FieldDataCache, ScoresClient, set_score
+from courseware.models import PersistentSubsectionGrade, StudentModule
+from openedx.core.djangoapps.user_api.models import UserCourseTag
+from courseware.user_state_client import DjangoXBlockUserStateClient
 from courseware.tests.helpers import (
     LoginEnrollmentTestCase,
     get_request_for_user
@@ -483,6 +491,245 @@ class TestGetModuleScore(LoginEnrollmentTestCase, SharedModuleStoreTestCase):
         self.assertEqual(score, 1.0)
 
 
+@attr('shard_1')
+class TestBatchGradeIteration(SharedModuleStoreTestCase):
+    """
+    Test that grading students in batches gives the same gradesets as one by one.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestBatchGradeIteration, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+        sequentials = [
+            ItemFactory.create(
+                parent=chapter, category='sequential', display_name="Test Sequential", graded=True, format='Homework'
+            )
+            for __ in range(2)
+        ]
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        cls.problems = [
+            ItemFactory.create(
+                parent=ItemFactory.create(parent=sequential, category='vertical'),
+                category="problem",
+                display_name="Test Problem",
+                data=problem_xml
+            )
+            for sequential in sequentials
+            for __ in range(2)
+        ]
+
+    def setUp(self):
+        super(TestBatchGradeIteration, self).setUp()
+        self.students = [UserFactory.create() for __ in range(5)]
+        for student in self.students:
+            CourseEnrollment.enroll(student, self.course.id)
+        # Give the students different scores, leaving the last one without any.
+        for index, student in enumerate(self.students[:-1]):
+            for problem in self.problems[:index + 1]:
+                set_score(student.id, problem.location, index % 2, 1)
+
+    def assert_same_gradesets(self, **kwargs):
+        """
+        Asserts that iterate_grades_in_batches and iterate_grades_for yield the same results.
+        """
+        expected = list(iterate_grades_for(self.course.id, self.students, keep_raw_scores=True))
+        actual = list(iterate_grades_in_batches(self.course.id, self.students, keep_raw_scores=True, **kwargs))
+        self.assertEqual(actual, expected)
+        self.assertTrue(all(gradeset for __, gradeset, __ in actual))
+
+    def test_same_gradesets(self):
+        self.assert_same_gradesets(batch_size=2)
+
+    def test_one_batch(self):
+        self.assert_same_gradesets(batch_size=10)
+
+    def test_empty_student_list(self):
+        self.assertEqual(list(iterate_grades_in_batches(self.course.id, [])), [])
+
+    def test_state_fetched_per_batch(self):
+        get_many_for_users = patch.object(
+            DjangoXBlockUserStateClient, 'get_many_for_users',
+            autospec=True, side_effect=DjangoXBlockUserStateClient.get_many_for_users,
+        )
+        iter_for_users = patch.object(ScoresClient, 'iter_for_users', wraps=ScoresClient.iter_for_users)
+        with get_many_for_users as mock_get_many_for_users, iter_for_users as mock_iter_for_users:
+            list(iterate_grades_in_batches(self.course.id, self.students, batch_size=2))
+        self.assertEqual(mock_get_many_for_users.call_count, 3)
+        self.assertEqual(mock_iter_for_users.call_count, 3)
+
+    @patch('courseware.grades.grade', side_effect=Exception('Grading failed'))
+    def test_grading_exception(self, __):
+        results = list(iterate_grades_in_batches(self.course.id, self.students))
+        self.assertEqual(results, [(student, {}, 'Grading failed') for student in self.students])
+
+
+@attr('shard_1')
+@patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_SUBSECTION_GRADES': True})
+class TestPersistentSubsectionGrades(SharedModuleStoreTestCase):
+    """
+    Test that grading reuses the persisted grades of subsections whose scores didn't change.
+    """
+    @classmethod
+    def setUpClass(cls):
+        super(TestPersistentSubsectionGrades, cls).setUpClass()
+        cls.course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=cls.course, category="chapter", display_name="Test Chapter")
+        cls.sequentials = [
+            ItemFactory.create(
+                parent=chapter, category='sequential', display_name="Test Sequential", graded=True, format='Homework'
+            )
+            for __ in range(2)
+        ]
+        problem_xml = MultipleChoiceResponseXMLFactory().build_xml(
+            question_text='The correct answer is Choice 3',
+            choices=[False, False, True, False],
+            choice_names=['choice_0', 'choice_1', 'choice_2', 'choice_3']
+        )
+        cls.problems = [
+            ItemFactory.create(
+                parent=ItemFactory.create(parent=sequential, category='vertical'),
+                category="problem",
+                display_name="Test Problem",
+                data=problem_xml
+            )
+            for sequential in cls.sequentials
+        ]
+
+    def setUp(self):
+        super(TestPersistentSubsectionGrades, self).setUp()
+        self.request = get_request_for_user(UserFactory())
+        CourseEnrollment.enroll(self.request.user, self.course.id)
+        answer_problem(self.course, self.request, self.problems[0])
+        answer_problem(self.course, self.request, self.problems[1], 0)
+
+    def grade(self):
+        """
+        Returns the grade of the user, and how many subsections had to be scored.
+        """
+        with patch('courseware.grades.score_subsection', wraps=score_subsection) as mock_score:
+            grade_summary = grade(self.request.user, self.request, self.course, keep_raw_scores=True)
+        return grade_summary, mock_score.call_count
+
+    def persisted_subsections(self):
+        """
+        Returns the locations of the subsections with persisted grades that
+        weren't invalidated.
+        """
+        return set(
+            grade.usage_key.map_into_course(self.course.id)
+            for grade in PersistentSubsectionGrade.objects.filter(user=self.request.user).exclude(course_version=u'')
+        )
+
+    def test_grades_reused(self):
+        grade_summary, scored = self.grade()
+        self.assertEqual(scored, 2)
+        self.assertEqual(grade_summary['percent'], 0.5)
+        self.assertEqual(self.persisted_subsections(), {sequential.location for sequential in self.sequentials})
+
+        self.assertEqual(self.grade(), (grade_summary, 0))
+
+    def test_score_change(self):
+        self.grade()
+        answer_problem(self.course, self.request, self.problems[1])
+        self.assertEqual(self.persisted_subsections(), {self.sequentials[0].location})
+
+        grade_summary, scored = self.grade()
+        self.assertEqual(scored, 1)
+        self.assertEqual(grade_summary['percent'], 1.0)
+
+    def test_state_deleted(self):
+        self.grade()
+        StudentModule.objects.get(
+            student=self.request.user, module_state_key=self.problems[0].location
+        ).delete()
+        self.assertEqual(self.persisted_subsections(), {self.sequentials[1].location})
+
+    def test_other_course_version(self):
+        self.grade()
+        PersistentSubsectionGrade.objects.update(course_version='2015-01-01T00:00:00+00:00')
+        self.assertEqual(self.grade()[1], 2)
+
+    def test_progress_summary(self):
+        with patch('courseware.grades.score_subsection', wraps=score_subsection) as mock_score:
+            expected = progress_summary(self.request.user, self.request, self.course)
+            self.assertEqual(mock_score.call_count, 2)
+            self.assertEqual(progress_summary(self.request.user, self.request, self.course), expected)
+            self.assertEqual(mock_score.call_count, 2)
+
+        self.assertEqual(self.grade()[1], 0)
+
+    def test_progress_page(self):
+        # Student state is loaded once, for both the progress summary and the grade.
+        with patch('courseware.grades.field_data_cache_for_grading', wraps=field_data_cache_for_grading) as mock_load:
+            store = SubsectionGradeStore(self.request.user, self.course)
+            progress_summary(self.request.user, self.request, self.course, grade_store=store)
+            grade(self.request.user, self.request, self.course, grade_store=store)
+        self.assertEqual(mock_load.call_count, 1)
+        self.assertEqual(self.persisted_subsections(), {sequential.location for sequential in self.sequentials})
+
+        # It isn't loaded at all once every subsection has persisted grades.
+        with patch('courseware.grades.field_data_cache_for_grading') as mock_load:
+            with patch('courseware.grades.score_subsection') as mock_score:
+                store = SubsectionGradeStore(self.request.user, self.course)
+                progress_summary(self.request.user, self.request, self.course, grade_store=store)
+                grade_summary = grade(self.request.user, self.request, self.course, grade_store=store)
+        self.assertFalse(mock_load.called)
+        self.assertFalse(mock_score.called)
+        self.assertEqual(grade_summary['percent'], 0.5)
+
+    def test_access_checked_on_read(self):
+        self.grade()
+        with patch('courseware.grades.has_access', return_value=False):
+            grade_summary, scored = self.grade()
+        self.assertEqual(scored, 0)
+        self.assertEqual(grade_summary['percent'], 0.0)
+
+    def test_course_tag_change(self):
+        self.grade()
+        UserCourseTag.objects.create(
+            user=self.request.user, course_id=self.course.id, key='xblock.partition_service.partition_0', value='1'
+        )
+        self.assertEqual(self.persisted_subsections(), set())
+
+    def test_not_saved_after_invalidation(self):
+        store = SubsectionGradeStore(self.request.user, self.course)
+        PersistentSubsectionGrade.invalidate(self.request.user.id, self.course.id, self.sequentials[0].location)
+        store.save(self.sequentials[0].location, [], True)
+        self.assertEqual(self.persisted_subsections(), set())
+
+        self.grade()
+        store = SubsectionGradeStore(self.request.user, self.course)
+        answer_problem(self.course, self.request, self.problems[0], 0)
+        store.save(self.sequentials[0].location, [], True)
+        self.assertEqual(self.persisted_subsections(), {self.sequentials[1].location})
+
+    def test_read_only_with_preloaded_scores(self):
+        field_data_cache = field_data_cache_for_grading(self.course, self.request.user)
+        grade(self.request.user, self.request, self.course, field_data_cache=field_data_cache)
+        self.assertEqual(self.persisted_subsections(), set())
+
+    @patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_SUBSECTION_GRADES': False})
+    def test_disabled(self):
+        self.grade()
+        self.assertEqual(self.persisted_subsections(), set())
+
+    def test_not_invalidated_when_disabled(self):
+        self.grade()
+        with patch.dict(settings.FEATURES, {'ENABLE_PERSISTENT_SUBSECTION_GRADES': False}):
+            with patch('courseware.models._subsection_location') as mock_subsection_location:
+                with self.assertNumQueries(0):
+                    PersistentSubsectionGrade.invalidate_for_block(
+                        self.request.user.id, self.course.id, self.problems[0].location
+                    )
+        self.assertFalse(mock_subsection_location.called)
+        self.assertEqual(self.persisted_subsections(), {sequential.location for sequential in self.sequentials})
+
+
 def answer_problem(course, request, problem, score=1):
     """
     Records a correct answer for the given problem.
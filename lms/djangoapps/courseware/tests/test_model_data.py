@@ -6,7 +6,7 @@ from mock import Mock, patch
 from nose.plugins.attrib import attr
 from functools import partial
 
-from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError
+from courseware.model_data import DjangoKeyValueStore, FieldDataCache, InvalidScopeError, ScoresClient
 from courseware.models import StudentModule, XModuleUserStateSummaryField
 from courseware.models import XModuleStudentInfoField, XModuleStudentPrefsField
 
@@ -415,3 +415,28 @@ class TestStudentInfoStorage(OtherUserFailureTestMixin, StorageTestBase, TestCas
     storage_class = XModuleStudentInfoField
     other_key_factory = partial(DjangoKeyValueStore.Key, Scope.user_info, 2, 'mock_problem')  # user_id=2, not 1
     existing_field_name = "existing_field"
+
+
+@attr('shard_1')
+class TestScoresClientForUsers(TestCase):
+    """Tests for ScoresClient.iter_for_users"""
+    def setUp(self):
+        super(TestScoresClientForUsers, self).setUp()
+        self.users = [UserFactory.create(username='user{}'.format(index)) for index in range(3)]
+        for index, user in enumerate(self.users[:2]):
+            StudentModuleFactory.create(student=user, grade=index, max_grade=2)
+        StudentModuleFactory.create(student=self.users[0], module_state_key=location('other_id'), grade=1, max_grade=1)
+
+    def test_iter_for_users(self):
+        user_ids = [user.id for user in self.users]
+        with self.assertNumQueries(2):
+            results = list(ScoresClient.iter_for_users(
+                course_id, iter(user_ids), [location('usage_id'), location('missing_id')], batch_size=2
+            ))
+
+        self.assertEqual([user_id for user_id, __ in results], user_ids)
+        scores_clients = dict(results)
+        self.assertEqual(scores_clients[self.users[0].id].get(location('usage_id')), ScoresClient.Score(0, 2))
+        self.assertEqual(scores_clients[self.users[1].id].get(location('usage_id')), ScoresClient.Score(1, 2))
+        self.assertIsNone(scores_clients[self.users[0].id].get(location('other_id')))
+        self.assertIsNone(scores_clients[self.users[2].id].get(location('usage_id')))
@@ -4,13 +4,14 @@ defined in edx_user_state_client.
 """
 
 from collections import defaultdict
+import json
 from unittest import skip
 
 from django.test import TestCase
 
 from edx_user_state_client.tests import UserStateClientTestBase
 from courseware.user_state_client import DjangoXBlockUserStateClient
-from courseware.tests.factories import UserFactory
+from courseware.tests.factories import StudentModuleFactory, UserFactory, course_id, location
 
 
 class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
@@ -65,3 +66,39 @@ class TestDjangoUserStateClient(UserStateClientTestBase, TestCase):
     @skip("Not supported by DjangoXBlockUserStateClient")
     def test_iter_course_many_users(self):
         pass
+
+
+class TestDjangoUserStateClientForUsers(TestCase):
+    """
+    Tests of DjangoXBlockUserStateClient.get_many_for_users.
+    """
+    def setUp(self):
+        super(TestDjangoUserStateClientForUsers, self).setUp()
+        self.client = DjangoXBlockUserStateClient()
+        self.users = [UserFactory.create() for __ in range(3)]
+        self.block_keys = [location('block{}'.format(index)) for index in range(2)]
+        for index, user in enumerate(self.users[:2]):
+            StudentModuleFactory.create(
+                student=user, course_id=course_id, module_state_key=self.block_keys[0],
+                state=json.dumps({'attempts': index, 'done': True}),
+            )
+        StudentModuleFactory.create(
+            student=self.users[0], course_id=course_id, module_state_key=self.block_keys[1], state='{}',
+        )
+
+    def test_get_many_for_users(self):
+        user_ids = [user.id for user in self.users]
+        with self.assertNumQueries(4):
+            results = list(self.client.get_many_for_users(iter(user_ids), self.block_keys, batch_size=2))
+
+        self.assertEqual([user_id for user_id, __ in results], user_ids)
+        block_states = dict(results)
+        self.assertEqual(block_states[self.users[0].id].keys(), [self.block_keys[0]])
+        self.assertEqual(block_states[self.users[0].id][self.block_keys[0]].state, {'attempts': 0, 'done': True})
+        self.assertEqual(block_states[self.users[0].id][self.block_keys[0]].username, self.users[0].username)
+        self.assertEqual(block_states[self.users[1].id][self.block_keys[0]].state, {'attempts': 1, 'done': True})
+        self.assertEqual(block_states[self.users[2].id], {})
+
+    def test_get_many_for_users_fields(self):
+        block_states = dict(self.client.get_many_for_users([self.users[1].id], self.block_keys, fields=['attempts']))
+        self.assertEqual(block_states[self.users[1].id][self.block_keys[0]].state, {'attempts': 1})
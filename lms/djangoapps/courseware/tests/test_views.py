@@ -1322,6 +1322,88 @@ class TestIndexView(ModuleStoreTestCase):
         response = views.index(request, unicode(course.id), chapter=chapter.url_name, section=section.url_name)
         self.assertIn("Activate Block ID: test_block_id", response.content)
 
+    def _create_lazy_sequence(self, user, **section_kwargs):
+        """
+        Creates a course with a sequence of three units, enrolls the user in it,
+        and returns the course, chapter and sequence.
+        """
+        course = CourseFactory.create()
+        chapter = ItemFactory.create(parent=course, category='chapter')
+        section = ItemFactory.create(parent=chapter, category='sequential', display_name="Sequence", **section_kwargs)
+        for index in range(3):
+            vertical = ItemFactory.create(parent=section, category='vertical', display_name="Vertical")
+            ItemFactory.create(parent=vertical, category='html', data="UnitContent{}".format(index))
+
+        CourseEnrollmentFactory(user=user, course_id=course.id)
+        return course, chapter, section
+
+    def _render_unit_url(self, course, section):
+        """
+        Returns the url of the render_unit dispatch of the sequence.
+        """
+        return reverse(
+            'xblock_handler',
+            kwargs={
+                'course_id': unicode(course.id),
+                'usage_id': unicode(section.location),
+                'handler': 'xmodule_handler',
+                'suffix': 'render_unit',
+            }
+        )
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_LAZY_SEQUENCE_UNITS': True})
+    def test_lazy_sequence_units(self):
+        user = UserFactory()
+        course, chapter, section = self._create_lazy_sequence(user)
+
+        request = RequestFactory().get(
+            reverse(
+                'courseware_section',
+                kwargs={
+                    'course_id': unicode(course.id),
+                    'chapter': chapter.url_name,
+                    'section': section.url_name,
+                }
+            )
+        )
+        request.user = user
+        mako_middleware_process_request(request)
+
+        # Only the unit at the current position is rendered with the page.
+        response = views.index(request, unicode(course.id), chapter=chapter.url_name, section=section.url_name)
+        self.assertIn("UnitContent0", response.content)
+        self.assertNotIn("UnitContent1", response.content)
+        self.assertEqual(response.content.count('data-lazy="true"'), 2)
+
+        # The others are rendered on demand.
+        self.client.login(username=user.username, password='test')
+        render_unit_url = self._render_unit_url(course, section)
+        response = self.client.post(render_unit_url, {'position': '2'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("UnitContent1", json.loads(response.content)['html'])
+
+        response = self.client.post(render_unit_url, {'position': '4'})
+        self.assertEqual(response.status_code, 404)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_LAZY_SEQUENCE_UNITS': False})
+    def test_render_unit_needs_lazy_units(self):
+        user = UserFactory()
+        course, __, section = self._create_lazy_sequence(user)
+
+        self.client.login(username=user.username, password='test')
+        response = self.client.post(self._render_unit_url(course, section), {'position': '2'})
+        self.assertEqual(response.status_code, 404)
+
+    @patch.dict('django.conf.settings.FEATURES', {'ENABLE_LAZY_SEQUENCE_UNITS': True})
+    @patch('xmodule.seq_module.SequenceModule._time_limited_student_view', return_value='Start the exam')
+    def test_render_unit_of_unstarted_exam(self, _time_limited_student_view):
+        user = UserFactory()
+        course, __, section = self._create_lazy_sequence(user, is_time_limited=True)
+
+        self.client.login(username=user.username, password='test')
+        response = self.client.post(self._render_unit_url(course, section), {'position': '2'})
+        self.assertEqual(response.status_code, 404)
+
 
 class TestIndexViewWithGating(ModuleStoreTestCase, MilestonesTestCaseMixin):
     """
@@ -3,6 +3,7 @@ An implementation of :class:`XBlockUserStateClient`, which stores XBlock Scope.u
 data in a Django ORM model.
 """
 
+from collections import defaultdict
 import itertools
 from operator import attrgetter
 from time import time
@@ -15,10 +16,14 @@ except ImportError:
 import dogstats_wrapper as dog_stats_api
 from django.contrib.auth.models import User
 from xblock.fields import Scope, ScopeBase
-from courseware.models import StudentModule, StudentModuleHistory
+from courseware.models import StudentModule, StudentModuleHistory, iter_chunks
 from edx_user_state_client.interface import XBlockUserStateClient, XBlockUserState
 
 
+# Number of users whose state is fetched together by get_many_for_users.
+USER_STATE_BATCH_SIZE = 100
+
+
 class DjangoXBlockUserStateClient(XBlockUserStateClient):
     """
     An interface that uses the Django ORM StudentModule as a backend.
@@ -77,6 +82,18 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             username (str): The name of the user to load `StudentModule`s for.
             block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
         """
+        return self._filter_student_modules(block_keys, student__username=username)
+
+    def _filter_student_modules(self, block_keys, **student_filter):
+        """
+        Retrieve the :class:`~StudentModule`s for the supplied ``block_keys`` of the
+        students selected by ``student_filter``.
+
+        Arguments:
+            block_keys (list of :class:`~UsageKey`): The set of XBlocks to load data for.
+            student_filter: The keyword arguments of StudentModule.objects.filter selecting
+                the students to load `StudentModule`s for.
+        """
         course_key_func = attrgetter('course_key')
         by_course = itertools.groupby(
             sorted(block_keys, key=course_key_func),
@@ -87,8 +104,8 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
             query = StudentModule.objects.chunked_filter(
                 'module_state_key__in',
                 usage_keys,
-                student__username=username,
                 course_id=course_key,
+                **student_filter
             )
 
             for student_module in query:
@@ -169,6 +186,53 @@ class DjangoXBlockUserStateClient(XBlockUserStateClient):
         self._ddog_histogram(evt_time, 'get_many.blks_out', block_count)
         self._ddog_histogram(evt_time, 'get_many.response_time', (finish_time - evt_time) * 1000)
 
+    def get_many_for_users(self, user_ids, block_keys, scope=Scope.user_state, fields=None,
+                           batch_size=USER_STATE_BATCH_SIZE):
+        """
+        Retrieve the stored XBlock state of the specified XBlock usages for many users.
+
+        The state of `batch_size` users is fetched together, so only one batch
+        of state is held in memory while user_ids is iterated.
+
+        Arguments:
+            user_ids: The ids of the users whose state should be retrieved
+            block_keys ([UsageKey]): A list of UsageKeys identifying which xblock states to load.
+            scope (Scope): The scope to load data from
+            fields: A list of field values to retrieve. If None, retrieve all stored fields.
+            batch_size (int): The number of users whose state is fetched together.
+
+        Yields:
+            (user_id, block_states) for each of user_ids, in order, where block_states is
+            a dict mapping the UsageKeys of the user's stored states to XBlockUserState tuples.
+        """
+        if scope != Scope.user_state:
+            raise ValueError("Only Scope.user_state is supported, not {}".format(scope))
+
+        for user_ids_batch in iter_chunks(user_ids, batch_size):
+            usernames = dict(User.objects.filter(id__in=user_ids_batch).values_list('id', 'username'))
+            block_states = defaultdict(dict)
+            for module, usage_key in self._filter_student_modules(block_keys, student_id__in=user_ids_batch):
+                if module.state is None:
+                    continue
+
+                # Follow get_many for deleted states and the fields to retrieve.
+                state = json.loads(module.state)
+                if state == {}:
+                    continue
+
+                if fields is not None:
+                    state = {
+                        field: state[field]
+                        for field in fields
+                        if field in state
+                    }
+                block_states[module.student_id][usage_key] = XBlockUserState(
+                    usernames.get(module.student_id), usage_key, state, module.modified, scope
+                )
+
+            for user_id in user_ids_batch:
+                yield user_id, block_states[user_id]
+
     def set_many(self, username, block_keys_to_state, scope=Scope.user_state):
         """
         Set fields for a particular XBlock.
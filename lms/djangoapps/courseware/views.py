@@ -58,7 +58,7 @@ from courseware.courses import (
     UserNotEnrolled
 )
 from courseware.masquerade import setup_masquerade
-from courseware.model_data import FieldDataCache, ScoresClient
+from courseware.model_data import FieldDataCache
 from courseware.models import StudentModuleHistory
 from courseware.url_helpers import get_redirect_url
 from courseware.user_state_client import DjangoXBlockUserStateClient
@@ -549,7 +549,10 @@ def _index_bulk_op(request, course_key, chapter, section, position):
 
             # Save where we are in the chapter.
             save_child_position(chapter_module, section)
-            section_render_context = {'activate_block_id': request.GET.get('activate_block_id')}
+            section_render_context = {
+                'activate_block_id': request.GET.get('activate_block_id'),
+                'lazy_units': settings.FEATURES.get('ENABLE_LAZY_SEQUENCE_UNITS', False),
+            }
             context['fragment'] = section_module.render(STUDENT_VIEW, section_render_context)
             context['section_title'] = section_descriptor.display_name_with_default_escaped
         else:
@@ -1020,16 +1023,13 @@ def _progress(request, course_key, student_id):
     # additional DB lookup (this kills the Progress page in particular).
     student = User.objects.prefetch_related("groups").get(id=student.id)
 
+    # Student state is only loaded for the subsections without persisted grades,
+    # once for both the progress summary and the grade.
     with outer_atomic():
-        field_data_cache = grades.field_data_cache_for_grading(course, student)
-        scores_client = ScoresClient.from_field_data_cache(field_data_cache)
+        grade_store = grades.SubsectionGradeStore(student, course)
 
-    courseware_summary = grades.progress_summary(
-        student, request, course, field_data_cache=field_data_cache, scores_client=scores_client
-    )
-    grade_summary = grades.grade(
-        student, request, course, field_data_cache=field_data_cache, scores_client=scores_client
-    )
+    courseware_summary = grades.progress_summary(student, request, course, grade_store=grade_store)
+    grade_summary = grades.grade(student, request, course, grade_store=grade_store)
     studio_url = get_studio_url(course, 'settings/grading')
 
     if courseware_summary is None:
@@ -1091,6 +1091,62 @@ class ContentGroupCategoryMapTestCase(CategoryMapTestMixin, ContentGroupTestCase
         )
 
 
+@attr('shard_1')
+class DiscussionModulesDataTestCase(ModuleStoreTestCase):
+    """
+    Tests the data of the discussion modules of a course, cached per
+    version of the course.
+    """
+    def setUp(self):
+        super(DiscussionModulesDataTestCase, self).setUp(create_user=True)
+        self.course = CourseFactory.create(
+            default_store=ModuleStoreEnum.Type.split,
+            start=datetime.datetime(2012, 2, 3, tzinfo=UTC),
+            discussion_topics={},
+        )
+        self.staff_user = UserFactory.create(is_staff=True)
+        self.create_discussion("discussion1", "Discussion 1")
+        self.create_discussion("discussion2", "Staff Discussion", visible_to_staff_only=True)
+
+    def create_discussion(self, discussion_id, discussion_target, **kwargs):
+        """
+        Creates a discussion module in the "Chapter" category.
+        """
+        return ItemFactory.create(
+            parent_location=self.course.location,
+            category="discussion",
+            discussion_id=discussion_id,
+            discussion_category="Chapter",
+            discussion_target=discussion_target,
+            **kwargs
+        )
+
+    def get_children(self, user):
+        """
+        Returns the titles of the discussions of the "Chapter" category
+        accessible to the given user.
+        """
+        return utils.get_discussion_category_map(self.course, user)["subcategories"]["Chapter"]["children"]
+
+    def test_cached_per_course_version(self):
+        with mock.patch.object(
+            utils, 'get_accessible_discussion_modules', wraps=utils.get_accessible_discussion_modules
+        ) as mock_get_modules:
+            self.assertEqual(self.get_children(self.user), ["Discussion 1"])
+            self.assertEqual(self.get_children(self.staff_user), ["Discussion 1", "Staff Discussion"])
+            self.assertEqual(mock_get_modules.call_count, 1)
+
+            self.create_discussion("discussion3", "Discussion 3")
+            self.assertEqual(self.get_children(self.user), ["Discussion 1", "Discussion 3"])
+            self.assertEqual(mock_get_modules.call_count, 2)
+
+    def test_accessible_modules_data(self):
+        self.assertEqual(
+            [module_data["id"] for module_data in utils.get_accessible_discussion_modules_data(self.course, self.user)],
+            [module.discussion_id for module in utils.get_accessible_discussion_modules(self.course, self.user)],
+        )
+
+
 class JsonResponseTestCase(TestCase, UnicodeTestMixin):
     def _test_unicode_data(self, text):
         response = utils.JsonResponse(text)
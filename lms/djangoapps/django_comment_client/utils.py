@@ -6,23 +6,27 @@ from django.conf import settings
 
 import pytz
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.core.urlresolvers import reverse
 from django.db import connection
 from django.http import HttpResponse
 from django.utils.timezone import UTC
 import pystache_custom as pystache
+from ccx_keys.locator import CCXLocator
 from opaque_keys.edx.locations import i4xEncoder
 from opaque_keys.edx.keys import CourseKey
 from xmodule.modulestore.django import modulestore
+from xmodule.partitions.partitions import NoSuchUserPartitionError
 from lms.djangoapps.ccx.overrides import get_current_ccx
 
 from django_comment_common.models import Role, FORUM_ROLE_STUDENT
 from django_comment_client.permissions import check_permissions_by_view, has_permission, get_team
-from django_comment_client.settings import MAX_COMMENT_DEPTH
+from django_comment_client.settings import DISCUSSION_MODULES_CACHE_TIMEOUT, MAX_COMMENT_DEPTH
 from edxmako import lookup_template
 
 from courseware import courses
-from courseware.access import has_access
+from courseware.access import has_access, _has_group_access
+from courseware.access_utils import check_start_date
 from openedx.core.djangoapps.content.course_structures.models import CourseStructure
 from openedx.core.djangoapps.course_groups.cohorts import (
     get_course_cohort_settings, get_cohort_by_id, get_cohort_id, is_course_cohorted
@@ -137,6 +141,120 @@ def get_accessible_discussion_modules(course, user, include_all=False):  # pylin
     ]
 
 
+def get_discussion_module_data(module):
+    """
+    Returns the data of the given discussion module which doesn't depend on
+    the user: what get_discussion_category_map shows of it, and what
+    has_access checks to load it.
+    """
+    return {
+        "id": module.discussion_id,
+        "title": module.discussion_target,
+        "sort_key": module.sort_key,
+        "category": " / ".join([x.strip() for x in module.discussion_category.split("/")]),
+        "start": module.start,
+        "days_early_for_beta": module.days_early_for_beta,
+        "visible_to_staff_only": module.visible_to_staff_only,
+        "merged_group_access": module.merged_group_access,
+        "detached": 'detached' in module._class_tags,  # pylint: disable=protected-access
+    }
+
+
+def _get_discussion_modules_cache_key(course):
+    """
+    Returns the cache key of the data of the discussion modules in the
+    current version of the given course, or None if it can't be cached.
+    """
+    # CCX field overrides change without a new version of the course.
+    if isinstance(course.id, CCXLocator):
+        return None
+    version = modulestore().get_course_version(course.id)
+    if version is None:
+        return None
+    return u"django_comment_client.discussion_modules.{}.{}".format(course.id, version)
+
+
+def get_discussion_modules_data(course):
+    """
+    Returns the data of all valid discussion modules in this course, as
+    returned by get_discussion_module_data.
+
+    The data is cached per version of the course, so that the discussion
+    modules are only loaded from the modulestore once per publish of a
+    versioned course.
+    """
+    cache_key = _get_discussion_modules_cache_key(course)
+    modules_data = cache.get(cache_key) if cache_key else None
+    if modules_data is None:
+        modules_data = [
+            get_discussion_module_data(module)
+            for module in get_accessible_discussion_modules(course, None, include_all=True)
+        ]
+        if cache_key:
+            cache.set(cache_key, modules_data, DISCUSSION_MODULES_CACHE_TIMEOUT)
+    return modules_data
+
+
+class _DiscussionModuleGroupAccess(object):
+    """
+    Provides the fields of a discussion module checked by _has_group_access,
+    from the data returned by get_discussion_module_data.
+    """
+    def __init__(self, course, module_data):
+        self.location = course.location
+        self.user_partitions = course.user_partitions
+        self.merged_group_access = module_data["merged_group_access"]
+
+    def _get_user_partition(self, user_partition_id):
+        """
+        Returns the user partition with the specified id. Raises
+        `NoSuchUserPartitionError` if the lookup fails.
+        """
+        for user_partition in self.user_partitions:
+            if user_partition.id == user_partition_id:
+                return user_partition
+        raise NoSuchUserPartitionError("could not find a UserPartition with ID [{}]".format(user_partition_id))
+
+
+def get_accessible_discussion_modules_data(course, user):  # pylint: disable=invalid-name
+    """
+    Returns the data of the valid discussion modules in this course that are
+    accessible to the given user, as returned by get_discussion_module_data.
+
+    This checks the same as has_access(user, 'load', module), but once for
+    all the modules with the same visibility, start date and group access,
+    and without loading any of them from the modulestore.
+    """
+    if has_access(user, 'staff', course):
+        return get_discussion_modules_data(course)
+
+    access_by_rules = {}
+
+    def can_load(module_data):
+        """
+        Returns whether the user can load the module with the given data.
+        """
+        rules = (
+            module_data["visible_to_staff_only"],
+            module_data["detached"],
+            module_data["start"],
+            module_data["days_early_for_beta"],
+            repr(sorted(module_data["merged_group_access"].items())),
+        )
+        if rules not in access_by_rules:
+            access_by_rules[rules] = bool(
+                not module_data["visible_to_staff_only"]
+                and _has_group_access(_DiscussionModuleGroupAccess(course, module_data), user, course.id)
+                and (
+                    module_data["detached"] or
+                    check_start_date(user, module_data["days_early_for_beta"], module_data["start"], course.id)
+                )
+            )
+        return access_by_rules[rules]
+
+    return [module_data for module_data in get_discussion_modules_data(course) if can_load(module_data)]
+
+
 def get_discussion_id_map_entry(module):
     """
     Returns a tuple of (discussion_id, metadata) suitable for inclusion in the results of get_discussion_id_map().
@@ -301,18 +419,19 @@ def get_discussion_category_map(course, user, cohorted_if_in_list=False, exclude
     """
     unexpanded_category_map = defaultdict(list)
 
-    modules = get_accessible_discussion_modules(course, user)
+    modules_data = get_accessible_discussion_modules_data(course, user)
 
     course_cohort_settings = get_course_cohort_settings(course.id)
 
-    for module in modules:
-        id = module.discussion_id
-        title = module.discussion_target
-        sort_key = module.sort_key
-        category = " / ".join([x.strip() for x in module.discussion_category.split("/")])
+    for module_data in modules_data:
         # Handle case where module.start is None
-        entry_start_date = module.start if module.start else datetime.max.replace(tzinfo=pytz.UTC)
-        unexpanded_category_map[category].append({"title": title, "id": id, "sort_key": sort_key, "start_date": entry_start_date})
+        entry_start_date = module_data["start"] if module_data["start"] else datetime.max.replace(tzinfo=pytz.UTC)
+        unexpanded_category_map[module_data["category"]].append({
+            "title": module_data["title"],
+            "id": module_data["id"],
+            "sort_key": module_data["sort_key"],
+            "start_date": entry_start_date,
+        })
 
     category_map = {"entries": defaultdict(dict), "subcategories": defaultdict(dict)}
     for category_path, entries in unexpanded_category_map.items():
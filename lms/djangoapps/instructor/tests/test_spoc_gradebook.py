@@ -3,12 +3,14 @@ Tests of the instructor dashboard spoc gradebook
 """
 
 from django.core.urlresolvers import reverse
+from mock import patch
 from nose.plugins.attrib import attr
 from xmodule.modulestore.tests.factories import CourseFactory, ItemFactory
 from student.tests.factories import UserFactory, CourseEnrollmentFactory, AdminFactory
 from xmodule.modulestore.tests.django_utils import SharedModuleStoreTestCase
 from capa.tests.response_xml_factory import StringResponseXMLFactory
 from courseware.tests.factories import StudentModuleFactory
+from courseware.user_state_client import DjangoXBlockUserStateClient
 
 
 USER_COUNT = 11
@@ -169,3 +171,18 @@ class TestLetterCutoffPolicy(TestGradebook):
         # User 0 has 0 on the class [1]
         # One use at the top of the page [1]
         self.assertEquals(3, self.response.content.count('grade_None'))
+
+
+@attr('shard_1')
+class TestGradebookBatchGrading(TestGradebook):
+    """
+    Tests that the students of a gradebook page are graded together.
+    """
+    def test_state_fetched_once_per_page(self):
+        with patch.object(
+            DjangoXBlockUserStateClient, 'get_many_for_users',
+            autospec=True, side_effect=DjangoXBlockUserStateClient.get_many_for_users,
+        ) as mock_get_many_for_users:
+            response = self.client.get(reverse('spoc_gradebook', args=(self.course.id.to_deprecated_string(),)))
+        self.assertEquals(response.status_code, 200)
+        self.assertEquals(mock_get_many_for_users.call_count, 1)
@@ -13,7 +13,7 @@ from opaque_keys.edx.keys import CourseKey
 
 from edxmako.shortcuts import render_to_response
 from courseware.courses import get_course_with_access
-from instructor.offline_gradecalc import student_grades
+from courseware.grades import iterate_grades_in_batches
 from instructor.views.api import require_level
 
 
@@ -67,6 +67,8 @@ def get_grade_book_page(request, course, course_key):
     """
     Get student records per page along with page information i.e current page, total pages and
     offset information.
+
+    The students of the page are graded together, fetching their user state and scores at once.
     """
     # Unsanitized offset
     current_offset = request.GET.get('offset', 0)
@@ -89,10 +91,10 @@ def get_grade_book_page(request, course, course_key):
             'username': student.username,
             'id': student.id,
             'email': student.email,
-            'grade_summary': student_grades(student, request, course),
+            'grade_summary': gradeset,
             'realname': student.profile.name,
         }
-        for student in enrolled_students
+        for student, gradeset, __ in iterate_grades_in_batches(course, enrolled_students)
     ]
     return student_info, page
 
@@ -19,6 +19,7 @@ import csv
 import json
 import hashlib
 import os.path
+import tempfile
 import urllib
 
 from boto.s3.connection import S3Connection
@@ -179,12 +180,143 @@ class InstructorTask(models.Model):
         return json.dumps({'message': 'Task revoked before running'})
 
 
+class ReportFile(object):
+    """
+    A CSV report being written to a ReportStore, one row at a time.
+
+    Rows are encoded and written out as they are added, and the output is
+    handed to the store in chunks of at least `chunk_size` bytes, so memory use
+    doesn't depend on the size of the report. The report only becomes visible
+    in the store once it is closed; aborting it discards what was written.
+
+    Used as a context manager, the report is closed at the end of the block, or
+    aborted if an exception was raised. Subclasses implement how the chunks are
+    stored.
+    """
+    def __init__(self, chunk_size, compress=False):
+        self.chunk_size = chunk_size
+        self._buffer = StringIO()
+        self._output = GzipFile(fileobj=self._buffer, mode="wb") if compress else self._buffer
+        self._csvwriter = csv.writer(self._output)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def writerow(self, row):
+        """
+        Appends `row`, an iterable of values, to the report.
+        """
+        self._csvwriter.writerow([unicode(item).encode('utf-8') for item in row])
+        if self._buffer.tell() >= self.chunk_size:
+            self._flush()
+
+    def writerows(self, rows):
+        """
+        Appends every row of the `rows` iterable to the report.
+        """
+        for row in rows:
+            self.writerow(row)
+
+    def _flush(self):
+        """
+        Hands the buffered output to the store.
+        """
+        self.write_chunk(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def close(self):
+        """
+        Writes out the rest of the report, and makes it visible in the store.
+        """
+        if self._output is not self._buffer:
+            self._output.close()
+        self._flush()
+        self.commit()
+
+    def write_chunk(self, data):
+        """
+        Stores the next chunk of the report.
+        """
+        raise NotImplementedError
+
+    def commit(self):
+        """
+        Makes the stored chunks visible as the report.
+        """
+        raise NotImplementedError
+
+    def abort(self):
+        """
+        Discards the report, deleting the chunks stored so far.
+        """
+        raise NotImplementedError
+
+
+class S3ReportFile(ReportFile):
+    """
+    A gzip'd CSV report uploaded to S3 as a multipart upload, one part per chunk.
+    """
+    # S3 requires every part but the last one to be at least 5 MB.
+    PART_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, key, content_type='text/csv', content_encoding='gzip'):
+        super(S3ReportFile, self).__init__(self.PART_SIZE, compress=True)
+        self._upload = key.bucket.initiate_multipart_upload(
+            key.key,
+            headers={
+                "Content-Encoding": content_encoding,
+                "Content-Type": content_type,
+            }
+        )
+        self._part_count = 0
+
+    def write_chunk(self, data):
+        self._part_count += 1
+        self._upload.upload_part_from_file(StringIO(data), self._part_count, size=len(data))
+
+    def commit(self):
+        self._upload.complete_upload()
+
+    def abort(self):
+        self._upload.cancel_upload()
+
+
+class LocalFSReportFile(ReportFile):
+    """
+    A CSV report written to a temporary file, which is moved to `path` once complete.
+    """
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, path, temp_directory):
+        super(LocalFSReportFile, self).__init__(self.CHUNK_SIZE)
+        self.path = path
+        handle, self._temp_path = tempfile.mkstemp(dir=temp_directory, prefix='.tmp-')
+        self._file = os.fdopen(handle, 'wb')
+
+    def write_chunk(self, data):
+        self._file.write(data)
+
+    def commit(self):
+        self._file.close()
+        os.rename(self._temp_path, self.path)
+
+    def abort(self):
+        self._file.close()
+        os.remove(self._temp_path)
+
+
 class ReportStore(object):
     """
     Simple abstraction layer that can fetch and store CSV files for reports
-    download. Should probably refactor later to create a ReportFile object that
-    can simply be appended to for the sake of memory efficiency, rather than
-    passing in the whole dataset. Doing that for now just because it's simpler.
+    download. Reports are written incrementally through a ReportFile, so they
+    never have to be held in memory as a whole.
     """
     @classmethod
     def from_config(cls, config_name):
@@ -198,14 +330,21 @@ class ReportStore(object):
         elif storage_type.lower() == "localfs":
             return LocalFSReportStore.from_config(config_name)
 
-    def _get_utf8_encoded_rows(self, rows):
+    def open_rows(self, course_id, filename):
         """
-        Given a list of `rows` containing unicode strings, return a
-        new list of rows with those strings encoded as utf-8 for CSV
-        compatibility.
+        Returns a ReportFile to write the rows of the CSV report `filename` for
+        `course_id` to.
         """
-        for row in rows:
-            yield [unicode(item).encode('utf-8') for item in row]
+        raise NotImplementedError
+
+    def store_rows(self, course_id, filename, rows):
+        """
+        Given a `course_id`, `filename`, and `rows` (an iterable of rows, each
+        row being an iterable of strings), write the rows out as a CSV report.
+        Rows are consumed one at a time, so `rows` can be a generator.
+        """
+        with self.open_rows(course_id, filename) as report_file:
+            report_file.writerows(rows)
 
 
 class S3ReportStore(ReportStore):
@@ -299,22 +438,15 @@ class S3ReportStore(ReportStore):
             }
         )
 
-    def store_rows(self, course_id, filename, rows):
+    def open_rows(self, course_id, filename):
         """
-        Given a `course_id`, `filename`, and `rows` (each row is an iterable of
-        strings), create a buffer that is a gzip'd csv file, and then `store()`
-        that buffer.
+        Returns an S3ReportFile that uploads a gzip'd csv file to the key for
+        `course_id` and `filename` in parts, as rows are written to it.
 
         Even though we store it in gzip format, browsers will transparently
         download and decompress it. Filenames should end in `.csv`, not `.gz`.
         """
-        output_buffer = StringIO()
-        gzip_file = GzipFile(fileobj=output_buffer, mode="wb")
-        csvwriter = csv.writer(gzip_file)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
-        gzip_file.close()
-
-        self.store(course_id, filename, output_buffer)
+        return S3ReportFile(self.key_for(course_id, filename))
 
     def links_for(self, course_id):
         """
@@ -372,24 +504,25 @@ class LocalFSReportStore(ReportStore):
         assumed to be a StringIO objecd (or anything that can flush its contents
         to string using `.getvalue()`).
         """
-        full_path = self.path_to(course_id, filename)
-        directory = os.path.dirname(full_path)
-        if not os.path.exists(directory):
-            os.mkdir(directory)
-
+        full_path = self._make_path(course_id, filename)
         with open(full_path, "wb") as f:
             f.write(buff.getvalue())
 
-    def store_rows(self, course_id, filename, rows):
+    def open_rows(self, course_id, filename):
         """
-        Given a course_id, filename, and rows (each row is an iterable of strings),
-        write this data out.
+        Returns a LocalFSReportFile writing to the file for `course_id` and
+        `filename`. It is written under a temporary name in `root_path` until
+        complete, so it never shows up in `links_for()` half written.
         """
-        output_buffer = StringIO()
-        csvwriter = csv.writer(output_buffer)
-        csvwriter.writerows(self._get_utf8_encoded_rows(rows))
+        return LocalFSReportFile(self._make_path(course_id, filename), self.root_path)
 
-        self.store(course_id, filename, output_buffer)
+    def _make_path(self, course_id, filename):
+        """Return the full path to a given file for a given course, creating its directory."""
+        full_path = self.path_to(course_id, filename)
+        directory = os.path.dirname(full_path)
+        if not os.path.exists(directory):
+            os.mkdir(directory)
+        return full_path
 
     def links_for(self, course_id):
         """
@@ -46,7 +46,7 @@ from certificates.models import (
 )
 from certificates.api import generate_user_certificates
 from courseware.courses import get_course_by_id, get_problems_in_section
-from courseware.grades import iterate_grades_for
+from courseware.grades import iterate_grades_in_batches
 from courseware.models import StudentModule
 from courseware.model_data import DjangoKeyValueStore, FieldDataCache
 from courseware.module_render import get_module_for_descriptor_internal
@@ -603,6 +603,10 @@ def upload_csv_to_report_store(rows, csv_name, course_id, timestamp, config_name
     """
     Upload data as a CSV using ReportStore.
 
+    The rows are written to the report store as they are consumed, so `rows`
+    can be a generator producing them one at a time, and the report is never
+    held in memory as a whole.
+
     Arguments:
         rows: CSV data in the following format (first column may be a
             header):
@@ -661,13 +665,9 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     For a given `course_id`, generate a grades CSV file for all students that
     are enrolled, and store using a `ReportStore`. Once created, the files can
     be accessed by instantiating another `ReportStore` (via
-    `ReportStore.from_config()`) and calling `link_for()` on it. Writes are
-    buffered, so we'll never write part of a CSV file to S3 -- i.e. any files
-    that are visible in ReportStore will be complete ones.
-
-    As we start to add more CSV downloads, it will probably be worthwhile to
-    make a more general CSVDoc class instead of building out the rows like we
-    do here.
+    `ReportStore.from_config()`) and calling `link_for()` on it. Rows are
+    uploaded while the students are graded, but a file only becomes visible
+    in ReportStore once it is complete.
     """
     start_time = time()
     start_date = datetime.now(UTC)
@@ -697,14 +697,12 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
     certificate_whitelist = CertificateWhitelist.objects.filter(course_id=course_id, whitelist=True)
     whitelisted_user_ids = [entry.user_id for entry in certificate_whitelist]
 
-    # Loop over all our students and build our CSV lists in memory
-    header = None
-    rows = []
+    # Errors are rare, so their rows are kept in memory while the grade rows
+    # are uploaded as the students get graded.
     err_rows = [["id", "username", "error_msg"]]
     current_step = {'step': 'Calculating Grades'}
 
     total_enrolled_students = enrolled_students.count()
-    student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, Starting grade calculation for total students: %s',
         task_info_string,
@@ -713,17 +711,98 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
 
         total_enrolled_students
     )
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students):
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
 
-        # Now add a log entry after each student is graded to get a sense
-        # of the task's progress
-        student_counter += 1
+    def grade_rows():
+        """
+        Grades the students, and yields the rows of the grade report.
+        """
+        header = None
+        student_counter = 0
+        for student, gradeset, err_msg in iterate_grades_in_batches(course_id, enrolled_students.iterator()):
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
+
+            # Now add a log entry after each student is graded to get a sense
+            # of the task's progress
+            student_counter += 1
+            TASK_LOG.info(
+                u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+                task_info_string,
+                action_name,
+                current_step,
+                student_counter,
+                total_enrolled_students
+            )
+
+            if gradeset:
+                # We were able to successfully grade this student for this course.
+                task_progress.succeeded += 1
+                if not header:
+                    header = [section['label'] for section in gradeset[u'section_breakdown']]
+                    yield (
+                        ["id", "email", "username", "grade"] + header + cohorts_header +
+                        group_configs_header + teams_header +
+                        ['Enrollment Track', 'Verification Status'] + certificate_info_header
+                    )
+
+                percents = {
+                    section['label']: section.get('percent', 0.0)
+                    for section in gradeset[u'section_breakdown']
+                    if 'label' in section
+                }
+
+                cohorts_group_name = []
+                if course_is_cohorted:
+                    group = get_cohort(student, course_id, assign=False)
+                    cohorts_group_name.append(group.name if group else '')
+
+                group_configs_group_names = []
+                for partition in experiment_partitions:
+                    group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
+                    group_configs_group_names.append(group.name if group else '')
+
+                team_name = []
+                if teams_enabled:
+                    try:
+                        membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
+                        team_name.append(membership.team.name)
+                    except CourseTeamMembership.DoesNotExist:
+                        team_name.append('')
+
+                enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
+                verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
+                    student,
+                    course_id,
+                    enrollment_mode
+                )
+                certificate_info = certificate_info_for_user(
+                    student,
+                    course_id,
+                    gradeset['grade'],
+                    student.id in whitelisted_user_ids
+                )
+
+                # Not everybody has the same gradable items. If the item is not
+                # found in the user's gradeset, just assume it's a 0. The aggregated
+                # grades for their sections and overall course will be calculated
+                # without regard for the item they didn't have access to, so it's
+                # possible for a student to have a 0.0 show up in their row but
+                # still have 100% for the course.
+                row_percents = [percents.get(label, 0.0) for label in header]
+                yield (
+                    [student.id, student.email, student.username, gradeset['percent']] +
+                    row_percents + cohorts_group_name + group_configs_group_names + team_name +
+                    [enrollment_mode] + [verification_status] + certificate_info
+                )
+            else:
+                # An empty gradeset means we failed to grade a student.
+                task_progress.failed += 1
+                err_rows.append([student.id, student.username, err_msg])
+
         TASK_LOG.info(
-            u'%s, Task type: %s, Current step: %s, Grade calculation in-progress for students: %s/%s',
+            u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
             task_info_string,
             action_name,
             current_step,
@@ -731,88 +810,13 @@ def upload_grades_csv(_xmodule_instance_args, _entry_id, course_id, _task_input,
             total_enrolled_students
         )
 
-        if gradeset:
-            # We were able to successfully grade this student for this course.
-            task_progress.succeeded += 1
-            if not header:
-                header = [section['label'] for section in gradeset[u'section_breakdown']]
-                rows.append(
-                    ["id", "email", "username", "grade"] + header + cohorts_header +
-                    group_configs_header + teams_header +
-                    ['Enrollment Track', 'Verification Status'] + certificate_info_header
-                )
-
-            percents = {
-                section['label']: section.get('percent', 0.0)
-                for section in gradeset[u'section_breakdown']
-                if 'label' in section
-            }
-
-            cohorts_group_name = []
-            if course_is_cohorted:
-                group = get_cohort(student, course_id, assign=False)
-                cohorts_group_name.append(group.name if group else '')
-
-            group_configs_group_names = []
-            for partition in experiment_partitions:
-                group = LmsPartitionService(student, course_id).get_group(partition, assign=False)
-                group_configs_group_names.append(group.name if group else '')
-
-            team_name = []
-            if teams_enabled:
-                try:
-                    membership = CourseTeamMembership.objects.get(user=student, team__course_id=course_id)
-                    team_name.append(membership.team.name)
-                except CourseTeamMembership.DoesNotExist:
-                    team_name.append('')
-
-            enrollment_mode = CourseEnrollment.enrollment_mode_for_user(student, course_id)[0]
-            verification_status = SoftwareSecurePhotoVerification.verification_status_for_user(
-                student,
-                course_id,
-                enrollment_mode
-            )
-            certificate_info = certificate_info_for_user(
-                student,
-                course_id,
-                gradeset['grade'],
-                student.id in whitelisted_user_ids
-            )
-
-            # Not everybody has the same gradable items. If the item is not
-            # found in the user's gradeset, just assume it's a 0. The aggregated
-            # grades for their sections and overall course will be calculated
-            # without regard for the item they didn't have access to, so it's
-            # possible for a student to have a 0.0 show up in their row but
-            # still have 100% for the course.
-            row_percents = [percents.get(label, 0.0) for label in header]
-            rows.append(
-                [student.id, student.email, student.username, gradeset['percent']] +
-                row_percents + cohorts_group_name + group_configs_group_names + team_name +
-                [enrollment_mode] + [verification_status] + certificate_info
-            )
-        else:
-            # An empty gradeset means we failed to grade a student.
-            task_progress.failed += 1
-            err_rows.append([student.id, student.username, err_msg])
-
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Grade calculation completed for students: %s/%s',
-        task_info_string,
-        action_name,
-        current_step,
-        student_counter,
-        total_enrolled_students
-    )
+    # Perform the actual upload, grading the students along the way
+    upload_csv_to_report_store(grade_rows(), 'grade_report', course_id, start_date)
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
     current_step = {'step': 'Uploading CSVs'}
     task_progress.update_task_state(extra_meta=current_step)
     TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'grade_report', course_id, start_date)
-
     # If there are any error rows (don't count the header), write them out as well
     if len(err_rows) > 1:
         upload_csv_to_report_store(err_rows, 'grade_report_err', course_id, start_date)
@@ -932,47 +936,56 @@ def upload_problem_grade_report(_xmodule_instance_args, _entry_id, course_id, _t
         )
 
     # Just generate the static fields for now.
-    rows = [list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))]
+    header = list(header_row.values()) + ['Final Grade'] + list(chain.from_iterable(problems.values()))
     error_rows = [list(header_row.values()) + ['error_msg']]
     current_step = {'step': 'Calculating Grades'}
 
-    for student, gradeset, err_msg in iterate_grades_for(course_id, enrolled_students, keep_raw_scores=True):
-        student_fields = [getattr(student, field_name) for field_name in header_row]
-        task_progress.attempted += 1
+    def grade_rows():
+        """
+        Grades the students, and yields a row of the report for each student graded successfully.
+        """
+        students_grades = iterate_grades_in_batches(course_id, enrolled_students.iterator(), keep_raw_scores=True)
+        for student, gradeset, err_msg in students_grades:
+            student_fields = [getattr(student, field_name) for field_name in header_row]
+            task_progress.attempted += 1
 
-        if 'percent' not in gradeset or 'raw_scores' not in gradeset:
-            # There was an error grading this student.
-            # Generally there will be a non-empty err_msg, but that is not always the case.
-            if not err_msg:
-                err_msg = u"Unknown error"
-            error_rows.append(student_fields + [err_msg])
-            task_progress.failed += 1
-            continue
+            if 'percent' not in gradeset or 'raw_scores' not in gradeset:
+                # There was an error grading this student.
+                # Generally there will be a non-empty err_msg, but that is not always the case.
+                if not err_msg:
+                    err_msg = u"Unknown error"
+                error_rows.append(student_fields + [err_msg])
+                task_progress.failed += 1
+                continue
 
-        final_grade = gradeset['percent']
-        # Only consider graded problems
-        problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
-        earned_possible_values = list()
-        for problem_id in problems:
-            try:
-                problem_score = problem_scores[problem_id]
-                earned_possible_values.append([problem_score.earned, problem_score.possible])
-            except KeyError:
-                # The student has not been graded on this problem.  For example,
-                # iterate_grades_for skips problems that students have never
-                # seen in order to speed up report generation.  It could also be
-                # the case that the student does not have access to it (e.g. A/B
-                # test or cohorted courseware).
-                earned_possible_values.append(['N/A', 'N/A'])
-        rows.append(student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values)))
-
-        task_progress.succeeded += 1
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
+            final_grade = gradeset['percent']
+            # Only consider graded problems
+            problem_scores = {unicode(score.module_id): score for score in gradeset['raw_scores'] if score.graded}
+            earned_possible_values = list()
+            for problem_id in problems:
+                try:
+                    problem_score = problem_scores[problem_id]
+                    earned_possible_values.append([problem_score.earned, problem_score.possible])
+                except KeyError:
+                    # The student has not been graded on this problem.  For example,
+                    # iterate_grades_for skips problems that students have never
+                    # seen in order to speed up report generation.  It could also be
+                    # the case that the student does not have access to it (e.g. A/B
+                    # test or cohorted courseware).
+                    earned_possible_values.append(['N/A', 'N/A'])
+
+            task_progress.succeeded += 1
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+
+            yield student_fields + [final_grade] + list(chain.from_iterable(earned_possible_values))
 
-    # Perform the upload if any students have been successfully graded
-    if len(rows) > 1:
-        upload_csv_to_report_store(rows, 'problem_grade_report', course_id, start_date)
+    # Perform the upload if any students have been successfully graded,
+    # grading the remaining ones along the way
+    rows = grade_rows()
+    first_row = next(rows, None)
+    if first_row is not None:
+        upload_csv_to_report_store(chain([header, first_row], rows), 'problem_grade_report', course_id, start_date)
     # If there are any error rows, write them out as well
     if len(error_rows) > 1:
         upload_csv_to_report_store(error_rows, 'problem_grade_report_err', course_id, start_date)
@@ -1034,13 +1047,9 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
     )
     TASK_LOG.info(u'%s, Task type: %s, Starting task execution', task_info_string, action_name)
 
-    # Loop over all our students and build our CSV lists in memory
-    rows = []
-    header = None
     current_step = {'step': 'Gathering Profile Information'}
     enrollment_report_provider = PaidCourseEnrollmentReportProvider()
     total_students = students_in_course.count()
-    student_counter = 0
     TASK_LOG.info(
         u'%s, Task type: %s, Current step: %s, generating detailed enrollment report for total students: %s',
         task_info_string,
@@ -1049,86 +1058,94 @@ def upload_enrollment_report(_xmodule_instance_args, _entry_id, course_id, _task
         total_students
     )
 
-    for student in students_in_course:
-        # Periodically update task status (this is a cache write)
-        if task_progress.attempted % status_interval == 0:
-            task_progress.update_task_state(extra_meta=current_step)
-        task_progress.attempted += 1
+    def enrollment_rows():
+        """
+        Yields the rows of the enrollment report.
+        """
+        header = None
+        student_counter = 0
+        for student in students_in_course.iterator():
+            # Periodically update task status (this is a cache write)
+            if task_progress.attempted % status_interval == 0:
+                task_progress.update_task_state(extra_meta=current_step)
+            task_progress.attempted += 1
 
-        # Now add a log entry after certain intervals to get a hint that task is in progress
-        student_counter += 1
-        if student_counter % 100 == 0:
-            TASK_LOG.info(
-                u'%s, Task type: %s, Current step: %s, gathering enrollment profile for students in progress: %s/%s',
-                task_info_string,
-                action_name,
-                current_step,
-                student_counter,
-                total_students
-            )
+            # Now add a log entry after certain intervals to get a hint that task is in progress
+            student_counter += 1
+            if student_counter % 100 == 0:
+                TASK_LOG.info(
+                    u'%s, Task type: %s, Current step: %s, '
+                    u'gathering enrollment profile for students in progress: %s/%s',
+                    task_info_string,
+                    action_name,
+                    current_step,
+                    student_counter,
+                    total_students
+                )
 
-        user_data = enrollment_report_provider.get_user_profile(student.id)
-        course_enrollment_data = enrollment_report_provider.get_enrollment_info(student, course_id)
-        payment_data = enrollment_report_provider.get_payment_info(student, course_id)
-
-        # display name map for the column headers
-        enrollment_report_headers = {
-            'User ID': _('User ID'),
-            'Username': _('Username'),
-            'Full Name': _('Full Name'),
-            'First Name': _('First Name'),
-            'Last Name': _('Last Name'),
-            'Company Name': _('Company Name'),
-            'Title': _('Title'),
-            'Language': _('Language'),
-            'Year of Birth': _('Year of Birth'),
-            'Gender': _('Gender'),
-            'Level of Education': _('Level of Education'),
-            'Mailing Address': _('Mailing Address'),
-            'Goals': _('Goals'),
-            'City': _('City'),
-            'Country': _('Country'),
-            'Enrollment Date': _('Enrollment Date'),
-            'Currently Enrolled': _('Currently Enrolled'),
-            'Enrollment Source': _('Enrollment Source'),
-            'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
-            'Enrollment Role': _('Enrollment Role'),
-            'List Price': _('List Price'),
-            'Payment Amount': _('Payment Amount'),
-            'Coupon Codes Used': _('Coupon Codes Used'),
-            'Registration Code Used': _('Registration Code Used'),
-            'Payment Status': _('Payment Status'),
-            'Transaction Reference Number': _('Transaction Reference Number')
-        }
+            user_data = enrollment_report_provider.get_user_profile(student.id)
+            course_enrollment_data = enrollment_report_provider.get_enrollment_info(student, course_id)
+            payment_data = enrollment_report_provider.get_payment_info(student, course_id)
+
+            # display name map for the column headers
+            enrollment_report_headers = {
+                'User ID': _('User ID'),
+                'Username': _('Username'),
+                'Full Name': _('Full Name'),
+                'First Name': _('First Name'),
+                'Last Name': _('Last Name'),
+                'Company Name': _('Company Name'),
+                'Title': _('Title'),
+                'Language': _('Language'),
+                'Year of Birth': _('Year of Birth'),
+                'Gender': _('Gender'),
+                'Level of Education': _('Level of Education'),
+                'Mailing Address': _('Mailing Address'),
+                'Goals': _('Goals'),
+                'City': _('City'),
+                'Country': _('Country'),
+                'Enrollment Date': _('Enrollment Date'),
+                'Currently Enrolled': _('Currently Enrolled'),
+                'Enrollment Source': _('Enrollment Source'),
+                'Manual (Un)Enrollment Reason': _('Manual (Un)Enrollment Reason'),
+                'Enrollment Role': _('Enrollment Role'),
+                'List Price': _('List Price'),
+                'Payment Amount': _('Payment Amount'),
+                'Coupon Codes Used': _('Coupon Codes Used'),
+                'Registration Code Used': _('Registration Code Used'),
+                'Payment Status': _('Payment Status'),
+                'Transaction Reference Number': _('Transaction Reference Number')
+            }
 
-        if not header:
-            header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
-            display_headers = []
-            for header_element in header:
-                # translate header into a localizable display string
-                display_headers.append(enrollment_report_headers.get(header_element, header_element))
-            rows.append(display_headers)
+            if not header:
+                header = user_data.keys() + course_enrollment_data.keys() + payment_data.keys()
+                display_headers = []
+                for header_element in header:
+                    # translate header into a localizable display string
+                    display_headers.append(enrollment_report_headers.get(header_element, header_element))
+                yield display_headers
 
-        rows.append(user_data.values() + course_enrollment_data.values() + payment_data.values())
-        task_progress.succeeded += 1
+            task_progress.succeeded += 1
+            yield user_data.values() + course_enrollment_data.values() + payment_data.values()
 
-    TASK_LOG.info(
-        u'%s, Task type: %s, Current step: %s, Detailed enrollment report generated for students: %s/%s',
-        task_info_string,
-        action_name,
-        current_step,
-        student_counter,
-        total_students
+        TASK_LOG.info(
+            u'%s, Task type: %s, Current step: %s, Detailed enrollment report generated for students: %s/%s',
+            task_info_string,
+            action_name,
+            current_step,
+            student_counter,
+            total_students
+        )
+
+    # Perform the actual upload, gathering the profiles along the way
+    upload_csv_to_report_store(
+        enrollment_rows(), 'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS'
     )
 
-    # By this point, we've got the rows we're going to stuff into our CSV files.
     current_step = {'step': 'Uploading CSVs'}
     task_progress.update_task_state(extra_meta=current_step)
     TASK_LOG.info(u'%s, Task type: %s, Current step: %s', task_info_string, action_name, current_step)
 
-    # Perform the actual upload
-    upload_csv_to_report_store(rows, 'enrollment_report', course_id, start_date, config_name='FINANCIAL_REPORTS')
-
     # One last update before we close out...
     TASK_LOG.info(u'%s, Task type: %s, Finalizing detailed enrollment task', task_info_string, action_name)
     return task_progress.update_task_state(extra_meta=current_step)
@@ -3,12 +3,15 @@ Tests for instructor_task/models.py.
 """
 
 from cStringIO import StringIO
+import csv
+import gzip
 import mock
+import os
 import time
 from datetime import datetime
 from unittest import TestCase
 
-from instructor_task.models import LocalFSReportStore, S3ReportStore
+from instructor_task.models import LocalFSReportFile, LocalFSReportStore, S3ReportFile, S3ReportStore
 from instructor_task.tests.test_base import TestReportMixin
 from opaque_keys.edx.locator import CourseLocator
 
@@ -30,10 +33,37 @@ class MockKey(object):
         return "http://fake-edx-s3.edx.org/"
 
 
+class MockMultiPartUpload(object):
+    """ Mocking a boto S3 MultiPartUpload object. """
+    def __init__(self, key_name):
+        self.key_name = key_name
+        self.parts = []
+        self.completed = self.cancelled = False
+
+    def upload_part_from_file(self, fp, part_num, size=None):  # pylint: disable=unused-argument
+        """ Expected method on a MultiPartUpload object. """
+        self.parts.append((part_num, fp.read()))
+
+    def complete_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.completed = True
+
+    def cancel_upload(self):
+        """ Expected method on a MultiPartUpload object. """
+        self.cancelled = True
+
+
 class MockBucket(object):
     """ Mocking a boto S3 Bucket object. """
     def __init__(self, _name):
         self.keys = []
+        self.uploads = []
+
+    def initiate_multipart_upload(self, key_name, headers):  # pylint: disable=unused-argument
+        """ Expected method on a Bucket object. """
+        upload = MockMultiPartUpload(key_name)
+        self.uploads.append(upload)
+        return upload
 
     def store_key(self, key):
         """ Not a Bucket method, created just to store the keys in the Bucket for testing purposes. """
@@ -93,6 +123,42 @@ class LocalFSReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase
         """ Create and return a LocalFSReportStore. """
         return LocalFSReportStore.from_config(config_name='GRADES_DOWNLOAD')
 
+    def read_rows(self, report_store, filename):
+        """ Return the rows of a CSV report in report_store """
+        with open(report_store.path_to(self.course_id, filename)) as report_file:
+            return list(csv.reader(report_file))
+
+    @mock.patch.object(LocalFSReportFile, 'CHUNK_SIZE', 100)
+    def test_store_rows_in_chunks(self):
+        report_store = self.create_report_store()
+        rows = ([u'caf\xe9', index] for index in range(100))
+        with mock.patch.object(LocalFSReportFile, 'write_chunk', autospec=True,
+                               side_effect=LocalFSReportFile.write_chunk) as mock_write_chunk:
+            report_store.store_rows(self.course_id, 'report.csv', rows)
+
+        self.assertGreater(mock_write_chunk.call_count, 5)
+        self.assertEqual(
+            self.read_rows(report_store, 'report.csv'),
+            [['caf\xc3\xa9', str(index)] for index in range(100)]
+        )
+        self.assertEqual([link[0] for link in report_store.links_for(self.course_id)], ['report.csv'])
+        self.assertEqual(sorted(os.listdir(report_store.root_path)), [os.path.basename(
+            os.path.dirname(report_store.path_to(self.course_id, 'report.csv'))
+        )])
+
+    def test_aborted_report_not_stored(self):
+        report_store = self.create_report_store()
+
+        def rows():
+            """ Yield a row, then fail """
+            yield ['a', 'b']
+            raise ValueError()
+
+        with self.assertRaises(ValueError):
+            report_store.store_rows(self.course_id, 'report.csv', rows())
+        self.assertEqual(report_store.links_for(self.course_id), [])
+        self.assertEqual(len(os.listdir(report_store.root_path)), 1)
+
 
 @mock.patch('instructor_task.models.S3Connection', new=MockS3Connection)
 @mock.patch('instructor_task.models.Key', new=MockKey)
@@ -105,3 +171,32 @@ class S3ReportStoreTestCase(ReportStoreTestMixin, TestReportMixin, TestCase):
     def create_report_store(self):
         """ Create and return a S3ReportStore. """
         return S3ReportStore.from_config(config_name='GRADES_DOWNLOAD')
+
+    def read_upload(self, upload):
+        """ Return the rows of a report uploaded as upload """
+        data = ''.join(part for __, part in upload.parts)
+        return list(csv.reader(gzip.GzipFile(fileobj=StringIO(data))))
+
+    @mock.patch.object(S3ReportFile, 'PART_SIZE', 1000)
+    def test_store_rows_multipart(self):
+        report_store = self.create_report_store()
+        rows = [[os.urandom(10).encode('hex'), index] for index in range(10000)]
+        report_store.store_rows(self.course_id, 'report.csv', iter(rows))
+
+        upload, = report_store.bucket.uploads
+        self.assertTrue(upload.completed)
+        self.assertEqual(upload.key_name, report_store.key_for(self.course_id, 'report.csv').key)
+        self.assertEqual([part_num for part_num, __ in upload.parts], range(1, len(upload.parts) + 1))
+        self.assertGreater(len(upload.parts), 1)
+        self.assertEqual(self.read_upload(upload), [[value, str(index)] for value, index in rows])
+
+    def test_aborted_upload(self):
+        report_store = self.create_report_store()
+        with self.assertRaises(ValueError):
+            with report_store.open_rows(self.course_id, 'report.csv') as report_file:
+                report_file.writerow(['a', 'b'])
+                raise ValueError()
+
+        upload, = report_store.bucket.uploads
+        self.assertTrue(upload.cancelled)
+        self.assertFalse(upload.completed)
@@ -95,7 +95,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         self.assertDictContainsSubset({'attempted': num_students, 'succeeded': num_students, 'failed': 0}, result)
 
     @patch('instructor_task.tasks_helper._get_current_task')
-    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    @patch('instructor_task.tasks_helper.iterate_grades_in_batches')
     def test_grading_failure(self, mock_iterate_grades_for, _mock_current_task):
         """
         Test that any grading errors are properly reported in the
@@ -273,7 +273,7 @@ class TestInstructorGradeReport(InstructorGradeReportTestCase):
         )
 
     @patch('instructor_task.tasks_helper._get_current_task')
-    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    @patch('instructor_task.tasks_helper.iterate_grades_in_batches')
     def test_unicode_in_csv_header(self, mock_iterate_grades_for, _mock_current_task):
         """
         Tests that CSV grade report works if unicode in headers.
@@ -624,7 +624,7 @@ class TestProblemGradeReport(TestReportMixin, InstructorTaskModuleTestCase):
         ])
 
     @patch('instructor_task.tasks_helper._get_current_task')
-    @patch('instructor_task.tasks_helper.iterate_grades_for')
+    @patch('instructor_task.tasks_helper.iterate_grades_in_batches')
     @ddt.data(u'Cannöt grade student', '')
     def test_grading_failure(self, error_message, mock_iterate_grades_for, _mock_current_task):
         """
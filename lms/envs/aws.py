@@ -280,6 +280,7 @@ VIRTUAL_UNIVERSITIES = ENV_TOKENS.get('VIRTUAL_UNIVERSITIES', [])
 META_UNIVERSITIES = ENV_TOKENS.get('META_UNIVERSITIES', {})
 COMMENTS_SERVICE_URL = ENV_TOKENS.get("COMMENTS_SERVICE_URL", '')
 COMMENTS_SERVICE_KEY = ENV_TOKENS.get("COMMENTS_SERVICE_KEY", '')
+COMMENTS_SERVICE_CLIENT.update(ENV_TOKENS.get("COMMENTS_SERVICE_CLIENT", {}))
 CERT_QUEUE = ENV_TOKENS.get("CERT_QUEUE", 'test-pull')
 ZENDESK_URL = ENV_TOKENS.get("ZENDESK_URL")
 FEEDBACK_SUBMISSION_EMAIL = ENV_TOKENS.get("FEEDBACK_SUBMISSION_EMAIL")
@@ -451,6 +452,13 @@ XQUEUE_INTERFACE = AUTH_TOKENS['XQUEUE_INTERFACE']
 # use the one from common.py
 MODULESTORE = convert_module_store_setting_if_needed(AUTH_TOKENS.get('MODULESTORE', MODULESTORE))
 CONTENTSTORE = AUTH_TOKENS.get('CONTENTSTORE', CONTENTSTORE)
+ASSET_DISK_CACHE.update(ENV_TOKENS.get('ASSET_DISK_CACHE', {}))
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = ENV_TOKENS.get(
+    'COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE', COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE
+)
+COURSE_STRUCTURE_CACHE_CODEC.update(ENV_TOKENS.get('COURSE_STRUCTURE_CACHE_CODEC', {}))
+BLOCK_STRUCTURE_CACHE_CODEC.update(ENV_TOKENS.get('BLOCK_STRUCTURE_CACHE_CODEC', {}))
+BLOCK_STRUCTURES_SETTINGS.update(ENV_TOKENS.get('BLOCK_STRUCTURES_SETTINGS', {}))
 DOC_STORE_CONFIG = AUTH_TOKENS.get('DOC_STORE_CONFIG', DOC_STORE_CONFIG)
 MONGODB_LOG = AUTH_TOKENS.get('MONGODB_LOG', {})
 
@@ -61,6 +61,20 @@ DISCUSSION_SETTINGS = {
     'MAX_COMMENT_DEPTH': 2,
 }
 
+COMMENTS_SERVICE_CLIENT = {
+    # Whether to keep connections to the comments service alive, and reuse
+    # them across requests of the same process.
+    'CONNECTION_POOL_ENABLED': True,
+    # Maximum number of connections to the comments service kept per process.
+    'CONNECTION_POOL_SIZE': 10,
+    # Number of threads per process making independent calls to the comments
+    # service concurrently. 1 makes the calls one after the other.
+    'CONCURRENCY': 4,
+    # Number of seconds for which repeated reads, such as of user info, are
+    # served from the request cache. 0 disables the cache.
+    'READ_CACHE_TIMEOUT': 5,
+}
+
 
 # Features
 FEATURES = {
@@ -349,6 +363,10 @@ FEATURES = {
     # Special Exams, aka Timed and Proctored Exams
     'ENABLE_SPECIAL_EXAMS': False,
 
+    # Render only the current unit of a sequence with the page, and the
+    # other units when the learner navigates to them.
+    'ENABLE_LAZY_SEQUENCE_UNITS': False,
+
     # Enable OpenBadge support. See the BADGR_* settings later in this file.
     'ENABLE_OPENBADGES': False,
 
@@ -358,6 +376,11 @@ FEATURES = {
     # Enable the max score cache to speed up grading
     'ENABLE_MAX_SCORE_CACHE': True,
 
+    # Persist the grades of each subsection, so that grading only recomputes
+    # the subsections whose scores changed. Grades are not invalidated while
+    # this is disabled: delete the persisted ones before enabling it again.
+    'ENABLE_PERSISTENT_SUBSECTION_GRADES': False,
+
     # Enable LTI Provider feature.
     'ENABLE_LTI_PROVIDER': False,
 
@@ -730,6 +753,53 @@ MODULESTORE = {
     }
 }
 
+# Local on-disk cache for course assets too large for the Django cache, used by the
+# contentserver. Disabled unless DIRECTORY is set; MAX_SIZE is the budget in bytes.
+ASSET_DISK_CACHE = {
+    'DIRECTORY': None,
+    'MAX_SIZE': 10 * 1024 ** 3,
+}
+
+# Memory budget in bytes of the per-process LRU of serialized split modulestore course structures
+# kept in front of the 'course_structure_cache'. Set to 0 to disable it.
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = 128 * 1024 ** 2
+
+# Serialization of course structures in the 'course_structure_cache'. CODEC is 'split_structure'
+# (columnar, fastest to load) or 'pickle'; COMPRESSOR is 'zlib', 'lz4' (needs the lz4 package)
+# or 'none'.
+COURSE_STRUCTURE_CACHE_CODEC = {
+    'CODEC': 'split_structure',
+    'COMPRESSOR': 'zlib',
+}
+
+# Serialization of the block structures cached by course_blocks, with the same choices of
+# COMPRESSOR as above; the only CODEC is 'pickle'. When neither is set, the data is written
+# in the original pickle and zlib format, readable by older releases.
+BLOCK_STRUCTURE_CACHE_CODEC = {
+    'CODEC': None,
+    'COMPRESSOR': None,
+}
+
+# Collection of course block structures into the cache.
+BLOCK_STRUCTURES_SETTINGS = {
+    # Seconds a process collecting a course's block structure holds the lease
+    # on it, so that other processes wait for it instead of collecting too.
+    'COLLECT_LEASE_TIMEOUT': 60,
+
+    # Seconds to wait for another process to finish collecting, before
+    # collecting anyway.
+    'COLLECT_WAIT_TIMEOUT': 5,
+
+    # Whether to keep serving the previously collected block structure of a
+    # published course until the update task has replaced it, rather than
+    # clearing it when the course is published.
+    'SERVE_STALE_WHILE_RECOLLECTING': False,
+
+    # Retries of the task updating a course's block structure.
+    'TASK_DEFAULT_RETRY_DELAY': 30,
+    'TASK_MAX_RETRIES': 5,
+}
+
 #################### Python sandbox ############################################
 
 CODE_JAIL = {
@@ -228,6 +228,9 @@ CACHES = {
     },
 }
 
+# Course structures are not cached between tests (see 'course_structure_cache' above).
+COURSE_STRUCTURE_CACHE_LOCAL_MAX_SIZE = 0
+
 # Dummy secret key for dev
 SECRET_KEY = '85920908f28904ed733fe576320db18cabd7b6cd'
 
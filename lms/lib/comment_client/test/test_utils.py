@@ -0,0 +1,170 @@
+"""
+Tests for the comment client utilities, against a stub comments service.
+"""
+from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+import json
+from SocketServer import ThreadingMixIn
+import threading
+from urlparse import urlparse
+
+from django.test import TestCase
+from django.test.utils import override_settings
+from django.utils import translation
+import mock
+
+from request_cache.middleware import RequestCache
+from lms.lib.comment_client import utils
+
+
+CLIENT_SETTINGS = {
+    'CONNECTION_POOL_ENABLED': True,
+    'CONNECTION_POOL_SIZE': 2,
+    'CONCURRENCY': 4,
+    'READ_CACHE_TIMEOUT': 5,
+}
+
+
+class StubCommentsServiceHandler(BaseHTTPRequestHandler):
+    """
+    Responds to every request with a description of the request, recording
+    the client's port of each request on the server.
+    """
+    protocol_version = 'HTTP/1.1'
+
+    def _respond(self):
+        """
+        Sends the description of the request as JSON.
+        """
+        length = int(self.headers.getheader('content-length') or 0)
+        if length:
+            self.rfile.read(length)
+        self.server.requests.append((self.command, urlparse(self.path).path, self.client_address[1]))
+        status = 404 if self.path.startswith('/missing') else 200
+        body = json.dumps({
+            'method': self.command,
+            'path': urlparse(self.path).path,
+            'language': self.headers.getheader('accept-language'),
+            'count': len(self.server.requests),
+        })
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _respond
+
+    def log_message(self, *args):  # pylint: disable=arguments-differ
+        pass
+
+
+class StubCommentsServiceServer(ThreadingMixIn, HTTPServer):
+    """
+    A stub comments service, handling each connection in its own thread.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        HTTPServer.__init__(self, ('127.0.0.1', 0), StubCommentsServiceHandler)
+        self.requests = []
+
+
+@override_settings(COMMENTS_SERVICE_CLIENT=CLIENT_SETTINGS)
+class CommentClientUtilsTestCase(TestCase):
+    """
+    Tests for perform_request and perform_concurrently.
+    """
+    def setUp(self):
+        super(CommentClientUtilsTestCase, self).setUp()
+        self.server = StubCommentsServiceServer()
+        server_thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05})
+        server_thread.daemon = True
+        server_thread.start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.base_url = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+        RequestCache.clear_request_cache()
+
+    def url(self, path):
+        """
+        Returns the URL of the given path on the stub comments service.
+        """
+        return self.base_url + path
+
+    def test_connection_reused(self):
+        utils.perform_request('get', self.url('/api/v1/users/1'))
+        utils.perform_request('post', self.url('/api/v1/threads'), {'title': 'Title'})
+        utils.perform_request('get', self.url('/api/v1/users/1'))
+        self.assertEqual(len(self.server.requests), 3)
+        self.assertEqual(len(set(port for __, __, port in self.server.requests)), 1)
+
+    @override_settings(COMMENTS_SERVICE_CLIENT=dict(CLIENT_SETTINGS, CONNECTION_POOL_ENABLED=False))
+    def test_connection_pool_disabled(self):
+        with mock.patch('lms.lib.comment_client.utils.requests.request', wraps=utils.requests.request) as request:
+            utils.perform_request('get', self.url('/api/v1/users/1'))
+        self.assertTrue(request.called)
+
+    def test_perform_concurrently(self):
+        with translation.override('fr'):
+            results = utils.perform_concurrently(*[
+                lambda path=path: utils.perform_request('get', self.url(path))
+                for path in ('/api/v1/users/1', '/api/v1/threads/2', '/api/v1/users/1/subscribed_threads')
+            ])
+        self.assertEqual(
+            [(result['path'], result['language']) for result in results],
+            [('/api/v1/users/1', 'fr'), ('/api/v1/threads/2', 'fr'), ('/api/v1/users/1/subscribed_threads', 'fr')],
+        )
+
+    def test_perform_concurrently_error(self):
+        with self.assertRaises(utils.CommentClientRequestError):
+            utils.perform_concurrently(
+                lambda: utils.perform_request('get', self.url('/api/v1/users/1')),
+                lambda: utils.perform_request('get', self.url('/missing')),
+            )
+        self.assertEqual(len(self.server.requests), 2)
+
+    @override_settings(COMMENTS_SERVICE_CLIENT=dict(CLIENT_SETTINGS, CONCURRENCY=1))
+    def test_perform_concurrently_disabled(self):
+        results = utils.perform_concurrently(
+            lambda: utils.perform_request('get', self.url('/api/v1/users/1')),
+            lambda: utils.perform_request('get', self.url('/api/v1/users/2')),
+        )
+        self.assertEqual([result['count'] for result in results], [1, 2])
+
+    def test_read_cache(self):
+        first = utils.perform_request('get', self.url('/api/v1/users/1'), {'complete': True}, cacheable=True)
+        first['path'] = 'modified by the caller'
+        second = utils.perform_request('get', self.url('/api/v1/users/1'), {'complete': True}, cacheable=True)
+        self.assertEqual(second, dict(first, path='/api/v1/users/1'))
+        self.assertEqual(len(self.server.requests), 1)
+
+        # Other params are another read.
+        utils.perform_request('get', self.url('/api/v1/users/1'), {'complete': False}, cacheable=True)
+        self.assertEqual(len(self.server.requests), 2)
+
+        # Other requests may change the data read.
+        utils.perform_request('put', self.url('/api/v1/users/1'), {'username': 'new'})
+        third = utils.perform_request('get', self.url('/api/v1/users/1'), {'complete': True}, cacheable=True)
+        self.assertEqual(third['count'], 4)
+
+    def test_read_cache_shared_with_threads(self):
+        utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True)
+        utils.perform_concurrently(
+            lambda: utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True),
+            lambda: utils.perform_request('get', self.url('/api/v1/threads/2')),
+        )
+        self.assertEqual(len(self.server.requests), 2)
+
+    @mock.patch('lms.lib.comment_client.utils.time')
+    def test_read_cache_expired(self, mock_time):
+        mock_time.return_value = 1000
+        utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True)
+        mock_time.return_value = 1010
+        utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True)
+        self.assertEqual(len(self.server.requests), 2)
+
+    @override_settings(COMMENTS_SERVICE_CLIENT=dict(CLIENT_SETTINGS, READ_CACHE_TIMEOUT=0))
+    def test_read_cache_disabled(self):
+        utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True)
+        utils.perform_request('get', self.url('/api/v1/users/1'), cacheable=True)
+        self.assertEqual(len(self.server.requests), 2)
@@ -136,6 +136,7 @@ class User(models.Model):
                 retrieve_params,
                 metric_action='model.retrieve',
                 metric_tags=self._metric_tags,
+                cacheable=True,
             )
         except CommentClientRequestError as e:
             if e.status_code == 404:
@@ -148,6 +149,7 @@ class User(models.Model):
                     retrieve_params,
                     metric_action='model.retrieve',
                     metric_tags=self._metric_tags,
+                    cacheable=True,
                 )
             else:
                 raise
@@ -1,15 +1,43 @@
 """" Common utilities for comment client wrapper """
 from contextlib import contextmanager
+from copy import deepcopy
 import dogstats_wrapper as dog_stats_api
 import logging
+from multiprocessing.pool import ThreadPool
+import os
 import requests
+import sys
+import threading
 from django.conf import settings
 from time import time
 from uuid import uuid4
+from django.utils import translation
 from django.utils.translation import get_language
 
+import request_cache
+
 log = logging.getLogger(__name__)
 
+# Defaults of the settings in settings.COMMENTS_SERVICE_CLIENT.
+CLIENT_SETTINGS_DEFAULTS = {
+    'CONNECTION_POOL_ENABLED': True,
+    'CONNECTION_POOL_SIZE': 10,
+    'CONCURRENCY': 4,
+    'READ_CACHE_TIMEOUT': 5,
+}
+
+READ_CACHE_NAME = 'comment_client.read_cache'
+
+# The session and thread pool of the current process, created when first used.
+_SESSION = None
+_THREAD_POOL = None
+_PROCESS_ID = None
+_PROCESS_LOCK = threading.Lock()
+
+# State of the threads of the thread pool: whether a thread is running a
+# function passed to perform_concurrently, and the read cache to use.
+_WORKER_STATE = threading.local()
+
 
 def strip_none(dic):
     return dict([(k, v) for k, v in dic.iteritems() if v is not None])
@@ -51,8 +79,127 @@ def request_timer(request_id, method, url, tags=None):
     )
 
 
+def get_client_setting(name):
+    """
+    Returns the value of the given setting of the comments service client.
+    """
+    return getattr(settings, 'COMMENTS_SERVICE_CLIENT', {}).get(name, CLIENT_SETTINGS_DEFAULTS[name])
+
+
+def _check_process():
+    """
+    Drops the session and thread pool of the parent process, if the current
+    process was forked from it. Must be called with _PROCESS_LOCK held.
+    """
+    global _SESSION, _THREAD_POOL, _PROCESS_ID  # pylint: disable=global-statement
+    if _PROCESS_ID != os.getpid():
+        _SESSION = None
+        _THREAD_POOL = None
+        _PROCESS_ID = os.getpid()
+
+
+def _get_session():
+    """
+    Returns the session of the current process, keeping a pool of
+    connections to the comments service alive.
+    """
+    global _SESSION  # pylint: disable=global-statement
+    with _PROCESS_LOCK:
+        _check_process()
+        if _SESSION is None:
+            pool_size = get_client_setting('CONNECTION_POOL_SIZE')
+            adapter = requests.adapters.HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+            _SESSION = requests.Session()
+            _SESSION.mount('http://', adapter)
+            _SESSION.mount('https://', adapter)
+        return _SESSION
+
+
+def _get_thread_pool():
+    """
+    Returns the thread pool of the current process.
+    """
+    global _THREAD_POOL  # pylint: disable=global-statement
+    with _PROCESS_LOCK:
+        _check_process()
+        if _THREAD_POOL is None:
+            _THREAD_POOL = ThreadPool(get_client_setting('CONCURRENCY'))
+        return _THREAD_POOL
+
+
+def _send_request(method, url, **kwargs):
+    """
+    Sends the request to the comments service, through the connection pool
+    of the process if enabled.
+    """
+    if get_client_setting('CONNECTION_POOL_ENABLED'):
+        return _get_session().request(method, url, **kwargs)
+    return requests.request(method, url, **kwargs)
+
+
+def _get_read_cache():
+    """
+    Returns the cache of reads from the comments service for the current
+    request.
+    """
+    read_cache = getattr(_WORKER_STATE, 'read_cache', None)
+    if read_cache is None:
+        read_cache = request_cache.get_cache(READ_CACHE_NAME)
+    return read_cache
+
+
+def perform_concurrently(*funcs):
+    """
+    Calls the given functions, which make independent requests to the
+    comments service, concurrently on the thread pool of the process, and
+    returns the list of their results.
+
+    The functions are called with the current language and read cache. If
+    any of them raises an exception, the exception of the first one is
+    re-raised once all of them have returned.
+    """
+    concurrency = get_client_setting('CONCURRENCY')
+    if len(funcs) < 2 or concurrency < 2 or getattr(_WORKER_STATE, 'running', False):
+        # Functions called by worker threads are not run on the pool, which
+        # could otherwise have no thread left to run them.
+        return [func() for func in funcs]
+
+    language = get_language()
+    read_cache = _get_read_cache()
+
+    def call(func):
+        """
+        Calls func in a worker thread, returning its result and the
+        information of any exception it raised.
+        """
+        _WORKER_STATE.running = True
+        _WORKER_STATE.read_cache = read_cache
+        try:
+            with translation.override(language):
+                return func(), None
+        except Exception:  # pylint: disable=broad-except
+            return None, sys.exc_info()
+        finally:
+            _WORKER_STATE.running = False
+            _WORKER_STATE.read_cache = None
+
+    results = _get_thread_pool().map(call, funcs)
+    for __, exc_info in results:
+        if exc_info is not None:
+            raise exc_info[0], exc_info[1], exc_info[2]
+    return [result for result, __ in results]
+
+
 def perform_request(method, url, data_or_params=None, raw=False,
-                    metric_action=None, metric_tags=None, paged_results=False):
+                    metric_action=None, metric_tags=None, paged_results=False, cacheable=False):
+    """
+    Sends a request to the comments service and returns its response data.
+
+    If cacheable, the response of a GET request is kept in the read cache
+    of the current request for READ_CACHE_TIMEOUT seconds, and returned for
+    the same request until then. Any other request clears the read cache,
+    as it may change the data read.
+    """
 
     if metric_tags is None:
         metric_tags = []
@@ -63,6 +210,18 @@ def perform_request(method, url, data_or_params=None, raw=False,
 
     if data_or_params is None:
         data_or_params = {}
+
+    read_cache_timeout = get_client_setting('READ_CACHE_TIMEOUT')
+    read_cache_key = None
+    if method != 'get':
+        _get_read_cache().clear()
+    elif cacheable and read_cache_timeout > 0 and not raw:
+        read_cache_key = (url, repr(sorted(data_or_params.iteritems())), get_language())
+        expiration, data = _get_read_cache().get(read_cache_key, (0, None))
+        if expiration > time():
+            dog_stats_api.increment('comment_client.request.cache_hit', tags=metric_tags)
+            return deepcopy(data)
+
     headers = {
         'X-Edx-Api-Key': getattr(settings, "COMMENTS_SERVICE_KEY", None),
         'Accept-Language': get_language(),
@@ -77,7 +236,7 @@ def perform_request(method, url, data_or_params=None, raw=False,
         data = None
         params = merge_dict(data_or_params, request_id_dict)
     with request_timer(request_id, method, url, metric_tags):
-        response = requests.request(
+        response = _send_request(
             method,
             url,
             data=data,
@@ -130,6 +289,8 @@ def perform_request(method, url, data_or_params=None, raw=False,
                     value=data.get('num_pages', 1),
                     tags=metric_tags
                 )
+            if read_cache_key is not None:
+                _get_read_cache()[read_cache_key] = (time() + read_cache_timeout, deepcopy(data))
             return data
 
 
@@ -64,6 +64,13 @@ class BlockStructure(object):
         # Add the root block.
         self._add_block(self._block_relations, root_block_usage_key)
 
+        # The same relations on the integer ids of the blocks, if this
+        # structure was built from a CompactBlockStructure, with which
+        # blocks are traversed, removed and pruned.  Set to None once
+        # the relations are otherwise changed.
+        # CompactBlockRelations
+        self._compact_relations = None
+
     def __iter__(self):
         """
         The default iterator for a block structure is a topological
@@ -117,6 +124,7 @@ class BlockStructure(object):
         """
         self.root_block_usage_key = usage_key
         self._block_relations[usage_key].parents = []
+        self._compact_relations = None
 
     def __contains__(self, usage_key):
         """
@@ -162,6 +170,14 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_topologically method.
         """
+        if self._compact_relations is not None:
+            block_keys = self._compact_relations.block_keys
+            traversal = self._compact_relations.topological_traversal(
+                filter_func=self._get_block_id_filter(filter_func),
+                yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+            )
+            return (block_keys[block_id] for block_id in traversal)
+
         return traverse_topologically(
             start_node=self.root_block_usage_key,
             get_parents=self.get_parents,
@@ -186,6 +202,13 @@ class BlockStructure(object):
             generator - A generator object created from the
                 traverse_post_order method.
         """
+        if self._compact_relations is not None:
+            block_keys = self._compact_relations.block_keys
+            traversal = self._compact_relations.post_order_traversal(
+                filter_func=self._get_block_id_filter(filter_func),
+            )
+            return (block_keys[block_id] for block_id in traversal)
+
         return traverse_post_order(
             start_node=self.root_block_usage_key,
             get_children=self.get_children,
@@ -199,6 +222,9 @@ class BlockStructure(object):
         """
         Mutates this block structure by removing any unreachable blocks.
         """
+        if self._compact_relations is not None:
+            self._block_relations = self._compact_relations.prune_unreachable()
+            return
 
         # Create a new block relations map to store only those blocks
         # that are still linked
@@ -232,6 +258,17 @@ class BlockStructure(object):
             child_key (UsageKey) - Usage key of the child block.
         """
         self._add_to_relations(self._block_relations, parent_key, child_key)
+        self._compact_relations = None
+
+    def _get_block_id_filter(self, filter_func):
+        """
+        Returns the given filter function on usage keys as a filter
+        function on the ids of the blocks in _compact_relations.
+        """
+        if filter_func is None:
+            return None
+        block_keys = self._compact_relations.block_keys
+        return lambda block_id: filter_func(block_keys[block_id])
 
     @staticmethod
     def _add_to_relations(block_relations, parent_key, child_key):
@@ -299,6 +336,21 @@ class BlockStructureBlockData(BlockStructure):
         # defaultdict {string: dict}
         self._transformer_data = defaultdict(dict)
 
+        # Version of the modulestore data that the block structure was
+        # collected from, if the modulestore versions its data.
+        # any picklable type
+        self.source_version = None
+
+        # Map of each collected transformer's name to the names under
+        # which its data was stored: its own name and the names of any
+        # transformers that it contains.
+        # defaultdict {string: set(string)}
+        self._collected_transformer_names = defaultdict(set)
+
+        # Name of the transformer whose data is being collected, if any.
+        # string
+        self._collecting_transformer_name = None
+
     def get_xblock_field(self, usage_key, field_name, default=None):
         """
         Returns the collected value of the xBlock field for the
@@ -346,6 +398,7 @@ class BlockStructureBlockData(BlockStructure):
             value (any picklable type) - The value to associate with the
                 given key for the given transformer's data.
         """
+        self._record_collected_transformer(transformer)
         self._transformer_data[transformer.name()][key] = value
 
     def get_transformer_block_field(self, usage_key, transformer, key, default=None):
@@ -388,6 +441,7 @@ class BlockStructureBlockData(BlockStructure):
                 given key for the given transformer's data for the
                 requested block.
         """
+        self._record_collected_transformer(transformer)
         self._block_data_map[usage_key].transformer_data[transformer.name()][key] = value
 
     def get_transformer_block_data(self, usage_key, transformer):
@@ -448,26 +502,8 @@ class BlockStructureBlockData(BlockStructure):
                 removed block's children become children of the
                 removed block's parents.
         """
-        children = self._block_relations[usage_key].children
-        parents = self._block_relations[usage_key].parents
-
-        # Remove block from its children.
-        for child in children:
-            self._block_relations[child].parents.remove(usage_key)
-
-        # Remove block from its parents.
-        for parent in parents:
-            self._block_relations[parent].children.remove(usage_key)
-
-        # Remove block.
-        self._block_relations.pop(usage_key, None)
-        self._block_data_map.pop(usage_key, None)
-
-        # Recreate the graph connections if descendants are to be kept.
-        if keep_descendants:
-            for child in children:
-                for parent in parents:
-                    self._add_relation(parent, child)
+        self._compact_relations = None
+        self._remove_block(usage_key, keep_descendants)
 
     def remove_block_if(self, removal_condition, keep_descendants=False, **kwargs):
         """
@@ -486,6 +522,26 @@ class BlockStructureBlockData(BlockStructure):
             kwargs (dict) - Optional keyword arguments to be forwarded
                 to topological_traversal.
         """
+        compact_relations = self._compact_relations
+        if compact_relations is not None:
+            block_keys = compact_relations.block_keys
+
+            def filter_block_id(block_id):
+                """
+                Filter function for removing blocks that satisfy the
+                removal_condition, by block id.
+                """
+                block_key = block_keys[block_id]
+                if removal_condition(block_key):
+                    self._remove_block(block_key, keep_descendants)
+                    compact_relations.remove_block(block_id, keep_descendants)
+                    return False
+                return True
+
+            for _ in compact_relations.topological_traversal(filter_func=filter_block_id, **kwargs):
+                pass
+            return
+
         def filter_func(block_key):
             """
             Filter function for removing blocks that satisfy the
@@ -507,6 +563,32 @@ class BlockStructureBlockData(BlockStructure):
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
+    def _remove_block(self, usage_key, keep_descendants):
+        """
+        Removes the block as in remove_block, leaving it to the caller
+        to update _compact_relations.
+        """
+        children = self._block_relations[usage_key].children
+        parents = self._block_relations[usage_key].parents
+
+        # Remove block from its children.
+        for child in children:
+            self._block_relations[child].parents.remove(usage_key)
+
+        # Remove block from its parents.
+        for parent in parents:
+            self._block_relations[parent].children.remove(usage_key)
+
+        # Remove block.
+        self._block_relations.pop(usage_key, None)
+        self._block_data_map.pop(usage_key, None)
+
+        # Recreate the graph connections if descendants are to be kept.
+        if keep_descendants:
+            for child in children:
+                for parent in parents:
+                    self._add_to_relations(self._block_relations, parent, child)
+
     def _get_transformer_data_version(self, transformer):
         """
         Returns the version number stored for the given transformer.
@@ -521,12 +603,38 @@ class BlockStructureBlockData(BlockStructure):
     def _add_transformer(self, transformer):
         """
         Adds the given transformer to the block structure by recording
-        its current version number.
+        its current version number. Data stored until the next call is
+        attributed to the given transformer.
         """
         if transformer.VERSION == 0:
             raise TransformerException('VERSION attribute is not set on transformer {0}.', transformer.name())
+        self._collecting_transformer_name = transformer.name()
         self.set_transformer_data(transformer, TRANSFORMER_VERSION_KEY, transformer.VERSION)
 
+    def _end_transformers_collection(self):
+        """
+        Stops attributing stored data to the last added transformer.
+        """
+        self._collecting_transformer_name = None
+
+    def _record_collected_transformer(self, transformer):
+        """
+        Records that data of the given transformer is collected by the
+        transformer that was last added, if any.
+        """
+        if self._collecting_transformer_name is not None:
+            self._collected_transformer_names[self._collecting_transformer_name].add(transformer.name())
+
+    def _remove_transformer(self, transformer):
+        """
+        Removes all the data collected by the given transformer,
+        including the data of the transformers that it contains.
+        """
+        for name in self._collected_transformer_names.pop(transformer.name(), ()):
+            self._transformer_data.pop(name, None)
+            for block_data in self._block_data_map.itervalues():
+                block_data.transformer_data.pop(name, None)
+
 
 class BlockStructureModulestoreData(BlockStructureBlockData):
     """
@@ -550,6 +658,17 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         # set(string)
         self._requested_xblock_fields = set()
 
+        # Modulestore from which xBlocks that were not added are loaded
+        # on demand, during an incremental collection.
+        # ModuleStoreRead
+        self._modulestore = None
+
+        # Set of usage keys of the blocks whose data is being collected,
+        # or None if the data of all blocks is being collected. Blocks
+        # outside this set keep the data collected for them previously.
+        # set(UsageKey)
+        self._collect_block_keys = None
+
     def request_xblock_fields(self, *field_names):
         """
         Records request for collecting data for the given xBlock fields.
@@ -574,8 +693,31 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
             usage_key (UsageKey) - Usage key of the block whose
                 xBlock object is to be returned.
         """
+        if usage_key not in self._xblock_map and self._modulestore is not None:
+            self._xblock_map[usage_key] = self._modulestore.get_item(usage_key)
         return self._xblock_map[usage_key]
 
+    def topological_traversal(self, filter_func=None, yield_descendants_of_unyielded=False):
+        """
+        Performs a topological sort of the block structure, as in
+        BlockStructure.topological_traversal, yielding only the blocks
+        whose data is being collected.
+        """
+        traversal = super(BlockStructureModulestoreData, self).topological_traversal(
+            filter_func=filter_func,
+            yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+        )
+        return self._filter_collected_blocks(traversal)
+
+    def post_order_traversal(self, filter_func=None):
+        """
+        Performs a post-order sort of the block structure, as in
+        BlockStructure.post_order_traversal, yielding only the blocks
+        whose data is being collected.
+        """
+        traversal = super(BlockStructureModulestoreData, self).post_order_traversal(filter_func=filter_func)
+        return self._filter_collected_blocks(traversal)
+
     #--- Internal methods ---#
     # To be used within the block_structure framework or by tests.
 
@@ -594,15 +736,47 @@ class BlockStructureModulestoreData(BlockStructureBlockData):
         """
         self._xblock_map[usage_key] = xblock
 
+    def _filter_collected_blocks(self, block_keys):
+        """
+        Returns the given iterable of block keys, restricted to the
+        blocks whose data is being collected.
+        """
+        if self._collect_block_keys is None:
+            return block_keys
+        return (block_key for block_key in block_keys if block_key in self._collect_block_keys)
+
+    def _set_collect_scope(self, modulestore, block_keys):
+        """
+        Restricts the collection of data to the given blocks, loading
+        their xBlocks from the given modulestore on demand. Passing None
+        for both restores the collection of all blocks.
+
+        Arguments:
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the xBlocks of the blocks to collect.
+
+            block_keys (set(UsageKey)) - Usage keys of the blocks
+                whose data is to be collected.
+        """
+        self._modulestore = modulestore
+        self._collect_block_keys = block_keys
+
     def _collect_requested_xblock_fields(self):
         """
         Iterates through all instantiated xBlocks that were added and
-        collects all xBlock fields that were requested.
+        collects all xBlock fields that were requested. During an
+        incremental collection, it iterates through the blocks whose
+        data is being collected instead, loading the xBlocks that no
+        transformer loaded.
         """
         if not self._requested_xblock_fields:
             return
 
-        for xblock_usage_key, xblock in self._xblock_map.iteritems():
+        if self._collect_block_keys is None:
+            xblocks = self._xblock_map.iteritems()
+        else:
+            xblocks = ((usage_key, self.get_xblock(usage_key)) for usage_key in self._collect_block_keys)
+        for xblock_usage_key, xblock in xblocks:
             for field_name in self._requested_xblock_fields:
                 self._set_xblock_field(xblock_usage_key, xblock, field_name)
 
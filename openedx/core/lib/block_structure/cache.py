@@ -7,54 +7,111 @@ from logging import getLogger
 from openedx.core.lib.cache_utils import zpickle, zunpickle
 
 from .block_structure import BlockStructureModulestoreData
+from .compact import CompactBlockStructure
+from .transformer_registry import TransformerRegistry
 
 
 logger = getLogger(__name__)  # pylint: disable=C0103
 
+# Version of the layout of the cached data, bumped whenever it changes.
+CACHE_FORMAT_VERSION = 3
+
 
 class BlockStructureCache(object):
     """
     Cache for BlockStructure objects.
     """
-    def __init__(self, cache):
+    def __init__(self, cache, codec=None, compressor=None):
         """
         Arguments:
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache into which cacheable data of the block structure
                 is to be serialized.
+
+            codec (str) - The name of the cache_utils codec to serialize
+                with. If neither codec nor compressor is given, the data
+                is pickled and zlib compressed.
+
+            compressor (str) - The name of the cache_utils compressor
+                to compress the serialization with.
         """
         self._cache = cache
+        self._codec = codec
+        self._compressor = compressor
 
-    def add(self, block_structure):
+    def add(self, block_structure, transformers=None):
         """
-        Store a compressed and pickled serialization of the given
-        block structure into the given cache.
+        Store a compressed serialization of the given block structure
+        into the given cache.
 
-        The key in the cache is 'root.key.<root_block_usage_key>'.
-        The data stored in the cache includes the structure's
-        block relations, transformer data, and block data.
+        The data is stored in its CompactBlockStructure representation,
+        sharded into several cache entries, so that the data of each
+        transformer can be read and updated on its own:
+          * 'root.key.<root_block_usage_key>' stores the structure's
+            block relations, xBlock fields and source version, and the
+            names of its collected transformers.
+          * 'root.transformer.<name>.<root_block_usage_key>' stores the
+            transformer data and block transformer data collected by the
+            transformer of that name, including the data of any
+            transformers that it contains. It is only read along with a
+            base entry numbering the blocks the same way.
 
         Arguments:
             block_structure (BlockStructure) - The block structure
                 that is to be serialized to the given cache.
+
+            transformers ([BlockStructureTransformer]) - If given, only
+                the data of these transformers is stored, along with the
+                block relations and xBlock fields. The data of the other
+                transformers in the cache is kept.
         """
-        data_to_cache = (
-            block_structure._block_relations,
-            block_structure._transformer_data,
-            block_structure._block_data_map
-        )
-        zp_data_to_cache = zpickle(data_to_cache)
-        self._cache.set(
-            self._encode_root_cache_key(block_structure.root_block_usage_key),
-            zp_data_to_cache
+        root_block_usage_key = block_structure.root_block_usage_key
+        collected_transformer_names = block_structure._collected_transformer_names
+        if transformers is None:
+            transformer_names = collected_transformer_names.keys()
+        else:
+            transformer_names = [transformer.name() for transformer in transformers]
+
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        block_ids_digest = compact_structure.get_block_ids_digest()
+        transformer_data, transformer_block_columns = (
+            compact_structure.transformer_data, compact_structure.transformer_block_columns
         )
+        compact_structure.transformer_data, compact_structure.transformer_block_columns = {}, {}
+
+        data_to_cache = {
+            self._encode_root_cache_key(root_block_usage_key): (
+                CACHE_FORMAT_VERSION,
+                compact_structure,
+                block_ids_digest,
+                block_structure.source_version,
+                dict(collected_transformer_names),
+            ),
+        }
+        for transformer_name in transformer_names:
+            data_to_cache[self._encode_transformer_cache_key(root_block_usage_key, transformer_name)] = (
+                block_structure.source_version,
+                block_ids_digest,
+                {
+                    name: (transformer_data.get(name, {}), transformer_block_columns.get(name, {}))
+                    for name in collected_transformer_names.get(transformer_name, ())
+                },
+            )
+
+        zp_data_to_cache = {
+            cache_key: zpickle(data, self._codec, self._compressor)
+            for cache_key, data in data_to_cache.iteritems()
+        }
+        self._cache.set_many(zp_data_to_cache)
+        if block_structure.source_version is not None:
+            self.set_current_version(root_block_usage_key, block_structure.source_version, replace=False)
         logger.debug(
             "Wrote BlockStructure %s to cache, size: %s",
-            block_structure.root_block_usage_key,
-            len(zp_data_to_cache),
+            root_block_usage_key,
+            sum(len(zp_data) for zp_data in zp_data_to_cache.itervalues()),
         )
 
-    def get(self, root_block_usage_key):
+    def get(self, root_block_usage_key, transformers=None, include_stale=False, starting_block_usage_key=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -67,15 +124,46 @@ class BlockStructureCache(object):
                 of the block structure that is to be deserialized from
                 the given cache.
 
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose data is to be read from the cache. If None, the
+                data of all registered transformers is read. The data of
+                a transformer not found in the cache is missing from the
+                returned block structure, and so is outdated.
+
+            include_stale (bool) - Whether to also return a block
+                structure collected from an older version than the one
+                last set with set_current_version. A versioned block
+                structure whose current version is missing from the
+                cache, e.g. evicted, is also stale, since the version
+                may have changed since.
+
+            starting_block_usage_key (UsageKey) - If given, only the
+                blocks under this block are deserialized, and the
+                returned block structure is rooted at it.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
             NoneType - If the root_block_usage_key is not found in the cache.
+
+        Raises:
+            UsageKeyNotInBlockStructure - If starting_block_usage_key is
+                not in the block structure found in the cache.
         """
+        if transformers is None:
+            transformers = TransformerRegistry.get_registered_transformers()
 
-        # Find root_block_usage_key in the cache.
-        zp_data_from_cache = self._cache.get(self._encode_root_cache_key(root_block_usage_key))
+        # Find root_block_usage_key in the cache, along with the data of
+        # the transformers.
+        root_cache_key = self._encode_root_cache_key(root_block_usage_key)
+        version_cache_key = self._encode_version_cache_key(root_block_usage_key)
+        transformer_cache_keys = [
+            self._encode_transformer_cache_key(root_block_usage_key, transformer.name())
+            for transformer in transformers
+        ]
+        cached = self._cache.get_many([root_cache_key, version_cache_key] + transformer_cache_keys)
+        zp_data_from_cache = cached.get(root_cache_key)
         if not zp_data_from_cache:
             logger.debug(
                 "Did not find BlockStructure %r in the cache.",
@@ -86,18 +174,74 @@ class BlockStructureCache(object):
             logger.debug(
                 "Read BlockStructure %r from cache, size: %s",
                 root_block_usage_key,
-                len(zp_data_from_cache),
+                sum(len(zp_data) for cache_key, zp_data in cached.iteritems() if cache_key != version_cache_key),
             )
 
         # Deserialize and construct the block structure.
-        block_relations, transformer_data, block_data_map = zunpickle(zp_data_from_cache)
-        block_structure = BlockStructureModulestoreData(root_block_usage_key)
-        block_structure._block_relations = block_relations
-        block_structure._transformer_data = transformer_data
-        block_structure._block_data_map = block_data_map
+        data_from_cache = zunpickle(zp_data_from_cache)
+        if data_from_cache[0] != CACHE_FORMAT_VERSION:
+            logger.debug(
+                "BlockStructure %r in the cache has an outdated format.",
+                root_block_usage_key,
+            )
+            return None
+        __, compact_structure, block_ids_digest, source_version, collected_transformer_names = data_from_cache
+
+        for transformer_cache_key in transformer_cache_keys:
+            if transformer_cache_key not in cached:
+                continue
+            transformer_source_version, transformer_block_ids_digest, transformers_data = zunpickle(
+                cached[transformer_cache_key]
+            )
+            # Ignore data collected from another version, or for other blocks, than the rest.
+            if (transformer_source_version, transformer_block_ids_digest) != (source_version, block_ids_digest):
+                continue
+            for name, (transformer_data, block_columns) in transformers_data.iteritems():
+                compact_structure.transformer_data[name] = transformer_data
+                compact_structure.transformer_block_columns[name] = block_columns
+
+        block_structure = compact_structure.to_block_structure(
+            BlockStructureModulestoreData,
+            starting_block_usage_key,
+        )
+        block_structure.source_version = source_version
+        block_structure._collected_transformer_names.update(collected_transformer_names)
+
+        current_version = cached.get(version_cache_key)
+        if not include_stale and source_version is not None and current_version != source_version:
+            logger.debug(
+                "BlockStructure %r in the cache is stale: collected from version %s, current version is %s.",
+                root_block_usage_key,
+                block_structure.source_version,
+                current_version,
+            )
+            return None
 
         return block_structure
 
+    def set_current_version(self, root_block_usage_key, version, replace=True):
+        """
+        Records the current version of the modulestore data of the block
+        structure for the given root_block_usage_key, so that a block
+        structure in the cache collected from another version is stale.
+
+        Arguments:
+            root_block_usage_key (UsageKey) - The usage_key for the root
+                of the block structure.
+
+            version (any picklable type) - The current version of the
+                block structure's modulestore data.
+
+            replace (bool) - Whether to replace a version already
+                recorded. If False, the version is only recorded if none
+                is, so that a newer version recorded meanwhile is kept.
+        """
+        version_cache_key = self._encode_version_cache_key(root_block_usage_key)
+        if replace:
+            self._cache.set(version_cache_key, version)
+        else:
+            self._cache.add(version_cache_key, version)
+
     def delete(self, root_block_usage_key):
         """
         Deletes the block structure for the given root_block_usage_key
@@ -108,12 +252,61 @@ class BlockStructureCache(object):
                 of the block structure that is to be removed from
                 the cache.
         """
-        self._cache.delete(self._encode_root_cache_key(root_block_usage_key))
+        self._cache.delete_many([
+            self._encode_root_cache_key(root_block_usage_key),
+            self._encode_version_cache_key(root_block_usage_key),
+        ] + [
+            self._encode_transformer_cache_key(root_block_usage_key, transformer.name())
+            for transformer in TransformerRegistry.get_registered_transformers()
+        ])
         logger.debug(
             "Deleted BlockStructure %r from the cache.",
             root_block_usage_key,
         )
 
+    def acquire_lease(self, root_block_usage_key, timeout):
+        """
+        Takes the lease on collecting the block structure for the given
+        root_block_usage_key, so that other processes know it is being
+        collected. The lease expires after timeout seconds unless released.
+
+        Returns:
+            bool - Whether the lease was acquired, i.e. whether no other
+            process was holding it.
+        """
+        return self._cache.add(self._encode_lease_cache_key(root_block_usage_key), True, timeout)
+
+    def release_lease(self, root_block_usage_key):
+        """
+        Releases the lease taken with acquire_lease.
+        """
+        self._cache.delete(self._encode_lease_cache_key(root_block_usage_key))
+
+    @classmethod
+    def _encode_transformer_cache_key(cls, root_block_usage_key, transformer_name):
+        """
+        Returns the cache key to use for storing the data collected by
+        the transformer of the given name, for the block structure for
+        the given root_block_usage_key.
+        """
+        return u"root.transformer.{}.{}".format(transformer_name, unicode(root_block_usage_key))
+
+    @classmethod
+    def _encode_version_cache_key(cls, root_block_usage_key):
+        """
+        Returns the cache key of the current version of the block
+        structure for the given root_block_usage_key.
+        """
+        return "root.version." + unicode(root_block_usage_key)
+
+    @classmethod
+    def _encode_lease_cache_key(cls, root_block_usage_key):
+        """
+        Returns the cache key of the lease on collecting the block structure
+        for the given root_block_usage_key.
+        """
+        return "root.lease." + unicode(root_block_usage_key)
+
     @classmethod
     def _encode_root_cache_key(cls, root_block_usage_key):
         """
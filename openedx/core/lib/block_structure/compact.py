@@ -0,0 +1,495 @@
+"""
+Module for CompactBlockStructure, an array-backed representation of a
+collected block structure.
+
+A BlockStructure keeps a _BlockRelations object per block, with lists of the
+usage keys of the block's parents and children, and a _BlockData object per
+block, with dicts of its xBlock fields and transformer data. That suits the
+transformers, which remove blocks while transforming the structure, but it is
+a lot of objects to pickle, unpickle and traverse for a course with tens of
+thousands of blocks.
+
+A CompactBlockStructure interns the usage keys into integer ids instead, in
+pre-order from the root, and stores:
+  * the children of the blocks in CSR form: the ids of the children of all the
+    blocks in a single array, with the offset of each block's children in a
+    second array;
+  * each xBlock field, and each field of a transformer's block data, as a
+    column of the ids of the blocks having a value and the list of the values.
+
+It is not modified once created. It converts to and from a
+BlockStructureBlockData, working on the integer ids, and can build the block
+structure of only the blocks under a starting block.
+
+A block structure built from a CompactBlockStructure keeps a
+CompactBlockRelations of its blocks, with which it traverses, removes and
+prunes blocks on the integer ids and the CSR arrays, instead of hashing usage
+keys to look up their _BlockRelations.
+"""
+# pylint: disable=protected-access
+import hashlib
+from array import array
+from collections import defaultdict
+from itertools import izip
+
+from openedx.core.lib.graph_traversals import traverse_topologically, traverse_post_order
+
+from .block_structure import _BlockData, _BlockRelations
+from .exceptions import UsageKeyNotInBlockStructure
+
+
+def _pack_ids(ids):
+    """
+    Returns the given list of ids packed into a string.
+    """
+    return array('I', ids).tostring()
+
+
+def _unpack_ids(packed_ids):
+    """
+    Returns the list of ids packed by _pack_ids.
+    """
+    ids = array('I')
+    ids.fromstring(packed_ids)
+    return ids.tolist()
+
+
+class _ColumnsEncoder(object):
+    """
+    Accumulates the columns of fields of block data: for each field, the
+    ids of the blocks having a value for the field and those values.
+    """
+    def __init__(self):
+        # dict {string: ([int], list)}
+        self._columns = defaultdict(lambda: ([], []))
+
+    def add(self, block_id, fields):
+        """
+        Adds the given dict of field values of the block with the given id.
+        """
+        for field_name, value in fields.iteritems():
+            ids, values = self._columns[field_name]
+            ids.append(block_id)
+            values.append(value)
+
+    def encode(self):
+        """
+        Returns a map of each field name to its column: a pair of the
+        packed ids of the blocks having a value and the list of values.
+        """
+        return {field_name: (_pack_ids(ids), values) for field_name, (ids, values) in self._columns.iteritems()}
+
+
+class CompactBlockStructure(object):
+    """
+    An array-backed, read-only representation of the blocks, relations
+    and collected data of a block structure.
+    """
+    def __init__(self, block_keys, child_offsets, child_ids):
+        """
+        Arguments:
+            block_keys ([UsageKey]) - The usage key of each block id, the
+                root block's being first.
+
+            child_offsets ([int]) - The offset in child_ids of the
+                children of each block id, followed by the length of
+                child_ids.
+
+            child_ids ([int]) - The ids of the children of all blocks.
+        """
+        self.block_keys = block_keys
+        self.child_offsets = child_offsets
+        self.child_ids = child_ids
+
+        # Map of each xBlock field name to its column.
+        # dict {string: (string, list)}
+        self.xblock_field_columns = {}
+
+        # Map of a transformer's name to its non-block-specific data.
+        # dict {string: dict}
+        self.transformer_data = {}
+
+        # Map of a transformer's name to the columns of its block data.
+        # dict {string: dict {string: (string, list)}}
+        self.transformer_block_columns = {}
+
+        # The offset in parent_ids of the parents of each block id, and
+        # the ids of the parents of all blocks, computed when needed.
+        self._parent_offsets = None
+        self._parent_ids = None
+
+    def __len__(self):
+        return len(self.block_keys)
+
+    def __getstate__(self):
+        """
+        Returns the state of the structure to pickle, with its arrays
+        packed into strings.
+        """
+        return (
+            self.block_keys,
+            _pack_ids(self.child_offsets),
+            _pack_ids(self.child_ids),
+            self.xblock_field_columns,
+            self.transformer_data,
+            self.transformer_block_columns,
+        )
+
+    def __setstate__(self, state):
+        """
+        Restores the structure from the state returned by __getstate__.
+        """
+        (
+            block_keys, packed_child_offsets, packed_child_ids,
+            xblock_field_columns, transformer_data, transformer_block_columns,
+        ) = state
+        self.__init__(block_keys, _unpack_ids(packed_child_offsets), _unpack_ids(packed_child_ids))
+        self.xblock_field_columns = xblock_field_columns
+        self.transformer_data = transformer_data
+        self.transformer_block_columns = transformer_block_columns
+
+    @classmethod
+    def from_block_structure(cls, block_structure):
+        """
+        Returns the compact representation of the given block structure.
+
+        Blocks are numbered in pre-order from the root, so block
+        structures with the same blocks and relations are given the same
+        ids. Blocks that are not reachable from the root come last.
+
+        Arguments:
+            block_structure (BlockStructureBlockData) - The block
+                structure to represent.
+        """
+        block_relations = block_structure._block_relations
+        block_keys = []
+        block_ids = {}
+        stack = [block_structure.root_block_usage_key]
+        while stack:
+            usage_key = stack.pop()
+            if usage_key in block_ids:
+                continue
+            block_ids[usage_key] = len(block_keys)
+            block_keys.append(usage_key)
+            stack.extend(reversed(block_relations[usage_key].children))
+        for usage_key in block_relations:
+            if usage_key not in block_ids:
+                block_ids[usage_key] = len(block_keys)
+                block_keys.append(usage_key)
+
+        child_offsets = []
+        child_ids = []
+        for usage_key in block_keys:
+            child_offsets.append(len(child_ids))
+            child_ids.extend(block_ids[child] for child in block_relations[usage_key].children)
+        child_offsets.append(len(child_ids))
+
+        compact_structure = cls(block_keys, child_offsets, child_ids)
+
+        xblock_fields_encoder = _ColumnsEncoder()
+        transformer_encoders = defaultdict(_ColumnsEncoder)
+        for usage_key, block_data in block_structure._block_data_map.iteritems():
+            block_id = block_ids.get(usage_key)
+            if block_id is None:
+                continue
+            xblock_fields_encoder.add(block_id, block_data.xblock_fields)
+            for name, data in block_data.transformer_data.iteritems():
+                transformer_encoders[name].add(block_id, data)
+
+        compact_structure.xblock_field_columns = xblock_fields_encoder.encode()
+        compact_structure.transformer_data = {
+            name: dict(data) for name, data in block_structure._transformer_data.iteritems()
+        }
+        compact_structure.transformer_block_columns = {
+            name: encoder.encode() for name, encoder in transformer_encoders.iteritems()
+        }
+        return compact_structure
+
+    def to_block_structure(self, block_structure_class, starting_block_usage_key=None):
+        """
+        Returns a block structure of the given class with the blocks,
+        relations and collected data of this structure.
+
+        Arguments:
+            block_structure_class (type) - BlockStructureBlockData or a
+                subclass of it.
+
+            starting_block_usage_key (UsageKey) - If given, the returned
+                block structure is rooted at this block, and only has
+                the blocks reachable from it.
+
+        Raises:
+            UsageKeyNotInBlockStructure - If starting_block_usage_key is
+                not in this structure.
+        """
+        block_keys = self.block_keys
+        if starting_block_usage_key is None:
+            start_id = 0
+            included = None
+            block_ids = xrange(len(block_keys))
+            present = bytearray('\x01') * len(block_keys)
+        else:
+            start_id = self.get_block_id(starting_block_usage_key)
+            block_ids = self.pre_order_ids(start_id)
+            included = present = bytearray(len(block_keys))
+            for block_id in block_ids:
+                included[block_id] = 1
+
+        block_structure = block_structure_class(block_keys[start_id])
+        compact_relations = CompactBlockRelations(self, start_id, present)
+        block_structure._block_relations = compact_relations.get_block_relations(block_ids)
+        block_structure._compact_relations = compact_relations
+
+        # Fill the data of the blocks by id, so that each usage key is
+        # hashed only once, when the data is added to the block data map.
+        block_data_list = [None] * len(block_keys)
+
+        def get_block_data(block_id):
+            """
+            Returns the _BlockData of the block with the given id.
+            """
+            block_data = block_data_list[block_id]
+            if block_data is None:
+                block_data = block_data_list[block_id] = _BlockData()
+            return block_data
+
+        for field_name, column in self.xblock_field_columns.iteritems():
+            for block_id, value in self._iter_column(column, included):
+                get_block_data(block_id).xblock_fields[field_name] = value
+        for name, columns in self.transformer_block_columns.iteritems():
+            for key, column in columns.iteritems():
+                for block_id, value in self._iter_column(column, included):
+                    get_block_data(block_id).transformer_data[name][key] = value
+
+        block_data_map = block_structure._block_data_map
+        for block_id, block_data in enumerate(block_data_list):
+            if block_data is not None:
+                block_data_map[block_keys[block_id]] = block_data
+        for name, data in self.transformer_data.iteritems():
+            block_structure._transformer_data[name] = dict(data)
+        return block_structure
+
+    def get_block_id(self, usage_key):
+        """
+        Returns the id of the block with the given usage key.
+
+        Raises:
+            UsageKeyNotInBlockStructure - If the block is not in this
+                structure.
+        """
+        try:
+            return self.block_keys.index(usage_key)
+        except ValueError:
+            raise UsageKeyNotInBlockStructure(
+                "The usage_key '{0}' is not found in the block_structure with root '{1}'",
+                unicode(usage_key),
+                unicode(self.block_keys[0]),
+            )
+
+    def get_block_ids_digest(self):
+        """
+        Returns a digest of the ids given to the blocks, identifying the
+        numbering that the columns of block data refer to.
+        """
+        digest = hashlib.md5()
+        for usage_key in self.block_keys:
+            digest.update(unicode(usage_key).encode('utf-8'))
+            digest.update('\n')
+        return digest.hexdigest()
+
+    def pre_order_ids(self, start_id=0):
+        """
+        Returns the ids of the blocks reachable from the block with the
+        given id, in pre-order.
+        """
+        child_offsets, child_ids = self.child_offsets, self.child_ids
+        visited = bytearray(len(self.block_keys))
+        ordered_ids = []
+        stack = [start_id]
+        while stack:
+            block_id = stack.pop()
+            if visited[block_id]:
+                continue
+            visited[block_id] = 1
+            ordered_ids.append(block_id)
+            stack.extend(reversed(child_ids[child_offsets[block_id]:child_offsets[block_id + 1]]))
+        return ordered_ids
+
+    def _get_parents_arrays(self):
+        """
+        Returns the CSR arrays of the parents of the blocks, computing
+        them from the children arrays if needed.
+        """
+        if self._parent_offsets is None:
+            block_count = len(self.block_keys)
+            child_offsets, child_ids = self.child_offsets, self.child_ids
+
+            parent_offsets = [0] * (block_count + 1)
+            for child_id in child_ids:
+                parent_offsets[child_id + 1] += 1
+            for block_id in xrange(block_count):
+                parent_offsets[block_id + 1] += parent_offsets[block_id]
+
+            parent_ids = [0] * len(child_ids)
+            next_offsets = parent_offsets[:-1]
+            for block_id in xrange(block_count):
+                for child_id in child_ids[child_offsets[block_id]:child_offsets[block_id + 1]]:
+                    parent_ids[next_offsets[child_id]] = block_id
+                    next_offsets[child_id] += 1
+
+            self._parent_offsets, self._parent_ids = parent_offsets, parent_ids
+        return self._parent_offsets, self._parent_ids
+
+    @staticmethod
+    def _iter_column(column, included=None):
+        """
+        Yields the (block id, value) pairs of the given column, only for
+        the included block ids if given.
+        """
+        packed_ids, values = column
+        pairs = izip(_unpack_ids(packed_ids), values)
+        if included is None:
+            return pairs
+        return ((block_id, value) for block_id, value in pairs if included[block_id])
+
+
+class CompactBlockRelations(object):
+    """
+    The relations of the blocks of a block structure built from a
+    CompactBlockStructure, on the integer ids of the blocks.
+
+    The relations are backed by the CSR arrays of the CompactBlockStructure:
+    a removed block is only marked as absent, and the relations added when
+    removing a block while keeping its descendants are kept aside.
+    """
+    def __init__(self, compact_structure, start_id, present):
+        """
+        Arguments:
+            compact_structure (CompactBlockStructure) - The structure
+                whose arrays back the relations.
+
+            start_id (int) - The id of the block from which the block
+                structure is traversed.
+
+            present (bytearray) - Whether each block id is in the block
+                structure.
+        """
+        self.block_keys = compact_structure.block_keys
+        self.start_id = start_id
+        self.present = present
+        self._child_offsets = compact_structure.child_offsets
+        self._child_ids = compact_structure.child_ids
+        self._parent_offsets, self._parent_ids = compact_structure._get_parents_arrays()
+
+        # Map of a block id to the ids of the children added to the block,
+        # and of a block id to the ids of the parents added to the block.
+        # dict {int: [int]}
+        self._added_child_ids = {}
+        self._added_parent_ids = {}
+
+    def get_child_ids(self, block_id):
+        """
+        Returns the ids of the children of the block with the given id.
+        """
+        present = self.present
+        child_ids = [
+            child_id
+            for child_id in self._child_ids[self._child_offsets[block_id]:self._child_offsets[block_id + 1]]
+            if present[child_id]
+        ]
+        if block_id in self._added_child_ids:
+            child_ids.extend(child_id for child_id in self._added_child_ids[block_id] if present[child_id])
+        return child_ids
+
+    def get_parent_ids(self, block_id):
+        """
+        Returns the ids of the parents of the block with the given id.
+        """
+        present = self.present
+        parent_ids = [
+            parent_id
+            for parent_id in self._parent_ids[self._parent_offsets[block_id]:self._parent_offsets[block_id + 1]]
+            if present[parent_id]
+        ]
+        if block_id in self._added_parent_ids:
+            parent_ids.extend(parent_id for parent_id in self._added_parent_ids[block_id] if present[parent_id])
+        return parent_ids
+
+    def get_block_relations(self, block_ids):
+        """
+        Returns a map of the usage key of each of the blocks with the
+        given ids to the _BlockRelations of the block.
+        """
+        block_keys = self.block_keys
+        block_relations = defaultdict(_BlockRelations)
+
+        # Set the attributes of the relations directly, as the constructor
+        # would only create lists to be replaced.
+        new_object = object.__new__
+        for block_id in block_ids:
+            relations = new_object(_BlockRelations)
+            relations.__dict__ = {
+                'parents': [block_keys[parent_id] for parent_id in self.get_parent_ids(block_id)],
+                'children': [block_keys[child_id] for child_id in self.get_child_ids(block_id)],
+            }
+            block_relations[block_keys[block_id]] = relations
+        return block_relations
+
+    def topological_traversal(self, filter_func=None, yield_descendants_of_unyielded=False):
+        """
+        Performs a topological sort of the blocks and yields the id of
+        each block as it is encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_topologically,
+            with filter_func taking a block id.
+        """
+        return traverse_topologically(
+            start_node=self.start_id,
+            get_parents=self.get_parent_ids,
+            get_children=self.get_child_ids,
+            filter_func=filter_func,
+            yield_descendants_of_unyielded=yield_descendants_of_unyielded,
+        )
+
+    def post_order_traversal(self, filter_func=None):
+        """
+        Performs a post-order sort of the blocks and yields the id of
+        each block as it is encountered.
+
+        Arguments:
+            See the description in
+            openedx.core.lib.graph_traversals.traverse_post_order,
+            with filter_func taking a block id.
+        """
+        return traverse_post_order(
+            start_node=self.start_id,
+            get_children=self.get_child_ids,
+            filter_func=filter_func,
+        )
+
+    def remove_block(self, block_id, keep_descendants):
+        """
+        Removes the block with the given id, as in
+        BlockStructureBlockData.remove_block.
+        """
+        if keep_descendants:
+            parent_ids = self.get_parent_ids(block_id)
+            for child_id in self.get_child_ids(block_id):
+                for parent_id in parent_ids:
+                    self._added_child_ids.setdefault(parent_id, []).append(child_id)
+                    self._added_parent_ids.setdefault(child_id, []).append(parent_id)
+        self.present[block_id] = 0
+
+    def prune_unreachable(self):
+        """
+        Removes the blocks that are not reachable from the start block,
+        and returns the block relations of the remaining blocks, as
+        returned by get_block_relations.
+        """
+        block_ids = list(self.post_order_traversal())
+        self.present = bytearray(len(self.block_keys))
+        for block_id in block_ids:
+            self.present[block_id] = 1
+        return self.get_block_relations(block_ids)
@@ -1,6 +1,8 @@
 """
 Module for factory class for BlockStructure objects.
 """
+from openedx.core.lib.graph_traversals import traverse_pre_order
+
 from .block_structure import BlockStructureModulestoreData
 
 
@@ -58,7 +60,126 @@ class BlockStructureFactory(object):
         return block_structure
 
     @classmethod
-    def create_from_cache(cls, root_block_usage_key, block_structure_cache):
+    def create_from_previous(cls, previous_block_structure, changed_block_keys, modulestore):
+        """
+        Creates and returns a block structure from the modulestore,
+        reusing the data previously collected for the blocks that are
+        not affected by the given changed blocks.
+
+        Only the xBlocks of the changed blocks and their descendants are
+        loaded to update the structure's relations; the relations of the
+        other blocks are copied from the previous block structure. The
+        changed blocks, their ancestors and their descendants are then
+        left to be collected again, loading the ancestors' xBlocks on
+        demand. Data collected for a block may depend on its ancestors
+        (when percolated down) or on its descendants (when aggregated
+        up), but not on unrelated blocks.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A block
+                structure previously collected from the modulestore.
+
+            changed_block_keys (set(UsageKey)) - Usage keys of the
+                blocks that were added or changed in the modulestore
+                since previous_block_structure was collected. A block
+                whose children changed is itself changed.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks within the block
+                structure.
+
+        Returns:
+            BlockStructureModulestoreData - The created block structure,
+                with the data of the unaffected blocks and restricted to
+                collecting the data of the affected blocks. The
+                transformers' collect methods must then be called on it.
+        """
+        root_block_usage_key = previous_block_structure.root_block_usage_key
+        block_structure = BlockStructureModulestoreData(root_block_usage_key)
+        blocks_visited = set()
+
+        def build_block_structure(block_key, xblock=None):
+            """
+            Recursively update the block structure with the given block
+            and its descendants, using the block's xBlock if it was
+            already loaded.
+            """
+            if block_key in blocks_visited:
+                return
+            blocks_visited.add(block_key)
+            block_structure._add_block(block_structure._block_relations, block_key)  # pylint: disable=protected-access
+
+            if xblock is None and block_key in changed_block_keys:
+                xblock = modulestore.get_item(block_key)
+            if xblock is not None:
+                block_structure._add_xblock(block_key, xblock)  # pylint: disable=protected-access
+                children = [(child.location, child) for child in xblock.get_children()]
+            else:
+                children = [(child_key, None) for child_key in previous_block_structure.get_children(block_key)]
+
+            for child_key, child_xblock in children:
+                build_block_structure(child_key, child_xblock)
+                block_structure._add_relation(block_key, child_key)  # pylint: disable=protected-access
+
+        build_block_structure(root_block_usage_key)
+
+        # Collect the changed blocks and all the blocks related to them.
+        collect_block_keys = set()
+        for block_key in changed_block_keys:
+            if block_key in block_structure:
+                collect_block_keys.update(traverse_pre_order(block_key, block_structure.get_parents))
+                collect_block_keys.update(traverse_pre_order(block_key, block_structure.get_children))
+
+        collected_transformer_names = block_structure._collected_transformer_names  # pylint: disable=protected-access
+        previous_names = previous_block_structure._collected_transformer_names  # pylint: disable=protected-access
+        for transformer_name, names in previous_names.iteritems():
+            collected_transformer_names[transformer_name].update(names)
+
+        block_data_map = block_structure._block_data_map  # pylint: disable=protected-access
+        previous_block_data_map = previous_block_structure._block_data_map  # pylint: disable=protected-access
+        for block_key in block_structure.get_block_keys():
+            if block_key not in collect_block_keys:
+                block_data_map[block_key] = previous_block_data_map[block_key]
+
+        block_structure._set_collect_scope(modulestore, collect_block_keys)  # pylint: disable=protected-access
+        return block_structure
+
+    @classmethod
+    def create_for_transformers(cls, previous_block_structure, transformers, modulestore):
+        """
+        Creates and returns a block structure from the modulestore, with
+        the data previously collected for all the transformers other than
+        the given ones, whose data is to be collected again.
+
+        Arguments:
+            previous_block_structure (BlockStructureBlockData) - A block
+                structure previously collected from the same version of
+                the modulestore data.
+
+            transformers ([BlockStructureTransformer]) - The registered
+                transformers whose previously collected data is removed.
+
+            modulestore (ModuleStoreRead) - The modulestore that
+                contains the data for the xBlocks within the block
+                structure.
+
+        Returns:
+            BlockStructureModulestoreData - The created block structure.
+                The given transformers' collect methods must then be
+                called on it.
+        """
+        block_structure = cls.create_from_modulestore(previous_block_structure.root_block_usage_key, modulestore)
+        # pylint: disable=protected-access
+        block_structure._block_data_map = previous_block_structure._block_data_map
+        block_structure._transformer_data = previous_block_structure._transformer_data
+        block_structure._collected_transformer_names = previous_block_structure._collected_transformer_names
+        for transformer in transformers:
+            block_structure._remove_transformer(transformer)
+        return block_structure
+
+    @classmethod
+    def create_from_cache(cls, root_block_usage_key, block_structure_cache, transformers=None,
+                          starting_block_usage_key=None):
         """
         Deserializes and returns the block structure starting at
         root_block_usage_key from the given cache, if it's found in the cache.
@@ -75,10 +196,22 @@ class BlockStructureFactory(object):
                 cache from which the block structure is to be
                 deserialized.
 
+            transformers ([BlockStructureTransformer]) - The transformers
+                whose data is to be deserialized. If None, the data of
+                all registered transformers is deserialized.
+
+            starting_block_usage_key (UsageKey) - If given, only the
+                blocks under this block are deserialized, and the block
+                structure is rooted at it.
+
         Returns:
             BlockStructure - The deserialized block structure starting
             at root_block_usage_key, if found in the cache.
 
             NoneType - If the root_block_usage_key is not found in the cache.
         """
-        return block_structure_cache.get(root_block_usage_key)
+        return block_structure_cache.get(
+            root_block_usage_key,
+            transformers,
+            starting_block_usage_key=starting_block_usage_key,
+        )
@@ -2,18 +2,36 @@
 Top-level module for the Block Structure framework with a class for managing
 BlockStructures.
 """
+from logging import getLogger
+from time import sleep, time
+
 from .cache import BlockStructureCache
 from .factory import BlockStructureFactory
 from .exceptions import UsageKeyNotInBlockStructure
 from .transformers import BlockStructureTransformers
 
 
+logger = getLogger(__name__)  # pylint: disable=C0103
+
+# Seconds between checks of the cache while another process collects a block structure.
+COLLECT_POLL_INTERVAL = 0.1
+
+
 class BlockStructureManager(object):
     """
     Top-level class for managing Block Structures.
     """
 
-    def __init__(self, root_block_usage_key, modulestore, cache):
+    def __init__(
+            self,
+            root_block_usage_key,
+            modulestore,
+            cache,
+            codec=None,
+            compressor=None,
+            collect_lease_timeout=60,
+            collect_wait_timeout=5,
+    ):
         """
         Arguments:
             root_block_usage_key (UsageKey) - The usage_key for the root
@@ -26,10 +44,22 @@ class BlockStructureManager(object):
             cache (django.core.cache.backends.base.BaseCache) - The
                 cache to use for storing/retrieving the block structure's
                 collected data.
+
+            codec (str), compressor (str) - The serialization of the
+                collected data in the cache; see BlockStructureCache.
+
+            collect_lease_timeout (int) - The number of seconds a process
+                collecting the block structure holds the lease on it, at most.
+
+            collect_wait_timeout (float) - The number of seconds to wait
+                for another process collecting the block structure, before
+                collecting it too.
         """
         self.root_block_usage_key = root_block_usage_key
         self.modulestore = modulestore
-        self.block_structure_cache = BlockStructureCache(cache)
+        self.block_structure_cache = BlockStructureCache(cache, codec, compressor)
+        self.collect_lease_timeout = collect_lease_timeout
+        self.collect_wait_timeout = collect_wait_timeout
 
     def get_transformed(self, transformers, starting_block_usage_key=None):
         """
@@ -38,7 +68,8 @@ class BlockStructureManager(object):
         and modulestore, as needed.
 
         Details: Similar to the get_collected method, except the transformers'
-        transform methods are also called.
+        transform methods are also called, and only the collected data of
+        the given transformers is read from the cache.
 
         Arguments:
             transformers (BlockStructureTransformers) - Collection of
@@ -52,22 +83,29 @@ class BlockStructureManager(object):
             BlockStructureBlockData - A transformed block structure,
                 starting at starting_block_usage_key.
         """
-        block_structure = self.get_collected()
+        block_structure = None
         if starting_block_usage_key:
-            # Override the root_block_usage_key so traversals start at the
-            # requested location.  The rest of the structure will be pruned
-            # as part of the transformation.
-            if starting_block_usage_key not in block_structure:
-                raise UsageKeyNotInBlockStructure(
-                    "The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
-                    unicode(starting_block_usage_key),
-                    unicode(self.root_block_usage_key),
-                )
-            block_structure.set_root_block(starting_block_usage_key)
+            # Only build the blocks under the requested location from the
+            # cache, if the block structure is in the cache.
+            block_structure = self._get_from_cache(transformers, starting_block_usage_key)
+
+        if block_structure is None:
+            block_structure = self.get_collected(transformers)
+            if starting_block_usage_key:
+                # Override the root_block_usage_key so traversals start at the
+                # requested location.  The rest of the structure will be pruned
+                # as part of the transformation.
+                if starting_block_usage_key not in block_structure:
+                    raise UsageKeyNotInBlockStructure(
+                        "The requested usage_key '{0}' is not found in the block_structure with root '{1}'",
+                        unicode(starting_block_usage_key),
+                        unicode(self.root_block_usage_key),
+                    )
+                block_structure.set_root_block(starting_block_usage_key)
         transformers.transform(block_structure)
         return block_structure
 
-    def get_collected(self):
+    def get_collected(self, transformers=None):
         """
         Returns the collected Block Structure for the root_block_usage_key,
         getting block data from the cache and modulestore, as needed.
@@ -76,34 +114,204 @@ class BlockStructureManager(object):
         the modulestore is accessed if needed (at cache miss), and the
         transformers data is collected if needed.
 
+        Only one process collects the block structure at a time: the
+        others wait for it to be in the cache, for up to
+        collect_wait_timeout seconds, instead of all loading the
+        modulestore at once.
+
+        Arguments:
+            transformers (BlockStructureTransformers) - If given, only
+                the collected data of these transformers is needed, and
+                read from the cache.
+
         Returns:
             BlockStructureBlockData - A collected block structure,
                 starting at root_block_usage_key, with collected data
-                from each registered transformer.
+                from each registered transformer, or at least from the
+                given transformers.
+        """
+        block_structure = self._get_from_cache(transformers)
+        if block_structure is not None:
+            return block_structure
+
+        if self.block_structure_cache.acquire_lease(self.root_block_usage_key, self.collect_lease_timeout):
+            try:
+                return self._collect()
+            finally:
+                self.block_structure_cache.release_lease(self.root_block_usage_key)
+
+        wait_deadline = time() + self.collect_wait_timeout
+        while time() < wait_deadline:
+            sleep(COLLECT_POLL_INTERVAL)
+            block_structure = self._get_from_cache(transformers)
+            if block_structure is not None:
+                return block_structure
+
+        logger.info(
+            "Timed out waiting for BlockStructure %r to be collected; collecting it.",
+            self.root_block_usage_key,
+        )
+        return self._collect()
+
+    def update_collected(self):
+        """
+        Updates the collected Block Structure for the root_block_usage_key.
+
+        Details: The transformers data is collected again from the
+        modulestore, and replaces the cached data. Until it does, the
+        previously cached data can still be read. If the modulestore
+        can tell which blocks changed since the cached data was
+        collected, only the data of the blocks affected by the changes
+        is collected again.
+        """
+        leased = self.block_structure_cache.acquire_lease(self.root_block_usage_key, self.collect_lease_timeout)
+        try:
+            self._collect(updating=True)
+        finally:
+            if leased:
+                self.block_structure_cache.release_lease(self.root_block_usage_key)
+
+    def _get_from_cache(self, transformers=None, starting_block_usage_key=None):
+        """
+        Returns the Block Structure for the root_block_usage_key from the
+        cache, with the data of the given transformers or of all the
+        registered transformers, or None if it isn't in the cache or that
+        collected data is outdated.
+
+        If starting_block_usage_key is given, the returned Block Structure
+        only has the blocks under it, and is rooted at it.
         """
+        if transformers is not None:
+            transformers = list(transformers)
         block_structure = BlockStructureFactory.create_from_cache(
             self.root_block_usage_key,
-            self.block_structure_cache
+            self.block_structure_cache,
+            transformers,
+            starting_block_usage_key,
         )
-        cache_miss = block_structure is None
-        if cache_miss or BlockStructureTransformers.is_collected_outdated(block_structure):
+        if block_structure is None or BlockStructureTransformers.is_collected_outdated(block_structure, transformers):
+            return None
+        return block_structure
+
+    def _collect(self, updating=False):
+        """
+        Collects the Block Structure for the root_block_usage_key from the
+        modulestore and stores it in the cache.
+
+        The data previously collected in the cache, even if stale, is
+        reused for the blocks not affected by changes since then. If it
+        was collected from the current modulestore data, only the data of
+        the outdated transformers is collected again.
+
+        Arguments:
+            updating (bool) - Whether the modulestore data changed since
+                the data in the cache was collected, even if the
+                modulestore doesn't version its data.
+        """
+        source_version = self._get_source_version()
+        previous_block_structure = self.block_structure_cache.get(self.root_block_usage_key, include_stale=True)
+
+        block_structure = None
+        outdated_transformers = None
+        if previous_block_structure is not None:
+            if previous_block_structure.source_version == source_version and not (updating and source_version is None):
+                outdated_transformers = BlockStructureTransformers.get_outdated_transformers(previous_block_structure)
+                if not outdated_transformers:
+                    if source_version is not None:
+                        # The current version was missing from the cache.
+                        self.block_structure_cache.set_current_version(
+                            self.root_block_usage_key, source_version, replace=False
+                        )
+                    return previous_block_structure
+                block_structure = BlockStructureFactory.create_for_transformers(
+                    previous_block_structure,
+                    outdated_transformers,
+                    self.modulestore,
+                )
+            else:
+                block_structure = self._create_from_previous(previous_block_structure, source_version)
+
+        if block_structure is None:
             block_structure = BlockStructureFactory.create_from_modulestore(
                 self.root_block_usage_key,
                 self.modulestore
             )
-            BlockStructureTransformers.collect(block_structure)
-            self.block_structure_cache.add(block_structure)
+        BlockStructureTransformers.collect(block_structure, outdated_transformers)
+        block_structure._set_collect_scope(None, None)  # pylint: disable=protected-access
+        block_structure.source_version = source_version
+        self.block_structure_cache.add(block_structure, outdated_transformers)
         return block_structure
 
-    def update_collected(self):
+    def _create_from_previous(self, previous_block_structure, source_version):
         """
-        Updates the collected Block Structure for the root_block_usage_key.
+        Returns a Block Structure for the root_block_usage_key, reusing
+        the data of the given block structure previously collected from
+        another version of the modulestore data, or None if that data
+        can't be reused.
+        """
+        if source_version is None or previous_block_structure.source_version is None:
+            return None
+        if not BlockStructureTransformers.supports_incremental_collect():
+            return None
+        if BlockStructureTransformers.is_collected_outdated(previous_block_structure):
+            return None
+
+        changed_block_keys = self._get_changed_block_keys(previous_block_structure.source_version, source_version)
+        if changed_block_keys is None or self.root_block_usage_key in changed_block_keys:
+            # All the blocks are affected by changes to the root.
+            return None
+
+        logger.info(
+            "Collecting BlockStructure %r from version %s, with %d blocks changed since version %s.",
+            self.root_block_usage_key,
+            source_version,
+            len(changed_block_keys),
+            previous_block_structure.source_version,
+        )
+        return BlockStructureFactory.create_from_previous(
+            previous_block_structure,
+            changed_block_keys,
+            self.modulestore,
+        )
+
+    def _get_source_version(self):
+        """
+        Returns the current version of the modulestore data for the
+        root_block_usage_key, or None if the modulestore doesn't version
+        its data.
+        """
+        get_course_version = getattr(self.modulestore, 'get_course_version', None)
+        if get_course_version is None:
+            return None
+        return get_course_version(self.root_block_usage_key.course_key)
+
+    def _get_changed_block_keys(self, from_version, to_version):
+        """
+        Returns the usage keys of the blocks that were added or changed
+        in the modulestore between the given versions, or None if the
+        modulestore can't tell.
+        """
+        if from_version == to_version:
+            return set()
+        get_changed_blocks = getattr(self.modulestore, 'get_changed_blocks', None)
+        if get_changed_blocks is None:
+            return None
+        return get_changed_blocks(self.root_block_usage_key.course_key, from_version, to_version)
+
+    def invalidate(self):
+        """
+        Marks the cached data for the block structure associated with the
+        given root block key as stale, after the modulestore data changed.
 
-        Details: The cache is cleared and updated by collecting transformers
-        data from the modulestore.
+        The stale data isn't returned anymore, but is kept so that it can
+        be reused to collect the data again. If the modulestore doesn't
+        version its data, the cached data is removed instead.
         """
-        self.clear()
-        self.get_collected()
+        source_version = self._get_source_version()
+        if source_version is None:
+            self.clear()
+        else:
+            self.block_structure_cache.set_current_version(self.root_block_usage_key, source_version)
 
     def clear(self):
         """
@@ -0,0 +1,204 @@
+"""
+Benchmark of the compact representation of block structures.
+
+Generates a collected block structure of the requested size, shaped like a real
+course (chapters, sequentials, verticals and leaf components), and times caching
+it as before (pickling its per-block relations and data objects) against caching
+its CompactBlockStructure, loading only the blocks under a chapter, and
+transforming the loaded structure, which then traverses, removes and prunes
+blocks on the ids of the CompactBlockStructure.
+
+Run with:
+  python -m openedx.core.lib.block_structure.perf_tests.benchmark_compact [--blocks N] [--repeat N]
+"""
+# pylint: disable=protected-access
+import argparse
+import cPickle as pickle
+import random
+import timeit
+import zlib
+
+from opaque_keys.edx.locator import CourseLocator
+
+from openedx.core.lib.block_structure.block_structure import BlockStructureBlockData
+from openedx.core.lib.block_structure.compact import CompactBlockStructure
+
+# Number of children of each block, from the course down to the verticals.
+FAN_OUT = (20, 10, 5)
+
+LEAF_TYPES = ('html', 'problem', 'video', 'discussion')
+
+
+class _Transformer(object):
+    """
+    Stands in for a registered transformer, storing block data under its name.
+    """
+    def __init__(self, name):
+        self._name = name
+
+    def name(self):
+        """
+        Returns the name of the transformer.
+        """
+        return self._name
+
+
+def generate_block_structure(block_count):
+    """
+    Returns a collected block structure with about `block_count` blocks.
+    """
+    course_key = CourseLocator('edX', 'Benchmark', '2016')
+    block_structure = BlockStructureBlockData(course_key.make_usage_key('course', 'course'))
+    visibility = _Transformer('visible_to_staff_only')
+    start_date = _Transformer('start_date')
+    block_counts = _Transformer('blocks_api:block_counts')
+
+    def add_block(parent_key, block_type, block_id):
+        """
+        Adds a block under the given parent, with some collected data, and
+        returns its usage key.
+        """
+        usage_key = course_key.make_usage_key(block_type, block_id)
+        block_structure._add_relation(parent_key, usage_key)
+        block_data = block_structure._block_data_map[usage_key]
+        block_data.xblock_fields['display_name'] = u'{} {}'.format(block_type.title(), block_id)
+        block_data.xblock_fields['category'] = block_type
+        block_structure.set_transformer_block_field(usage_key, visibility, 'merged_visible_to_staff_only', False)
+        block_structure.set_transformer_block_field(usage_key, start_date, 'merged_start_date', None)
+        return usage_key
+
+    per_vertical = max(1, block_count / (FAN_OUT[0] * FAN_OUT[1] * FAN_OUT[2]))
+    for chapter_index in range(FAN_OUT[0]):
+        chapter = add_block(block_structure.root_block_usage_key, 'chapter', 'c{}'.format(chapter_index))
+        for sequential_index in range(FAN_OUT[1]):
+            sequential = add_block(chapter, 'sequential', 's{}.{}'.format(chapter_index, sequential_index))
+            for vertical_index in range(FAN_OUT[2]):
+                vertical_id = '{}.{}.{}'.format(chapter_index, sequential_index, vertical_index)
+                vertical = add_block(sequential, 'vertical', 'v' + vertical_id)
+                for leaf_index in range(per_vertical):
+                    leaf_type = random.choice(LEAF_TYPES)
+                    leaf = add_block(vertical, leaf_type, 'l{}.{}'.format(vertical_id, leaf_index))
+                    block_structure.set_transformer_block_field(leaf, block_counts, leaf_type, 1)
+    return block_structure
+
+
+def dumps_block_structure(block_structure):
+    """
+    Returns the serialization of the block structure's objects, as cached
+    before CompactBlockStructure.
+    """
+    return zlib.compress(pickle.dumps(
+        (block_structure._block_relations, block_structure._transformer_data, block_structure._block_data_map),
+        pickle.HIGHEST_PROTOCOL,
+    ))
+
+
+def loads_block_structure(root_block_usage_key, dumped):
+    """
+    Returns the block structure serialized by dumps_block_structure.
+    """
+    block_structure = BlockStructureBlockData(root_block_usage_key)
+    (
+        block_structure._block_relations, block_structure._transformer_data, block_structure._block_data_map,
+    ) = pickle.loads(zlib.decompress(dumped))
+    return block_structure
+
+
+def dumps_compact(block_structure):
+    """
+    Returns the serialization of the block structure's compact representation.
+    """
+    return zlib.compress(pickle.dumps(
+        CompactBlockStructure.from_block_structure(block_structure),
+        pickle.HIGHEST_PROTOCOL,
+    ))
+
+
+def loads_compact(dumped, starting_block_usage_key=None):
+    """
+    Returns the block structure serialized by dumps_compact, rooted at the
+    given block if any.
+    """
+    return pickle.loads(zlib.decompress(dumped)).to_block_structure(BlockStructureBlockData, starting_block_usage_key)
+
+
+def prune_block_structure(block_structure, starting_block_usage_key):
+    """
+    Returns the block structure rooted at the given block, pruned as the
+    whole structure was before CompactBlockStructure.
+    """
+    block_structure.set_root_block(starting_block_usage_key)
+    block_structure._prune_unreachable()
+    return block_structure
+
+
+def transform_block_structure(block_structure):
+    """
+    Returns the block structure, traversed, with some blocks removed and then
+    pruned as by the transformers.
+    """
+    for __ in block_structure.topological_traversal():
+        pass
+    block_structure.remove_block_if(lambda block_key: block_key.block_type == 'discussion')
+    block_structure._prune_unreachable()
+    return block_structure
+
+
+def main():
+    """
+    Time each operation on both representations and print the results.
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--blocks', type=int, default=50000, help='approximate number of blocks in the course')
+    parser.add_argument('--repeat', type=int, default=5, help='number of timed runs')
+    args = parser.parse_args()
+
+    block_structure = generate_block_structure(args.blocks)
+    compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+    dumped = dumps_block_structure(block_structure)
+    dumped_compact = dumps_compact(block_structure)
+    root_block_usage_key = block_structure.root_block_usage_key
+    starting_block_usage_key = block_structure.get_children(root_block_usage_key)[0]
+
+    def best_time(func):
+        """
+        Returns the best time of running func, in milliseconds.
+        """
+        return min(timeit.repeat(func, setup='gc.enable()', repeat=args.repeat, number=1)) * 1000
+
+    print "Block structure with {} blocks".format(len(compact_structure))
+    print "{:>24} {:>14} {:>14}".format('', 'objects', 'compact')
+    print "{:>24} {:>14.1f} {:>14.1f}".format(
+        'size (KB)', len(dumped) / 1024.0, len(dumped_compact) / 1024.0,
+    )
+    rows = (
+        (
+            'dumps (ms)',
+            lambda: dumps_block_structure(block_structure),
+            lambda: dumps_compact(block_structure),
+        ),
+        (
+            'loads (ms)',
+            lambda: loads_block_structure(root_block_usage_key, dumped),
+            lambda: loads_compact(dumped_compact),
+        ),
+        (
+            'load one chapter (ms)',
+            lambda: prune_block_structure(
+                loads_block_structure(root_block_usage_key, dumped),
+                starting_block_usage_key,
+            ),
+            lambda: loads_compact(dumped_compact, starting_block_usage_key),
+        ),
+        (
+            'load and transform (ms)',
+            lambda: transform_block_structure(loads_block_structure(root_block_usage_key, dumped)),
+            lambda: transform_block_structure(loads_compact(dumped_compact)),
+        ),
+    )
+    for label, objects_func, compact_func in rows:
+        print "{:>24} {:>14.1f} {:>14.1f}".format(label, best_time(objects_func), best_time(compact_func))
+
+
+if __name__ == '__main__':
+    main()
@@ -86,6 +86,25 @@ class MockCache(object):
         self.set_call_count += 1
         self.map[key] = val
 
+    def set_many(self, data):
+        """
+        Associates each of the given keys with its value in the cache.
+        """
+        self.set_call_count += 1
+        self.map.update(data)
+
+    def add(self, key, val, timeout=None):  # pylint: disable=unused-argument
+        """
+        Associates the given key with the given value in the cache,
+        unless the key is already in the cache.
+
+        Returns whether the value was added.
+        """
+        if key in self.map:
+            return False
+        self.map[key] = val
+        return True
+
     def get(self, key, default=None):
         """
         Returns the value associated with the given key in the cache;
@@ -93,12 +112,26 @@ class MockCache(object):
         """
         return self.map.get(key, default)
 
+    def get_many(self, keys):
+        """
+        Returns a dict of the given keys found in the cache to their
+        associated values.
+        """
+        return {key: self.map[key] for key in keys if key in self.map}
+
     def delete(self, key):
         """
         Deletes the given key from the cache.
         """
         del self.map[key]
 
+    def delete_many(self, keys):
+        """
+        Deletes the given keys from the cache, if found.
+        """
+        for key in keys:
+            self.map.pop(key, None)
+
 
 class MockModulestoreFactory(object):
     """
@@ -4,9 +4,17 @@ Tests for block_structure/cache.py
 from unittest import TestCase
 
 from ..cache import BlockStructureCache
+from ..transformers import BlockStructureTransformers
 from .helpers import ChildrenMapTestMixin, MockCache, MockTransformer
 
 
+class OtherMockTransformer(MockTransformer):
+    """
+    Another mock transformer, with its own collected data.
+    """
+    pass
+
+
 class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
     """
     Tests for BlockStructureFactory
@@ -22,11 +30,12 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         Add each registered transformer to the block structure.
         Mimic collection by setting test transformer block data.
         """
-        for transformer in [MockTransformer]:
+        for transformer in [MockTransformer, OtherMockTransformer]:
             self.block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             self.block_structure.set_transformer_block_field(
                 usage_key=0, transformer=transformer, key='test', value='{} val'.format(transformer.name())
             )
+        self.block_structure._end_transformers_collection()  # pylint: disable=protected-access
 
     def test_add(self):
         self.add_transformers()
@@ -35,6 +44,14 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         self.assertIsNotNone(cached_value)
         self.assert_block_structure(cached_value, self.children_map)
 
+    def test_add_with_codec(self):
+        self.cache = BlockStructureCache(MockCache(), codec='pickle', compressor='none')
+        self.add_transformers()
+        self.cache.add(self.block_structure)
+        cached_value = self.cache.get(self.block_structure.root_block_usage_key)
+        self.assertIsNotNone(cached_value)
+        self.assert_block_structure(cached_value, self.children_map)
+
     def test_get_none(self):
         self.assertIsNone(
             self.cache.get(self.block_structure.root_block_usage_key)
@@ -47,3 +64,79 @@ class TestBlockStructureCache(ChildrenMapTestMixin, TestCase):
         self.assertIsNone(
             self.cache.get(self.block_structure.root_block_usage_key)
         )
+
+    def test_stale(self):
+        self.add_transformers()
+        self.block_structure.source_version = 'v1'
+        self.cache.add(self.block_structure)
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        self.cache.set_current_version(root_block_usage_key, 'v1')
+        self.assertIsNotNone(self.cache.get(root_block_usage_key))
+
+        self.cache.set_current_version(root_block_usage_key, 'v2')
+        self.assertIsNone(self.cache.get(root_block_usage_key))
+        cached_value = self.cache.get(root_block_usage_key, include_stale=True)
+        self.assertEquals(cached_value.source_version, 'v1')
+        self.assert_block_structure(cached_value, self.children_map)
+
+    def test_stale_without_current_version(self):
+        self.add_transformers()
+        self.block_structure.source_version = 'v1'
+        self.cache.add(self.block_structure)
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        self.assertIsNotNone(self.cache.get(root_block_usage_key))
+
+        # The current version is evicted from the cache before the block structure.
+        self.cache._cache.delete(  # pylint: disable=protected-access
+            BlockStructureCache._encode_version_cache_key(root_block_usage_key)  # pylint: disable=protected-access
+        )
+        self.assertIsNone(self.cache.get(root_block_usage_key))
+        self.assertIsNotNone(self.cache.get(root_block_usage_key, include_stale=True))
+
+    def test_add_keeps_newer_current_version(self):
+        self.add_transformers()
+        root_block_usage_key = self.block_structure.root_block_usage_key
+        self.cache.set_current_version(root_block_usage_key, 'v2')
+        self.block_structure.source_version = 'v1'
+        self.cache.add(self.block_structure)
+        self.assertIsNone(self.cache.get(root_block_usage_key))
+
+    def test_get_transformers(self):
+        self.add_transformers()
+        self.cache.add(self.block_structure)
+        cached_value = self.cache.get(self.block_structure.root_block_usage_key, transformers=[MockTransformer])
+        self.assertEquals(cached_value.get_transformer_block_field(0, MockTransformer, 'test'), 'MockTransformer val')
+        self.assertIsNone(cached_value.get_transformer_block_field(0, OtherMockTransformer, 'test'))
+        self.assertEquals(
+            BlockStructureTransformers.get_outdated_transformers(cached_value, [MockTransformer, OtherMockTransformer]),
+            [OtherMockTransformer],
+        )
+
+    def test_add_transformers(self):
+        self.add_transformers()
+        self.cache.add(self.block_structure)
+        self.block_structure.set_transformer_block_field(0, MockTransformer, 'test', 'new val')
+        self.block_structure.set_transformer_block_field(0, OtherMockTransformer, 'test', 'new val')
+        self.cache.add(self.block_structure, transformers=[OtherMockTransformer])
+
+        cached_value = self.cache.get(
+            self.block_structure.root_block_usage_key, transformers=[MockTransformer, OtherMockTransformer]
+        )
+        self.assertEquals(cached_value.get_transformer_block_field(0, MockTransformer, 'test'), 'MockTransformer val')
+        self.assertEquals(cached_value.get_transformer_block_field(0, OtherMockTransformer, 'test'), 'new val')
+
+    def test_transformer_data_from_other_version(self):
+        self.add_transformers()
+        self.block_structure.source_version = 'v1'
+        self.cache.add(self.block_structure)
+        self.cache.set_current_version(self.block_structure.root_block_usage_key, 'v2')
+        self.block_structure.source_version = 'v2'
+        self.cache.add(self.block_structure, transformers=[MockTransformer])
+
+        cached_value = self.cache.get(
+            self.block_structure.root_block_usage_key, transformers=[MockTransformer, OtherMockTransformer]
+        )
+        self.assertEquals(
+            BlockStructureTransformers.get_outdated_transformers(cached_value, [MockTransformer, OtherMockTransformer]),
+            [OtherMockTransformer],
+        )
@@ -0,0 +1,196 @@
+"""
+Tests for compact.py
+"""
+# pylint: disable=protected-access
+import cPickle as pickle
+import ddt
+import itertools
+from unittest import TestCase
+
+from openedx.core.lib.graph_traversals import traverse_pre_order
+
+from ..block_structure import BlockStructureBlockData, BlockStructureModulestoreData
+from ..compact import CompactBlockStructure
+from ..exceptions import UsageKeyNotInBlockStructure
+from .helpers import ChildrenMapTestMixin, MockTransformer
+
+
+@ddt.ddt
+class TestCompactBlockStructure(TestCase, ChildrenMapTestMixin):
+    """
+    Tests for CompactBlockStructure
+    """
+    def create_collected_block_structure(self, children_map):
+        """
+        Returns a block structure for the given children_map, with xBlock
+        fields and transformer data set for some of its blocks.
+        """
+        block_structure = self.create_block_structure(children_map)
+        for block_key in range(len(children_map)):
+            block_structure._block_data_map[block_key].xblock_fields['display_name'] = 'Block {}'.format(block_key)
+            if block_key % 2:
+                block_structure.set_transformer_block_field(block_key, MockTransformer, 'odd', block_key)
+        block_structure.set_transformer_data(MockTransformer, 'course_data', ['value'])
+        return block_structure
+
+    def assert_block_data(self, block_structure, block_keys):
+        """
+        Verifies the data set by create_collected_block_structure for the
+        given blocks.
+        """
+        for block_key in block_keys:
+            self.assertEquals(block_structure.get_xblock_field(block_key, 'display_name'), 'Block {}'.format(block_key))
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'odd'),
+                block_key if block_key % 2 else None,
+            )
+        self.assertEquals(block_structure.get_transformer_data(MockTransformer, 'course_data'), ['value'])
+
+    @ddt.data(
+        [[]],
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_round_trip(self, children_map):
+        block_structure = self.create_collected_block_structure(children_map)
+        compact_structure = pickle.loads(
+            pickle.dumps(CompactBlockStructure.from_block_structure(block_structure), pickle.HIGHEST_PROTOCOL)
+        )
+        new_block_structure = compact_structure.to_block_structure(BlockStructureModulestoreData)
+        self.assertIsInstance(new_block_structure, BlockStructureModulestoreData)
+        self.assert_block_structure(new_block_structure, children_map)
+        self.assert_block_data(new_block_structure, range(len(children_map)))
+
+    @ddt.data(
+        ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+        ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+        ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+    )
+    def test_pre_order_ids(self, children_map):
+        block_structure = self.create_block_structure(children_map)
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        for block_key in range(len(children_map)):
+            block_ids = compact_structure.pre_order_ids(compact_structure.get_block_id(block_key))
+            self.assertEquals(
+                [compact_structure.block_keys[block_id] for block_id in block_ids],
+                list(traverse_pre_order(block_key, block_structure.get_children)),
+            )
+
+    def test_starting_block(self):
+        #     0
+        #    / \
+        #   1  2
+        #   \ / \
+        #    3  4
+        #   / \
+        #  5  6
+        block_structure = self.create_collected_block_structure(self.DAG_CHILDREN_MAP)
+        compact_structure = CompactBlockStructure.from_block_structure(block_structure)
+        new_block_structure = compact_structure.to_block_structure(BlockStructureBlockData, starting_block_usage_key=2)
+        self.assertEquals(new_block_structure.root_block_usage_key, 2)
+        self.assert_block_structure(
+            new_block_structure,
+            [[], [], [3, 4], [5, 6], [], [], []],
+            missing_blocks=[0, 1],
+        )
+        self.assert_block_data(new_block_structure, [2, 3, 4, 5, 6])
+        self.assertIsNone(new_block_structure.get_xblock_field(1, 'display_name'))
+
+    def assert_same_relations(self, block_structure, expected_block_structure):
+        """
+        Verifies that the given block structures have the same blocks,
+        relations and traversals.
+        """
+        self.assertEquals(set(block_structure.get_block_keys()), set(expected_block_structure.get_block_keys()))
+        for block_key in expected_block_structure.get_block_keys():
+            self.assertEquals(block_structure.get_children(block_key), expected_block_structure.get_children(block_key))
+            self.assertEquals(
+                set(block_structure.get_parents(block_key)),
+                set(expected_block_structure.get_parents(block_key)),
+            )
+        for kwargs in ({}, {'yield_descendants_of_unyielded': True}):
+            self.assertEquals(
+                list(block_structure.topological_traversal(filter_func=lambda block_key: block_key != 1, **kwargs)),
+                list(expected_block_structure.topological_traversal(
+                    filter_func=lambda block_key: block_key != 1, **kwargs
+                )),
+            )
+        self.assertEquals(
+            list(block_structure.post_order_traversal()),
+            list(expected_block_structure.post_order_traversal()),
+        )
+
+    @ddt.data(
+        *itertools.product(
+            [True, False],
+            range(1, 7),
+            [
+                ChildrenMapTestMixin.SIMPLE_CHILDREN_MAP,
+                ChildrenMapTestMixin.LINEAR_CHILDREN_MAP,
+                ChildrenMapTestMixin.DAG_CHILDREN_MAP,
+            ],
+        )
+    )
+    @ddt.unpack
+    def test_compact_relations(self, keep_descendants, block_to_remove, children_map):
+        block_structure = self.create_block_structure(children_map)
+        new_block_structure = CompactBlockStructure.from_block_structure(block_structure).to_block_structure(
+            BlockStructureBlockData
+        )
+        self.assertIsNotNone(new_block_structure._compact_relations)
+        self.assert_same_relations(new_block_structure, block_structure)
+
+        # Blocks are removed and pruned on the ids, as they are on the usage keys.
+        for structure in (block_structure, new_block_structure):
+            structure.remove_block_if(
+                lambda block_key: block_key in (block_to_remove, block_to_remove + 1),
+                keep_descendants=keep_descendants,
+            )
+        self.assertIsNotNone(new_block_structure._compact_relations)
+        self.assert_same_relations(new_block_structure, block_structure)
+        for structure in (block_structure, new_block_structure):
+            structure._prune_unreachable()
+        self.assertIsNotNone(new_block_structure._compact_relations)
+        self.assert_same_relations(new_block_structure, block_structure)
+
+    def test_compact_relations_starting_block(self):
+        block_structure = self.create_block_structure(self.DAG_CHILDREN_MAP)
+        new_block_structure = CompactBlockStructure.from_block_structure(block_structure).to_block_structure(
+            BlockStructureBlockData, starting_block_usage_key=2,
+        )
+        block_structure.set_root_block(2)
+        block_structure._prune_unreachable()
+        self.assert_same_relations(new_block_structure, block_structure)
+
+    def test_compact_relations_changed(self):
+        block_structure = CompactBlockStructure.from_block_structure(
+            self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        ).to_block_structure(BlockStructureBlockData)
+        block_structure._add_relation(2, 5)
+        self.assertIsNone(block_structure._compact_relations)
+        self.assertEquals(list(block_structure.topological_traversal()), [0, 1, 3, 4, 2, 5])
+
+    def test_starting_block_not_found(self):
+        compact_structure = CompactBlockStructure.from_block_structure(
+            self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        )
+        with self.assertRaises(UsageKeyNotInBlockStructure):
+            compact_structure.to_block_structure(BlockStructureBlockData, starting_block_usage_key=10)
+
+    def test_block_ids_digest(self):
+        digest = CompactBlockStructure.from_block_structure(
+            self.create_block_structure(self.SIMPLE_CHILDREN_MAP)
+        ).get_block_ids_digest()
+        self.assertEquals(
+            CompactBlockStructure.from_block_structure(
+                self.create_collected_block_structure(self.SIMPLE_CHILDREN_MAP)
+            ).get_block_ids_digest(),
+            digest,
+        )
+        self.assertNotEquals(
+            CompactBlockStructure.from_block_structure(
+                self.create_block_structure([[2, 1], [3, 4], [], [], []])
+            ).get_block_ids_digest(),
+            digest,
+        )
@@ -7,7 +7,7 @@ from xmodule.modulestore.exceptions import ItemNotFoundError
 from ..cache import BlockStructureCache
 from ..factory import BlockStructureFactory
 from .helpers import (
-    MockCache, MockModulestoreFactory, ChildrenMapTestMixin
+    MockCache, MockModulestoreFactory, MockTransformer, ChildrenMapTestMixin
 )
 
 
@@ -52,3 +52,55 @@ class TestBlockStructureFactory(TestCase, ChildrenMapTestMixin):
                 block_structure_cache=cache,
             )
         )
+
+    def test_from_previous(self):
+        previous_block_structure = BlockStructureFactory.create_from_modulestore(
+            root_block_usage_key=0, modulestore=self.modulestore
+        )
+        for block_key in range(len(self.children_map)):
+            previous_block_structure.set_transformer_block_field(block_key, MockTransformer, 'collected', 'old')
+
+        # Add block 5 as a child of block 2.
+        children_map = [[1, 2], [3, 4], [5], [], [], []]
+        modulestore = MockModulestoreFactory.create(children_map)
+        block_structure = BlockStructureFactory.create_from_previous(
+            previous_block_structure, changed_block_keys={2, 5}, modulestore=modulestore,
+        )
+        self.assert_block_structure(block_structure, children_map)
+
+        # Only the changed blocks and their ancestors and descendants are collected.
+        self.assertEquals(list(block_structure.topological_traversal()), [0, 2, 5])
+        self.assertEquals(list(block_structure.post_order_traversal()), [5, 2, 0])
+        for block_key in [1, 3, 4]:
+            self.assertEquals(
+                block_structure.get_transformer_block_field(block_key, MockTransformer, 'collected'), 'old'
+            )
+        for block_key in [0, 2, 5]:
+            self.assertIsNone(block_structure.get_transformer_block_field(block_key, MockTransformer, 'collected'))
+
+        # Only the xBlocks of the changed blocks were loaded, others are loaded on demand.
+        self.assertEquals(modulestore.get_items_call_count, 2)
+        self.assertEquals(block_structure.get_xblock(1).location, 1)
+        self.assertEquals(modulestore.get_items_call_count, 3)
+
+        block_structure._set_collect_scope(None, None)  # pylint: disable=protected-access
+        self.assertEquals(set(block_structure.topological_traversal()), set(range(len(children_map))))
+
+    def test_from_previous_requested_xblock_fields(self):
+        previous_block_structure = BlockStructureFactory.create_from_modulestore(
+            root_block_usage_key=0, modulestore=self.modulestore
+        )
+        children_map = [[1, 2], [3, 4], [5], [], [], []]
+        modulestore = MockModulestoreFactory.create(children_map)
+        block_structure = BlockStructureFactory.create_from_previous(
+            previous_block_structure, changed_block_keys={2, 5}, modulestore=modulestore,
+        )
+
+        # Fields are collected for the ancestors in the collect scope too,
+        # even though their xBlocks were not loaded when the structure was built.
+        block_structure.request_xblock_fields('location')
+        block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
+        for block_key in [0, 2, 5]:
+            self.assertEquals(block_structure.get_xblock_field(block_key, 'location'), block_key)
+        for block_key in [1, 3, 4]:
+            self.assertIsNone(block_structure.get_xblock_field(block_key, 'location'))
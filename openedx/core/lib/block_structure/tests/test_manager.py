@@ -1,8 +1,10 @@
 """
 Tests for manager.py
 """
+from mock import patch
 from unittest import TestCase
 
+from ..cache import BlockStructureCache
 from ..exceptions import UsageKeyNotInBlockStructure
 from ..manager import BlockStructureManager
 from ..transformers import BlockStructureTransformers
@@ -16,6 +18,7 @@ class TestTransformer1(MockTransformer):
     Test Transformer class with basic functionality to verify collected and
     transformed data.
     """
+    SUPPORTS_INCREMENTAL_COLLECT = True
     collect_data_key = 't1.collect'
     transform_data_key = 't1.transform'
     collect_call_count = 0
@@ -83,6 +86,15 @@ class TestTransformer1(MockTransformer):
         return data_key + 't1.val1.' + unicode(block_key)
 
 
+class TestTransformer2(TestTransformer1):
+    """
+    Test Transformer class, collecting its own data.
+    """
+    collect_data_key = 't2.collect'
+    transform_data_key = 't2.transform'
+    collect_call_count = 0
+
+
 class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
     """
     Test class for BlockStructureManager.
@@ -141,6 +153,18 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
             with self.assertRaises(UsageKeyNotInBlockStructure):
                 self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=100)
 
+    def test_get_transformed_with_starting_block_cached(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.modulestore.get_items_call_count = 0
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=1)
+            with self.assertRaises(UsageKeyNotInBlockStructure):
+                self.bs_manager.get_transformed(self.transformers, starting_block_usage_key=100)
+        substructure_of_children_map = [[], [3, 4], [], [], []]
+        self.assert_block_structure(block_structure, substructure_of_children_map, missing_blocks=[0, 2])
+        TestTransformer1.assert_transformed(block_structure)
+        self.assertEquals(self.modulestore.get_items_call_count, 0)
+
     def test_get_collected_cached(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
@@ -152,8 +176,112 @@ class TestBlockStructureManager(TestCase, ChildrenMapTestMixin):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
 
+    def test_get_collected_outdated_transformer(self):
+        TestTransformer2.collect_call_count = 0
+        self.registered_transformers.append(TestTransformer2())
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        TestTransformer2.VERSION += 1
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        # Only the data of the outdated transformer is collected again.
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+        self.assertEquals(TestTransformer2.collect_call_count, 2)
+
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_collected()
+        TestTransformer2.assert_collected(block_structure)
+        self.assertEquals(TestTransformer2.collect_call_count, 2)
+
+    def test_get_transformed_reads_transformers_data(self):
+        self.registered_transformers.append(TestTransformer2())
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        with mock_registered_transformers(self.registered_transformers):
+            block_structure = self.bs_manager.get_transformed(self.transformers)
+        TestTransformer1.assert_transformed(block_structure)
+        self.assertIsNone(block_structure.get_transformer_block_field(0, TestTransformer2, 't2.collect'))
+
     def test_clear(self):
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.bs_manager.clear()
         self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
         self.assertEquals(TestTransformer1.collect_call_count, 2)
+
+    def test_update_collected_keeps_cached_data(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        with patch.object(self.cache, 'delete', wraps=self.cache.delete) as mock_delete:
+            with mock_registered_transformers(self.registered_transformers):
+                self.bs_manager.update_collected()
+        self.assertFalse(any(
+            key.startswith('root.key.') for (key,), __ in mock_delete.call_args_list
+        ))
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+    def test_lease_released_after_collect(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.assertFalse(any(key.startswith('root.lease.') for key in self.cache.map))
+
+    @patch('openedx.core.lib.block_structure.manager.sleep')
+    def test_waits_for_collecting_process(self, mock_sleep):
+        self.bs_manager.block_structure_cache.acquire_lease(0, 60)
+
+        def collect_elsewhere(interval):  # pylint: disable=unused-argument
+            """ Simulates the process holding the lease collecting the block structure """
+            other_manager = BlockStructureManager(0, self.modulestore, self.cache)
+            with mock_registered_transformers(self.registered_transformers):
+                other_manager._collect()  # pylint: disable=protected-access
+            self.modulestore.get_items_call_count = 0
+            self.cache.set_call_count = 0
+        mock_sleep.side_effect = collect_elsewhere
+
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(mock_sleep.call_count, 1)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+
+    @patch('openedx.core.lib.block_structure.manager.sleep')
+    def test_collects_after_wait_timeout(self, mock_sleep):
+        self.bs_manager.collect_wait_timeout = 0
+        self.bs_manager.block_structure_cache.acquire_lease(0, 60)
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.assertFalse(mock_sleep.called)
+        # The lease of the other process is left alone.
+        self.assertFalse(self.bs_manager.block_structure_cache.acquire_lease(0, 60))
+
+    @patch.object(BlockStructureManager, '_get_changed_block_keys', return_value={3})
+    @patch.object(BlockStructureManager, '_get_source_version', return_value='v1')
+    def test_update_collected_incrementally(self, mock_source_version, mock_changed_block_keys):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        mock_source_version.return_value = 'v2'
+        self.modulestore.get_items_call_count = 0
+        with mock_registered_transformers(self.registered_transformers):
+            self.bs_manager.update_collected()
+        mock_changed_block_keys.assert_called_once_with('v1', 'v2')
+        # Only the xBlock of the changed block was loaded.
+        self.assertEquals(self.modulestore.get_items_call_count, 1)
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+    @patch.object(BlockStructureManager, '_get_changed_block_keys', return_value={0})
+    @patch.object(BlockStructureManager, '_get_source_version', return_value='v1')
+    def test_invalidate(self, mock_source_version, mock_changed_block_keys):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        mock_source_version.return_value = 'v2'
+        self.bs_manager.invalidate()
+        # Changes to the root block affect all blocks, so all are collected again.
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        mock_changed_block_keys.assert_called_once_with('v1', 'v2')
+        self.assertEquals(TestTransformer1.collect_call_count, 2)
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+
+    @patch.object(BlockStructureManager, '_get_source_version', return_value='v1')
+    def test_current_version_evicted(self, mock_source_version):  # pylint: disable=unused-argument
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        version_cache_key = BlockStructureCache._encode_version_cache_key(0)  # pylint: disable=protected-access
+        self.cache.delete(version_cache_key)
+        # The cached data is checked against the modulestore's version, and reused.
+        self.collect_and_verify(expect_modulestore_called=False, expect_cache_updated=False)
+        self.assertEquals(TestTransformer1.collect_call_count, 1)
+        self.assertIn(version_cache_key, self.cache.map)
+
+    def test_invalidate_unversioned(self):
+        self.collect_and_verify(expect_modulestore_called=True, expect_cache_updated=True)
+        self.bs_manager.invalidate()
+        self.assertIsNone(self.bs_manager.block_structure_cache.get(0, include_stale=True))
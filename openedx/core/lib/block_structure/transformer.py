@@ -28,6 +28,16 @@ class BlockStructureTransformer(object):
     #
     VERSION = 0
 
+    # Whether the transformer's collect method also works when collecting
+    # the data of only some blocks, as done after small changes to the
+    # modulestore. In that case, the block structure's traversals yield
+    # only the blocks to collect, and the other blocks keep their
+    # previously collected data. This holds if the data collected for a
+    # block depends only on the block, its ancestors and its descendants,
+    # and if any non-block-specific data depends only on the root block.
+    #
+    SUPPORTS_INCREMENTAL_COLLECT = False
+
     @classmethod
     def name(cls):
         """
@@ -64,18 +64,44 @@ class BlockStructureTransformers(object):
         self._transformers.extend(transformers)
         return self
 
+    def __iter__(self):
+        """
+        Iterates over the transformers in the collection, in the order
+        that they were added.
+        """
+        return iter(self._transformers)
+
     @classmethod
-    def collect(cls, block_structure):
+    def collect(cls, block_structure, transformers=None):
         """
         Collects data for each registered transformer.
+
+        Arguments:
+            transformers ([BlockStructureTransformer]) - If given, only
+                the data of these registered transformers is collected.
         """
-        for transformer in TransformerRegistry.get_registered_transformers():
+        if transformers is None:
+            transformers = TransformerRegistry.get_registered_transformers()
+
+        for transformer in transformers:
             block_structure._add_transformer(transformer)  # pylint: disable=protected-access
             transformer.collect(block_structure)
+        block_structure._end_transformers_collection()  # pylint: disable=protected-access
 
         # Collect all fields that were requested by the transformers.
         block_structure._collect_requested_xblock_fields()  # pylint: disable=protected-access
 
+    @classmethod
+    def supports_incremental_collect(cls):
+        """
+        Returns whether the data of all registered transformers can be
+        collected for only some blocks of a block structure.
+        """
+        return all(
+            transformer.SUPPORTS_INCREMENTAL_COLLECT
+            for transformer in TransformerRegistry.get_registered_transformers()
+        )
+
     def transform(self, block_structure):
         """
         The given block structure is transformed by each transformer in the
@@ -88,12 +114,33 @@ class BlockStructureTransformers(object):
         block_structure._prune_unreachable()  # pylint: disable=protected-access
 
     @classmethod
-    def is_collected_outdated(cls, block_structure):
+    def is_collected_outdated(cls, block_structure, transformers=None):
         """
         Returns whether the collected data in the block structure is outdated.
+
+        Arguments:
+            transformers ([BlockStructureTransformer]) - If given, only
+                the data of these transformers is checked, instead of
+                the data of all registered transformers.
+        """
+        return bool(cls.get_outdated_transformers(block_structure, transformers))
+
+    @classmethod
+    def get_outdated_transformers(cls, block_structure, transformers=None):
         """
+        Returns the registered transformers whose collected data in the
+        block structure is outdated or missing.
+
+        Arguments:
+            transformers ([BlockStructureTransformer]) - If given, only
+                the data of these transformers is checked, instead of
+                the data of all registered transformers.
+        """
+        if transformers is None:
+            transformers = TransformerRegistry.get_registered_transformers()
+
         outdated_transformers = []
-        for transformer in TransformerRegistry.get_registered_transformers():
+        for transformer in transformers:
             version_in_block_structure = block_structure._get_transformer_data_version(transformer)  # pylint: disable=protected-access
             if transformer.VERSION != version_in_block_structure:
                 outdated_transformers.append(transformer)
@@ -104,4 +151,4 @@ class BlockStructureTransformers(object):
                 [(transformer.name(), transformer.VERSION) for transformer in outdated_transformers],
             )
 
-        return bool(outdated_transformers)
+        return outdated_transformers
@@ -1,17 +1,25 @@
 """
 Utilities related to caching.
 """
+from collections import Counter, OrderedDict
 import cPickle as pickle
 import functools
+import hashlib
+import threading
+import time
 import zlib
 from xblock.core import XBlock
 
+try:
+    import lz4.block
+except ImportError:
+    lz4 = None  # pylint: disable=invalid-name
+
 
 def memoize_in_request_cache(request_cache_attr_name=None):
     """
-    Memoize a method call's results in the request_cache if there's one. Creates the cache key by
-    joining the unicode of all the args with &; so, if your arg may use the default &, it may
-    have false hits.
+    Memoize a method call's results in the request_cache if there's one. Creates the cache key from
+    all the args with make_cache_key.
 
     Arguments:
         request_cache_attr_name - The name of the field or property in this method's containing
@@ -26,7 +34,10 @@ def memoize_in_request_cache(request_cache_attr_name=None):
             """
             request_cache = getattr(self, request_cache_attr_name, None)
             if request_cache:
-                cache_key = '&'.join([hashvalue(arg) for arg in args])
+                try:
+                    cache_key = make_cache_key(args)
+                except UncacheableArgument:
+                    return func(self, *args, **kwargs)
                 if cache_key in request_cache.data.setdefault(func.__name__, {}):
                     return request_cache.data[func.__name__][cache_key]
 
@@ -50,11 +61,398 @@ def hashvalue(arg):
         return unicode(arg)
 
 
-def zpickle(data):
-    """Given any data structure, returns a zlib compressed pickled serialization."""
-    return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+class UncacheableArgument(Exception):
+    """
+    Raised by make_cache_key for arguments that don't identify their value,
+    such as unsaved model instances.
+    """
+    pass
+
+
+def _cache_key_part(arg):
+    """
+    Returns a string identifying arg, prefixed with its type and length so
+    that the parts of different arguments can't run into each other.
+    """
+    if isinstance(arg, (list, tuple)):
+        value = u''.join(_cache_key_part(item) for item in arg)
+    elif isinstance(arg, (set, frozenset)):
+        value = u''.join(sorted(_cache_key_part(item) for item in arg))
+    elif isinstance(arg, dict):
+        value = u''.join(sorted(_cache_key_part(item) for item in arg.iteritems()))
+    elif isinstance(arg, type):
+        value = u'{}.{}'.format(arg.__module__, arg.__name__)
+    elif hasattr(arg, '_meta') and hasattr(arg, 'pk'):
+        # A Django model instance, identified by its primary key.
+        if arg.pk is None:
+            raise UncacheableArgument(arg)
+        value = u'{}.{}'.format(arg._meta.db_table, arg.pk)  # pylint: disable=protected-access
+    else:
+        value = hashvalue(arg)
+    return u'{}:{}:{}'.format(type(arg).__name__, len(value), value)
+
+
+def make_cache_key(args, kwargs=None):
+    """
+    Returns a hash of the given positional and keyword arguments, usable in
+    cache keys.
+
+    XBlocks are identified by their location and Django model instances by
+    their primary key; raises UncacheableArgument for unsaved instances.
+    """
+    key = _cache_key_part(tuple(args))
+    if kwargs:
+        key += _cache_key_part(kwargs)
+    return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+
+class ProcessCache(object):
+    """
+    A process-local LRU of memoized results, bounded by its number of entries,
+    whose entries expire `timeout` seconds after they are set.
+    """
+    def __init__(self, max_entries, timeout):
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Returns (True, value) for a live entry of key, or (False, None).
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None or entry[1] <= time.time():
+                return False, None
+            # Re-insert to mark it as the most recently used.
+            self._entries[key] = entry
+            return True, entry[0]
+
+    def set(self, key, value):
+        """
+        Caches value for key, evicting the least recently used entries.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.time() + self.timeout)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """
+        Removes all entries.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+# Tiers of memoized caches, from the fastest to the most widely shared.
+MEMOIZE_TIERS = ('request', 'process', 'shared')
+
+# The ProcessCache of each memoized namespace, and the namespaces memoized in the shared cache.
+_PROCESS_CACHES = {}
+_SHARED_NAMESPACES = set()
+
+_MEMOIZE_STATS = Counter()
+_MEMOIZE_STATS_LOCK = threading.Lock()
+
+
+def _record_memoize_lookup(namespace, tier, hit):
+    """
+    Counts a lookup of the namespace in the tier.
+    """
+    with _MEMOIZE_STATS_LOCK:
+        _MEMOIZE_STATS[(namespace, tier, 'hits' if hit else 'misses')] += 1
+
+
+def get_memoize_stats(namespace):
+    """
+    Returns the hits and misses of the namespace in this process, as a dict
+    mapping each tier to a dict with 'hits' and 'misses' counts.
+    """
+    with _MEMOIZE_STATS_LOCK:
+        return {
+            tier: {outcome: _MEMOIZE_STATS[(namespace, tier, outcome)] for outcome in ('hits', 'misses')}
+            for tier in MEMOIZE_TIERS
+        }
+
+
+def reset_memoize_stats():
+    """
+    Resets the hit and miss counts of all namespaces.
+    """
+    with _MEMOIZE_STATS_LOCK:
+        _MEMOIZE_STATS.clear()
+
+
+def _get_request_memo(namespace):
+    """
+    Returns the dict of results memoized for the namespace in the current
+    request, or None outside of requests: only RequestCacheMiddleware clears
+    the request cache, so in celery tasks and management commands it would
+    keep results for the life of the process.
+    """
+    from request_cache import get_cache, get_request
+    if get_request() is None:
+        return None
+    return get_cache(u'memoized.{}'.format(namespace))
+
+
+def _get_shared_generation_key(namespace):
+    """
+    Returns the cache key of the namespace's generation, which is part of the
+    keys of its results in the shared cache so that they can all be invalidated.
+    """
+    return u'memoized.{}.generation'.format(namespace)
+
+
+def memoized(namespace, request=True, process_timeout=0, process_max_entries=1000, shared_timeout=0):
+    """
+    Memoize a function's results in the tiers enabled for the namespace:
+    the request cache when `request` is True and there is a current request
+    (see _get_request_memo), a ProcessCache of
+    `process_max_entries` when `process_timeout` is set, and the Django cache
+    when `shared_timeout` is set. Results are looked up from the fastest tier,
+    and stored in the faster tiers that missed.
+
+    The cache key is made from all the args with make_cache_key; calls with
+    unsaved model instances aren't memoized. Use invalidate_memoized, or
+    invalidate_memoized_on for models, when the results may change.
+
+    Arguments:
+        namespace - The name of the memoized results, unique to the function.
+    """
+    def _decorator(func):
+        """Outer function decorator."""
+        if process_timeout:
+            _PROCESS_CACHES[namespace] = ProcessCache(process_max_entries, process_timeout)
+        if shared_timeout:
+            _SHARED_NAMESPACES.add(namespace)
+
+        @functools.wraps(func)
+        def _wrapper(*args, **kwargs):
+            """
+            Wraps a function to memoize results.
+            """
+            try:
+                cache_key = make_cache_key(args, kwargs)
+            except UncacheableArgument:
+                return func(*args, **kwargs)
+
+            request_memo = _get_request_memo(namespace) if request else None
+            if request_memo is not None:
+                found = cache_key in request_memo
+                _record_memoize_lookup(namespace, 'request', found)
+                if found:
+                    return request_memo[cache_key]
+
+            result = _get_from_slower_tiers(args, kwargs, cache_key)
+
+            if request_memo is not None:
+                request_memo[cache_key] = result
+            return result
+
+        def _get_from_slower_tiers(args, kwargs, cache_key):
+            """
+            Returns the result from the process or shared tiers, or from func,
+            storing it in the tiers that missed.
+            """
+            process_cache = _PROCESS_CACHES.get(namespace)
+            if process_cache is not None:
+                found, result = process_cache.get(cache_key)
+                _record_memoize_lookup(namespace, 'process', found)
+                if found:
+                    return result
+
+            if shared_timeout:
+                from django.core.cache import cache
+                generation = cache.get(_get_shared_generation_key(namespace)) or 0
+                shared_key = u'memoized.{}.{}.{}'.format(namespace, generation, cache_key)
+                # Results are wrapped in a tuple, so that None results are cached too.
+                cached = cache.get(shared_key)
+                _record_memoize_lookup(namespace, 'shared', cached is not None)
+                if cached is not None:
+                    result = cached[0]
+                else:
+                    result = func(*args, **kwargs)
+                    cache.set(shared_key, (result,), shared_timeout)
+            else:
+                result = func(*args, **kwargs)
+
+            if process_cache is not None:
+                process_cache.set(cache_key, result)
+            return result
+
+        return _wrapper
+    return _decorator
+
+
+def invalidate_memoized(namespace):
+    """
+    Forgets the results memoized for the namespace: in the current request,
+    in this process and in the shared cache. Other processes only forget
+    theirs when their ProcessCache entries expire.
+    """
+    request_memo = _get_request_memo(namespace)
+    if request_memo is not None:
+        request_memo.clear()
+    process_cache = _PROCESS_CACHES.get(namespace)
+    if process_cache is not None:
+        process_cache.clear()
+
+    if namespace not in _SHARED_NAMESPACES:
+        return
+    from django.core.cache import cache
+    generation_key = _get_shared_generation_key(namespace)
+    try:
+        cache.incr(generation_key)
+    except ValueError:
+        # The generation isn't set, so no results are in the shared cache yet.
+        cache.add(generation_key, 1, None)
+
+
+def invalidate_memoized_on(namespace, *senders):
+    """
+    Invalidates the results memoized for the namespace whenever an instance
+    of one of the given models is saved or deleted.
+    """
+    from django.db.models.signals import post_delete, post_save
+
+    def _invalidate(sender, **kwargs):  # pylint: disable=unused-argument
+        """
+        Signal receiver invalidating the namespace.
+        """
+        invalidate_memoized(namespace)
+
+    for sender in senders:
+        for signal in (post_save, post_delete):
+            signal.connect(
+                _invalidate, sender=sender, weak=False,
+                dispatch_uid=u'memoized.{}.{}.{}'.format(namespace, sender.__name__, id(signal)),
+            )
+
+
+class PickleCodec(object):
+    """
+    Serializes any picklable data with cPickle.
+    """
+    name = 'pickle'
+
+    def dumps(self, data):
+        """Returns the serialization of data as a string."""
+        return pickle.dumps(data, pickle.HIGHEST_PROTOCOL)
+
+    def loads(self, serialized):
+        """Returns the data serialized by dumps."""
+        return pickle.loads(serialized)
+
+
+class ZlibCompressor(object):
+    """
+    Compresses with zlib at its fastest level, which compresses slightly less.
+    """
+    name = 'zlib'
+
+    def compress(self, data):
+        """Returns the compressed data."""
+        return zlib.compress(data, 1)
+
+    def decompress(self, data):
+        """Returns the decompressed data."""
+        return zlib.decompress(data)
+
+
+class Lz4Compressor(object):
+    """
+    Compresses with lz4, several times faster than zlib on both ends.
+    """
+    name = 'lz4'
+
+    def compress(self, data):
+        """Returns the compressed data."""
+        return lz4.block.compress(data)
+
+    def decompress(self, data):
+        """Returns the decompressed data."""
+        return lz4.block.decompress(data)
+
+
+class NullCompressor(object):
+    """
+    Leaves the data uncompressed, for caches where CPU matters more than space.
+    """
+    name = 'none'
+
+    def compress(self, data):
+        """Returns the data unchanged."""
+        return data
+
+    def decompress(self, data):
+        """Returns the data unchanged."""
+        return data
+
+
+CODECS = {}
+COMPRESSORS = {}
+
+
+def register_codec(codec):
+    """
+    Makes codec available to zpickle and zunpickle under its name.
+
+    A codec has a `name` and `dumps(data)`/`loads(serialized)` methods.
+    """
+    CODECS[codec.name] = codec
+
+
+def register_compressor(compressor):
+    """
+    Makes compressor available to zpickle and zunpickle under its name.
+
+    A compressor has a `name` and `compress(data)`/`decompress(data)` methods.
+    """
+    COMPRESSORS[compressor.name] = compressor
+
+
+register_codec(PickleCodec())
+register_compressor(ZlibCompressor())
+register_compressor(NullCompressor())
+if lz4 is not None:
+    register_compressor(Lz4Compressor())
+
+# Serializations written with an explicit codec start with this byte, followed by
+# "<codec>.<compressor>\n". The original format is a bare zlib stream, which never
+# starts with a NUL byte.
+CODEC_HEADER_MARKER = '\x00'
+
+
+def zpickle(data, codec=None, compressor=None):
+    """
+    Given any data structure, returns a compressed serialization.
+
+    Without a codec or compressor, returns a zlib compressed pickled
+    serialization. Otherwise, the named codec and compressor (defaulting
+    to 'pickle' and 'zlib') are used and recorded in a header, so that
+    zunpickle knows how to read the data back.
+    """
+    if codec is None and compressor is None:
+        return zlib.compress(pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+    codec = CODECS[codec or PickleCodec.name]
+    compressor = COMPRESSORS[compressor or ZlibCompressor.name]
+    header = '{}{}.{}\n'.format(CODEC_HEADER_MARKER, codec.name, compressor.name)
+    return header + compressor.compress(codec.dumps(data))
 
 
 def zunpickle(zdata):
-    """Given a zlib compressed pickled serialization, returns the deserialized data."""
-    return pickle.loads(zlib.decompress(zdata))
+    """Given a serialization returned by zpickle, returns the deserialized data."""
+    if not zdata.startswith(CODEC_HEADER_MARKER):
+        return pickle.loads(zlib.decompress(zdata))
+
+    header_end = zdata.index('\n')
+    codec_name, compressor_name = zdata[len(CODEC_HEADER_MARKER):header_end].split('.')
+    return CODECS[codec_name].loads(COMPRESSORS[compressor_name].decompress(zdata[header_end + 1:]))
@@ -1,11 +1,27 @@
 """
 Tests for cache_utils.py
 """
+import cPickle as pickle
+import zlib
+
 import ddt
-from mock import MagicMock
+from django.core.cache import cache
+from django.test.client import RequestFactory
+from mock import MagicMock, Mock, patch
 from unittest import TestCase
 
-from openedx.core.lib.cache_utils import memoize_in_request_cache
+from openedx.core.lib.cache_utils import (
+    ProcessCache,
+    get_memoize_stats,
+    invalidate_memoized,
+    make_cache_key,
+    memoize_in_request_cache,
+    memoized,
+    reset_memoize_stats,
+    zpickle,
+    zunpickle,
+)
+from request_cache.middleware import RequestCache
 
 
 @ddt.ddt
@@ -62,3 +78,159 @@ class TestMemoizeInRequestCache(TestCase):
                 func_to_memoize(*arg_list2)
 
             self.assertEquals(self.func_to_count.call_count, 2)
+
+
+@ddt.ddt
+class TestMakeCacheKey(TestCase):
+    """
+    Test the make_cache_key helper function.
+    """
+    @ddt.data(
+        (('a&b',), ('a', 'b')),
+        ((1,), ('1',)),
+        ((['a', 'b'],), ('a', 'b')),
+        ((('a', 'b'), 'c'), ('a', ('b', 'c'))),
+    )
+    @ddt.unpack
+    def test_distinct_args(self, args1, args2):
+        self.assertNotEqual(make_cache_key(args1), make_cache_key(args2))
+
+    def test_kwargs(self):
+        self.assertEqual(make_cache_key((1,), {'a': 1, 'b': 2}), make_cache_key((1,), {'b': 2, 'a': 1}))
+        self.assertNotEqual(make_cache_key((1,), {'a': 1}), make_cache_key((1, 1)))
+
+    def test_model_instances(self):
+        self.assertEqual(
+            make_cache_key((Mock(_meta=Mock(db_table='auth_user'), pk=1, username='one'),)),
+            make_cache_key((Mock(_meta=Mock(db_table='auth_user'), pk=1, username='changed'),)),
+        )
+
+
+class TestProcessCache(TestCase):
+    """
+    Test the ProcessCache LRU.
+    """
+    @patch('openedx.core.lib.cache_utils.time.time')
+    def test_timeout(self, mock_time):
+        mock_time.return_value = 1000
+        process_cache = ProcessCache(max_entries=2, timeout=10)
+        process_cache.set('key', None)
+        self.assertEqual(process_cache.get('key'), (True, None))
+        mock_time.return_value = 1010
+        self.assertEqual(process_cache.get('key'), (False, None))
+
+    def test_eviction(self):
+        process_cache = ProcessCache(max_entries=2, timeout=10)
+        process_cache.set('key1', 1)
+        process_cache.set('key2', 2)
+        process_cache.get('key1')
+        process_cache.set('key3', 3)
+        self.assertEqual(len(process_cache), 2)
+        self.assertEqual(process_cache.get('key1'), (True, 1))
+        self.assertEqual(process_cache.get('key2'), (False, None))
+
+
+class TestMemoized(TestCase):
+    """
+    Test the memoized decorator.
+    """
+    def setUp(self):
+        super(TestMemoized, self).setUp()
+        self.func_to_count = MagicMock(side_effect=lambda *args, **kwargs: len(args))
+        self.start_request()
+        self.addCleanup(RequestCache.clear_request_cache)
+        reset_memoize_stats()
+        cache.clear()
+
+    def start_request(self):
+        """
+        Clears the request cache for a new current request, as RequestCacheMiddleware does.
+        """
+        RequestCache().process_request(RequestFactory().get('/'))
+
+    def memoize(self, namespace, **kwargs):
+        """
+        Returns func_to_count memoized in the namespace.
+        """
+        return memoized(namespace, **kwargs)(lambda *args, **kwargs: self.func_to_count(*args, **kwargs))
+
+    def test_request_tier(self):
+        func = self.memoize('test.request')
+        self.assertEqual(func('a', 'b'), 2)
+        self.assertEqual(func('a', 'b'), 2)
+        self.assertEqual(self.func_to_count.call_count, 1)
+        func('a&b')
+        self.assertEqual(self.func_to_count.call_count, 2)
+        self.assertEqual(get_memoize_stats('test.request')['request'], {'hits': 1, 'misses': 2})
+
+        self.start_request()
+        func('a', 'b')
+        self.assertEqual(self.func_to_count.call_count, 3)
+
+    def test_request_tier_outside_requests(self):
+        RequestCache.clear_request_cache()
+        func = self.memoize('test.no_request')
+        func('a')
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 2)
+        self.assertEqual(RequestCache.get_request_cache().data, {})
+
+    def test_process_tier(self):
+        func = self.memoize('test.process', process_timeout=60)
+        func('a')
+        self.start_request()
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 1)
+        self.assertEqual(get_memoize_stats('test.process')['process'], {'hits': 1, 'misses': 1})
+
+    def test_shared_tier(self):
+        func = self.memoize('test.shared', request=False, shared_timeout=60)
+        func(None)
+        func(None)
+        self.assertEqual(self.func_to_count.call_count, 1)
+        self.assertEqual(get_memoize_stats('test.shared')['shared'], {'hits': 1, 'misses': 1})
+
+    def test_invalidate(self):
+        func = self.memoize('test.invalidate', process_timeout=60, shared_timeout=60)
+        func('a')
+        invalidate_memoized('test.invalidate')
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 2)
+        func('a')
+        self.assertEqual(self.func_to_count.call_count, 2)
+
+    def test_uncacheable_argument(self):
+        func = self.memoize('test.uncacheable')
+        unsaved = Mock(_meta=Mock(db_table='auth_user'), pk=None)
+        func(unsaved)
+        func(unsaved)
+        self.assertEqual(self.func_to_count.call_count, 2)
+
+
+@ddt.ddt
+class TestZpickle(TestCase):
+    """
+    Test the zpickle and zunpickle serialization functions.
+    """
+    DATA = {'key': [1, 2.5, u'unicode', None], 'nested': {'tuple': (1, 2)}}
+
+    @ddt.data(
+        (None, None),
+        ('pickle', None),
+        (None, 'zlib'),
+        ('pickle', 'none'),
+    )
+    @ddt.unpack
+    def test_round_trip(self, codec, compressor):
+        self.assertEqual(zunpickle(zpickle(self.DATA, codec, compressor)), self.DATA)
+
+    def test_default_format(self):
+        # Without a codec, the data is written in the original format.
+        self.assertEqual(pickle.loads(zlib.decompress(zpickle(self.DATA))), self.DATA)
+
+    def test_codec_header(self):
+        self.assertTrue(zpickle(self.DATA, 'pickle', 'none').startswith('\x00pickle.none\n'))
+
+    def test_unknown_codec(self):
+        with self.assertRaises(KeyError):
+            zpickle(self.DATA, 'unknown')